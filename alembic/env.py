@@ -19,6 +19,14 @@ if config.config_file_name is not None:
 # add your model's MetaData object here
 target_metadata = Base.metadata
 
+def include_object(objeto, nombre, tipo, reflejado, comparado_con):
+    """Excluir de autogenerate las particiones de movimiento_stock (las gestiona HistoricoStockService)"""
+    if tipo in ("table", "index") and reflejado and comparado_con is None:
+        tabla = nombre if tipo == "table" else objeto.table.name
+        if tabla.startswith("movimiento_stock_"):
+            return False
+    return True
+
 def get_url():
     """Construye la URL de la base de datos desde variables de entorno"""
     from dotenv import load_dotenv
@@ -38,6 +46,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -58,7 +67,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
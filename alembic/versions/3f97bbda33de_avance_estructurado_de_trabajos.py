@@ -0,0 +1,29 @@
+"""Avance estructurado de trabajos
+
+Revision ID: 3f97bbda33de
+Revises: d3816c4c06e7
+Create Date: 2026-10-19 08:05:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f97bbda33de'
+down_revision: Union[str, Sequence[str], None] = 'd3816c4c06e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('trabajo', sa.Column('avance', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('trabajo', 'avance')
@@ -0,0 +1,165 @@
+"""
+🚀 Arranque y apagado de la aplicación - Montaje de routers y preparación diferida
+
+Cada router se registra con su prefijo y el módulo que lo define, sin
+importarlo. Al arrancar se montan todos salvo los de `RUTAS_DIFERIDAS`
+(prefijos separados por comas, p. ej. `/graphql,/inventario`), que se
+importan y montan con la primera petición bajo su prefijo: el proceso
+arranca sin cargar strawberry, numpy o los servicios que todavía nadie ha
+pedido. Si el esquema OpenAPI se genera a partir de las rutas (sin el
+artefacto de `app.openapi`), antes se montan todos los pendientes.
+
+`preparar_mapeos()` configura los mappers del ORM en un punto conocido (el
+arranque de la app) en lugar de en la primera consulta de una petición.
+
+`apagar()` se ejecuta al parar el proceso, cuando uvicorn ya no acepta
+peticiones y ha terminado (o agotado el plazo de) las que estaban en curso:
+espera hasta `APAGADO_ESPERA` segundos a que terminen las escrituras de
+stock que sigan en marcha y para los hilos LISTEN/NOTIFY.
+
+Con `ARRANQUE_PERFIL=1` se registra la duración de cada fase:
+
+    ARRANQUE_PERFIL=1 uvicorn app.main:app
+    python scripts/benchmark_arranque.py
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from importlib import import_module
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import FastAPI
+from sqlalchemy.orm import configure_mappers
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARRANQUE_PERFIL = os.getenv("ARRANQUE_PERFIL", "0") == "1"
+APAGADO_ESPERA = float(os.getenv("APAGADO_ESPERA", "30"))
+
+
+def rutas_diferidas() -> List[str]:
+    """Prefijos de `RUTAS_DIFERIDAS`"""
+    return [prefijo.strip() for prefijo in os.getenv("RUTAS_DIFERIDAS", "").split(",") if prefijo.strip()]
+
+
+@contextmanager
+def medir(fase: str):
+    """Registrar la duración de una fase del arranque (solo con ARRANQUE_PERFIL=1)"""
+    inicio = time.perf_counter()
+    yield
+    if ARRANQUE_PERFIL:
+        logger.info("⏱️ Arranque - %s: %.1f ms", fase, (time.perf_counter() - inicio) * 1000)
+
+
+def preparar_mapeos() -> None:
+    """Configurar todos los mappers del ORM (relaciones, herencia) de una vez"""
+    with medir("configure_mappers"):
+        configure_mappers()
+
+
+def apagar(espera: float = APAGADO_ESPERA) -> None:
+    """Esperar a las escrituras de stock en curso y parar las escuchas LISTEN/NOTIFY"""
+    # Si el servicio de stock no llegó a importarse no hay escrituras que esperar
+    stock_service = sys.modules.get("app.services.stock_service")
+    if stock_service and stock_service.movimientos_en_curso.en_curso:
+        pendientes = stock_service.movimientos_en_curso.en_curso
+        logger.info("⏳ Apagado: esperando %s movimientos de stock en curso", pendientes)
+        if not stock_service.movimientos_en_curso.esperar(espera):
+            logger.error(
+                "❌ Apagado con %s movimientos de stock sin terminar tras %s s",
+                stock_service.movimientos_en_curso.en_curso, espera
+            )
+    eventos = sys.modules.get("app.services.stock_eventos_service")
+    if eventos:
+        eventos.EscuchaNotificaciones.detener_todas()
+
+
+class RegistroRouters:
+    """
+    🧭 Routers de la aplicación por prefijo, montados al arrancar o al pedirlos
+
+    `rutas` es una secuencia de (prefijo, módulo, atributo) en orden de
+    registro. Un router sin prefijo propio se monta bajo el registrado; uno
+    con prefijo distinto del registrado es un error de configuración.
+    """
+
+    def __init__(self, app: FastAPI, rutas: Sequence[Tuple[str, str, str]]):
+        self.app = app
+        self.rutas: Dict[str, Tuple[str, str]] = {prefijo: (modulo, atributo) for prefijo, modulo, atributo in rutas}
+        self.pendientes: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, diferidas: Iterable[str] = ()) -> None:
+        """
+        Montar los routers salvo los `diferidas`, que quedan pendientes
+
+        Raises:
+            ValueError: Si algún prefijo diferido no está registrado
+        """
+        diferidas = set(diferidas)
+        desconocidas = diferidas - set(self.rutas)
+        if desconocidas:
+            raise ValueError(
+                f"RUTAS_DIFERIDAS no válidas: {', '.join(sorted(desconocidas))}. "
+                f"Disponibles: {', '.join(self.rutas)}"
+            )
+        for prefijo, ruta in self.rutas.items():
+            if prefijo in diferidas:
+                self.pendientes[prefijo] = ruta
+            else:
+                self._montar(prefijo)
+        if self.pendientes:
+            self.app.add_middleware(MontajeDiferido, registro=self)
+
+    def _montar(self, prefijo: str) -> None:
+        modulo, atributo = self.rutas[prefijo]
+        with medir(f"router {prefijo}"):
+            router = getattr(import_module(modulo), atributo)
+            if router.prefix and router.prefix != prefijo:
+                raise ValueError(f"El router de {modulo} usa el prefijo {router.prefix}, registrado como {prefijo}")
+            self.app.include_router(router, prefix="" if router.prefix else prefijo)
+
+    def montar(self, prefijo: str) -> None:
+        """Montar un router pendiente (una sola vez aunque lo pidan varias peticiones a la vez)"""
+        with self._lock:
+            if prefijo not in self.pendientes:
+                return
+            self._montar(prefijo)
+            del self.pendientes[prefijo]
+            # El esquema ya generado no incluye las rutas nuevas
+            self.app.openapi_schema = None
+        logger.info("✅ Router %s montado bajo demanda", prefijo)
+
+    def montar_pendientes(self) -> None:
+        """Montar todos los routers pendientes"""
+        for prefijo in list(self.pendientes):
+            self.montar(prefijo)
+
+    def pendiente_para(self, ruta: str) -> Optional[str]:
+        """Prefijo pendiente bajo el que cae `ruta`, si lo hay"""
+        for prefijo in list(self.pendientes):
+            if ruta == prefijo or ruta.startswith(prefijo + "/"):
+                return prefijo
+        return None
+
+
+class MontajeDiferido:
+    """Middleware ASGI: monta el router pendiente de una ruta antes de enrutar su primera petición"""
+
+    def __init__(self, app: ASGIApp, registro: RegistroRouters):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and self.registro.pendientes:
+            prefijo = self.registro.pendiente_para(scope["path"])
+            if prefijo:
+                # La importación bloquea: fuera del bucle de eventos
+                await run_in_threadpool(self.registro.montar, prefijo)
+        await self.app(scope, receive, send)
@@ -0,0 +1,202 @@
+"""
+🗜️ Compresión de respuestas (brotli / gzip) por encima de un umbral
+
+Middleware ASGI que comprime el cuerpo de las respuestas HTTP con la mejor
+codificación que acepte el cliente (`Accept-Encoding`, con sus `q`) entre
+las configuradas en `COMPRESION` (por orden de preferencia, `br,gzip` por
+defecto; vacía para desactivarla). brotli es opcional: sin el paquete
+`brotli` instalado solo se ofrece gzip.
+
+Solo se comprime a partir de `COMPRESION_MINIMO` bytes: el cuerpo se
+acumula hasta superar el umbral y, si la respuesta termina antes, sale tal
+cual. Las respuestas en streaming se comprimen bloque a bloque, vaciando el
+compresor tras cada uno para que el cliente reciba los datos sin esperar al
+final. No se tocan las respuestas ya codificadas (p. ej. /openapi.json), ni
+los eventos SSE o los formatos ya comprimidos, ni los websockets.
+
+Los ETag fuertes pasan a débiles al comprimir: el cuerpo enviado ya no es
+byte a byte el de la representación sin comprimir.
+"""
+
+import os
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import logging
+
+try:
+    import brotli
+except ImportError:  # Dependencia opcional: sin ella solo se ofrece gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESION = [nombre.strip() for nombre in os.getenv("COMPRESION", "br,gzip").split(",") if nombre.strip()]
+COMPRESION_MINIMO = int(os.getenv("COMPRESION_MINIMO", "1024"))
+COMPRESION_NIVEL_GZIP = int(os.getenv("COMPRESION_NIVEL_GZIP", "6"))
+COMPRESION_NIVEL_BROTLI = int(os.getenv("COMPRESION_NIVEL_BROTLI", "4"))
+
+# Tipos que no se comprimen: eventos en vivo y formatos ya comprimidos
+TIPOS_EXCLUIDOS = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+def codificaciones_aceptadas(accept_encoding: str) -> Dict[str, float]:
+    """Codificaciones de `Accept-Encoding` con su calidad (`q`, 1 si no se indica)"""
+    aceptadas = {}
+    for codificacion in accept_encoding.split(","):
+        nombre, _, parametros = codificacion.partition(";")
+        nombre = nombre.strip().lower()
+        if not nombre:
+            continue
+        calidad = 1.0
+        parametro = parametros.strip().replace(" ", "")
+        if parametro.startswith("q="):
+            try:
+                calidad = float(parametro[2:])
+            except ValueError:
+                calidad = 0.0
+        aceptadas[nombre] = calidad
+    return aceptadas
+
+
+def elegir_codificacion(accept_encoding: str, disponibles: Sequence[str]) -> Optional[str]:
+    """La codificación de `disponibles` con mayor calidad para el cliente (en empate, la primera)"""
+    aceptadas = codificaciones_aceptadas(accept_encoding)
+    elegida, mejor = None, 0.0
+    for nombre in disponibles:
+        calidad = aceptadas.get(nombre, aceptadas.get("*", 0.0))
+        if calidad > mejor:
+            elegida, mejor = nombre, calidad
+    return elegida
+
+
+class _Gzip:
+    def __init__(self, nivel: int):
+        # wbits=31: formato gzip (cabecera y CRC) en lugar de zlib
+        self._compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+
+    def comprimir(self, datos: bytes, final: bool) -> bytes:
+        return self._compresor.compress(datos) + self._compresor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _Brotli:
+    def __init__(self, nivel: int):
+        self._compresor = brotli.Compressor(quality=nivel)
+
+    def comprimir(self, datos: bytes, final: bool) -> bytes:
+        return self._compresor.process(datos) + (self._compresor.finish() if final else self._compresor.flush())
+
+
+COMPRESORES = {
+    "gzip": lambda: _Gzip(COMPRESION_NIVEL_GZIP),
+    "br": lambda: _Brotli(COMPRESION_NIVEL_BROTLI),
+}
+
+
+def codificaciones_disponibles(codificaciones: Sequence[str] = COMPRESION) -> List[str]:
+    """
+    Codificaciones configuradas que se pueden usar, en orden de preferencia
+
+    Raises:
+        ValueError: Si alguna codificación no está soportada
+    """
+    desconocidas = [nombre for nombre in codificaciones if nombre not in COMPRESORES]
+    if desconocidas:
+        raise ValueError(f"COMPRESION no válida: {', '.join(desconocidas)}. Opciones: br, gzip")
+    if "br" in codificaciones and brotli is None:
+        logger.info("ℹ️ Paquete brotli no instalado: las respuestas se comprimen solo con gzip")
+    return [nombre for nombre in codificaciones if nombre != "br" or brotli is not None]
+
+
+class Compresion:
+    """Middleware ASGI: comprime las respuestas HTTP mayores que `minimo` bytes"""
+
+    def __init__(self, app: ASGIApp, minimo: int = COMPRESION_MINIMO,
+                 codificaciones: Sequence[str] = COMPRESION):
+        self.app = app
+        self.minimo = minimo
+        self.codificaciones = codificaciones_disponibles(codificaciones)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        codificacion = None
+        if scope["type"] == "http" and self.codificaciones:
+            codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding", ""), self.codificaciones)
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _RespuestaComprimida(send, codificacion, self.minimo).enviar)
+
+
+class _RespuestaComprimida:
+    """Estado de la compresión de una respuesta"""
+
+    def __init__(self, send: Send, codificacion: str, minimo: int):
+        self.send = send
+        self.codificacion = codificacion
+        self.minimo = minimo
+        self.inicio: Optional[Message] = None
+        self.pendiente: List[bytes] = []
+        self.tamano = 0
+        self.compresor = None
+        self.sin_comprimir = False
+
+    async def enviar(self, mensaje: Message) -> None:
+        tipo = mensaje["type"]
+        if tipo == "http.response.start":
+            cabeceras = Headers(raw=mensaje["headers"])
+            self.sin_comprimir = (
+                "content-encoding" in cabeceras
+                or cabeceras.get("content-type", "").startswith(TIPOS_EXCLUIDOS)
+                or mensaje["status"] in (204, 304)
+            )
+            if self.sin_comprimir:
+                await self.send(mensaje)
+            else:
+                # Las cabeceras dependen de si se llega a comprimir
+                self.inicio = mensaje
+            return
+        if tipo != "http.response.body" or self.sin_comprimir:
+            await self._enviar_inicio()
+            await self.send(mensaje)
+            return
+
+        cuerpo = mensaje.get("body", b"")
+        mas = mensaje.get("more_body", False)
+        if self.compresor is None:
+            self.pendiente.append(cuerpo)
+            self.tamano += len(cuerpo)
+            if self.tamano < self.minimo:
+                if mas:
+                    return
+                # Terminó por debajo del umbral: sale tal cual
+                await self._enviar_inicio()
+                await self.send({"type": "http.response.body", "body": b"".join(self.pendiente), "more_body": False})
+                return
+            cuerpo, self.pendiente = b"".join(self.pendiente), []
+            self.compresor = COMPRESORES[self.codificacion]()
+            comprimido = self.compresor.comprimir(cuerpo, final=not mas)
+            self._preparar_cabeceras(None if mas else len(comprimido))
+            await self._enviar_inicio()
+        else:
+            comprimido = self.compresor.comprimir(cuerpo, final=not mas)
+        await self.send({"type": "http.response.body", "body": comprimido, "more_body": mas})
+
+    def _preparar_cabeceras(self, longitud: Optional[int]) -> None:
+        cabeceras = MutableHeaders(raw=list(self.inicio["headers"]))
+        cabeceras["Content-Encoding"] = self.codificacion
+        cabeceras.add_vary_header("Accept-Encoding")
+        if longitud is None:
+            del cabeceras["Content-Length"]
+        else:
+            cabeceras["Content-Length"] = str(longitud)
+        etag = cabeceras.get("etag")
+        if etag and not etag.startswith("W/"):
+            cabeceras["ETag"] = f"W/{etag}"
+        self.inicio["headers"] = cabeceras.raw
+
+    async def _enviar_inicio(self) -> None:
+        if self.inicio is not None:
+            inicio, self.inicio = self.inicio, None
+            await self.send(inicio)
@@ -1,15 +1,143 @@
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+from sqlalchemy import JSON, BigInteger, DateTime, Integer, create_engine, event
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
+import logging
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-DATABASE_URL = (
-    f"postgresql+psycopg2://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}"
-    f"@{os.getenv('POSTGRES_HOST')}:{os.getenv('POSTGRES_PORT')}/{os.getenv('POSTGRES_DB')}"
-)
+# Motor de base de datos: "postgresql" (por defecto) o "sqlite" (en memoria,
+# sin servicios externos, para pruebas y benchmarks locales)
+DB_BACKEND = os.getenv("DB_BACKEND", "postgresql").lower()
+if DB_BACKEND not in ("postgresql", "sqlite"):
+    raise ValueError(f"DB_BACKEND no válido: '{DB_BACKEND}'. Opciones: postgresql, sqlite")
+ES_SQLITE = DB_BACKEND == "sqlite"
+
+# Pool de conexiones de cada proceso (PostgreSQL): DB_POOL_SIZE conexiones que
+# se mantienen abiertas y hasta DB_MAX_OVERFLOW más en los picos. Con varios
+# workers, `app.servidor` los ajusta para no superar las conexiones del servidor.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# SQL en el log: con DB_ECHO=1 el logger sqlalchemy.engine registra cada
+# sentencia a nivel INFO a través del registro de la app (ver `app.registro`)
+# en lugar del handler síncrono que añade `echo=True`
+DB_ECHO = os.getenv("DB_ECHO", "0") == "1"
+if DB_ECHO:
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+if ES_SQLITE:
+    DATABASE_URL = "sqlite+pysqlite:///:memory:"
+    # Una única conexión compartida: cada conexión nueva a :memory: sería otra base vacía
+    engine = create_engine(
+        DATABASE_URL, poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+else:
+    DATABASE_URL = (
+        f"postgresql+psycopg2://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}"
+        f"@{os.getenv('POSTGRES_HOST')}:{os.getenv('POSTGRES_PORT')}/{os.getenv('POSTGRES_DB')}"
+    )
+    engine = create_engine(DATABASE_URL, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
 
-engine = create_engine(DATABASE_URL, echo=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+# JSONB en PostgreSQL, JSON (texto) en SQLite
+JSONB_PORTABLE = JSONB().with_variant(JSON(), "sqlite")
+# Claves BIGINT: en SQLite solo INTEGER PRIMARY KEY es autoincremental
+ENTERO_GRANDE = BigInteger().with_variant(Integer(), "sqlite")
+
+
+def _ahora() -> str:
+    """Hora real en UTC con el formato de fecha de SQLite (equivalente a clock_timestamp())"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+class _FechaHoraSQLite(sqlite.DATETIME):
+    """
+    DATETIME de SQLite que conserva la zona horaria de las columnas `timezone=True`
+
+    SQLite guarda las fechas como texto sin zona: se escriben en UTC y se
+    leen como UTC, igual que las devuelve PostgreSQL (`timestamptz`).
+    """
+
+    def bind_processor(self, dialect):
+        procesar = super().bind_processor(dialect)
+
+        def convertir(valor):
+            if valor is not None and getattr(valor, "tzinfo", None) is not None:
+                valor = valor.astimezone(timezone.utc)
+            return procesar(valor)
+        return convertir
+
+    def result_processor(self, dialect, coltype):
+        procesar = super().result_processor(dialect, coltype)
+        if not self.timezone:
+            return procesar
+
+        def convertir(valor):
+            valor = procesar(valor)
+            return valor.replace(tzinfo=timezone.utc) if valor is not None else None
+        return convertir
+
+
+if ES_SQLITE:
+    engine.dialect.colspecs = {**engine.dialect.colspecs, DateTime: _FechaHoraSQLite}
+    _secuencias: dict = {}
+
+    def _nextval(nombre: str) -> int:
+        """Secuencias de PostgreSQL referenciadas en valores por defecto; viven lo que la base en memoria"""
+        _secuencias[nombre] = _secuencias.get(nombre, 0) + 1
+        return _secuencias[nombre]
+
+    @event.listens_for(engine, "connect")
+    def _configurar_sqlite(conexion_dbapi, registro) -> None:
+        """Claves foráneas, funciones de PostgreSQL usadas por el esquema y transacciones explícitas"""
+        conexion_dbapi.isolation_level = None
+        conexion_dbapi.create_function("clock_timestamp", 0, _ahora)
+        conexion_dbapi.create_function("nextval", 1, _nextval)
+        cursor = conexion_dbapi.cursor()
+        cursor.execute("PRAGMA foreign_keys = ON")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _iniciar_transaccion(conexion) -> None:
+        # pysqlite no emite BEGIN por sí mismo antes de un SAVEPOINT; con la
+        # conexión compartida, una sesión que empieza con otra transacción
+        # abierta se une a ella
+        if not conexion.connection.driver_connection.in_transaction:
+            conexion.exec_driver_sql("BEGIN")
+
+
+def reiniciar_secuencias() -> None:
+    """Volver a empezar en 1 las secuencias emuladas en SQLite (bases de prueba)"""
+    if ES_SQLITE:
+        _secuencias.clear()
+
+
+def crear_esquema() -> None:
+    """
+    🏗️ Crear las tablas de todos los modelos (solo SQLite)
+
+    En PostgreSQL el esquema lo gestionan las migraciones de alembic.
+    """
+    import app.models  # noqa: F401  (registra todas las tablas en Base.metadata)
+    Base.metadata.create_all(engine)
+
+
+def get_db():
+    """
+    🔌 Dependencia para obtener sesión de base de datos
+
+    Compartida por todas las rutas: los tests la sustituyen en un único
+    punto (`app.dependency_overrides[get_db]`).
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,2 +1,21 @@
 # GraphQL package
 # This package contains all GraphQL types, resolvers, and schema definitions
+#
+# `schema` (y con él strawberry) se carga al pedirlo, no al importar el
+# paquete: `app.graphql.versiones` no lo necesita
+
+from importlib import import_module
+
+
+def __getattr__(nombre: str):
+    if nombre not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(import_module(".schema", __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+__all__ = [
+    "graphql_router",
+    "schema"
+]
@@ -0,0 +1,186 @@
+"""
+⚡ Consultas persistidas y caché de resultados GraphQL
+
+- Consultas persistidas: el cliente envía solo el sha256 de la consulta
+  (`extensions.persistedQuery.sha256Hash`, protocolo APQ). La primera vez
+  la envía completa junto al hash para registrarla.
+- Caché de resultados: por (hash, variables, operación), válido mientras
+  no cambie ninguna de las tablas que la consulta lee.
+
+Las versiones de tabla (`app.graphql.versiones`) se incrementan al confirmar cualquier escritura del
+ORM (servicios incluidos). En PostgreSQL cada transacción anuncia además sus
+tablas con NOTIFY (`CANAL_TABLAS`), que se entrega a todos los procesos al
+confirmar; cada proceso escucha el canal e incrementa sus versiones. Mientras
+la escucha no está conectada no se sirve ni se guarda nada en la caché.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, FrozenSet, Iterator, Optional
+
+from graphql import ExecutionResult, GraphQLError, TypeInfo, TypeInfoVisitor, Visitor, get_named_type, visit
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+from app.graphql.versiones import escucha_tablas, versiones_tablas
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tablas que lee cada tipo GraphQL
+TABLAS_POR_TIPO = {
+    "Familia": ("familia",),
+    "Color": ("color",),
+    "Proveedor": ("proveedor",),
+    "Articulo": ("articulo",),
+    "Producto": ("producto",),
+    "ProductoSimple": ("producto_simple",),
+    "ProductoCompuesto": ("producto_compuesto",),
+    "ComponenteProducto": ("componente_producto",),
+    "Componente": ("componente",),
+    "Pack": ("pack",),
+    "PackProducto": ("pack_producto",),
+    "Stock": ("stock",),
+    "Ubicacion": ("ubicacion",),
+}
+
+MAX_CONSULTAS_PERSISTIDAS = int(os.getenv("GRAPHQL_MAX_CONSULTAS_PERSISTIDAS", "1000"))
+MAX_RESULTADOS = int(os.getenv("GRAPHQL_CACHE_MAX_RESULTADOS", "1000"))
+TTL_RESULTADOS = float(os.getenv("GRAPHQL_CACHE_TTL", "60"))
+
+
+def hash_consulta(consulta: str) -> str:
+    """sha256 hexadecimal del texto de la consulta"""
+    return hashlib.sha256(consulta.encode("utf-8")).hexdigest()
+
+
+# ==========================================
+# REGISTRO Y CACHÉS
+# ==========================================
+
+class CacheLRU:
+    """🗃️ Diccionario LRU acotado y seguro entre hilos"""
+
+    def __init__(self, maximo: int):
+        self.maximo = maximo
+        self._datos: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Any) -> Optional[Any]:
+        with self._lock:
+            valor = self._datos.get(clave)
+            if valor is not None:
+                self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: Any, valor: Any) -> None:
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def eliminar(self, clave: Any) -> None:
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+
+# hash -> texto de la consulta
+consultas_persistidas = CacheLRU(MAX_CONSULTAS_PERSISTIDAS)
+# hash -> tablas que lee la consulta
+tablas_por_consulta = CacheLRU(MAX_CONSULTAS_PERSISTIDAS)
+# (hash, variables, operación) -> (versiones, caduca_en, datos)
+resultados = CacheLRU(MAX_RESULTADOS)
+
+
+def tablas_de_documento(esquema: Any, documento: Any) -> FrozenSet[str]:
+    """Tablas que lee una consulta, según los tipos de todos sus campos"""
+    type_info = TypeInfo(esquema)
+    tablas = set()
+
+    class Visitante(Visitor):
+        def enter_field(self, *_args):
+            tipo = type_info.get_type()
+            if tipo is not None:
+                tablas.update(TABLAS_POR_TIPO.get(get_named_type(tipo).name, ()))
+
+    visit(documento, TypeInfoVisitor(type_info, Visitante()))
+    return frozenset(tablas)
+
+
+# ==========================================
+# EXTENSIONES
+# ==========================================
+
+class ConsultasPersistidas(SchemaExtension):
+    """
+    📌 Resolver consultas persistidas por hash
+
+    Sin texto de consulta busca el hash en el registro; con texto y hash
+    comprueba que coinciden y lo registra.
+    """
+
+    def on_operation(self) -> Iterator[None]:
+        contexto = self.execution_context
+        persistida = (contexto.operation_extensions or {}).get("persistedQuery") or {}
+        hash_ = persistida.get("sha256Hash")
+        if hash_:
+            if contexto.query:
+                if hash_consulta(contexto.query) != hash_:
+                    raise GraphQLError(
+                        "El hash no coincide con la consulta", extensions={"code": "PERSISTED_QUERY_HASH_MISMATCH"}
+                    )
+                consultas_persistidas.guardar(hash_, contexto.query)
+            else:
+                consulta = consultas_persistidas.obtener(hash_)
+                if consulta is None:
+                    raise GraphQLError("PersistedQueryNotFound", extensions={"code": "PERSISTED_QUERY_NOT_FOUND"})
+                contexto.query = consulta
+        yield
+
+
+class CacheResultados(SchemaExtension):
+    """
+    💾 Caché de resultados de consultas de lectura
+
+    La instantánea de versiones se toma antes de ejecutar: si una escritura
+    confirma durante la ejecución, la entrada guardada ya nace caducada.
+    """
+
+    def on_execute(self) -> Iterator[None]:
+        contexto = self.execution_context
+        if (contexto.operation_type != OperationType.QUERY or TTL_RESULTADOS <= 0
+                or not escucha_tablas.preparada()):
+            yield
+            return
+
+        hash_ = hash_consulta(contexto.query)
+        tablas = tablas_por_consulta.obtener(hash_)
+        if tablas is None:
+            tablas = tablas_de_documento(contexto.schema._schema, contexto.graphql_document)
+            tablas_por_consulta.guardar(hash_, tablas)
+
+        clave = (hash_, json.dumps(contexto.variables or {}, sort_keys=True, default=str), contexto.operation_name)
+        versiones = versiones_tablas.instantanea(tablas)
+        entrada = resultados.obtener(clave)
+        if entrada is not None:
+            versiones_guardadas, caduca_en, datos = entrada
+            if versiones_guardadas == versiones and caduca_en > time.monotonic():
+                contexto.result = ExecutionResult(data=datos, errors=None)
+                yield
+                return
+            resultados.eliminar(clave)
+
+        yield
+
+        resultado = contexto.result
+        if isinstance(resultado, ExecutionResult) and not resultado.errors and resultado.data is not None:
+            resultados.guardar(clave, (versiones, time.monotonic() + TTL_RESULTADOS, resultado.data))
@@ -0,0 +1,81 @@
+"""
+🚧 Límites de coste de las consultas GraphQL
+
+La profundidad y los alias se limitan con las extensiones de Strawberry.
+Esta regla de validación estima además cuántos objetos puede devolver
+una consulta antes de ejecutarla y rechaza las que superan el máximo.
+"""
+
+from typing import Any, Set
+
+from graphql import (
+    FieldNode, FragmentSpreadNode, GraphQLError, GraphQLObjectType, InlineFragmentNode,
+    IntValueNode, ValidationRule, get_named_type, get_nullable_type, is_list_type
+)
+
+# Tamaño máximo de página de los listados raíz
+LIMITE_MAXIMO = 1000
+
+# Tamaño supuesto de una lista anidada (sin argumento `limite`)
+FACTOR_LISTA = 10
+
+
+def limite_complejidad(maximo: int):
+    """
+    Crear la regla de validación que limita la complejidad a `maximo`
+
+    Cada campo cuesta tantas unidades como veces puede aparecer en la
+    respuesta: un campo dentro de `packs(limite: 500)` cuesta 500, y dentro
+    de su lista `productos` 500 × FACTOR_LISTA.
+    """
+
+    class LimiteComplejidad(ValidationRule):
+
+        def enter_operation_definition(self, node, *_args):
+            tipo_raiz = self.context.schema.get_root_type(node.operation)
+            coste = self._coste(node.selection_set, tipo_raiz, 1, set())
+            if coste > maximo:
+                self.report_error(GraphQLError(
+                    f"La consulta supera la complejidad máxima permitida ({coste} > {maximo})", node
+                ))
+
+        @staticmethod
+        def _tamano_lista(nodo: FieldNode, campo: Any) -> int:
+            """Número de elementos que puede devolver un campo lista"""
+            if "limite" not in campo.args:
+                return FACTOR_LISTA
+            for argumento in nodo.arguments or ():
+                if argumento.name.value == "limite":
+                    if isinstance(argumento.value, IntValueNode):
+                        return min(int(argumento.value.value), LIMITE_MAXIMO)
+                    # Con variables el valor aún no se conoce: suponer el peor caso
+                    return LIMITE_MAXIMO
+            return campo.args["limite"].default_value or FACTOR_LISTA
+
+        def _coste(self, seleccion: Any, tipo: Any, multiplicador: int, fragmentos: Set[str]) -> int:
+            if seleccion is None or not isinstance(tipo, GraphQLObjectType):
+                return 0
+            total = 0
+            for nodo in seleccion.selections:
+                if isinstance(nodo, FieldNode):
+                    campo = tipo.fields.get(nodo.name.value)
+                    if campo is None:
+                        continue
+                    total += multiplicador
+                    factor = self._tamano_lista(nodo, campo) if is_list_type(get_nullable_type(campo.type)) else 1
+                    total += self._coste(nodo.selection_set, get_named_type(campo.type), multiplicador * factor, fragmentos)
+                elif isinstance(nodo, FragmentSpreadNode):
+                    nombre = nodo.name.value
+                    fragmento = self.context.get_fragment(nombre)
+                    if fragmento is not None and nombre not in fragmentos:
+                        tipo_fragmento = self.context.schema.get_type(fragmento.type_condition.name.value)
+                        total += self._coste(fragmento.selection_set, tipo_fragmento, multiplicador, fragmentos | {nombre})
+                elif isinstance(nodo, InlineFragmentNode):
+                    tipo_fragmento = (
+                        self.context.schema.get_type(nodo.type_condition.name.value)
+                        if nodo.type_condition else tipo
+                    )
+                    total += self._coste(nodo.selection_set, tipo_fragmento, multiplicador, fragmentos)
+            return total
+
+    return LimiteComplejidad
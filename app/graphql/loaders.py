@@ -0,0 +1,128 @@
+"""
+📦 DataLoaders de GraphQL
+
+Cada relación se resuelve con un DataLoader que agrupa todas las claves
+pedidas en un mismo ciclo de ejecución en una única consulta `IN`, en lugar
+de una consulta por fila padre (problema N+1).
+
+Los loaders se crean por petición: su caché vive lo mismo que la petición
+y nunca sirve datos de otra.
+"""
+
+import asyncio
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from strawberry.dataloader import DataLoader
+
+from app.models.articulo import Articulo
+from app.models.color import Color
+from app.models.componente import Componente
+from app.models.componente_producto import ComponenteProducto
+from app.models.familia import Familia
+from app.models.pack import Pack
+from app.models.pack_producto import PackProducto
+from app.models.producto import Producto
+from app.models.producto_compuesto import ProductoCompuesto
+from app.models.producto_simple import ProductoSimple
+from app.models.proveedor import Proveedor
+from app.models.stock import Stock
+from app.models.ubicacion import Ubicacion
+from app.graphql.types import (
+    ArticuloType, ColorType, ComponenteProductoType, ComponenteType, FamiliaType, PackProductoType,
+    PackType, ProductoCompuestoType, ProductoSimpleType, ProductoType, ProveedorType, StockType,
+    UbicacionType
+)
+
+
+def convertir(tipo: Type, instancia: Any) -> Any:
+    """
+    Crear una instancia del tipo GraphQL a partir de una fila del ORM
+
+    Solo copia los campos sin resolver propio (columnas y propiedades);
+    las relaciones las resuelven los loaders.
+    """
+    if instancia is None:
+        return None
+    valores = {}
+    for campo in tipo.__strawberry_definition__.fields:
+        if campo.base_resolver is not None:
+            continue
+        valor = getattr(instancia, campo.python_name)
+        valores[campo.python_name] = float(valor) if isinstance(valor, Decimal) else valor
+    return tipo(**valores)
+
+
+class Loaders:
+    """
+    🧺 DataLoaders de una petición GraphQL
+
+    Las consultas se ejecutan en el pool de hilos para no bloquear el bucle
+    de eventos, de una en una porque la sesión no es segura entre hilos.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._lock = asyncio.Lock()
+
+        # Por clave primaria
+        self.familia = self._por_columna(Familia.id, FamiliaType)
+        self.color = self._por_columna(Color.id, ColorType)
+        self.proveedor = self._por_columna(Proveedor.id, ProveedorType)
+        self.articulo = self._por_columna(Articulo.id, ArticuloType)
+        self.producto = self._por_columna(Producto.id, ProductoType)
+        self.producto_simple = self._por_columna(ProductoSimple.id, ProductoSimpleType)
+        self.componente = self._por_columna(Componente.id, ComponenteType)
+        self.ubicacion = self._por_columna(Ubicacion.id, UbicacionType)
+
+        # Relaciones uno a uno por clave foránea
+        self.producto_por_articulo = self._por_columna(Producto.id_articulo, ProductoType)
+        self.pack_por_articulo = self._por_columna(Pack.id_articulo, PackType)
+        self.producto_simple_por_producto = self._por_columna(ProductoSimple.id_producto, ProductoSimpleType)
+        self.producto_compuesto_por_producto = self._por_columna(ProductoCompuesto.id_producto, ProductoCompuestoType)
+        self.stock_por_producto_simple = self._por_columna(Stock.id_producto_simple, StockType)
+        self.stock_por_componente = self._por_columna(Stock.id_componente, StockType)
+
+        # Relaciones uno a muchos por clave foránea
+        self.articulos_por_familia = self._por_columna(Articulo.id_familia, ArticuloType, muchos=True)
+        self.componentes_por_proveedor = self._por_columna(Componente.id_proveedor, ComponenteType, muchos=True)
+        self.lineas_por_pack = self._por_columna(PackProducto.id_pack, PackProductoType, muchos=True)
+        self.stocks_por_producto_simple = self._por_columna(Stock.id_producto_simple, StockType, muchos=True)
+        self.stocks_por_componente = self._por_columna(Stock.id_componente, StockType, muchos=True)
+        self.ubicaciones_por_padre = self._por_columna(Ubicacion.id_padre, UbicacionType, muchos=True)
+        self.lineas_por_producto_compuesto = self._por_columna(
+            ComponenteProducto.id_producto_compuesto, ComponenteProductoType, muchos=True
+        )
+
+    async def consultar(self, funcion: Callable[[], Any]) -> Any:
+        """Ejecutar una consulta síncrona con la sesión de la petición"""
+        async with self._lock:
+            return await run_in_threadpool(funcion)
+
+    def _por_columna(self, columna: Any, tipo: Type, muchos: bool = False) -> DataLoader:
+        """
+        Crear un DataLoader que busca filas por los valores de `columna`
+
+        Args:
+            columna: Columna del modelo por la que se agrupa (PK o FK)
+            tipo: Tipo GraphQL al que se convierten las filas
+            muchos (bool): Devolver una lista por clave en lugar de una fila
+        """
+        modelo = columna.class_
+
+        def buscar(claves: List[int]) -> List[Any]:
+            filas = self.db.query(modelo).filter(columna.in_(claves)).order_by(modelo.id).all()
+            agrupadas: Dict[int, List[Any]] = defaultdict(list)
+            for fila in filas:
+                agrupadas[getattr(fila, columna.key)].append(convertir(tipo, fila))
+            if muchos:
+                return [agrupadas.get(clave, []) for clave in claves]
+            return [agrupadas[clave][0] if agrupadas.get(clave) else None for clave in claves]
+
+        async def cargar(claves: List[int]) -> List[Optional[Any]]:
+            return await self.consultar(lambda: buscar(list(claves)))
+
+        return DataLoader(load_fn=cargar)
@@ -0,0 +1,160 @@
+"""
+🔗 Esquema GraphQL - Consultas sobre los servicios del inventario
+
+Los campos raíz usan los servicios existentes; las relaciones anidadas
+se resuelven en lote con los DataLoaders de `app.graphql.loaders`.
+"""
+
+from typing import Any, Callable, List, Optional, Type
+
+import strawberry
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from strawberry.extensions import (
+    AddValidationRules, MaxAliasesLimiter, ParserCache, QueryDepthLimiter, ValidationCache
+)
+from strawberry.fastapi import BaseContext, GraphQLRouter
+from strawberry.schema.config import StrawberryConfig
+from strawberry.types import Info
+
+from app.db import get_db
+from app.graphql.cache import CacheResultados, ConsultasPersistidas
+from app.graphql.limites import LIMITE_MAXIMO, limite_complejidad
+from app.graphql.loaders import Loaders, convertir
+from app.graphql.types import (
+    ArticuloType, ColorType, ComponenteType, FamiliaType, PackType,
+    ProductoType, ProveedorType, StockType, UbicacionType
+)
+from app.services.articulo_service import ArticuloService
+from app.services.color_service import ColorService
+from app.services.componente_service import ComponenteService
+from app.services.familia_service import FamiliaService
+from app.services.pack_service import PackService
+from app.services.producto_service import ProductoService
+from app.services.proveedor_service import ProveedorService
+from app.services.stock_service import StockService
+from app.services.ubicacion_service import UbicacionService
+
+# Límites de las consultas
+PROFUNDIDAD_MAXIMA = 8
+ALIAS_MAXIMOS = 15
+COMPLEJIDAD_MAXIMA = 100000
+
+
+class ContextoGraphQL(BaseContext):
+    """Contexto de una petición: sesión de base de datos y DataLoaders"""
+
+    def __init__(self, db: Session):
+        super().__init__()
+        self.db = db
+        self.loaders = Loaders(db)
+
+
+async def obtener_contexto(db: Session = Depends(get_db)) -> ContextoGraphQL:
+    return ContextoGraphQL(db)
+
+
+async def _consultar(info: Info, funcion: Callable[[Session], Any], tipo: Type) -> Any:
+    """Ejecutar una consulta de servicio y convertir el resultado al tipo GraphQL"""
+    def ejecutar():
+        resultado = funcion(info.context.db)
+        if isinstance(resultado, list):
+            return [convertir(tipo, fila) for fila in resultado]
+        return convertir(tipo, resultado)
+    return await info.context.loaders.consultar(ejecutar)
+
+
+@strawberry.type
+class Query:
+
+    @strawberry.field
+    async def familias(self, info: Info, limite: int = 100, offset: int = 0) -> List[FamiliaType]:
+        limite = min(limite, LIMITE_MAXIMO)
+        return await _consultar(info, lambda db: FamiliaService(db).obtener_todos(limite=limite, offset=offset), FamiliaType)
+
+    @strawberry.field
+    async def familia(self, info: Info, id: int) -> Optional[FamiliaType]:
+        return await _consultar(info, lambda db: FamiliaService(db).obtener_por_id(id), FamiliaType)
+
+    @strawberry.field
+    async def colores(self, info: Info, limite: int = 100, offset: int = 0) -> List[ColorType]:
+        limite = min(limite, LIMITE_MAXIMO)
+        return await _consultar(info, lambda db: ColorService(db).obtener_todos(limite=limite, offset=offset), ColorType)
+
+    @strawberry.field
+    async def proveedores(self, info: Info, limite: int = 100, offset: int = 0) -> List[ProveedorType]:
+        limite = min(limite, LIMITE_MAXIMO)
+        return await _consultar(info, lambda db: ProveedorService(db).obtener_todos(limite=limite, offset=offset), ProveedorType)
+
+    @strawberry.field
+    async def articulos(self, info: Info, limite: int = 100, offset: int = 0) -> List[ArticuloType]:
+        limite = min(limite, LIMITE_MAXIMO)
+        return await _consultar(info, lambda db: ArticuloService(db).obtener_todos(limite=limite, offset=offset), ArticuloType)
+
+    @strawberry.field
+    async def articulo(self, info: Info, id: int) -> Optional[ArticuloType]:
+        return await _consultar(info, lambda db: ArticuloService(db).obtener_por_id(id), ArticuloType)
+
+    @strawberry.field
+    async def productos(self, info: Info, limite: int = 100, offset: int = 0) -> List[ProductoType]:
+        limite = min(limite, LIMITE_MAXIMO)
+        return await _consultar(info, lambda db: ProductoService(db).obtener_todos(limite=limite, offset=offset), ProductoType)
+
+    @strawberry.field
+    async def producto(self, info: Info, id: int) -> Optional[ProductoType]:
+        return await _consultar(info, lambda db: ProductoService(db).obtener_por_id(id), ProductoType)
+
+    @strawberry.field
+    async def packs(self, info: Info, limite: int = 100, offset: int = 0) -> List[PackType]:
+        limite = min(limite, LIMITE_MAXIMO)
+        return await _consultar(info, lambda db: PackService(db).obtener_todos(limite=limite, offset=offset), PackType)
+
+    @strawberry.field
+    async def pack(self, info: Info, id: int) -> Optional[PackType]:
+        return await _consultar(info, lambda db: PackService(db).obtener_por_id(id), PackType)
+
+    @strawberry.field
+    async def componentes(self, info: Info, limite: int = 100, offset: int = 0) -> List[ComponenteType]:
+        limite = min(limite, LIMITE_MAXIMO)
+        return await _consultar(info, lambda db: ComponenteService(db).obtener_todos(limite=limite, offset=offset), ComponenteType)
+
+    @strawberry.field
+    async def componente(self, info: Info, id: int) -> Optional[ComponenteType]:
+        return await _consultar(info, lambda db: ComponenteService(db).obtener_por_id(id), ComponenteType)
+
+    @strawberry.field
+    async def ubicaciones(self, info: Info, limite: int = 100, offset: int = 0,
+                          prefijo: Optional[str] = None, tipo: Optional[str] = None) -> List[UbicacionType]:
+        limite = min(limite, LIMITE_MAXIMO)
+        return await _consultar(
+            info,
+            lambda db: UbicacionService(db).listar_ubicaciones(prefijo=prefijo, tipo=tipo, skip=offset, limit=limite),
+            UbicacionType
+        )
+
+    @strawberry.field
+    async def stock(self, info: Info, limite: int = 100, offset: int = 0,
+                    bajo_minimo: Optional[bool] = None, ubicacion: Optional[str] = None) -> List[StockType]:
+        limite = min(limite, LIMITE_MAXIMO)
+        return await _consultar(
+            info,
+            lambda db: StockService(db).listar_stock(bajo_minimo=bajo_minimo, ubicacion=ubicacion, skip=offset, limit=limite),
+            StockType
+        )
+
+
+schema = strawberry.Schema(
+    query=Query,
+    config=StrawberryConfig(auto_camel_case=False),
+    extensions=[
+        ConsultasPersistidas,
+        ParserCache(maxsize=256),
+        ValidationCache(maxsize=256),
+        QueryDepthLimiter(max_depth=PROFUNDIDAD_MAXIMA),
+        MaxAliasesLimiter(max_alias_count=ALIAS_MAXIMOS),
+        AddValidationRules([limite_complejidad(COMPLEJIDAD_MAXIMA)]),
+        CacheResultados,
+    ]
+)
+
+graphql_router = GraphQLRouter(schema, context_getter=obtener_contexto, tags=["GraphQL"])
@@ -0,0 +1,283 @@
+"""
+🧩 Tipos GraphQL del catálogo e inventario
+
+Los campos escalares reflejan las columnas de cada modelo; las relaciones
+se resuelven con los DataLoaders del contexto (`info.context.loaders`).
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+import strawberry
+from strawberry.types import Info
+
+
+@strawberry.type(name="Familia")
+class FamiliaType:
+    id: int
+    nombre: str
+    descripcion: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @strawberry.field
+    async def articulos(self, info: Info) -> List["ArticuloType"]:
+        return await info.context.loaders.articulos_por_familia.load(self.id)
+
+
+@strawberry.type(name="Color")
+class ColorType:
+    id: int
+    nombre: str
+    codigo_hex: Optional[str]
+    url_imagen: Optional[str]
+    activo: Optional[bool]
+    descripcion: Optional[str]
+    id_familia: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+@strawberry.type(name="Proveedor")
+class ProveedorType:
+    id: int
+    nombre: str
+    nif_cif: Optional[str]
+    direccion: Optional[str]
+    telefono: Optional[str]
+    email: Optional[str]
+    activo: Optional[bool]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @strawberry.field
+    async def componentes(self, info: Info) -> List["ComponenteType"]:
+        return await info.context.loaders.componentes_por_proveedor.load(self.id)
+
+
+@strawberry.type(name="Articulo")
+class ArticuloType:
+    id: int
+    nombre: str
+    descripcion: Optional[str]
+    codigo: Optional[str]
+    activo: Optional[bool]
+    id_familia: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @strawberry.field
+    async def familia(self, info: Info) -> Optional[FamiliaType]:
+        if self.id_familia is None:
+            return None
+        return await info.context.loaders.familia.load(self.id_familia)
+
+    @strawberry.field
+    async def producto(self, info: Info) -> Optional["ProductoType"]:
+        return await info.context.loaders.producto_por_articulo.load(self.id)
+
+    @strawberry.field
+    async def pack(self, info: Info) -> Optional["PackType"]:
+        return await info.context.loaders.pack_por_articulo.load(self.id)
+
+
+@strawberry.type(name="Ubicacion")
+class UbicacionType:
+    id: int
+    codigo: str
+    tipo: str
+    nivel: int
+    ruta: str
+    posicion: Optional[int]
+    id_padre: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @strawberry.field
+    async def padre(self, info: Info) -> Optional["UbicacionType"]:
+        if self.id_padre is None:
+            return None
+        return await info.context.loaders.ubicacion.load(self.id_padre)
+
+    @strawberry.field
+    async def hijos(self, info: Info) -> List["UbicacionType"]:
+        return await info.context.loaders.ubicaciones_por_padre.load(self.id)
+
+
+@strawberry.type(name="Stock")
+class StockType:
+    id: int
+    cantidad_actual: float
+    cantidad_minima: Optional[float]
+    cantidad_maxima: Optional[float]
+    ubicacion_almacen: Optional[str]
+    necesita_reposicion: bool
+    id_producto_simple: Optional[int]
+    id_componente: Optional[int]
+    id_ubicacion: Optional[int]
+    id_almacen: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @strawberry.field
+    async def ubicacion(self, info: Info) -> Optional[UbicacionType]:
+        if self.id_ubicacion is None:
+            return None
+        return await info.context.loaders.ubicacion.load(self.id_ubicacion)
+
+    @strawberry.field
+    async def almacen(self, info: Info) -> Optional[UbicacionType]:
+        if self.id_almacen is None:
+            return None
+        return await info.context.loaders.ubicacion.load(self.id_almacen)
+
+    @strawberry.field
+    async def producto_simple(self, info: Info) -> Optional["ProductoSimpleType"]:
+        if self.id_producto_simple is None:
+            return None
+        return await info.context.loaders.producto_simple.load(self.id_producto_simple)
+
+    @strawberry.field
+    async def componente(self, info: Info) -> Optional["ComponenteType"]:
+        if self.id_componente is None:
+            return None
+        return await info.context.loaders.componente.load(self.id_componente)
+
+
+@strawberry.type(name="Componente")
+class ComponenteType:
+    id: int
+    nombre: str
+    descripcion: Optional[str]
+    codigo: Optional[str]
+    especificaciones: Optional[str]
+    id_proveedor: Optional[int]
+    id_color: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @strawberry.field
+    async def proveedor(self, info: Info) -> Optional[ProveedorType]:
+        if self.id_proveedor is None:
+            return None
+        return await info.context.loaders.proveedor.load(self.id_proveedor)
+
+    @strawberry.field
+    async def color(self, info: Info) -> Optional[ColorType]:
+        if self.id_color is None:
+            return None
+        return await info.context.loaders.color.load(self.id_color)
+
+    @strawberry.field(description="Primer registro de stock (ver `stocks` para todas las ubicaciones)")
+    async def stock(self, info: Info) -> Optional[StockType]:
+        return await info.context.loaders.stock_por_componente.load(self.id)
+
+    @strawberry.field
+    async def stocks(self, info: Info) -> List[StockType]:
+        return await info.context.loaders.stocks_por_componente.load(self.id)
+
+
+@strawberry.type(name="ProductoSimple")
+class ProductoSimpleType:
+    id: int
+    especificaciones: Optional[str]
+    id_producto: int
+    id_proveedor: Optional[int]
+    id_color: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @strawberry.field
+    async def proveedor(self, info: Info) -> Optional[ProveedorType]:
+        if self.id_proveedor is None:
+            return None
+        return await info.context.loaders.proveedor.load(self.id_proveedor)
+
+    @strawberry.field
+    async def color(self, info: Info) -> Optional[ColorType]:
+        if self.id_color is None:
+            return None
+        return await info.context.loaders.color.load(self.id_color)
+
+    @strawberry.field(description="Primer registro de stock (ver `stocks` para todas las ubicaciones)")
+    async def stock(self, info: Info) -> Optional[StockType]:
+        return await info.context.loaders.stock_por_producto_simple.load(self.id)
+
+    @strawberry.field
+    async def stocks(self, info: Info) -> List[StockType]:
+        return await info.context.loaders.stocks_por_producto_simple.load(self.id)
+
+
+@strawberry.type(name="ComponenteProducto")
+class ComponenteProductoType:
+    id: int
+    cantidad_necesaria: float
+    id_componente: int
+    id_producto_compuesto: int
+
+    @strawberry.field
+    async def componente(self, info: Info) -> Optional[ComponenteType]:
+        return await info.context.loaders.componente.load(self.id_componente)
+
+
+@strawberry.type(name="ProductoCompuesto")
+class ProductoCompuestoType:
+    id: int
+    id_producto: int
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @strawberry.field
+    async def componentes(self, info: Info) -> List[ComponenteProductoType]:
+        return await info.context.loaders.lineas_por_producto_compuesto.load(self.id)
+
+
+@strawberry.type(name="Producto")
+class ProductoType:
+    id: int
+    tipo_producto: str
+    id_articulo: int
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @strawberry.field
+    async def articulo(self, info: Info) -> Optional[ArticuloType]:
+        return await info.context.loaders.articulo.load(self.id_articulo)
+
+    @strawberry.field
+    async def producto_simple(self, info: Info) -> Optional[ProductoSimpleType]:
+        return await info.context.loaders.producto_simple_por_producto.load(self.id)
+
+    @strawberry.field
+    async def producto_compuesto(self, info: Info) -> Optional[ProductoCompuestoType]:
+        return await info.context.loaders.producto_compuesto_por_producto.load(self.id)
+
+
+@strawberry.type(name="PackProducto")
+class PackProductoType:
+    id: int
+    cantidad_incluida: float
+    id_pack: int
+    id_producto: int
+
+    @strawberry.field
+    async def producto(self, info: Info) -> Optional[ProductoType]:
+        return await info.context.loaders.producto.load(self.id_producto)
+
+
+@strawberry.type(name="Pack")
+class PackType:
+    id: int
+    nombre: str
+    descripcion: Optional[str]
+    id_articulo: int
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @strawberry.field
+    async def articulo(self, info: Info) -> Optional[ArticuloType]:
+        return await info.context.loaders.articulo.load(self.id_articulo)
+
+    @strawberry.field
+    async def productos(self, info: Info) -> List[PackProductoType]:
+        return await info.context.loaders.lineas_por_pack.load(self.id)
@@ -0,0 +1,120 @@
+"""
+🔢 Versiones de tabla para la caché de resultados GraphQL
+
+Se separa de `app.graphql.cache` para no depender de strawberry: los
+listeners deben registrarse al arrancar aunque el router GraphQL se monte
+más tarde (`RUTAS_DIFERIDAS`), porque las escrituras de este proceso se
+anuncian con NOTIFY a las cachés de todos los demás.
+"""
+
+import threading
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from app.services.stock_eventos_service import EscuchaNotificaciones
+
+# Marca de las escrituras cuyas tablas no se conocen (SQL textual)
+TODAS_LAS_TABLAS = "*"
+
+# Canal de LISTEN/NOTIFY con las tablas que modifica cada transacción
+CANAL_TABLAS = "cache_tablas"
+
+
+class VersionesTablas:
+    """🔢 Contador de versión por tabla, incrementado en cada commit que la modifica"""
+
+    def __init__(self):
+        self._versiones: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, tablas: Iterable[str]) -> None:
+        with self._lock:
+            for tabla in tablas:
+                self._versiones[tabla] = self._versiones.get(tabla, 0) + 1
+
+    def instantanea(self, tablas: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        """Versiones actuales de las tablas indicadas (y de la marca global)"""
+        with self._lock:
+            return tuple(
+                (tabla, self._versiones.get(tabla, 0)) for tabla in sorted({*tablas, TODAS_LAS_TABLAS})
+            )
+
+
+versiones_tablas = VersionesTablas()
+
+
+def _marcar_tablas(session: Session, tablas: Iterable[str]) -> None:
+    """Apuntar las tablas modificadas y anunciar las nuevas en esta transacción"""
+    marcadas = session.info.setdefault("tablas_modificadas", set())
+    nuevas = set(tablas) - marcadas
+    if not nuevas:
+        return
+    marcadas.update(nuevas)
+    conexion = session.connection()
+    if conexion.dialect.name == "postgresql":
+        # Se entrega al confirmar y se descarta con el rollback
+        conexion.execute(
+            text("SELECT pg_notify(:canal, :tablas)"),
+            {"canal": CANAL_TABLAS, "tablas": ",".join(sorted(nuevas))}
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_tablas_flush(session: Session, flush_context) -> None:
+    _marcar_tablas(session, (
+        instancia.__table__.name
+        for instancia in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(instancia, "__table__")
+    ))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _registrar_tablas_sentencia(estado) -> None:
+    """Escrituras con `session.execute` (update/delete masivos o SQL textual)"""
+    if estado.is_select:
+        return
+    sentencia = estado.statement
+    if isinstance(sentencia, TextClause) and sentencia.text.lstrip()[:6].upper() == "SELECT":
+        return
+    mapper = estado.bind_mapper
+    _marcar_tablas(estado.session, (mapper.local_table.name,) if mapper is not None else (TODAS_LAS_TABLAS,))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_tablas(session: Session) -> None:
+    """Invalidar en el propio proceso sin esperar a la notificación"""
+    tablas = session.info.pop("tablas_modificadas", None)
+    if tablas:
+        versiones_tablas.incrementar(tablas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_tablas(session: Session) -> None:
+    session.info.pop("tablas_modificadas", None)
+
+
+class EscuchaTablas(EscuchaNotificaciones):
+    """👂 Escucha de `CANAL_TABLAS`: aplica las escrituras confirmadas por cualquier proceso"""
+
+    canal = CANAL_TABLAS
+    nombre_hilo = "escucha-cache-graphql"
+
+    def _al_conectar(self) -> None:
+        # Lo confirmado mientras no se escuchaba no ha llegado: todo caduca
+        versiones_tablas.incrementar((TODAS_LAS_TABLAS,))
+
+    def _notificar(self, payload: str) -> None:
+        versiones_tablas.incrementar(payload.split(","))
+
+    def preparada(self) -> bool:
+        """Si la caché puede usarse; en PostgreSQL arranca la escucha la primera vez"""
+        if self.motor.dialect.name != "postgresql" or self.lista:
+            return True
+        self.iniciar(espera=0)
+        return False
+
+
+escucha_tablas = EscuchaTablas()
@@ -11,24 +11,42 @@ import uvicorn
 import sys
 sys.path.insert(0, "./app/..")
 
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from app.db import SessionLocal
-from fastapi.openapi.utils import get_openapi
-
-# Importar todos los routers de rutas
-from app.routes import (
-    familia_router,
-    color_router,
-    proveedor_router,
-    articulo_router,
-    componente_router,
-    producto_router,
-    pack_router,
-    stock_router,
-    inventario_router
-)
+from app.arranque import RegistroRouters, apagar, medir, preparar_mapeos, rutas_diferidas
+from app.compresion import Compresion
+from app.db import ES_SQLITE, crear_esquema, get_db
+from app.openapi import DocumentoOpenAPI, cargar_artefacto, generar_esquema
+from app.perfilado import Perfilado
+from app.registro import IdPeticion, configurar_registro
+
+# Registro en segundo plano antes de nada, para que entren los tiempos de arranque
+configurar_registro()
+
+# Todos los modelos registrados antes de configurar los mappers, aunque sus
+# routers se monten más tarde
+with medir("modelos"):
+    from app import models  # noqa: F401
+# Listeners de la caché GraphQL: anuncian las escrituras de este proceso a
+# los demás aunque el router GraphQL no se haya montado todavía
+from app.graphql import versiones  # noqa: F401
+
+# SQLite en memoria: sin migraciones, el esquema se crea a partir de los modelos
+if ES_SQLITE:
+    crear_esquema()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Preparar el ORM antes de la primera petición y drenar el proceso al apagar"""
+    preparar_mapeos()
+    yield
+    await run_in_threadpool(apagar)
+
 
 # Configuración de la aplicación
 app = FastAPI(
@@ -61,10 +79,12 @@ app = FastAPI(
     contact={
         "name": "Tienda Oficit SLU",
     },
-    # Ocultar 422 globalmente
-    openapi_url="/openapi.json",
-    docs_url="/docs",
-    redoc_url="/redoc"
+    # /openapi.json, /docs y /redoc se sirven más abajo a partir del esquema
+    # precalculado (ver app.openapi)
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
+    lifespan=lifespan
 )
 
 @app.exception_handler(RequestValidationError)
@@ -74,38 +94,46 @@ async def validation_exception_handler(request, exc):
         content={"detail": "Datos inválidos en la petición"}
     )
 
+# Esquema OpenAPI generado en el build (scripts/generar_openapi.py); sin él,
+# se genera en la primera petición a /openapi.json
+with medir("openapi"):
+    documento_openapi = cargar_artefacto(app)
+
+
 # Personalizar la generación de OpenAPI para ocultar 422
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
-    
-    openapi_schema = get_openapi(
-        title=app.title,
-        version=app.version,
-        description=app.description,
-        routes=app.routes,
-    )
-    
-    # Remover 422 de todas las rutas
-    for path_data in openapi_schema["paths"].values():
-        for operation in path_data.values():
-            if "responses" in operation and "422" in operation["responses"]:
-                del operation["responses"]["422"]
-    
-    app.openapi_schema = openapi_schema
+    if documento_openapi:
+        app.openapi_schema = documento_openapi.esquema
+        return app.openapi_schema
+
+    registro_routers.montar_pendientes()
+    app.openapi_schema = generar_esquema(app)
     return app.openapi_schema
 
 app.openapi = custom_openapi
 
-def get_db():
+
+@app.get("/openapi.json", include_in_schema=False)
+def openapi_json(request: Request):
     """
-    🔌 Dependencia para obtener sesión de base de datos
+    📘 Esquema OpenAPI con ETag fuerte y gzip
     """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    global documento_openapi
+    if documento_openapi is None:
+        documento_openapi = DocumentoOpenAPI.desde_esquema(app.openapi())
+    return documento_openapi.respuesta(request)
+
+
+@app.get("/docs", include_in_schema=False)
+def swagger_ui():
+    return get_swagger_ui_html(openapi_url="/openapi.json", title=f"{app.title} - Swagger UI")
+
+
+@app.get("/redoc", include_in_schema=False)
+def redoc():
+    return get_redoc_html(openapi_url="/openapi.json", title=f"{app.title} - ReDoc")
 
 # ==========================================
 # ENDPOINT RAÍZ
@@ -132,7 +160,13 @@ def read_root():
             "productos": "/productos",
             "packs": "/packs",
             "stock": "/stock",
-            "inventario": "/inventario"
+            "ubicaciones": "/ubicaciones",
+            "picking": "/picking/lista",
+            "historico": "/historico",
+            "inventario": "/inventario",
+            "sync": "/sync/changes",
+            "trabajos": "/trabajos",
+            "graphql": "/graphql"
         }
     }
 
@@ -162,27 +196,58 @@ def health_check(db: Session = Depends(get_db)):
 # REGISTRO DE ROUTERS POR MODELO
 # ==========================================
 
-# Modelos base (sin dependencias fuertes)
-app.include_router(familia_router)
-app.include_router(color_router)
-app.include_router(proveedor_router)
+# (prefijo, módulo, atributo): los de RUTAS_DIFERIDAS se montan con su
+# primera petición (ver app.arranque)
+RUTAS = (
+    # Modelos base (sin dependencias fuertes)
+    ("/familias", "app.routes.familia_routes", "router"),
+    ("/colores", "app.routes.color_routes", "router"),
+    ("/proveedores", "app.routes.proveedor_routes", "router"),
+
+    # Modelos intermedios (dependen de los base)
+    ("/articulos", "app.routes.articulo_routes", "router"),
+    ("/componentes", "app.routes.componente_routes", "router"),
+
+    # Modelos complejos (dependen de intermedios)
+    ("/productos", "app.routes.producto_routes", "router"),
+    ("/packs", "app.routes.pack_routes", "router"),
+    ("/stock", "app.routes.stock_routes", "router"),
+    ("/ubicaciones", "app.routes.ubicacion_routes", "router"),
+    ("/picking", "app.routes.picking_routes", "router"),
+    ("/historico", "app.routes.historico_routes", "router"),
 
-# Modelos intermedios (dependen de los base)
-app.include_router(articulo_router)
-app.include_router(componente_router)
+    # Servicio coordinador (operaciones complejas)
+    ("/inventario", "app.routes.inventario_routes", "router"),
 
-# Modelos complejos (dependen de intermedios)  
-app.include_router(producto_router)
-app.include_router(pack_router)
-app.include_router(stock_router)
+    # Sincronización de réplicas
+    ("/sync", "app.routes.sync_routes", "router"),
 
-# Servicio coordinador (operaciones complejas)
-app.include_router(inventario_router)
+    # Trabajos en segundo plano
+    ("/trabajos", "app.routes.trabajo_routes", "router"),
+
+    # API GraphQL
+    ("/graphql", "app.graphql.schema", "graphql_router"),
+
+    # Diagnóstico
+    ("/perfilado", "app.routes.perfilado_routes", "router"),
+)
+
+# Perfilado bajo demanda (ver app.perfilado): dentro del montaje diferido,
+# para que los routers pendientes ya estén montados al instrumentarlos
+app.add_middleware(Perfilado)
+
+registro_routers = RegistroRouters(app, RUTAS)
+registro_routers.registrar(rutas_diferidas())
 
 # ==========================================
 # CONFIGURACIÓN ADICIONAL
 # ==========================================
 
+# Compresión brotli/gzip de las respuestas grandes (ver app.compresion)
+app.add_middleware(Compresion)
+# El último en añadirse es el más externo: la duración incluye la compresión
+app.add_middleware(IdPeticion)
+
 # Middleware para CORS (si es necesario)
 # from fastapi.middleware.cors import CORSMiddleware
 # app.add_middleware(
@@ -194,6 +259,7 @@ app.include_router(inventario_router)
 # )
 
 if __name__ == "__main__":
+    # Desarrollo con recarga; en producción: python -m app.servidor
     uvicorn.run(
         "app.main:app", 
         host="localhost", 
@@ -12,11 +12,29 @@ from .producto_simple import ProductoSimple
 from .producto_compuesto import ProductoCompuesto
 from .pack import Pack
 from .stock import Stock
+from .ubicacion import Ubicacion
+from .disponibilidad_stock import DisponibilidadStock
+
+# Histórico de stock
+from .movimiento_stock import MovimientoStock
+from .instantanea_stock import InstantaneaStock, InstantaneaStockLinea
+
+# Valoración
+from .capa_coste import CapaCoste
 
 # Tablas intermedias
 from .componente_producto import ComponenteProducto
 from .pack_producto import PackProducto
 
+# Sincronización de réplicas
+from .registro_eliminado import RegistroEliminado
+
+# Eventos de integración
+from .evento_stock_outbox import EventoStockOutbox
+
+# Trabajos en segundo plano
+from .trabajo import Trabajo
+
 # Exportar todos los modelos
 __all__ = [
     "Familia",
@@ -29,7 +47,16 @@ __all__ = [
     "ProductoCompuesto",
     "Pack",
     "Stock",
+    "Ubicacion",
+    "DisponibilidadStock",
+    "MovimientoStock",
+    "InstantaneaStock",
+    "InstantaneaStockLinea",
+    "CapaCoste",
     "ComponenteProducto",
     "PackProducto",
+    "RegistroEliminado",
+    "EventoStockOutbox",
+    "Trabajo",
     "InventarioService"
 ]
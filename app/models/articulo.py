@@ -30,8 +30,8 @@ class Articulo(Base):
     id_familia = Column(Integer, ForeignKey("familia.id"))
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
     
     # Relaciones
     familia = relationship("Familia", back_populates="articulos")
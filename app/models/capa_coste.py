@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, Numeric, String, DateTime, CheckConstraint, Index, text
+from app.db import Base, ENTERO_GRANDE
+
+class CapaCoste(Base):
+    """
+    💶 CapaCoste - Entrada de stock con su coste unitario
+
+    Cada entrada con coste (alta de stock o movimiento de entrada) abre una
+    capa con la cantidad y el coste unitario de esa compra. El motor de
+    valoración (`ValoracionService`) las recorre por elemento en orden de
+    fecha: en FIFO las existencias se valoran con las capas más recientes
+    que las cubren y en coste medio ponderado con la media de todas.
+
+    Como el histórico de movimientos, guarda el elemento y el almacén y no
+    tiene clave foránea a `stock`: las capas sobreviven a la baja del registro.
+
+    Attributes:
+        id (int): Identificador de la capa
+        fecha (datetime): Momento de la entrada
+        id_stock (int): Registro de stock que recibió la entrada
+        id_producto_simple (int): Producto simple (exclusivo con componente)
+        id_componente (int): Componente (exclusivo con producto simple)
+        id_almacen (int): Almacén del registro
+        cantidad (Decimal): Unidades de la entrada
+        coste_unitario (Decimal): Coste de cada unidad
+        origen (str): Tipo de movimiento que abrió la capa ('alta', 'entrada', 'ajuste')
+    """
+    __tablename__ = "capa_coste"
+
+    __table_args__ = (
+        CheckConstraint("cantidad > 0", name='check_capa_coste_cantidad_positiva'),
+        CheckConstraint("coste_unitario >= 0", name='check_capa_coste_coste_no_negativo'),
+        CheckConstraint(
+            text("id_producto_simple IS NOT NULL AND id_componente IS NULL OR id_producto_simple IS NULL AND id_componente IS NOT NULL"),
+            name='check_capa_coste_exclusive_relation'
+        ),
+        Index('ix_capa_coste_producto_fecha', 'id_producto_simple', 'fecha'),
+        Index('ix_capa_coste_componente_fecha', 'id_componente', 'fecha'),
+    )
+
+    id = Column(ENTERO_GRANDE, primary_key=True)
+    fecha = Column(DateTime(timezone=True), nullable=False, server_default=text("clock_timestamp()"))
+    id_stock = Column(Integer, nullable=False)
+    id_producto_simple = Column(Integer)
+    id_componente = Column(Integer)
+    id_almacen = Column(Integer)
+    cantidad = Column(Numeric(12, 2), nullable=False)
+    coste_unitario = Column(Numeric(12, 4), nullable=False)
+    origen = Column(String(20), nullable=False)
+
+    def __repr__(self):
+        return f"<CapaCoste(id={self.id}, id_stock={self.id_stock}, cantidad={self.cantidad}, coste_unitario={self.coste_unitario})>"
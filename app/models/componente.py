@@ -26,7 +26,7 @@ class Componente(Base):
     Relationships:
         proveedor (Proveedor): Proveedor que suministra el componente
         color (Color): Color del componente (si aplica)
-        stock (Stock): Información de stock del componente
+        stocks (List[Stock]): Stock del componente, un registro por ubicación
         componente_productos (List[ComponenteProducto]): Productos que usan este componente
     """
     __tablename__ = "componente"
@@ -42,14 +42,14 @@ class Componente(Base):
     id_color = Column(Integer, ForeignKey("color.id"))
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
     
     # Relaciones
     proveedor = relationship("Proveedor", back_populates="componentes")
    
     color = relationship("Color", back_populates="componentes")
-    stock = relationship("Stock", back_populates="componente", uselist=False)
+    stocks = relationship("Stock", back_populates="componente")
     productos_que_lo_usan = relationship("ComponenteProducto", back_populates="componente")
     
     def __repr__(self):
@@ -0,0 +1,193 @@
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import Column, Integer, Numeric, DateTime, ForeignKey, CheckConstraint, Index, event, inspect, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.db import Base
+from app.models.stock import Stock
+
+class DisponibilidadStock(Base):
+    """
+    🧮 DisponibilidadStock - Stock agregado por elemento y almacén
+
+    Tabla resumen mantenida de forma incremental a partir de los cambios de
+    `Stock` (listener `after_flush`, misma transacción). Por cada producto
+    simple o componente hay una fila por almacén con stock y una fila total
+    (`id_almacen` NULL) que suma todos los almacenes y el stock sin ubicación,
+    de modo que "¿cuánto hay de X?" es una búsqueda por índice y no una suma
+    sobre sus registros de stock.
+
+    Attributes:
+        id (int): Identificador único de la fila
+        id_producto_simple (int): Ref. a producto simple (exclusivo con componente)
+        id_componente (int): Ref. a componente (exclusivo con producto simple)
+        id_almacen (int): Ubicación raíz del almacén (NULL = total de todos los almacenes)
+        cantidad_actual (Decimal): Suma de `cantidad_actual` de los registros agregados
+        registros (int): Número de registros de stock agregados
+        updated_at (datetime): Fecha y hora de la última actualización
+    """
+    __tablename__ = "disponibilidad_stock"
+
+    __table_args__ = (
+        CheckConstraint(
+            text("id_producto_simple IS NOT NULL AND id_componente IS NULL OR id_producto_simple IS NULL AND id_componente IS NOT NULL"),
+            name='check_disponibilidad_exclusive_relation'
+        ),
+        # Una fila por elemento y almacén...
+        Index('ux_disponibilidad_producto_almacen', 'id_producto_simple', 'id_almacen', unique=True),
+        Index('ux_disponibilidad_componente_almacen', 'id_componente', 'id_almacen', unique=True),
+        # ...y una fila total por elemento
+        Index('ux_disponibilidad_producto_total', 'id_producto_simple', unique=True,
+              postgresql_where=text("id_almacen IS NULL"), sqlite_where=text("id_almacen IS NULL")),
+        Index('ux_disponibilidad_componente_total', 'id_componente', unique=True,
+              postgresql_where=text("id_almacen IS NULL"), sqlite_where=text("id_almacen IS NULL")),
+    )
+
+    id = Column(Integer, primary_key=True)
+    id_producto_simple = Column(Integer, ForeignKey("producto_simple.id", ondelete="CASCADE"))
+    id_componente = Column(Integer, ForeignKey("componente.id", ondelete="CASCADE"))
+    id_almacen = Column(Integer, ForeignKey("ubicacion.id", ondelete="CASCADE"), index=True)
+    cantidad_actual = Column(Numeric(12, 2), nullable=False, server_default="0")
+    registros = Column(Integer, nullable=False, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<DisponibilidadStock(id={self.id}, almacen={self.id_almacen}, cantidad={self.cantidad_actual})>"
+
+
+# Columnas de Stock que determinan a qué filas del resumen contribuye un registro
+COLUMNAS_AGREGADAS = ("id_producto_simple", "id_componente", "id_almacen", "cantidad_actual")
+
+
+def estado_anterior(stock: Stock) -> tuple:
+    """Columnas agregadas de un stock antes del flush actual"""
+    estado = inspect(stock)
+    valores = []
+    for columna in COLUMNAS_AGREGADAS:
+        historial = estado.attrs[columna].history
+        if historial.has_changes():
+            valores.append(historial.deleted[0] if historial.deleted else None)
+        else:
+            valores.append(getattr(stock, columna))
+    return tuple(valores)
+
+
+def estado_actual(stock: Stock) -> tuple:
+    """Columnas agregadas de un stock tal como quedan tras el flush actual"""
+    return tuple(getattr(stock, columna) for columna in COLUMNAS_AGREGADAS)
+
+
+def _acumular(deltas: dict, estado: tuple, signo: int) -> None:
+    """Sumar (signo=1) o restar (signo=-1) un registro a su fila de almacén y a la total"""
+    id_producto_simple, id_componente, id_almacen, cantidad = estado
+    if id_producto_simple is None and id_componente is None:
+        return
+    cantidad = Decimal(cantidad or 0) * signo
+    for almacen in {id_almacen, None}:
+        delta = deltas[(id_producto_simple, id_componente, almacen)]
+        delta[0] += cantidad
+        delta[1] += signo
+
+
+def _upsert(conexion, filas: list, columna: str, total: bool) -> None:
+    tabla = DisponibilidadStock.__table__
+    # Ambos dialectos admiten ON CONFLICT sobre un índice parcial
+    insert = sqlite.insert if conexion.dialect.name == "sqlite" else postgresql.insert
+    sentencia = insert(tabla)
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=[columna] if total else [columna, "id_almacen"],
+        index_where=tabla.c.id_almacen.is_(None) if total else None,
+        set_={
+            "cantidad_actual": tabla.c.cantidad_actual + sentencia.excluded.cantidad_actual,
+            "registros": tabla.c.registros + sentencia.excluded.registros,
+            "updated_at": func.now(),
+        }
+    )
+    conexion.execute(sentencia, filas)
+
+
+def _filas_resumen(deltas: dict) -> list:
+    """Incrementos no nulos por fila del resumen, en orden fijo"""
+    filas = []
+    # Orden fijo de filas: dos flushes concurrentes las bloquean en el mismo orden
+    for (id_producto_simple, id_componente, id_almacen), (cantidad, registros) in sorted(
+        deltas.items(), key=lambda item: tuple(valor or 0 for valor in item[0])
+    ):
+        if cantidad == 0 and registros == 0:
+            continue
+        filas.append({
+            "id_producto_simple": id_producto_simple,
+            "id_componente": id_componente,
+            "id_almacen": id_almacen,
+            "cantidad_actual": cantidad,
+            "registros": registros,
+        })
+    return filas
+
+
+def descontar_bajas(conexion, filas: list) -> None:
+    """
+    Restar del resumen los registros de stock borrados con un DELETE masivo
+
+    Solo actualiza filas existentes: un stock huérfano cuyo elemento ya no
+    existe no tiene fila en el resumen (la borró la cascada del elemento).
+
+    Args:
+        filas (list): Filas devueltas por `DELETE ... RETURNING` con las columnas de Stock
+    """
+    deltas = defaultdict(lambda: [Decimal(0), 0])
+    for fila in filas:
+        _acumular(deltas, estado_actual(fila), -1)
+    tabla = DisponibilidadStock.__table__
+    for fila in _filas_resumen(deltas):
+        conexion.execute(
+            update(tabla).where(
+                tabla.c.id_producto_simple.is_not_distinct_from(fila["id_producto_simple"]),
+                tabla.c.id_componente.is_not_distinct_from(fila["id_componente"]),
+                tabla.c.id_almacen.is_not_distinct_from(fila["id_almacen"]),
+            ).values(
+                cantidad_actual=tabla.c.cantidad_actual + fila["cantidad_actual"],
+                registros=tabla.c.registros + fila["registros"],
+                updated_at=func.now(),
+            )
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def actualizar_disponibilidad(session: Session, flush_context) -> None:
+    """
+    🧮 Aplicar al resumen de disponibilidad los cambios de Stock del flush actual
+
+    Cada alta, baja o cambio (de cantidad, de elemento o de almacén) se
+    traduce en incrementos sobre las filas afectadas, aplicados con
+    INSERT ... ON CONFLICT DO UPDATE: dos transacciones que mueven el mismo
+    elemento no se pisan, solo se serializan sobre su fila.
+
+    Como el outbox, no ve los UPDATE/DELETE masivos ni el SQL directo; para
+    esos casos está `StockService.recalcular_disponibilidad`.
+    """
+    deltas = defaultdict(lambda: [Decimal(0), 0])
+    for stock in session.new:
+        if isinstance(stock, Stock):
+            _acumular(deltas, estado_actual(stock), 1)
+    for stock in session.dirty:
+        if isinstance(stock, Stock) and session.is_modified(stock, include_collections=False):
+            anterior, actual = estado_anterior(stock), estado_actual(stock)
+            if anterior != actual:
+                _acumular(deltas, anterior, -1)
+                _acumular(deltas, actual, 1)
+    for stock in session.deleted:
+        if isinstance(stock, Stock):
+            _acumular(deltas, estado_anterior(stock), -1)
+
+    grupos = defaultdict(list)
+    for fila in _filas_resumen(deltas):
+        columna = "id_producto_simple" if fila["id_producto_simple"] is not None else "id_componente"
+        grupos[(columna, fila["id_almacen"] is None)].append(fila)
+    if not grupos:
+        return
+
+    conexion = session.connection()
+    for (columna, total), filas in sorted(grupos.items()):
+        _upsert(conexion, filas, columna, total)
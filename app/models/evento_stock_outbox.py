@@ -0,0 +1,141 @@
+import json
+from typing import List
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, event, insert, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.db import Base, ENTERO_GRANDE, JSONB_PORTABLE
+from app.models.stock import Stock
+
+# Canal de LISTEN/NOTIFY para los cambios de stock en tiempo real
+CANAL_STOCK = "stock_cambios"
+
+class EventoStockOutbox(Base):
+    """
+    📮 EventoStockOutbox - Evento de cambio de stock pendiente de publicar
+    
+    Se escribe en la misma transacción que la modificación del Stock
+    (patrón outbox transaccional), de modo que un cambio confirmado siempre
+    tiene su evento y un rollback nunca publica nada. Un relay lee los
+    eventos pendientes por lotes y los publica a los consumidores.
+    
+    Attributes:
+        id (int): Identificador único y orden de publicación del evento
+        tipo (str): Tipo de evento (stock.creado, stock.actualizado, stock.eliminado)
+        id_stock (int): ID del registro de stock afectado
+        datos (dict): Estado del stock tras el cambio y cantidad anterior
+        created_at (datetime): Fecha y hora del cambio
+        publicado_at (datetime): Fecha y hora de publicación (None si está pendiente)
+        intentos (int): Intentos de publicación fallidos
+        ultimo_error (str): Mensaje del último error de publicación
+    """
+    __tablename__ = "evento_stock_outbox"
+    
+    # Índice parcial: el relay solo recorre los eventos pendientes
+    __table_args__ = (
+        Index(
+            'ix_evento_stock_outbox_pendientes', 'id',
+            postgresql_where=text("publicado_at IS NULL"),
+            sqlite_where=text("publicado_at IS NULL")
+        ),
+    )
+    
+    id = Column(ENTERO_GRANDE, primary_key=True)
+    tipo = Column(String(50), nullable=False)
+    id_stock = Column(Integer, nullable=False)
+    datos = Column(JSONB_PORTABLE, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    publicado_at = Column(DateTime(timezone=True))
+    intentos = Column(Integer, nullable=False, server_default="0")
+    ultimo_error = Column(Text)
+    
+    def __repr__(self):
+        return f"<EventoStockOutbox(id={self.id}, tipo='{self.tipo}', id_stock={self.id_stock})>"
+
+
+def _numero(valor):
+    """Convertir cantidades Decimal a float serializable en JSON"""
+    return float(valor) if valor is not None else None
+
+
+def _bajo_minimo(cantidad, minima):
+    """Misma regla que `Stock.necesita_reposicion` (None si no hay cantidad)"""
+    if cantidad is None:
+        return None
+    return minima is not None and cantidad <= minima
+
+
+def _valor_anterior(stock: Stock, atributo: str):
+    """Valor de un atributo antes del flush actual"""
+    historial = inspect(stock).attrs[atributo].history
+    if historial.has_changes():
+        return historial.deleted[0] if historial.deleted else None
+    return getattr(stock, atributo)
+
+
+def _datos_stock(stock: Stock, cantidad_anterior, minima_anterior) -> dict:
+    """Estado del stock incluido en el evento (solo columnas ya cargadas)"""
+    return {
+        "id_producto_simple": stock.id_producto_simple,
+        "id_componente": stock.id_componente,
+        "ubicacion_almacen": stock.ubicacion_almacen,
+        "id_ubicacion": stock.id_ubicacion,
+        "id_almacen": stock.id_almacen,
+        "cantidad_anterior": _numero(cantidad_anterior),
+        "cantidad_actual": _numero(stock.cantidad_actual),
+        "cantidad_minima": _numero(stock.cantidad_minima),
+        "cantidad_maxima": _numero(stock.cantidad_maxima),
+        "necesita_reposicion_anterior": _bajo_minimo(cantidad_anterior, minima_anterior),
+        "necesita_reposicion": _bajo_minimo(stock.cantidad_actual, stock.cantidad_minima),
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def registrar_eventos_stock(session: Session, flush_context) -> None:
+    """
+    📮 Escribir en el outbox los cambios de Stock del flush actual
+    
+    Se ejecuta para cualquier mutación de Stock hecha con el ORM (servicios,
+    rutas o scripts), en la misma conexión y transacción que el cambio.
+    En `after_flush` las instancias nuevas ya tienen ID y el historial de
+    atributos aún conserva la cantidad anterior.
+    
+    En PostgreSQL cada evento se anuncia además con NOTIFY en el canal
+    `CANAL_STOCK`; la notificación solo se entrega si la transacción confirma.
+    """
+    eventos = []
+    for stock in session.new:
+        if isinstance(stock, Stock):
+            eventos.append({"tipo": "stock.creado", "id_stock": stock.id, "datos": _datos_stock(stock, None, None)})
+    for stock in session.dirty:
+        if isinstance(stock, Stock) and session.is_modified(stock, include_collections=False):
+            datos = _datos_stock(
+                stock, _valor_anterior(stock, "cantidad_actual"), _valor_anterior(stock, "cantidad_minima")
+            )
+            eventos.append({"tipo": "stock.actualizado", "id_stock": stock.id, "datos": datos})
+    for stock in session.deleted:
+        if isinstance(stock, Stock):
+            eventos.append(evento_eliminacion(stock))
+    if eventos:
+        publicar_eventos(session.connection(), eventos)
+
+
+def evento_actualizacion(stock, cantidad_anterior, minima_anterior) -> dict:
+    """Evento `stock.actualizado` para cambios hechos fuera del flush (actualizaciones masivas)"""
+    return {"tipo": "stock.actualizado", "id_stock": stock.id, "datos": _datos_stock(stock, cantidad_anterior, minima_anterior)}
+
+
+def evento_eliminacion(stock) -> dict:
+    """Evento `stock.eliminado`; `stock` puede ser la instancia o una fila devuelta por DELETE ... RETURNING"""
+    datos = _datos_stock(stock, stock.cantidad_actual, stock.cantidad_minima)
+    return {"tipo": "stock.eliminado", "id_stock": stock.id, "datos": datos}
+
+
+def publicar_eventos(conexion: Connection, eventos: List[dict]) -> None:
+    """Escribir eventos en el outbox y, en PostgreSQL, anunciarlos con NOTIFY"""
+    conexion.execute(insert(EventoStockOutbox.__table__), eventos)
+    if conexion.dialect.name == "postgresql":
+        conexion.execute(
+            text("SELECT pg_notify(:canal, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"canal": CANAL_STOCK, "payloads": [json.dumps(evento) for evento in eventos]}
+        )
@@ -0,0 +1,68 @@
+from sqlalchemy import Column, Boolean, Integer, Numeric, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from app.db import Base, ENTERO_GRANDE
+
+class InstantaneaStock(Base):
+    """
+    📸 InstantaneaStock - Punto de control del stock completo
+
+    Copia de todos los registros de `Stock` en un instante. El stock en una
+    fecha pasada es la última instantánea anterior más los movimientos entre
+    ambas, así que basta leer los meses de `movimiento_stock` posteriores a
+    la instantánea y no todo el histórico.
+
+    Una instantánea con `inicio_historico` marca que los movimientos
+    anteriores no están (stock previo al histórico o meses archivados): las
+    fechas anteriores a ella no se pueden reconstruir.
+
+    Attributes:
+        id (int): Identificador de la instantánea
+        fecha (datetime): Instante de la copia
+        registros (int): Número de registros de stock copiados
+        inicio_historico (bool): No hay movimientos anteriores a esta instantánea
+
+    Relationships:
+        lineas (List[InstantaneaStockLinea]): Cantidades de cada registro de stock
+    """
+    __tablename__ = "instantanea_stock"
+
+    id = Column(Integer, primary_key=True)
+    fecha = Column(DateTime(timezone=True), nullable=False, unique=True)
+    registros = Column(Integer, nullable=False, default=0)
+    inicio_historico = Column(Boolean, nullable=False, default=False, server_default="false")
+
+    # Relaciones
+    lineas = relationship("InstantaneaStockLinea", back_populates="instantanea", passive_deletes=True)
+
+    def __repr__(self):
+        return f"<InstantaneaStock(id={self.id}, fecha={self.fecha}, registros={self.registros})>"
+
+
+class InstantaneaStockLinea(Base):
+    """
+    📸 InstantaneaStockLinea - Cantidad de un registro de stock en una instantánea
+
+    Attributes:
+        id (int): Identificador de la línea
+        id_instantanea (int): Instantánea a la que pertenece
+        id_stock (int): Registro de stock copiado
+        id_producto_simple (int): Producto simple del registro
+        id_componente (int): Componente del registro
+        id_almacen (int): Almacén del registro
+        cantidad (Decimal): Cantidad del registro en la instantánea
+    """
+    __tablename__ = "instantanea_stock_linea"
+
+    id = Column(ENTERO_GRANDE, primary_key=True)
+    id_instantanea = Column(Integer, ForeignKey("instantanea_stock.id", ondelete="CASCADE"), nullable=False, index=True)
+    id_stock = Column(Integer, nullable=False)
+    id_producto_simple = Column(Integer)
+    id_componente = Column(Integer)
+    id_almacen = Column(Integer)
+    cantidad = Column(Numeric(12, 2), nullable=False)
+
+    # Relaciones
+    instantanea = relationship("InstantaneaStock", back_populates="lineas")
+
+    def __repr__(self):
+        return f"<InstantaneaStockLinea(id_instantanea={self.id_instantanea}, id_stock={self.id_stock}, cantidad={self.cantidad})>"
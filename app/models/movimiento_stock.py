@@ -0,0 +1,150 @@
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import Column, BigInteger, Integer, Numeric, String, DateTime, Index, Sequence, event, insert, text
+from sqlalchemy.orm import Session
+from app.db import Base
+from app.models.stock import Stock
+from app.models.capa_coste import CapaCoste
+from app.models.disponibilidad_stock import estado_actual, estado_anterior
+
+# Clave de `Session.info` con el tipo y motivo del movimiento en curso
+INFO_MOVIMIENTO = "movimiento_stock"
+
+class MovimientoStock(Base):
+    """
+    📜 MovimientoStock - Histórico de cambios de cantidad del stock
+
+    Una fila por cambio de `Stock` hecho con el ORM, escrita en la misma
+    transacción (listener `after_flush`). La tabla está particionada por mes
+    sobre `fecha` (ver `HistoricoStockService`): la reconstrucción del stock
+    en una fecha solo lee los meses posteriores a la última instantánea, y
+    los meses antiguos se pueden desacoplar y archivar.
+
+    `fecha` usa `clock_timestamp()` (hora real de la escritura, no la de
+    inicio de la transacción) para que las instantáneas tomadas con la tabla
+    de stock bloqueada separen sin ambigüedad lo anterior de lo posterior.
+
+    Attributes:
+        id (int): Identificador del movimiento
+        fecha (datetime): Momento del cambio (clave de partición)
+        tipo (str): 'alta', 'entrada', 'salida', 'ajuste' o 'baja'
+        id_stock (int): Registro de stock afectado (sin clave foránea: el histórico sobrevive a la baja)
+        id_producto_simple (int): Producto simple del registro
+        id_componente (int): Componente del registro
+        id_almacen (int): Almacén del registro
+        cantidad (Decimal): Variación de la cantidad (positiva o negativa)
+        cantidad_resultante (Decimal): Cantidad del registro tras el cambio
+        motivo (str): Motivo indicado por quien hizo el cambio
+    """
+    __tablename__ = "movimiento_stock"
+
+    __table_args__ = (
+        # BRIN: las fechas llegan en orden, el índice ocupa unas pocas páginas por partición
+        Index('ix_movimiento_stock_fecha', 'fecha', postgresql_using='brin'),
+        Index('ix_movimiento_stock_id_stock_fecha', 'id_stock', 'fecha'),
+        {'postgresql_partition_by': 'RANGE (fecha)'},
+    )
+
+    # Secuencia también como valor por defecto: la usan las cargas con SQL directo
+    id = Column(BigInteger, Sequence('movimiento_stock_id_seq'), primary_key=True,
+                server_default=text("nextval('movimiento_stock_id_seq')"))
+    fecha = Column(DateTime(timezone=True), primary_key=True, server_default=text("clock_timestamp()"))
+    tipo = Column(String(20), nullable=False)
+    id_stock = Column(Integer, nullable=False)
+    id_producto_simple = Column(Integer)
+    id_componente = Column(Integer)
+    id_almacen = Column(Integer)
+    cantidad = Column(Numeric(12, 2), nullable=False)
+    cantidad_resultante = Column(Numeric(12, 2), nullable=False)
+    motivo = Column(String(255))
+
+    def __repr__(self):
+        return f"<MovimientoStock(id={self.id}, tipo='{self.tipo}', id_stock={self.id_stock}, cantidad={self.cantidad})>"
+
+
+def _movimiento(stock: Stock, estado: tuple, tipo: str, cantidad, resultante, motivo) -> dict:
+    id_producto_simple, id_componente, id_almacen, _ = estado
+    return {
+        "tipo": tipo,
+        "id_stock": stock.id,
+        "id_producto_simple": id_producto_simple,
+        "id_componente": id_componente,
+        "id_almacen": id_almacen,
+        "cantidad": cantidad,
+        "cantidad_resultante": resultante,
+        "motivo": motivo,
+    }
+
+
+def registrar_bajas(conexion, filas: list, motivo: Optional[str] = None) -> None:
+    """
+    Registrar como 'baja' los registros de stock borrados con un DELETE masivo
+
+    Args:
+        filas (list): Filas devueltas por `DELETE ... RETURNING` con las columnas de Stock
+        motivo (str, optional): Motivo de la baja
+    """
+    movimientos = [
+        _movimiento(fila, estado_actual(fila), "baja", -Decimal(fila.cantidad_actual or 0), Decimal(0), motivo)
+        for fila in filas
+    ]
+    if movimientos:
+        conexion.execute(insert(MovimientoStock.__table__), movimientos)
+
+
+@event.listens_for(Session, "after_flush")
+def registrar_movimientos_stock(session: Session, flush_context) -> None:
+    """
+    📜 Registrar en el histórico los cambios de cantidad de Stock del flush actual
+
+    El tipo y el motivo se toman de `session.info[INFO_MOVIMIENTO]` si quien
+    hace el cambio los indica (ver `StockService`); si no, el tipo se deduce
+    del signo. Un cambio de elemento o de almacén se registra como baja en el
+    origen y alta en el destino, de modo que la suma de movimientos por
+    elemento y almacén sea siempre su stock.
+
+    Si se indica también `coste_unitario`, cada movimiento positivo abre una
+    capa de coste (`CapaCoste`) con esa cantidad y ese coste.
+    """
+    indicado = session.info.get(INFO_MOVIMIENTO) or {}
+    motivo = indicado.get("motivo")
+    coste_unitario = indicado.get("coste_unitario")
+    movimientos = []
+    for stock in session.new:
+        if isinstance(stock, Stock):
+            actual = estado_actual(stock)
+            cantidad = Decimal(actual[3] or 0)
+            movimientos.append(_movimiento(stock, actual, "alta", cantidad, cantidad, motivo))
+    for stock in session.dirty:
+        if isinstance(stock, Stock) and session.is_modified(stock, include_collections=False):
+            anterior, actual = estado_anterior(stock), estado_actual(stock)
+            antes, despues = Decimal(anterior[3] or 0), Decimal(actual[3] or 0)
+            if anterior[:3] != actual[:3]:
+                movimientos.append(_movimiento(stock, anterior, "baja", -antes, Decimal(0), motivo))
+                movimientos.append(_movimiento(stock, actual, "alta", despues, despues, motivo))
+            elif antes != despues:
+                tipo = indicado.get("tipo") or ("entrada" if despues > antes else "salida")
+                movimientos.append(_movimiento(stock, actual, tipo, despues - antes, despues, motivo))
+    for stock in session.deleted:
+        if isinstance(stock, Stock):
+            anterior = estado_anterior(stock)
+            movimientos.append(_movimiento(stock, anterior, "baja", -Decimal(anterior[3] or 0), Decimal(0), motivo))
+    if not movimientos:
+        return
+    conexion = session.connection()
+    conexion.execute(insert(MovimientoStock.__table__), movimientos)
+    if coste_unitario is not None:
+        capas = [
+            {
+                "id_stock": movimiento["id_stock"],
+                "id_producto_simple": movimiento["id_producto_simple"],
+                "id_componente": movimiento["id_componente"],
+                "id_almacen": movimiento["id_almacen"],
+                "cantidad": movimiento["cantidad"],
+                "coste_unitario": Decimal(str(coste_unitario)),
+                "origen": movimiento["tipo"],
+            }
+            for movimiento in movimientos if movimiento["cantidad"] > 0
+        ]
+        if capas:
+            conexion.execute(insert(CapaCoste.__table__), capas)
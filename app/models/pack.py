@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, CheckConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db import Base
@@ -11,6 +11,7 @@ class Pack(Base):
         id (int): Identificador único del pack
         nombre (str): Nombre comercial del pack
         descripcion (str): Descripción detallada del pack
+        descuento_porcentaje (int): Descuento del pack sobre la suma de sus productos (0-100)
         id_articulo (int): Referencia al artículo asociado (única)
         created_at (datetime): Fecha y hora de creación
         updated_at (datetime): Fecha y hora de última actualización
@@ -24,16 +25,22 @@ class Pack(Base):
     """
     __tablename__ = "pack"
     
+    # Restricciones de integridad
+    __table_args__ = (
+        CheckConstraint("descuento_porcentaje >= 0 AND descuento_porcentaje <= 100", name='check_descuento_porcentaje_rango'),
+    )
+    
     id = Column(Integer, primary_key=True, index=True)
     nombre = Column(String(200), nullable=False)
     descripcion = Column(Text)
+    descuento_porcentaje = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Foreign Keys
     id_articulo = Column(Integer, ForeignKey("articulo.id"), nullable=False, unique=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
     
     # Relaciones
     articulo = relationship("Articulo", back_populates="pack")
@@ -38,8 +38,8 @@ class Producto(Base):
     id_articulo = Column(Integer, ForeignKey("articulo.id"), nullable=False, unique=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
     
     # Relaciones
     articulo = relationship("Articulo", back_populates="producto")
@@ -24,7 +24,7 @@ class ProductoSimple(Base):
         producto (Producto): Producto base asociado
         proveedor (Proveedor): Proveedor que suministra el producto
         color (Color): Color del producto (si aplica)
-        stock (Stock): Información de stock del producto
+        stocks (List[Stock]): Stock del producto, un registro por ubicación
     """
     __tablename__ = "producto_simple"
     
@@ -45,7 +45,7 @@ class ProductoSimple(Base):
     producto = relationship("Producto", back_populates="producto_simple")
     proveedor = relationship("Proveedor", back_populates="productos_simples")
     color = relationship("Color", back_populates="productos_simples")
-    stock = relationship("Stock", back_populates="producto_simple", uselist=False)
+    stocks = relationship("Stock", back_populates="producto_simple")
     
     def __repr__(self):
         return f"<ProductoSimple(id={self.id})>"
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, event, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.db import Base
+from app.models.articulo import Articulo
+from app.models.componente import Componente
+from app.models.pack import Pack
+from app.models.producto import Producto
+from app.models.stock import Stock
+from app.models.ubicacion import Ubicacion
+
+# Modelos publicados en /sync/changes: sus bajas con el ORM dejan marca
+MODELOS_SINCRONIZADOS = (Articulo, Producto, Pack, Componente, Stock, Ubicacion)
+
+class RegistroEliminado(Base):
+    """
+    🪦 RegistroEliminado - Marca (tombstone) de una fila eliminada
+    
+    Permite a las réplicas del catálogo sincronizarse de forma incremental:
+    las altas y modificaciones se detectan por `updated_at`/`created_at`,
+    y las bajas por estos registros. Se escriben en la misma transacción que
+    la baja (listener `after_flush`), la haga el servicio que la haga.
+    
+    Attributes:
+        id (int): Identificador único del registro
+        tabla (str): Nombre de la tabla de la fila eliminada
+        id_registro (int): ID que tenía la fila eliminada
+        eliminado_at (datetime): Fecha y hora de la eliminación
+    """
+    __tablename__ = "registro_eliminado"
+    
+    __table_args__ = (
+        Index('ix_registro_eliminado_tabla_fecha', 'tabla', 'eliminado_at'),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    tabla = Column(String(50), nullable=False)
+    id_registro = Column(Integer, nullable=False)
+    eliminado_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<RegistroEliminado(tabla='{self.tabla}', id_registro={self.id_registro})>"
+
+
+@event.listens_for(Session, "after_flush")
+def registrar_bajas_sincronizadas(session: Session, flush_context) -> None:
+    """
+    🪦 Dejar una marca por cada fila sincronizada borrada en el flush actual
+
+    Como el outbox, no ve los DELETE masivos ni el SQL directo: quien los
+    haga escribe sus marcas (ver `LimpiezaService`).
+    """
+    marcas = [
+        {"tabla": instancia.__tablename__, "id_registro": instancia.id}
+        for instancia in session.deleted if isinstance(instancia, MODELOS_SINCRONIZADOS)
+    ]
+    if marcas:
+        session.connection().execute(insert(RegistroEliminado.__table__), marcas)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Numeric, String, DateTime, ForeignKey, CheckConstraint, text
+from sqlalchemy import Column, Integer, Numeric, String, DateTime, ForeignKey, CheckConstraint, Index, and_, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db import Base
@@ -9,13 +9,17 @@ class Stock(Base):
     
     Controla el inventario físico de productos simples y componentes,
     gestionando cantidades, ubicaciones y alertas de reposición.
+    Un mismo elemento puede tener un registro por ubicación; el total por
+    almacén y global se mantiene en `DisponibilidadStock`.
     
     Attributes:
         id (int): Identificador único del registro de stock
         cantidad_actual (Decimal): Cantidad disponible actualmente
         cantidad_minima (Decimal): Nivel mínimo antes de alerta
         cantidad_maxima (Decimal): Nivel máximo recomendado
-        ubicacion_almacen (str): Ubicación física en el almacén
+        ubicacion_almacen (str): Ruta de la ubicación (copia de `ubicacion.ruta`)
+        id_ubicacion (int): Referencia a la ubicación física
+        id_almacen (int): Almacén (ubicación raíz) de la ubicación
         id_producto_simple (int): Ref. a producto simple (exclusivo con componente)
         id_componente (int): Ref. a componente (exclusivo con producto simple)
         created_at (datetime): Fecha y hora de creación
@@ -24,6 +28,7 @@ class Stock(Base):
     Relationships:
         producto_simple (ProductoSimple): Producto simple asociado (si aplica)
         componente (Componente): Componente asociado (si aplica)
+        ubicacion (Ubicacion): Ubicación donde está el stock
         
     Properties:
         elemento: Elemento asociado (producto simple o componente)
@@ -42,25 +47,31 @@ class Stock(Base):
         CheckConstraint("cantidad_minima >= 0", name='check_cantidad_minima_positiva'),
         CheckConstraint("cantidad_maxima IS NULL OR cantidad_maxima >= 0", name='check_cantidad_maxima_positiva'),
         CheckConstraint("cantidad_maxima IS NULL OR cantidad_maxima >= cantidad_minima", name='check_stock_range'),
+        # Un registro por elemento y ubicación (el stock sin ubicación cuenta como una más)
+        Index('ux_stock_producto_ubicacion', 'id_producto_simple', text('coalesce(id_ubicacion, 0)'), unique=True),
+        Index('ux_stock_componente_ubicacion', 'id_componente', text('coalesce(id_ubicacion, 0)'), unique=True),
     )
     
     id = Column(Integer, primary_key=True, index=True)
     cantidad_actual = Column(Numeric(10, 2), nullable=False, default=0)
     cantidad_minima = Column(Numeric(10, 2), default=0)
     cantidad_maxima = Column(Numeric(10, 2))
-    ubicacion_almacen = Column(String(255))  # Pasillo, estantería, etc.
+    ubicacion_almacen = Column(String(255))  # Ruta de la ubicación (ALM1/P04/E02/H03)
     
     # Foreign Keys (solo uno debe estar presente)
-    id_producto_simple = Column(Integer, ForeignKey("producto_simple.id"), unique=True)
-    id_componente = Column(Integer, ForeignKey("componente.id"), unique=True)
+    id_producto_simple = Column(Integer, ForeignKey("producto_simple.id"))
+    id_componente = Column(Integer, ForeignKey("componente.id"))
+    id_ubicacion = Column(Integer, ForeignKey("ubicacion.id"), index=True)
+    id_almacen = Column(Integer, ForeignKey("ubicacion.id"), index=True)  # Raíz de id_ubicacion, para agregar por almacén
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
     
     # Relaciones
-    producto_simple = relationship("ProductoSimple", back_populates="stock")
-    componente = relationship("Componente", back_populates="stock")
+    producto_simple = relationship("ProductoSimple", back_populates="stocks")
+    componente = relationship("Componente", back_populates="stocks")
+    ubicacion = relationship("Ubicacion", foreign_keys=[id_ubicacion], back_populates="stocks")
     
     @property
     def elemento(self):
@@ -78,8 +89,13 @@ class Stock(Base):
     
     @property
     def necesita_reposicion(self):
-        """Indica si el stock está por debajo del mínimo"""
-        return self.cantidad_actual <= self.cantidad_minima
+        """Indica si el stock está en el mínimo o por debajo (sin mínimo, nunca)"""
+        return self.cantidad_minima is not None and self.cantidad_actual <= self.cantidad_minima
+
+    @classmethod
+    def filtro_necesita_reposicion(cls):
+        """Condición SQL con la misma regla que `necesita_reposicion`"""
+        return and_(cls.cantidad_minima.isnot(None), cls.cantidad_actual <= cls.cantidad_minima)
     
     def __repr__(self):
         return f"<Stock(id={self.id}, cantidad={self.cantidad_actual}, elemento='{self.nombre_elemento}')>"
@@ -0,0 +1,68 @@
+from sqlalchemy import Column, Boolean, Integer, String, Text, DateTime, CheckConstraint, Index, text
+from sqlalchemy.sql import func
+from app.db import Base, ENTERO_GRANDE, JSONB_PORTABLE
+
+ESTADOS_TRABAJO = ("pendiente", "en_curso", "completado", "error", "cancelado")
+ESTADOS_FINALES = ("completado", "error", "cancelado")
+
+class Trabajo(Base):
+    """
+    ⚙️ Trabajo - Operación pesada ejecutada en segundo plano
+
+    La petición HTTP solo encola el trabajo; los procesos trabajadores lo
+    reclaman con `FOR UPDATE SKIP LOCKED`, lo ejecutan y van guardando su
+    progreso. Mientras está en curso el trabajador renueva `latido_at`; un
+    trabajo en curso sin latido reciente se da por abandonado (trabajador
+    caído) y vuelve a la cola.
+
+    Attributes:
+        id (int): Identificador único y orden de la cola
+        tipo (str): Tipo de trabajo registrado (ver `app.services.trabajo_service`)
+        parametros (dict): Argumentos del trabajo
+        estado (str): pendiente, en_curso, completado, error o cancelado
+        progreso (int): Porcentaje completado (0-100)
+        mensaje (str): Descripción del paso en curso
+        avance (dict): Estado parcial del trabajo en curso (p. ej. cursores para reanudarlo)
+        resultado (dict): Resultado del trabajo completado
+        error (str): Mensaje del error si ha fallado
+        cancelacion_solicitada (bool): Cancelación pedida mientras estaba en curso
+        intentos (int): Veces que se ha empezado a ejecutar
+        trabajador (str): Proceso que lo ejecuta o lo ejecutó (host:pid)
+        created_at (datetime): Fecha y hora de encolado
+        iniciado_at (datetime): Inicio de la última ejecución
+        latido_at (datetime): Última señal de vida del trabajador
+        finalizado_at (datetime): Fecha y hora de fin
+    """
+    __tablename__ = "trabajo"
+
+    __table_args__ = (
+        CheckConstraint(
+            "estado IN ('pendiente', 'en_curso', 'completado', 'error', 'cancelado')",
+            name='check_trabajo_estado'
+        ),
+        CheckConstraint("progreso BETWEEN 0 AND 100", name='check_trabajo_progreso'),
+        # Índice parcial: los trabajadores solo recorren la cola pendiente
+        Index('ix_trabajo_pendientes', 'id', postgresql_where=text("estado = 'pendiente'"),
+              sqlite_where=text("estado = 'pendiente'")),
+        Index('ix_trabajo_estado_created_at', 'estado', 'created_at'),
+    )
+
+    id = Column(ENTERO_GRANDE, primary_key=True)
+    tipo = Column(String(50), nullable=False)
+    parametros = Column(JSONB_PORTABLE, nullable=False, server_default=text("'{}'"))
+    estado = Column(String(20), nullable=False, server_default="pendiente")
+    progreso = Column(Integer, nullable=False, server_default="0")
+    mensaje = Column(String(255))
+    avance = Column(JSONB_PORTABLE)
+    resultado = Column(JSONB_PORTABLE)
+    error = Column(Text)
+    cancelacion_solicitada = Column(Boolean, nullable=False, server_default=text("false"))
+    intentos = Column(Integer, nullable=False, server_default="0")
+    trabajador = Column(String(100))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    iniciado_at = Column(DateTime(timezone=True))
+    latido_at = Column(DateTime(timezone=True))
+    finalizado_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<Trabajo(id={self.id}, tipo='{self.tipo}', estado='{self.estado}', progreso={self.progreso})>"
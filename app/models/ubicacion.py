@@ -0,0 +1,97 @@
+import re
+from typing import List, Optional
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db import Base
+
+# Niveles de la jerarquía, de la raíz a la hoja
+TIPOS_UBICACION = ("almacen", "pasillo", "estanteria", "hueco")
+
+# Separador de los segmentos de la ruta (ALM1/P04/E02/H03)
+SEPARADOR_RUTA = "/"
+
+
+def normalizar_ruta(ruta: str) -> str:
+    """
+    Normalizar una ruta de ubicación ("alm1 / p04" -> "ALM1/P04")
+
+    Raises:
+        ValueError: Si la ruta está vacía, tiene segmentos vacíos o más niveles de los permitidos
+    """
+    segmentos = [segmento.strip().upper() for segmento in (ruta or "").split(SEPARADOR_RUTA)]
+    if not segmentos or any(not segmento for segmento in segmentos):
+        raise ValueError(f"Ruta de ubicación no válida: '{ruta}'")
+    if len(segmentos) > len(TIPOS_UBICACION):
+        raise ValueError(f"La ruta '{ruta}' tiene más de {len(TIPOS_UBICACION)} niveles")
+    return SEPARADOR_RUTA.join(segmentos)
+
+
+def rutas_ancestras(ruta: str) -> List[str]:
+    """Rutas de todos los niveles de una ruta normalizada, de la raíz a la propia ruta"""
+    segmentos = ruta.split(SEPARADOR_RUTA)
+    return [SEPARADOR_RUTA.join(segmentos[:nivel]) for nivel in range(1, len(segmentos) + 1)]
+
+
+def posicion_de_codigo(codigo: str) -> Optional[int]:
+    """Número de orden de un segmento a partir de sus últimos dígitos ("P04" -> 4)"""
+    coincidencia = re.search(r"(\d+)$", codigo)
+    return int(coincidencia.group(1)) if coincidencia else None
+
+
+class Ubicacion(Base):
+    """
+    📍 Ubicacion - Nodo de la jerarquía física del almacén
+
+    Cada nivel (almacén, pasillo, estantería, hueco) es una fila que apunta a su
+    padre. La ruta completa se guarda materializada (`ALM1/P04/E02/H03`), de modo
+    que "todo lo que hay en el pasillo 4" es un recorrido de rango sobre su índice
+    (`ruta = 'ALM1/P04' OR ruta LIKE 'ALM1/P04/%'`).
+
+    Attributes:
+        id (int): Identificador único de la ubicación
+        codigo (str): Código del segmento dentro de su padre (ej: 'P04')
+        tipo (str): Nivel ('almacen', 'pasillo', 'estanteria' o 'hueco')
+        nivel (int): Profundidad en la jerarquía (1 = almacén)
+        ruta (str): Ruta completa materializada (única)
+        posicion (int): Orden físico dentro del padre (dígitos del código)
+        id_padre (int): Referencia a la ubicación padre
+        created_at (datetime): Fecha y hora de creación
+        updated_at (datetime): Fecha y hora de última actualización
+
+    Relationships:
+        padre (Ubicacion): Ubicación que la contiene
+        hijos (List[Ubicacion]): Ubicaciones contenidas
+        stocks (List[Stock]): Registros de stock situados exactamente en esta ubicación
+    """
+    __tablename__ = "ubicacion"
+
+    __table_args__ = (
+        CheckConstraint(
+            "tipo IN ('almacen', 'pasillo', 'estanteria', 'hueco')", name='check_tipo_ubicacion'
+        ),
+        # varchar_pattern_ops permite usar el índice con LIKE 'prefijo%' sea cual sea la collation
+        Index('ix_ubicacion_ruta_prefijo', 'ruta', postgresql_ops={'ruta': 'varchar_pattern_ops'}),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    codigo = Column(String(50), nullable=False)
+    tipo = Column(String(20), nullable=False)
+    nivel = Column(Integer, nullable=False)
+    ruta = Column(String(255), nullable=False, unique=True)
+    posicion = Column(Integer)
+
+    # Foreign Keys
+    id_padre = Column(Integer, ForeignKey("ubicacion.id"), index=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
+
+    # Relaciones
+    padre = relationship("Ubicacion", remote_side=[id], back_populates="hijos")
+    hijos = relationship("Ubicacion", back_populates="padre")
+    stocks = relationship("Stock", foreign_keys="Stock.id_ubicacion", back_populates="ubicacion")
+
+    def __repr__(self):
+        return f"<Ubicacion(id={self.id}, ruta='{self.ruta}')>"
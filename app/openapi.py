@@ -0,0 +1,168 @@
+"""
+📘 Esquema OpenAPI precalculado
+
+El esquema se genera en el build (`python scripts/generar_openapi.py`) en
+`app/openapi.json`, que se versiona con el código. La app lo carga al
+arrancar y lo sirve tal cual: ni recorre las rutas ni monta los routers
+diferidos en la primera petición a `/openapi.json` o `/docs`.
+
+La respuesta lleva un ETag fuerte (hash del contenido) y se entrega
+comprimida con gzip si el cliente lo acepta; con `If-None-Match` responde
+304 sin cuerpo. Si falta el artefacto, o es de otra versión de la app, el
+esquema se genera a partir de las rutas con la primera petición.
+
+`python scripts/generar_openapi.py --comprobar` (y el test de `test_main`)
+detecta un artefacto desfasado respecto a las rutas reales.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.openapi.utils import get_openapi
+
+from app.compresion import elegir_codificacion
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ruta del artefacto; vacía para generar siempre el esquema a partir de las rutas
+OPENAPI_ARTEFACTO = os.getenv("OPENAPI_ARTEFACTO", str(Path(__file__).with_name("openapi.json")))
+
+METODOS_HTTP = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+
+def generar_esquema(app: FastAPI) -> Dict[str, Any]:
+    """Esquema OpenAPI de las rutas montadas en `app`, sin las respuestas 422"""
+    esquema = get_openapi(
+        title=app.title,
+        version=app.version,
+        description=app.description,
+        routes=app.routes,
+    )
+
+    # Las validaciones fallidas responden 400 (ver validation_exception_handler)
+    for path_data in esquema["paths"].values():
+        for operation in path_data.values():
+            if "responses" in operation and "422" in operation["responses"]:
+                del operation["responses"]["422"]
+    return esquema
+
+
+def serializar(esquema: Dict[str, Any]) -> bytes:
+    """JSON estable del esquema: el mismo esquema produce siempre los mismos bytes"""
+    return (json.dumps(esquema, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+
+class DocumentoOpenAPI:
+    """
+    📘 Esquema OpenAPI serializado, comprimido y con su ETag, listo para servir
+
+    Cada codificación es una representación distinta con su propio ETag
+    fuerte (RFC 9110): `"<hash>"` sin comprimir y `"<hash>-gzip"` con gzip.
+    """
+
+    def __init__(self, contenido: bytes):
+        self.contenido = contenido
+        self.esquema: Dict[str, Any] = json.loads(contenido)
+        # mtime fijo: los mismos bytes comprimidos en todos los workers
+        self.comprimido = gzip.compress(contenido, compresslevel=9, mtime=0)
+        self.etag = f'"{hashlib.sha256(contenido).hexdigest()[:32]}"'
+        self.etag_gzip = f'{self.etag[:-1]}-gzip"'
+
+    @classmethod
+    def desde_esquema(cls, esquema: Dict[str, Any]) -> "DocumentoOpenAPI":
+        return cls(serializar(esquema))
+
+    def respuesta(self, request: Request) -> Response:
+        """Esquema en la codificación que acepta el cliente, o 304 si ya lo tiene"""
+        if elegir_codificacion(request.headers.get("accept-encoding", ""), ("gzip",)):
+            cuerpo, etag, cabeceras = self.comprimido, self.etag_gzip, {"Content-Encoding": "gzip"}
+        else:
+            cuerpo, etag, cabeceras = self.contenido, self.etag, {}
+        cabeceras.update({"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"})
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # Comparación débil, como pide If-None-Match
+            candidatos = {valor.strip().removeprefix("W/") for valor in if_none_match.split(",")}
+            if "*" in candidatos or etag in candidatos:
+                cabeceras.pop("Content-Encoding", None)
+                return Response(status_code=304, headers=cabeceras)
+        return Response(content=cuerpo, media_type="application/json", headers=cabeceras)
+
+
+def cargar_artefacto(app: FastAPI, ruta: str = OPENAPI_ARTEFACTO) -> Optional[DocumentoOpenAPI]:
+    """
+    Cargar el esquema precalculado de `ruta`
+
+    Returns:
+        Optional[DocumentoOpenAPI]: None si no hay artefacto o es de otra versión de la app
+    """
+    if not ruta:
+        return None
+    try:
+        documento = DocumentoOpenAPI(Path(ruta).read_bytes())
+    except FileNotFoundError:
+        logger.warning("⚠️ No hay esquema OpenAPI precalculado en %s: se generará en la primera petición", ruta)
+        return None
+    except ValueError as e:
+        logger.error("❌ Esquema OpenAPI precalculado no válido en %s: %s", ruta, e)
+        return None
+
+    info = documento.esquema.get("info", {})
+    if info.get("title") != app.title or info.get("version") != app.version:
+        logger.warning(
+            "⚠️ El esquema OpenAPI de %s es de la versión %s y la app es la %s: "
+            "se generará en la primera petición", ruta, info.get("version"), app.version
+        )
+        return None
+    return documento
+
+
+def diferencias(esquema: Dict[str, Any], artefacto: Dict[str, Any]) -> List[str]:
+    """
+    Diferencias entre el esquema de las rutas reales y el artefacto
+
+    Returns:
+        List[str]: Una línea por operación o componente añadido, eliminado o cambiado
+    """
+    # Normalizar: el esquema generado puede contener tuplas donde el JSON tiene listas
+    esquema = json.loads(serializar(esquema))
+
+    def operaciones(documento: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            f"{metodo.upper()} {ruta}": operacion
+            for ruta, metodos in documento.get("paths", {}).items()
+            for metodo, operacion in metodos.items() if metodo in METODOS_HTTP
+        }
+
+    def componentes(documento: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            f"{tipo}/{nombre}": valor
+            for tipo, valores in documento.get("components", {}).items()
+            for nombre, valor in valores.items()
+        }
+
+    cambios = []
+    for vivo, guardado in ((operaciones(esquema), operaciones(artefacto)),
+                           (componentes(esquema), componentes(artefacto))):
+        for clave in sorted(set(vivo) | set(guardado)):
+            if clave not in guardado:
+                cambios.append(f"+ {clave}")
+            elif clave not in vivo:
+                cambios.append(f"- {clave}")
+            elif vivo[clave] != guardado[clave]:
+                cambios.append(f"~ {clave}")
+
+    for clave in sorted(set(esquema) | set(artefacto)):
+        if clave not in ("paths", "components") and esquema.get(clave) != artefacto.get(clave):
+            cambios.append(f"~ {clave}")
+    if not cambios and serializar(esquema) != serializar(artefacto):
+        # Mismo contenido en otro orden (p. ej. rutas registradas en otro orden)
+        cambios.append("~ orden")
+    return cambios
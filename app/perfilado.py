@@ -0,0 +1,384 @@
+"""
+🔬 Perfilado bajo demanda de peticiones (cProfile + SQL)
+
+Perfila una fracción de las peticiones de las rutas configuradas, o una
+petición concreta que lleve `X-Perfilar: <PERFILADO_TOKEN>`. Para cada
+petición perfilada se guardan en `PERFILADO_DIR`:
+
+- `<id>.prof`: estadísticas de cProfile (pstats) del bucle de eventos y del
+  hilo donde se ejecuta el endpoint; se abren con snakeviz, flameprof o
+  gprof2dot para verlas como flamegraph o árbol de llamadas.
+- `<id>.json`: método, ruta, estado, duración, id de petición, las
+  funciones con más tiempo acumulado y cada sentencia SQL con su duración y
+  los métodos de `app/services/*` que la lanzaron (del más externo al más
+  interno), más el total por método.
+
+La respuesta perfilada lleva `X-Perfil: <id>`. Los perfiles se consultan
+en `/perfilado` (ver `app.routes.perfilado_routes`) y se conservan los
+últimos `PERFILADO_MAXIMO`.
+
+Sin `PERFILADO_TOKEN` ni `PERFILADO_RUTAS` el middleware solo deja pasar
+las peticiones; los hooks de SQL se registran con el primer perfil. Se
+perfila una petición a la vez por proceso (cProfile admite un perfilador
+por hilo): si llega otra mientras tanto, se atiende sin perfilar. Con
+varias peticiones concurrentes, el perfil del bucle de eventos incluye
+también el trabajo asíncrono de las demás.
+
+Configuración (variables de entorno):
+    PERFILADO_TOKEN: token de `X-Perfilar` y de las rutas de /perfilado (sin él, desactivadas)
+    PERFILADO_RUTAS: fracción a perfilar por prefijo, p. ej. "/inventario/dashboard=0.05"
+    PERFILADO_DIR: directorio de los perfiles (<tmp>/perfiles)
+    PERFILADO_MAXIMO: perfiles que se conservan (200)
+"""
+
+import asyncio
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.registro import id_peticion
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Funciones con más tiempo acumulado que se incluyen en el resumen JSON
+FUNCIONES_RESUMEN = 20
+
+# Ids ordenables por fecha (hasta el microsegundo): el listado y la limpieza
+# ordenan los archivos por nombre
+_ID_PERFIL = re.compile(r"[0-9]{8}T[0-9]{12}-[0-9a-f]{8}")
+
+
+def fracciones_por_ruta(configuracion: str) -> Dict[str, float]:
+    """
+    Fracciones de `PERFILADO_RUTAS` ("/prefijo=0.1,/otro=1")
+
+    Raises:
+        ValueError: Si alguna entrada no tiene la forma /prefijo=fracción entre 0 y 1
+    """
+    fracciones = {}
+    for entrada in configuracion.split(","):
+        if not entrada.strip():
+            continue
+        prefijo, _, fraccion = entrada.partition("=")
+        try:
+            fracciones[prefijo.strip()] = float(fraccion)
+        except ValueError:
+            raise ValueError(f"PERFILADO_RUTAS no válido: '{entrada.strip()}'. Formato: /prefijo=fracción")
+    validar_fracciones(fracciones)
+    return fracciones
+
+
+def validar_fracciones(fracciones: Dict[str, float]) -> None:
+    """
+    Raises:
+        ValueError: Si algún prefijo no empieza por / o alguna fracción no está entre 0 y 1
+    """
+    for prefijo, fraccion in fracciones.items():
+        if not prefijo.startswith("/"):
+            raise ValueError(f"Prefijo de perfilado no válido: '{prefijo}'. Debe empezar por /")
+        if not 0 <= fraccion <= 1:
+            raise ValueError(f"Fracción de perfilado no válida para {prefijo}: {fraccion}. Debe estar entre 0 y 1")
+
+
+class ConfiguracionPerfilado:
+    """⚙️ Configuración del perfilado del proceso (las fracciones se cambian desde /perfilado)"""
+
+    def __init__(self):
+        self.token = os.getenv("PERFILADO_TOKEN", "")
+        self.fracciones = fracciones_por_ruta(os.getenv("PERFILADO_RUTAS", ""))
+        self.directorio = Path(os.getenv("PERFILADO_DIR", os.path.join(tempfile.gettempdir(), "perfiles")))
+        self.maximo = int(os.getenv("PERFILADO_MAXIMO", "200"))
+
+    def fraccion(self, ruta: str) -> float:
+        """Fracción del prefijo más largo que contiene `ruta` (0 si ninguno)"""
+        mejor, fraccion = -1, 0.0
+        for prefijo, valor in self.fracciones.items():
+            if (ruta == prefijo or ruta.startswith(prefijo.rstrip("/") + "/")) and len(prefijo) > mejor:
+                mejor, fraccion = len(prefijo), valor
+        return fraccion
+
+
+configuracion = ConfiguracionPerfilado()
+
+# Perfil de la petición en curso (se copia a los hilos del threadpool)
+perfil_actual: ContextVar[Optional["Perfil"]] = ContextVar("perfil_actual", default=None)
+
+
+def _metodos_de_servicio() -> List[str]:
+    """Métodos de app/services/* en la pila actual, del más externo al más interno"""
+    metodos = []
+    marco = sys._getframe(2)
+    while marco is not None:
+        modulo = marco.f_globals.get("__name__", "")
+        if modulo.startswith("app.services."):
+            metodos.append(f"{modulo.rsplit('.', 1)[-1]}:{marco.f_code.co_qualname}")
+        marco = marco.f_back
+    return metodos[::-1]
+
+
+class Perfil:
+    """🔬 Perfil de una petición: cProfile por hilo y sentencias SQL con su duración"""
+
+    def __init__(self, metodo: str, ruta: str):
+        self.id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+        self.metodo = metodo
+        self.ruta = ruta
+        self.id_peticion = id_peticion.get()
+        self.perfiles: List[cProfile.Profile] = []
+        self.consultas: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def medir(self):
+        """Perfilar con cProfile lo que se ejecute en este hilo dentro del bloque"""
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield
+        finally:
+            perfil.disable()
+            with self._lock:
+                self.perfiles.append(perfil)
+
+    def registrar_consulta(self, sentencia: str, duracion_ms: float) -> None:
+        consulta = {"sentencia": sentencia, "duracion_ms": round(duracion_ms, 3), "servicio": _metodos_de_servicio()}
+        with self._lock:
+            self.consultas.append(consulta)
+
+    def _estadisticas(self) -> Optional[pstats.Stats]:
+        if not self.perfiles:
+            return None
+        estadisticas = pstats.Stats(self.perfiles[0], stream=io.StringIO())
+        for perfil in self.perfiles[1:]:
+            estadisticas.add(perfil)
+        return estadisticas
+
+    def resumen(self, estado: int, duracion_ms: float) -> Dict[str, Any]:
+        """Metadatos del perfil: petición, funciones más costosas y SQL por método de servicio"""
+        por_servicio: Dict[str, Dict[str, Any]] = {}
+        for consulta in self.consultas:
+            clave = consulta["servicio"][0] if consulta["servicio"] else "(fuera de servicios)"
+            total = por_servicio.setdefault(clave, {"consultas": 0, "duracion_ms": 0.0})
+            total["consultas"] += 1
+            total["duracion_ms"] = round(total["duracion_ms"] + consulta["duracion_ms"], 3)
+
+        funciones = []
+        estadisticas = self._estadisticas()
+        if estadisticas:
+            filas = sorted(estadisticas.stats.items(), key=lambda fila: fila[1][3], reverse=True)
+            for (archivo, linea, nombre), (_, llamadas, propio, acumulado, _) in filas[:FUNCIONES_RESUMEN]:
+                funciones.append({
+                    "funcion": f"{archivo}:{linea}({nombre})", "llamadas": llamadas,
+                    "propio_ms": round(propio * 1000, 3), "acumulado_ms": round(acumulado * 1000, 3)
+                })
+
+        return {
+            "id": self.id,
+            "fecha": datetime.now(timezone.utc).isoformat(),
+            "metodo": self.metodo,
+            "ruta": self.ruta,
+            "estado": estado,
+            "duracion_ms": round(duracion_ms, 3),
+            "id_peticion": self.id_peticion,
+            "sql": {
+                "consultas": len(self.consultas),
+                "duracion_ms": round(sum(consulta["duracion_ms"] for consulta in self.consultas), 3),
+                "por_servicio": por_servicio,
+                "sentencias": self.consultas,
+            },
+            "funciones": funciones,
+        }
+
+    def guardar(self, directorio: Path, estado: int, duracion_ms: float, maximo: int) -> None:
+        """Escribir `<id>.prof` y `<id>.json` y borrar los perfiles más antiguos que `maximo`"""
+        directorio.mkdir(parents=True, exist_ok=True)
+        estadisticas = self._estadisticas()
+        if estadisticas:
+            estadisticas.dump_stats(directorio / f"{self.id}.prof")
+        (directorio / f"{self.id}.json").write_text(
+            json.dumps(self.resumen(estado, duracion_ms), ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        for antiguo in sorted(directorio.glob("*.json"))[:-maximo or None]:
+            antiguo.unlink(missing_ok=True)
+            antiguo.with_suffix(".prof").unlink(missing_ok=True)
+
+
+# ==========================================
+# SQL
+# ==========================================
+
+_sql_registrado = False
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if perfil_actual.get() is not None:
+        conn.info.setdefault("perfilado_inicio", []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    perfil = perfil_actual.get()
+    inicios = conn.info.get("perfilado_inicio")
+    if perfil is not None and inicios:
+        perfil.registrar_consulta(statement, (time.perf_counter() - inicios.pop()) * 1000)
+
+
+def registrar_sql() -> None:
+    """Escuchar las sentencias de todos los engines (una vez por proceso)"""
+    global _sql_registrado
+    if not _sql_registrado:
+        event.listen(Engine, "before_cursor_execute", _antes_de_ejecutar)
+        event.listen(Engine, "after_cursor_execute", _despues_de_ejecutar)
+        _sql_registrado = True
+
+
+# ==========================================
+# PETICIONES
+# ==========================================
+
+def _perfilar_endpoint(funcion):
+    """Perfilar un endpoint síncrono en el hilo del threadpool donde se ejecuta"""
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        perfil = perfil_actual.get()
+        if perfil is None:
+            return funcion(*args, **kwargs)
+        with perfil.medir():
+            return funcion(*args, **kwargs)
+    envoltura.perfilado = True
+    return envoltura
+
+
+def instrumentar_rutas(rutas) -> None:
+    """Envolver los endpoints síncronos que aún no lo estén (los routers diferidos llegan más tarde)"""
+    for ruta in rutas:
+        if not isinstance(ruta, APIRoute):
+            continue
+        llamada = ruta.dependant.call
+        # Los asíncronos se ejecutan en el bucle de eventos, que ya se perfila
+        if llamada is None or getattr(llamada, "perfilado", False) or asyncio.iscoroutinefunction(llamada):
+            continue
+        ruta.dependant.call = _perfilar_endpoint(llamada)
+
+
+# Un perfil a la vez por proceso
+_en_curso = threading.Lock()
+
+
+class Perfilado:
+    """Middleware ASGI: perfila las peticiones muestreadas o marcadas con X-Perfilar"""
+
+    def __init__(self, app: ASGIApp, ajustes: ConfiguracionPerfilado = configuracion):
+        self.app = app
+        self.ajustes = ajustes
+
+    def _perfilar(self, scope: Scope) -> bool:
+        if self.ajustes.token:
+            marcada = Headers(scope=scope).get("x-perfilar")
+            if marcada is not None:
+                return marcada == self.ajustes.token
+        fraccion = self.ajustes.fraccion(scope["path"]) if self.ajustes.fracciones else 0.0
+        return fraccion > 0 and random.random() < fraccion
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._perfilar(scope) or not _en_curso.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            registrar_sql()
+            instrumentar_rutas(scope["app"].router.routes)
+            perfil = Perfil(scope["method"], scope["path"])
+            estado = 500
+
+            async def enviar(mensaje: Message) -> None:
+                nonlocal estado
+                if mensaje["type"] == "http.response.start":
+                    estado = mensaje["status"]
+                    MutableHeaders(scope=mensaje)["X-Perfil"] = perfil.id
+                await send(mensaje)
+
+            token = perfil_actual.set(perfil)
+            inicio = time.perf_counter()
+            try:
+                with perfil.medir():
+                    await self.app(scope, receive, enviar)
+            finally:
+                perfil_actual.reset(token)
+                duracion = (time.perf_counter() - inicio) * 1000
+                try:
+                    await run_in_threadpool(
+                        perfil.guardar, self.ajustes.directorio, estado, duracion, self.ajustes.maximo
+                    )
+                    logger.info("🔬 Perfil %s guardado: %s %s %.1f ms", perfil.id, perfil.metodo, perfil.ruta, duracion)
+                except OSError as e:
+                    logger.error("❌ Error guardando el perfil %s: %s", perfil.id, e)
+        finally:
+            _en_curso.release()
+
+
+# ==========================================
+# CONSULTA DE PERFILES
+# ==========================================
+
+def _archivo(perfil_id: str, extension: str, ajustes: ConfiguracionPerfilado) -> Optional[Path]:
+    if not _ID_PERFIL.fullmatch(perfil_id):
+        return None
+    archivo = ajustes.directorio / f"{perfil_id}{extension}"
+    return archivo if archivo.is_file() else None
+
+
+def listar_perfiles(limite: int = 50, ruta: Optional[str] = None,
+                    ajustes: ConfiguracionPerfilado = configuracion) -> List[Dict[str, Any]]:
+    """Resumen de los perfiles guardados, del más reciente al más antiguo"""
+    perfiles = []
+    if not ajustes.directorio.is_dir():
+        return perfiles
+    for archivo in sorted(ajustes.directorio.glob("*.json"), reverse=True):
+        try:
+            datos = json.loads(archivo.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if ruta and not datos["ruta"].startswith(ruta):
+            continue
+        perfiles.append({
+            "id": datos["id"], "fecha": datos["fecha"], "metodo": datos["metodo"], "ruta": datos["ruta"],
+            "estado": datos["estado"], "duracion_ms": datos["duracion_ms"],
+            "sql_consultas": datos["sql"]["consultas"], "sql_duracion_ms": datos["sql"]["duracion_ms"],
+        })
+        if len(perfiles) >= limite:
+            break
+    return perfiles
+
+
+def leer_perfil(perfil_id: str, ajustes: ConfiguracionPerfilado = configuracion) -> Optional[Dict[str, Any]]:
+    """Metadatos completos de un perfil (None si no existe)"""
+    archivo = _archivo(perfil_id, ".json", ajustes)
+    return json.loads(archivo.read_text(encoding="utf-8")) if archivo else None
+
+
+def archivo_prof(perfil_id: str, ajustes: ConfiguracionPerfilado = configuracion) -> Optional[Path]:
+    """Ruta del `.prof` de un perfil (None si no existe)"""
+    return _archivo(perfil_id, ".prof", ajustes)
@@ -0,0 +1,232 @@
+"""
+📝 Registro (logging) estructurado y asíncrono
+
+`configurar_registro()` deja en el logger raíz un único `QueueHandler`: la
+llamada a `logger.info(...)` solo encola el registro y un hilo de fondo
+(`QueueListener`) lo formatea y escribe. Las escrituras de stock no esperan
+a la salida estándar ni al formateo.
+
+Los mensajes usan formateo diferido (`logger.info("✅ Stock %s", id)`): si
+el nivel está desactivado no se formatea nada y, si está activo, el mensaje
+se compone en el hilo de fondo. Solo se difiere cuando todos los argumentos
+son valores inmutables (números, textos, fechas, excepciones); con
+cualquier otro (objetos del ORM, listas...) el mensaje se compone al
+registrarlo, porque el objeto podría cambiar o cargar atributos desde otro
+hilo.
+
+Los procesos hijos creados con fork (trabajadores, previsión) no heredan el
+hilo de fondo: con el primer registro en el hijo se configura una cola
+nueva, y los registros pendientes se escriben al salir del proceso.
+
+Cada registro sale como una línea JSON con la fecha, el nivel, el logger,
+el mensaje, el id de la petición HTTP en curso y los campos de `extra`.
+`IdPeticion` asigna ese id (o respeta el `X-Request-ID` recibido), lo
+devuelve en la respuesta y registra método, ruta, estado y duración de cada
+petición en el logger `app.peticiones`.
+
+Configuración (variables de entorno):
+    LOG_NIVEL: nivel del logger raíz (INFO)
+    LOG_NIVELES: niveles por módulo, p. ej. "app.services=WARNING,app.peticiones=ERROR"
+    LOG_FORMATO: json (por defecto) o texto, más legible en desarrollo
+    DB_ECHO: 1 para registrar el SQL (logger sqlalchemy.engine, ver `app.db`)
+"""
+
+import atexit
+import json
+import logging
+import multiprocessing.util
+import os
+import queue
+import re
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LOG_NIVEL = os.getenv("LOG_NIVEL", "INFO").upper()
+LOG_NIVELES = os.getenv("LOG_NIVELES", "")
+LOG_FORMATO = os.getenv("LOG_FORMATO", "json").lower()
+
+# Id de la petición HTTP que se está atendiendo (None fuera de una petición)
+id_peticion: ContextVar[Optional[str]] = ContextVar("id_peticion", default=None)
+
+# Argumentos que se pueden formatear más tarde en otro hilo sin riesgo
+_INMUTABLES = (str, int, float, bool, type(None), bytes, Decimal, date, datetime, BaseException)
+
+# Atributos propios de LogRecord: el resto viene de `extra`
+_ATRIBUTOS_REGISTRO = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "id_peticion"}
+
+
+def niveles_por_modulo(configuracion: str) -> Dict[str, int]:
+    """
+    Niveles de `LOG_NIVELES` ("modulo=NIVEL,otro=NIVEL")
+
+    Raises:
+        ValueError: Si alguna entrada no tiene la forma modulo=NIVEL o el nivel no existe
+    """
+    niveles = {}
+    for entrada in configuracion.split(","):
+        if not entrada.strip():
+            continue
+        modulo, _, nivel = entrada.partition("=")
+        valor = logging.getLevelName(nivel.strip().upper())
+        if not modulo.strip() or not isinstance(valor, int):
+            raise ValueError(f"LOG_NIVELES no válido: '{entrada.strip()}'. Formato: modulo=NIVEL")
+        niveles[modulo.strip()] = valor
+    return niveles
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro, con el id de petición y los campos de `extra`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            "fecha": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        if getattr(record, "id_peticion", None):
+            datos["id_peticion"] = record.id_peticion
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_REGISTRO:
+                datos[clave] = valor
+        if record.exc_info:
+            datos["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class _AnotarPeticion(logging.Filter):
+    """Copiar el id de la petición al registro en el hilo que registra"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.id_peticion = id_peticion.get()
+        return True
+
+
+class ColaRegistro(QueueHandler):
+    """QueueHandler que deja el formateo del mensaje al hilo de fondo cuando es seguro"""
+
+    def __init__(self, cola):
+        super().__init__(cola)
+        self.pid = os.getpid()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        if self.pid != os.getpid() and self is _handler:
+            # Proceso hijo creado con fork: el hilo de fondo se quedó en el padre
+            configurar_registro()
+            return _handler.handle(record)
+        return super().handle(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        argumentos = record.args if isinstance(record.args, tuple) else ()
+        if all(isinstance(argumento, _INMUTABLES) for argumento in argumentos):
+            return record
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+
+def crear_cola(*destinos: logging.Handler) -> tuple:
+    """
+    Handler para los loggers y escucha que escribe en `destinos` en segundo plano
+
+    Returns:
+        tuple: (ColaRegistro, QueueListener); la escucha se arranca con `start()`
+    """
+    cola = queue.SimpleQueue()
+    handler = ColaRegistro(cola)
+    handler.addFilter(_AnotarPeticion())
+    return handler, QueueListener(cola, *destinos, respect_handler_level=True)
+
+
+_handler: Optional[ColaRegistro] = None
+_escucha: Optional[QueueListener] = None
+
+
+def configurar_registro() -> None:
+    """Configurar el logger raíz con la cola y los niveles por módulo (una vez por proceso)"""
+    global _handler, _escucha
+    if _handler is not None and _handler.pid == os.getpid():
+        return
+    if LOG_FORMATO not in ("json", "texto"):
+        raise ValueError(f"LOG_FORMATO no válido: '{LOG_FORMATO}'. Opciones: json, texto")
+    niveles = niveles_por_modulo(LOG_NIVELES)
+
+    salida = logging.StreamHandler(sys.stderr)
+    salida.setFormatter(
+        FormatoJSON() if LOG_FORMATO == "json"
+        else logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(id_peticion)s] %(message)s")
+    )
+    _handler, _escucha = crear_cola(salida)
+
+    raiz = logging.getLogger()
+    for anterior in list(raiz.handlers):
+        raiz.removeHandler(anterior)
+    raiz.addHandler(_handler)
+    raiz.setLevel(LOG_NIVEL)
+    for modulo, nivel in niveles.items():
+        logging.getLogger(modulo).setLevel(nivel)
+
+    _escucha.start()
+    # Al salir del proceso se escriben los registros que queden en la cola; los
+    # procesos de multiprocessing salen sin pasar por atexit
+    atexit.register(detener_registro)
+    multiprocessing.util.Finalize(None, detener_registro, exitpriority=0)
+
+
+def detener_registro() -> None:
+    """Escribir los registros pendientes y parar el hilo de fondo"""
+    global _escucha
+    escucha, _escucha = _escucha, None
+    if escucha is not None:
+        escucha.stop()
+
+
+# Valores de X-Request-ID que se aceptan del cliente (o del balanceador)
+_ID_VALIDO = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+logger_peticiones = logging.getLogger("app.peticiones")
+
+
+class IdPeticion:
+    """Middleware ASGI: id de petición en los registros y en `X-Request-ID`, y duración"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recibido = Headers(scope=scope).get("x-request-id", "")
+        identificador = recibido if _ID_VALIDO.fullmatch(recibido) else uuid.uuid4().hex
+        token = id_peticion.set(identificador)
+        inicio = time.perf_counter()
+        estado = 500
+
+        async def enviar(mensaje: Message) -> None:
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                MutableHeaders(scope=mensaje)["X-Request-ID"] = identificador
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            if logger_peticiones.isEnabledFor(logging.INFO):
+                duracion = (time.perf_counter() - inicio) * 1000
+                logger_peticiones.info(
+                    "%s %s %s %.1f ms", scope["method"], scope["path"], estado, duracion,
+                    extra={"metodo": scope["method"], "ruta": scope["path"], "estado": estado,
+                           "duracion_ms": round(duracion, 2)}
+                )
+            id_peticion.reset(token)
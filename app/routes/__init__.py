@@ -5,15 +5,17 @@ Este módulo contiene todas las rutas organizadas por modelo,
 proporcionando endpoints RESTful para cada entidad del sistema.
 """
 
-from .familia_routes import router as familia_router
-from .color_routes import router as color_router
-from .proveedor_routes import router as proveedor_router
-from .articulo_routes import router as articulo_router
-from .componente_routes import router as componente_router
-from .producto_routes import router as producto_router
-from .pack_routes import router as pack_router
-from .stock_routes import router as stock_router
-from .inventario_routes import router as inventario_router
+from importlib import import_module
+
+
+def __getattr__(nombre: str):
+    """Importar el módulo de rutas solo al pedir su router (`familia_router` -> `familia_routes`)"""
+    if nombre not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = import_module(f".{nombre.removesuffix('_router')}_routes", __name__).router
+    globals()[nombre] = valor
+    return valor
+
 
 __all__ = [
     "familia_router",
@@ -24,5 +26,11 @@ __all__ = [
     "producto_router",
     "pack_router",
     "stock_router",
-    "inventario_router"
+    "ubicacion_router",
+    "picking_router",
+    "historico_router",
+    "inventario_router",
+    "sync_router",
+    "trabajo_router",
+    "perfilado_router"
 ]
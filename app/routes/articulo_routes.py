@@ -4,48 +4,72 @@
 Endpoints RESTful para gestionar los Articulos.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic_core import ValidationError
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db import SessionLocal
+from app.db import get_db
 from app.schemas.articuloDTO import ArticuloCreate, ArticuloResponse, ArticuloUpdate
+from app.schemas.base_schema import esquema_parcial, parsear_campos
+from app.routes.cache_http import respuesta_condicional
+from app.routes.streaming import respuesta_json_en_streaming
 from app.services.articulo_service import ArticuloService
 
 router = APIRouter(prefix="/articulos", tags=["Articulos"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # ==========================================
 # ENDPOINTS CRUD BÁSICOS
 # ==========================================
 
 @router.get("/", response_model=List[ArticuloResponse], responses={
     200: {'description': 'Lista de Articulos obtenida exitosamente'},
+    304: {'description': 'La lista no ha cambiado desde la versión del cliente'},
+    400: {'description': 'Campos solicitados no válidos'},
     500: {'description': 'Error interno del servidor al listar Articulos'}
     })
 def listar_articulos(
+    request: Request,
+    response: Response,
     offset: int = 0,
     limite: int = 100,
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas (ej: id,codigo,nombre)"),
     db: Session = Depends(get_db)
 ) -> List[ArticuloResponse]:
     """
     📋 Obtener lista de Articulos con filtros opcionales
+
+    - **fields**: Proyección de columnas; solo se leen de la base de datos los campos indicados.
+    - Admite `If-None-Match` para responder `304` sin consultar las filas.
+    - La lista se envía en streaming a medida que se leen las filas.
     """
     try:
+        campos = parsear_campos(fields)
         articulo_service = ArticuloService(db)
-        articulos = articulo_service.obtener_todos(
-            offset=offset,
-            limite=limite
+        no_modificado = respuesta_condicional(
+            request, response, articulo_service.obtener_version(), validar_fecha=False
+        )
+        if no_modificado:
+            return no_modificado
+        esquema = esquema_parcial(ArticuloResponse, tuple(campos)) if campos else ArticuloResponse
+        return respuesta_json_en_streaming(
+            db,
+            lambda sesion: ArticuloService(sesion).iterar_todos(
+                offset=offset,
+                limite=limite,
+                campos=campos
+            ),
+            lambda articulo: esquema.model_validate(articulo, from_attributes=True).model_dump_json().encode("utf-8"),
+            headers=dict(response.headers)
         )
-        return articulos
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -54,27 +78,49 @@ def listar_articulos(
 
 @router.get("/{articulo_id}", response_model=ArticuloResponse, responses={
     200: {'description': 'Articulo obtenido exitosamente'},
+    304: {'description': 'El Articulo no ha cambiado desde la versión del cliente'},
+    400: {'description': 'Campos solicitados no válidos'},
     404: {'description': 'Articulo no encontrado'},
     500: {'description': 'Error interno del servidor al obtener Articulo'}
 })
 def obtener_articulo(
     articulo_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas (ej: id,codigo,nombre)"),
     db: Session = Depends(get_db)
 ) -> ArticuloResponse:
     """
     🔍 Obtener un Articulo específico por ID
     """
     try:
+        campos = parsear_campos(fields)
         articulo_service = ArticuloService(db)
-        articulo = articulo_service.obtener_por_id(articulo_id)
+        version = articulo_service.obtener_version(articulo_id)
+        if version:
+            no_modificado = respuesta_condicional(request, response, version)
+            if no_modificado:
+                return no_modificado
+        articulo = articulo_service.obtener_por_id(articulo_id, campos=campos)
         if not articulo:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Articulo no encontrado"
             )
+        if campos:
+            esquema = esquema_parcial(ArticuloResponse, tuple(campos))
+            return JSONResponse(
+                jsonable_encoder(esquema.model_validate(articulo)),
+                headers=dict(response.headers)
+            )
         return articulo
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,82 @@
+"""
+🗂️ Validación condicional HTTP (ETag / Last-Modified)
+
+Utilidades compartidas por las rutas para responder `304 Not Modified`
+sin cargar ni serializar filas cuando el cliente ya tiene la versión actual.
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import sha1
+from typing import Optional, Tuple
+
+from fastapi import Request, Response, status
+
+
+def _etag(request: Request, version: Tuple[Optional[datetime], int, Optional[int]]) -> str:
+    """Construir un ETag débil a partir de la ruta, los parámetros y la versión"""
+    marca, total, ultimo_id = version
+    clave = f"{request.url.path}?{request.url.query}|{total}|{ultimo_id}|{marca.isoformat() if marca else ''}"
+    return f'W/"{sha1(clave.encode("utf-8")).hexdigest()}"'
+
+
+def _coincide_etag(cabecera: str, etag: str) -> bool:
+    """Comparar If-None-Match con el ETag actual (comparación débil)"""
+    candidatos = [valor.strip() for valor in cabecera.split(",")]
+    if "*" in candidatos:
+        return True
+    limpio = etag.removeprefix("W/")
+    return any(candidato.removeprefix("W/") == limpio for candidato in candidatos)
+
+
+def _no_modificado_desde(cabecera: str, marca: Optional[datetime]) -> bool:
+    """Evaluar If-Modified-Since con resolución de segundos"""
+    if marca is None:
+        return False
+    try:
+        desde = parsedate_to_datetime(cabecera)
+    except (TypeError, ValueError):
+        return False
+    if desde.tzinfo is None:
+        desde = desde.replace(tzinfo=timezone.utc)
+    return marca.replace(microsecond=0) <= desde
+
+
+def respuesta_condicional(
+    request: Request,
+    response: Response,
+    version: Tuple[Optional[datetime], int, Optional[int]],
+    validar_fecha: bool = True
+) -> Optional[Response]:
+    """
+    Resolver una petición condicional contra la versión actual del recurso
+
+    Si el cliente tiene la versión vigente devuelve una respuesta `304`;
+    en caso contrario añade ETag/Last-Modified a `response` y devuelve None
+    para que la ruta continúe con la consulta normal.
+
+    Args:
+        request (Request): Petición entrante
+        response (Response): Respuesta en la que se fijan las cabeceras
+        version (Tuple): Versión obtenida con `BaseService.obtener_version`
+        validar_fecha (bool): Evaluar If-Modified-Since. En listados se desactiva
+            porque las bajas no cambian la fecha de última modificación.
+    """
+    marca = version[0]
+    cabeceras = {"ETag": _etag(request, version), "Cache-Control": "no-cache"}
+    if marca is not None:
+        cabeceras["Last-Modified"] = format_datetime(marca.astimezone(timezone.utc), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        no_modificado = _coincide_etag(if_none_match, cabeceras["ETag"])
+    elif if_modified_since is not None and validar_fecha:
+        no_modificado = _no_modificado_desde(if_modified_since, marca)
+    else:
+        no_modificado = False
+
+    if no_modificado:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabeceras)
+    response.headers.update(cabeceras)
+    return None
@@ -4,31 +4,28 @@
 Endpoints RESTful para gestionar los colores de productos.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db import SessionLocal
+from app.db import get_db
+from app.routes.cache_http import respuesta_condicional
 from app.schemas.colorDTO import ColorCreate, ColorResponse, ColorUpdate
 from app.services.color_service import ColorService
 
 router = APIRouter(prefix="/colores", tags=["Colores"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # ==========================================
 # ENDPOINTS CRUD BÁSICOS
 # ==========================================
 
 @router.get("/", response_model=List[ColorResponse], responses={
     200: {"description": "Lista de colores obtenida exitosamente"},
+    304: {"description": "Sin cambios desde la versión del cliente (ETag)"},
     500: {"description": "Error interno del servidor"}
 })
 def listar_colores(
+    request: Request,
+    response: Response,
     offset: int = 0,
     limite: int = 100,
     db: Session = Depends(get_db)
@@ -38,6 +35,11 @@ def listar_colores(
     """
     try:
         color_service = ColorService(db)
+        no_modificado = respuesta_condicional(
+            request, response, color_service.obtener_version(), validar_fecha=False
+        )
+        if no_modificado:
+            return no_modificado
         colores = color_service.obtener_todos(
             offset=offset,
             limite=limite
@@ -53,11 +55,14 @@ def listar_colores(
 
 @router.get("/{color_id}", response_model=ColorResponse, responses={
     200: {"description": "Color encontrado exitosamente"},
+    304: {"description": "Sin cambios desde la versión del cliente (ETag)"},
     404: {"description": "Color no encontrado"},
     500: {"description": "Error interno del servidor"}
     })
 def obtener_color(
     color_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
@@ -65,6 +70,11 @@ def obtener_color(
     """
     try:
         color_service = ColorService(db)
+        version = color_service.obtener_version(color_id)
+        if version:
+            no_modificado = respuesta_condicional(request, response, version)
+            if no_modificado:
+                return no_modificado
         color = color_service.obtener_por_id(color_id)
         if not color:
             raise HTTPException(
@@ -4,21 +4,15 @@
 Endpoints RESTful para gestionar los componentes.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db import SessionLocal
+from app.db import get_db
+from app.schemas.base_schema import parsear_campos
 from app.services.componente_service import ComponenteService
 
 router = APIRouter(prefix="/componentes", tags=["Componentes"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
 def crear_componente(
     nombre: str,
@@ -61,17 +55,22 @@ def listar_componentes(
     id_color: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas (ej: id,codigo,nombre)"),
     db: Session = Depends(get_db)
 ):
     """📋 Obtener lista de componentes con filtros opcionales"""
     try:
+        campos = parsear_campos(fields)
         componente_service = ComponenteService(db)
         componentes = componente_service.listar_componentes(
             id_proveedor=id_proveedor,
             id_color=id_color,
             skip=skip,
-            limit=limit
+            limit=limit,
+            campos=campos
         )
+        if campos:
+            return [{campo: getattr(componente, campo) for campo in campos} for componente in componentes]
         return [
             {
                 "id": componente.id,
@@ -86,17 +85,26 @@ def listar_componentes(
             }
             for componente in componentes
         ]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al listar componentes: {str(e)}")
 
 @router.get("/{componente_id}", response_model=dict)
-def obtener_componente(componente_id: int, db: Session = Depends(get_db)):
+def obtener_componente(
+    componente_id: int,
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas (ej: id,codigo,nombre)"),
+    db: Session = Depends(get_db)
+):
     """🔍 Obtener un componente específico por ID"""
     try:
+        campos = parsear_campos(fields)
         componente_service = ComponenteService(db)
-        componente = componente_service.obtener_componente(componente_id)
+        componente = componente_service.obtener_componente(componente_id, campos=campos)
         if not componente:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Componente no encontrado")
+        if campos:
+            return {campo: getattr(componente, campo) for campo in campos}
         return {
             "id": componente.id,
             "nombre": componente.nombre,
@@ -110,6 +118,8 @@ def obtener_componente(componente_id: int, db: Session = Depends(get_db)):
         }
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al obtener componente: {str(e)}")
 
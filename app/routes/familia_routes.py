@@ -4,11 +4,12 @@
 Endpoints RESTful para gestionar las familias de productos.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from typing import List
-from app.db import SessionLocal
+from app.db import get_db
+from app.routes.cache_http import respuesta_condicional
 from app.schemas.articuloDTO import ArticuloInDB
 from app.schemas.colorDTO import ColorInDB
 from app.schemas.familiaDTO import FamiliaResponse, FamiliaCreate, FamiliaUpdate
@@ -16,22 +17,18 @@ from app.services.familia_service import FamiliaService
 
 router = APIRouter(prefix="/familias", tags=["Familias"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # ==========================================
 # ENDPOINTS CRUD BÁSICOS
 # ==========================================
 
 @router.get("/", response_model=List[FamiliaResponse], responses={
     200: {"description": "Lista de familias obtenida exitosamente"},
+    304: {"description": "Sin cambios desde la versión del cliente (ETag)"},
     500: {"description": "Error interno del servidor"}
 })
 def listar_familias(
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
@@ -44,6 +41,11 @@ def listar_familias(
     """
     try:
         familia_service = FamiliaService(db)
+        no_modificado = respuesta_condicional(
+            request, response, familia_service.obtener_version(), validar_fecha=False
+        )
+        if no_modificado:
+            return no_modificado
         familias = familia_service.obtener_todos(
             offset=offset,
             limite=limit
@@ -60,11 +62,14 @@ def listar_familias(
 
 @router.get("/{familia_id}", response_model=FamiliaResponse, responses={
     200: {"description": "Familia encontrada"},
+    304: {"description": "Sin cambios desde la versión del cliente (ETag)"},
     404: {"description": "Familia no encontrada"},
     500: {"description": "Error interno del servidor"}
 })
 def obtener_familia(
     familia_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
@@ -74,6 +79,11 @@ def obtener_familia(
     """
     try:
         familia_service = FamiliaService(db)
+        version = familia_service.obtener_version(familia_id)
+        if version:
+            no_modificado = respuesta_condicional(request, response, version)
+            if no_modificado:
+                return no_modificado
         familia = familia_service.obtener_por_id(familia_id)
         if not familia:
             raise HTTPException(
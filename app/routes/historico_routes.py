@@ -0,0 +1,77 @@
+"""
+📜 Rutas del Histórico de Stock
+
+Stock en una fecha pasada, instantáneas (puntos de control) y mantenimiento
+de las particiones mensuales de movimientos.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.db import get_db
+from app.services.historico_stock_service import HistoricoStockService
+
+router = APIRouter(prefix="/historico", tags=["Histórico de Stock"])
+
+@router.get("/stock", response_model=dict)
+def stock_en_fecha(fecha: Optional[str] = None, db: Session = Depends(get_db)):
+    """🕰️ Stock por elemento y almacén en una fecha (AAAA-MM-DD = final del día; sin fecha, el actual)"""
+    try:
+        resultado = HistoricoStockService(db).stock_en_fecha(fecha)
+        for fila in resultado["filas"]:
+            fila["cantidad"] = float(fila["cantidad"])
+        return resultado
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al reconstruir stock: {str(e)}")
+
+@router.post("/instantaneas", response_model=dict, status_code=status.HTTP_201_CREATED)
+def crear_instantanea(db: Session = Depends(get_db)):
+    """📸 Tomar una instantánea de todo el stock"""
+    try:
+        instantanea = HistoricoStockService(db).crear_instantanea()
+        return {
+            "mensaje": "Instantánea creada exitosamente",
+            "instantanea": {"id": instantanea.id, "fecha": instantanea.fecha, "registros": instantanea.registros}
+        }
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al crear instantánea: {str(e)}")
+
+@router.get("/instantaneas", response_model=List[dict])
+def listar_instantaneas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """📋 Listar instantáneas, de la más reciente a la más antigua"""
+    try:
+        return [
+            {"id": instantanea.id, "fecha": instantanea.fecha, "registros": instantanea.registros}
+            for instantanea in HistoricoStockService(db).listar_instantaneas(skip=skip, limit=limit)
+        ]
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al listar instantáneas: {str(e)}")
+
+@router.get("/particiones", response_model=List[dict])
+def listar_particiones(db: Session = Depends(get_db)):
+    """🗂️ Particiones mensuales de movimientos acopladas"""
+    try:
+        return HistoricoStockService(db).listar_particiones()
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al listar particiones: {str(e)}")
+
+@router.post("/particiones", response_model=dict)
+def asegurar_particiones(meses_adelante: int = 3, db: Session = Depends(get_db)):
+    """🆕 Crear las particiones mensuales que falten hasta `meses_adelante` meses"""
+    try:
+        creadas = HistoricoStockService(db).asegurar_particiones(meses_adelante=meses_adelante)
+        return {"mensaje": "Particiones al día", "creadas": creadas}
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al crear particiones: {str(e)}")
+
+@router.delete("/particiones/{anio}/{mes}", response_model=dict)
+def desacoplar_particion(anio: int, mes: int, eliminar: bool = False, db: Session = Depends(get_db)):
+    """📦 Desacoplar (archivar) o eliminar la partición de un mes"""
+    try:
+        return HistoricoStockService(db).desacoplar_particion(anio, mes, eliminar=eliminar)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al desacoplar partición: {str(e)}")
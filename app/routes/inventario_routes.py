@@ -5,19 +5,21 @@ Endpoints RESTful para operaciones complejas que coordinan múltiples modelos.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
-from app.db import SessionLocal
+from app.db import get_db
+from app.routes.streaming import fila_json, respuesta_csv_en_streaming, respuesta_json_en_streaming
 from app.services.inventario_service import InventarioService
+from app.services.trabajo_service import TrabajoService
 
 router = APIRouter(prefix="/inventario", tags=["Inventario"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def _encolar(db: Session, tipo: str, parametros: Dict[str, Any]) -> JSONResponse:
+    """Encolar la operación como trabajo y responder 202 con él (progreso en /trabajos/{id})"""
+    trabajo = TrabajoService(db).encolar(tipo, parametros)
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(TrabajoService.a_dict(trabajo)))
 
 # ==========================================
 # ENDPOINTS DE CONFIGURACIÓN INICIAL
@@ -140,13 +142,21 @@ def busqueda_avanzada(
 def analisis_costos(
     id_producto: Optional[int] = None,
     id_familia: Optional[int] = None,
+    fecha_corte: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """💰 Análisis de costos de productos o familias"""
+    """
+    💰 Análisis de costos de productos o familias
+    
+    Coste unitario FIFO y medio ponderado a partir de las capas de coste;
+    los compuestos suman sus componentes y los packs sus productos con descuento.
+    """
     try:
         inventario_service = InventarioService(db)
-        analisis = inventario_service.analizar_costos(id_producto, id_familia)
+        analisis = inventario_service.analizar_costos(id_producto, id_familia, fecha_corte)
         return analisis
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error en análisis de costos: {str(e)}")
 
@@ -155,11 +165,18 @@ def reporte_valoracion_inventario(
     fecha_corte: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """📊 Reporte de valoración del inventario"""
+    """
+    📊 Reporte de valoración del inventario
+    
+    Con `fecha_corte` (AAAA-MM-DD, final de ese día, o fecha y hora ISO) el
+    stock se reconstruye desde el histórico de movimientos.
+    """
     try:
         inventario_service = InventarioService(db)
         reporte = inventario_service.generar_reporte_valoracion(fecha_corte)
         return reporte
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al generar reporte: {str(e)}")
 
@@ -168,42 +185,86 @@ def reporte_valoracion_inventario(
 # ==========================================
 
 @router.get("/validacion/integridad", response_model=dict)
-def validar_integridad_datos(db: Session = Depends(get_db)):
-    """🔧 Validar integridad de datos del inventario"""
+def validar_integridad_datos(
+    chequeos: Optional[str] = None,  # Lista separada por comas; todos por defecto
+    muestra: int = 10,
+    en_segundo_plano: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    🔧 Validar integridad de datos del inventario (incidencias y muestra de IDs por chequeo)
+    
+    Con `en_segundo_plano` se encola un trabajo `validacion_integridad` y se responde 202.
+    """
     try:
         inventario_service = InventarioService(db)
-        validacion = inventario_service.validar_integridad_datos()
+        nombres = [nombre.strip() for nombre in chequeos.split(",") if nombre.strip()] if chequeos else None
+        if en_segundo_plano:
+            return _encolar(db, "validacion_integridad", {"chequeos": nombres, "muestra": muestra})
+        validacion = inventario_service.validar_integridad_datos(nombres, muestra)
         return validacion
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error en validación: {str(e)}")
 
 @router.post("/mantenimiento/limpiar-huerfanos", response_model=dict)
-def limpiar_registros_huerfanos(db: Session = Depends(get_db)):
-    """🧹 Limpiar registros huérfanos del inventario"""
+def limpiar_registros_huerfanos(
+    limpiezas: Optional[str] = None,  # Lista separada por comas; todas por defecto
+    simular: bool = False,
+    tamano_lote: Optional[int] = None,
+    pausa: Optional[float] = None,
+    desde: Optional[str] = None,  # Cursores devueltos por una limpieza anterior: "tipo:id,tipo:id"
+    en_segundo_plano: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    🧹 Limpiar registros huérfanos del inventario por lotes (`simular` solo los cuenta)
+    
+    Con `en_segundo_plano` se encola un trabajo `limpieza_huerfanos` y se responde 202.
+    """
     try:
         inventario_service = InventarioService(db)
-        resultado = inventario_service.limpiar_registros_huerfanos()
+        nombres = [nombre.strip() for nombre in limpiezas.split(",") if nombre.strip()] if limpiezas else None
+        cursores = None
+        if desde:
+            cursores = {}
+            for par in filter(None, (par.strip() for par in desde.split(","))):
+                nombre, separador, cursor = par.partition(":")
+                if not separador or not cursor.strip().isdigit():
+                    raise ValueError(f"Cursor no válido: '{par}' (formato tipo:id)")
+                cursores[nombre.strip()] = int(cursor)
+        if en_segundo_plano:
+            return _encolar(db, "limpieza_huerfanos", {
+                "limpiezas": nombres, "simular": simular, "tamano_lote": tamano_lote, "pausa": pausa, "desde": cursores
+            })
+        resultado = inventario_service.limpiar_registros_huerfanos(nombres, simular, tamano_lote, pausa, cursores)
         return {
-            "mensaje": "Limpieza de registros huérfanos completada",
+            "mensaje": "Simulación de limpieza completada" if simular else "Limpieza de registros huérfanos completada",
             "registros_eliminados": resultado
         }
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Error en limpieza: {str(e)}")
 
-@router.get("/exportar/{formato}", response_model=dict)
+@router.get("/exportar/{formato}", response_model=List[dict])
 def exportar_inventario(
-    formato: str,  # "csv", "excel", "json"
+    formato: str,  # "csv", "json"
     incluir_stock: bool = True,
     db: Session = Depends(get_db)
 ):
-    """📤 Exportar inventario en diferentes formatos"""
+    """📤 Exportar inventario (una fila por producto) en streaming, como CSV o lista JSON"""
     try:
-        if formato not in ["csv", "excel", "json"]:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Formato no válido")
+        if formato not in ["csv", "json"]:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Formato no válido. Opciones: csv, json")
         
-        inventario_service = InventarioService(db)
-        resultado = inventario_service.exportar_inventario(formato, incluir_stock)
-        return resultado
+        def consultar(sesion: Session):
+            return InventarioService(sesion).exportar_inventario(incluir_stock)
+        
+        if formato == "csv":
+            return respuesta_csv_en_streaming(
+                db, consultar, InventarioService.columnas_exportacion(incluir_stock), "inventario.csv"
+            )
+        return respuesta_json_en_streaming(db, consultar, fila_json)
     except HTTPException:
         raise
     except Exception as e:
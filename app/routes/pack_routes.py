@@ -7,18 +7,11 @@ Endpoints RESTful para gestionar packs de productos.
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db import SessionLocal
+from app.db import get_db
 from app.services.pack_service import PackService
 
 router = APIRouter(prefix="/packs", tags=["Packs"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
 def crear_pack(
     nombre: str,
@@ -0,0 +1,65 @@
+"""
+🔬 Rutas de Perfilado
+
+Consultar los perfiles guardados por el middleware de perfilado y cambiar
+en caliente qué fracción de cada ruta se perfila en este proceso (ver
+`app.perfilado`). Todas piden la cabecera `X-Perfilado-Token`; sin
+`PERFILADO_TOKEN` configurado responden 404.
+"""
+
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+from typing import Dict, List, Optional
+from app.perfilado import archivo_prof, configuracion, leer_perfil, listar_perfiles, validar_fracciones
+
+
+def verificar_token(x_perfilado_token: str = Header("")):
+    """Exigir el token de perfilado"""
+    if not configuracion.token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfilado desactivado")
+    if not hmac.compare_digest(x_perfilado_token, configuracion.token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token de perfilado no válido")
+
+
+router = APIRouter(prefix="/perfilado", tags=["Perfilado"], dependencies=[Depends(verificar_token)])
+
+@router.get("/configuracion", response_model=dict)
+def obtener_configuracion():
+    """⚙️ Fracción de peticiones que se perfila por prefijo de ruta"""
+    return {"fracciones": configuracion.fracciones, "directorio": str(configuracion.directorio),
+            "maximo": configuracion.maximo}
+
+@router.put("/configuracion", response_model=dict)
+def cambiar_configuracion(fracciones: Dict[str, float]):
+    """🎚️ Sustituir las fracciones por prefijo (solo en este proceso; `{}` para dejar de muestrear)"""
+    try:
+        validar_fracciones(fracciones)
+        configuracion.fracciones = fracciones
+        return obtener_configuracion()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/", response_model=List[dict])
+def listar(ruta: Optional[str] = None, limit: int = 50):
+    """📋 Perfiles guardados, del más reciente al más antiguo"""
+    try:
+        return listar_perfiles(limite=limit, ruta=ruta)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al listar perfiles: {str(e)}")
+
+@router.get("/{perfil_id}", response_model=dict)
+def obtener_perfil(perfil_id: str):
+    """🔍 Petición, funciones más costosas y sentencias SQL de un perfil"""
+    perfil = leer_perfil(perfil_id)
+    if not perfil:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil no encontrado")
+    return perfil
+
+@router.get("/{perfil_id}/prof")
+def descargar_prof(perfil_id: str):
+    """📥 Estadísticas de cProfile (pstats) para snakeviz, flameprof o gprof2dot"""
+    archivo = archivo_prof(perfil_id)
+    if not archivo:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Perfil no encontrado")
+    return FileResponse(archivo, media_type="application/octet-stream", filename=archivo.name)
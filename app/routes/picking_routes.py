@@ -0,0 +1,31 @@
+"""
+🧺 Rutas de Picking
+
+Genera listas de recogida ordenadas por ruta a partir de un pedido o de una
+oleada de pedidos.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.db import get_db
+from app.schemas.pickingDTO import SolicitudPicking
+from app.services.picking_service import PickingService
+
+router = APIRouter(prefix="/picking", tags=["Picking"])
+
+@router.post("/lista", response_model=dict)
+def generar_lista_picking(solicitud: SolicitudPicking, db: Session = Depends(get_db)):
+    """
+    🧺 Generar la lista de picking de un pedido u oleada
+
+    Explota packs y productos compuestos, asigna cada necesidad a ubicaciones
+    con stock y ordena las recogidas según `estrategia` (serpentina, vecino
+    más cercano o sin ordenar). No modifica el stock.
+    """
+    try:
+        lineas = [linea.model_dump() for linea in solicitud.lineas]
+        return PickingService(db).generar_lista(lineas, estrategia=solicitud.estrategia)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al generar lista de picking: {str(e)}")
@@ -7,18 +7,11 @@ Endpoints RESTful para gestionar productos (simples y compuestos).
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db import SessionLocal
+from app.db import get_db
 from app.services.producto_service import ProductoService
 
 router = APIRouter(prefix="/productos", tags=["Productos"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/simple", response_model=dict, status_code=status.HTTP_201_CREATED)
 def crear_producto_simple(
     id_articulo: int,
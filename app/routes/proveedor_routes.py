@@ -4,22 +4,18 @@
 Endpoints RESTful para gestionar los proveedores.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db import SessionLocal
+from app.db import get_db
+from app.schemas.base_schema import esquema_parcial, parsear_campos
 from app.schemas.proveedorDTO import ProveedorCreate, ProveedorResponse, ProveedorUpdate
 from app.services.proveedor_service import ProveedorService
 
 router = APIRouter(prefix="/proveedores", tags=["Proveedores"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # ==========================================
 # ENDPOINTS CRUD BÁSICOS
 # ==========================================
@@ -50,23 +46,35 @@ def crear_proveedor(
 
 @router.get("/", response_model=List[ProveedorResponse], status_code=status.HTTP_200_OK, responses={
     200: {"description": "Lista de proveedores obtenida exitosamente"},
+    400: {"description": "Campos solicitados no válidos"},
     500: {"description": "Error interno del servidor"}
     })
 def listar_proveedores(
     offset: int = 0,
     limite: int = 100,
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas (ej: id,nombre,nif_cif)"),
     db: Session = Depends(get_db)
 ):
     """
     📋 Obtener lista de proveedores con filtros opcionales
     """
     try:
+        campos = parsear_campos(fields)
         proveedor_service = ProveedorService(db)
         proveedores = proveedor_service.obtener_todos(
             offset=offset,
-            limite=limite
+            limite=limite,
+            campos=campos
         )
+        if campos:
+            esquema = esquema_parcial(ProveedorResponse, tuple(campos))
+            return JSONResponse(jsonable_encoder([esquema.model_validate(p) for p in proveedores]))
         return proveedores
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -75,27 +83,38 @@ def listar_proveedores(
 
 @router.get("/{proveedor_id}", response_model=ProveedorResponse, status_code=status.HTTP_200_OK, responses={
     200: {"description": "Proveedor encontrado exitosamente"},
+    400: {"description": "Campos solicitados no válidos"},
     404: {"description": "Proveedor no encontrado"},
     500: {"description": "Error interno del servidor"}
     })
 def obtener_proveedor(
     proveedor_id: int,
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas (ej: id,nombre,nif_cif)"),
     db: Session = Depends(get_db)
 ):
     """
     🔍 Obtener un proveedor específico por ID
     """
     try:
+        campos = parsear_campos(fields)
         proveedor_service = ProveedorService(db)
-        proveedor = proveedor_service.obtener_por_id(proveedor_id)
+        proveedor = proveedor_service.obtener_por_id(proveedor_id, campos=campos)
         if not proveedor:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Proveedor no encontrado"
             )
+        if campos:
+            esquema = esquema_parcial(ProveedorResponse, tuple(campos))
+            return JSONResponse(jsonable_encoder(esquema.model_validate(proveedor)))
         return proveedor
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -4,20 +4,23 @@
 Endpoints RESTful para gestionar el stock de productos y componentes.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db import SessionLocal
+from app.db import SessionLocal, get_db
+from app.models.ubicacion import normalizar_ruta
+from app.routes.streaming import fila_json, respuesta_json_en_streaming
+from app.services.historico_stock_service import HistoricoStockService
+from app.services.prevision_demanda_service import PrevisionDemandaService
+from app.services.stock_eventos_service import SuscripcionStock, bus_stock, escucha_stock
 from app.services.stock_service import StockService
 
 router = APIRouter(prefix="/stock", tags=["Stock"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Registros por mensaje `snapshot` del websocket de stock
+TAMANO_PAGINA_SNAPSHOT = 500
 
 @router.post("/producto/{producto_simple_id}", response_model=dict, status_code=status.HTTP_201_CREATED)
 def crear_stock_producto(
@@ -26,6 +29,7 @@ def crear_stock_producto(
     cantidad_minima: Optional[float] = None,
     cantidad_maxima: Optional[float] = None,
     ubicacion_almacen: Optional[str] = None,
+    coste_unitario: Optional[float] = None,
     db: Session = Depends(get_db)
 ):
     """🆕 Crear registro de stock para producto simple"""
@@ -36,7 +40,8 @@ def crear_stock_producto(
             cantidad_actual=cantidad_actual,
             cantidad_minima=cantidad_minima,
             cantidad_maxima=cantidad_maxima,
-            ubicacion_almacen=ubicacion_almacen
+            ubicacion_almacen=ubicacion_almacen,
+            coste_unitario=coste_unitario
         )
         return {
             "mensaje": "Stock de producto creado exitosamente",
@@ -46,6 +51,8 @@ def crear_stock_producto(
                 "cantidad_minima": float(stock.cantidad_minima) if stock.cantidad_minima else None,
                 "cantidad_maxima": float(stock.cantidad_maxima) if stock.cantidad_maxima else None,
                 "ubicacion_almacen": stock.ubicacion_almacen,
+                "id_ubicacion": stock.id_ubicacion,
+                "id_almacen": stock.id_almacen,
                 "id_producto_simple": stock.id_producto_simple
             }
         }
@@ -59,6 +66,7 @@ def crear_stock_componente(
     cantidad_minima: Optional[float] = None,
     cantidad_maxima: Optional[float] = None,
     ubicacion_almacen: Optional[str] = None,
+    coste_unitario: Optional[float] = None,
     db: Session = Depends(get_db)
 ):
     """🆕 Crear registro de stock para componente"""
@@ -69,7 +77,8 @@ def crear_stock_componente(
             cantidad_actual=cantidad_actual,
             cantidad_minima=cantidad_minima,
             cantidad_maxima=cantidad_maxima,
-            ubicacion_almacen=ubicacion_almacen
+            ubicacion_almacen=ubicacion_almacen,
+            coste_unitario=coste_unitario
         )
         return {
             "mensaje": "Stock de componente creado exitosamente",
@@ -79,46 +88,117 @@ def crear_stock_componente(
                 "cantidad_minima": float(stock.cantidad_minima) if stock.cantidad_minima else None,
                 "cantidad_maxima": float(stock.cantidad_maxima) if stock.cantidad_maxima else None,
                 "ubicacion_almacen": stock.ubicacion_almacen,
+                "id_ubicacion": stock.id_ubicacion,
+                "id_almacen": stock.id_almacen,
                 "id_componente": stock.id_componente
             }
         }
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Error al crear stock: {str(e)}")
 
+def _fila_stock(stock) -> dict:
+    """Registro de stock tal como lo devuelve el listado"""
+    return {
+        "id": stock.id,
+        "cantidad_actual": float(stock.cantidad_actual),
+        "cantidad_minima": float(stock.cantidad_minima) if stock.cantidad_minima else None,
+        "cantidad_maxima": float(stock.cantidad_maxima) if stock.cantidad_maxima else None,
+        "ubicacion_almacen": stock.ubicacion_almacen,
+        "id_ubicacion": stock.id_ubicacion,
+        "id_almacen": stock.id_almacen,
+        "id_producto_simple": stock.id_producto_simple,
+        "id_componente": stock.id_componente,
+        "created_at": stock.created_at,
+        "updated_at": stock.updated_at
+    }
+
 @router.get("/", response_model=List[dict])
 def listar_stock(
     bajo_minimo: Optional[bool] = None,
     ubicacion: Optional[str] = None,
+    id_ubicacion: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
-    """📋 Obtener lista de registros de stock con filtros opcionales"""
+    """
+    📋 Obtener lista de registros de stock con filtros opcionales
+    
+    `ubicacion` es una ruta (ALM1/P04) e incluye todo lo que contiene;
+    `id_ubicacion` devuelve solo lo que está exactamente en esa ubicación.
+    La lista se envía en streaming a medida que se leen los registros.
+    """
     try:
-        stock_service = StockService(db)
-        stocks = stock_service.listar_stock(
-            bajo_minimo=bajo_minimo,
-            ubicacion=ubicacion,
-            skip=skip,
-            limit=limit
+        return respuesta_json_en_streaming(
+            db,
+            lambda sesion: StockService(sesion).iterar_stock(
+                bajo_minimo=bajo_minimo,
+                ubicacion=ubicacion,
+                id_ubicacion=id_ubicacion,
+                skip=skip,
+                limit=limit
+            ),
+            lambda stock: fila_json(_fila_stock(stock))
         )
-        return [
-            {
-                "id": stock.id,
-                "cantidad_actual": float(stock.cantidad_actual),
-                "cantidad_minima": float(stock.cantidad_minima) if stock.cantidad_minima else None,
-                "cantidad_maxima": float(stock.cantidad_maxima) if stock.cantidad_maxima else None,
-                "ubicacion_almacen": stock.ubicacion_almacen,
-                "id_producto_simple": stock.id_producto_simple,
-                "id_componente": stock.id_componente,
-                "created_at": stock.created_at,
-                "updated_at": stock.updated_at
-            }
-            for stock in stocks
-        ]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al listar stock: {str(e)}")
 
+@router.get("/disponibilidad", response_model=dict)
+def obtener_disponibilidad(
+    id_producto_simple: Optional[int] = None,
+    id_componente: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """🧮 Disponibilidad total de un producto simple o componente y su desglose por almacén"""
+    try:
+        return StockService(db).obtener_disponibilidad(id_producto_simple=id_producto_simple, id_componente=id_componente)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al obtener disponibilidad: {str(e)}")
+
+@router.post("/disponibilidad/recalcular", response_model=dict)
+def recalcular_disponibilidad(db: Session = Depends(get_db)):
+    """🔁 Reconstruir el resumen de disponibilidad desde los registros de stock"""
+    try:
+        filas = StockService(db).recalcular_disponibilidad()
+        return {"mensaje": "Disponibilidad recalculada", "filas": filas}
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al recalcular disponibilidad: {str(e)}")
+
+@router.post("/reposicion/recalcular", response_model=dict)
+def recalcular_niveles_reposicion(
+    aplicar: bool = False,
+    metodo: str = "exponencial",
+    dias_historico: int = 90,
+    alfa: float = 0.2,
+    ventana: int = 28,
+    plazo_reposicion: float = 7,
+    dias_revision: float = 14,
+    nivel_servicio: float = 0.95,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """
+    📈 Proponer (o aplicar, con `aplicar=true`) mínimo, máximo y stock de
+    seguridad de cada registro según la demanda de sus salidas
+    """
+    try:
+        resultado = PrevisionDemandaService(db).recalcular_niveles(
+            aplicar=aplicar, metodo=metodo, dias_historico=dias_historico, alfa=alfa, ventana=ventana,
+            plazo_reposicion=plazo_reposicion, dias_revision=dias_revision, nivel_servicio=nivel_servicio
+        )
+        resultado["total_propuestas"] = len(resultado["propuestas"])
+        resultado["propuestas"] = resultado["propuestas"][skip:skip + limit]
+        return resultado
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al recalcular niveles de reposición: {str(e)}")
+
 @router.get("/{stock_id}", response_model=dict)
 def obtener_stock(stock_id: int, db: Session = Depends(get_db)):
     """🔍 Obtener un registro de stock específico por ID"""
@@ -133,6 +213,8 @@ def obtener_stock(stock_id: int, db: Session = Depends(get_db)):
             "cantidad_minima": float(stock.cantidad_minima) if stock.cantidad_minima else None,
             "cantidad_maxima": float(stock.cantidad_maxima) if stock.cantidad_maxima else None,
             "ubicacion_almacen": stock.ubicacion_almacen,
+            "id_ubicacion": stock.id_ubicacion,
+            "id_almacen": stock.id_almacen,
             "id_producto_simple": stock.id_producto_simple,
             "id_componente": stock.id_componente,
             "created_at": stock.created_at,
@@ -143,6 +225,35 @@ def obtener_stock(stock_id: int, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al obtener stock: {str(e)}")
 
+@router.get("/{stock_id}/movimientos", response_model=List[dict])
+def listar_movimientos_stock(
+    stock_id: int,
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """📜 Histórico de movimientos de un registro de stock (el más reciente primero)"""
+    try:
+        movimientos = HistoricoStockService(db).listar_movimientos(stock_id, desde=desde, hasta=hasta, skip=skip, limit=limit)
+        return [
+            {
+                "id": movimiento.id,
+                "fecha": movimiento.fecha,
+                "tipo": movimiento.tipo,
+                "cantidad": float(movimiento.cantidad),
+                "cantidad_resultante": float(movimiento.cantidad_resultante),
+                "motivo": movimiento.motivo,
+                "id_almacen": movimiento.id_almacen
+            }
+            for movimiento in movimientos
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al listar movimientos: {str(e)}")
+
 @router.put("/{stock_id}/cantidad", response_model=dict)
 def actualizar_cantidad_stock(
     stock_id: int,
@@ -173,6 +284,7 @@ def registrar_movimiento_stock(
     cantidad: float,
     tipo_movimiento: str,  # "entrada" o "salida"
     motivo: Optional[str] = None,
+    coste_unitario: Optional[float] = None,  # Solo entradas: abre una capa de coste
     db: Session = Depends(get_db)
 ):
     """📝 Registrar movimiento de stock (entrada/salida)"""
@@ -181,7 +293,7 @@ def registrar_movimiento_stock(
         if tipo_movimiento not in ["entrada", "salida"]:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tipo de movimiento debe ser 'entrada' o 'salida'")
         
-        stock = stock_service.registrar_movimiento(stock_id, cantidad, tipo_movimiento, motivo)
+        stock = stock_service.registrar_movimiento(stock_id, cantidad, tipo_movimiento, motivo, coste_unitario)
         return {
             "mensaje": f"Movimiento de {tipo_movimiento} registrado exitosamente",
             "stock": {
@@ -207,6 +319,8 @@ def obtener_alertas_stock_bajo(db: Session = Depends(get_db)):
                 "cantidad_minima": float(stock.cantidad_minima),
                 "diferencia": float(stock.cantidad_minima - stock.cantidad_actual),
                 "ubicacion_almacen": stock.ubicacion_almacen,
+                "id_ubicacion": stock.id_ubicacion,
+                "id_almacen": stock.id_almacen,
                 "tipo": "producto" if stock.id_producto_simple else "componente",
                 "elemento_id": stock.id_producto_simple if stock.id_producto_simple else stock.id_componente
             }
@@ -214,3 +328,102 @@ def obtener_alertas_stock_bajo(db: Session = Depends(get_db)):
         ]
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al obtener alertas: {str(e)}")
+
+
+# ==========================================
+# TIEMPO REAL
+# ==========================================
+
+def _snapshot_stock(ubicacion: Optional[str], id_producto_simple: Optional[int],
+                    id_componente: Optional[int], despues_de_id: Optional[int]) -> List[dict]:
+    """Página del stock actual que coincide con los filtros de la suscripción"""
+    db = SessionLocal()
+    try:
+        stocks = StockService(db).listar_stock(
+            ubicacion=ubicacion,
+            id_producto_simple=id_producto_simple,
+            id_componente=id_componente,
+            despues_de_id=despues_de_id,
+            limit=TAMANO_PAGINA_SNAPSHOT
+        )
+        return [
+            {
+                "id_stock": stock.id,
+                "id_producto_simple": stock.id_producto_simple,
+                "id_componente": stock.id_componente,
+                "ubicacion_almacen": stock.ubicacion_almacen,
+                "cantidad_actual": float(stock.cantidad_actual),
+                "cantidad_minima": float(stock.cantidad_minima) if stock.cantidad_minima is not None else None,
+                "cantidad_maxima": float(stock.cantidad_maxima) if stock.cantidad_maxima is not None else None,
+                "necesita_reposicion": stock.necesita_reposicion
+            }
+            for stock in stocks
+        ]
+    finally:
+        db.close()
+
+async def _esperar_desconexion(websocket: WebSocket) -> None:
+    """Consumir mensajes del cliente hasta que cierre la conexión"""
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+@router.websocket("/ws")
+async def stock_tiempo_real(
+    websocket: WebSocket,
+    ubicacion: Optional[str] = None,
+    id_producto_simple: Optional[int] = None,
+    id_componente: Optional[int] = None,
+    solo_umbral: bool = False
+):
+    """
+    📡 Recibir los cambios de stock en tiempo real
+
+    Envía primero el stock que coincide con los filtros en mensajes
+    `snapshot` de hasta TAMANO_PAGINA_SNAPSHOT registros (el último lleva
+    `completo: true`) y después un mensaje por cada `stock.creado`, `stock.actualizado`,
+    `stock.eliminado` y `stock.umbral` (cambio de `necesita_reposicion`).
+    Con `solo_umbral=true` solo se envían los cruces de umbral. `ubicacion`
+    es una ruta e incluye las ubicaciones que contiene.
+    """
+    if ubicacion:
+        try:
+            ubicacion = normalizar_ruta(ubicacion)
+        except ValueError:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+    await websocket.accept()
+    await run_in_threadpool(escucha_stock.iniciar)
+    # Suscribir antes del snapshot para no perder cambios entre ambos
+    suscripcion = bus_stock.suscribir(SuscripcionStock(
+        asyncio.get_running_loop(),
+        ubicacion=ubicacion,
+        id_producto_simple=id_producto_simple,
+        id_componente=id_componente,
+        solo_umbral=solo_umbral
+    ))
+    desconexion = asyncio.create_task(_esperar_desconexion(websocket))
+    try:
+        # Paginado por id: ni una consulta ni un mensaje con todo el stock
+        ultimo_id = None
+        while not desconexion.done():
+            stocks = await run_in_threadpool(_snapshot_stock, ubicacion, id_producto_simple, id_componente, ultimo_id)
+            completo = len(stocks) < TAMANO_PAGINA_SNAPSHOT
+            await websocket.send_json({"tipo": "snapshot", "stocks": stocks, "completo": completo})
+            if completo:
+                break
+            ultimo_id = stocks[-1]["id_stock"]
+        while True:
+            siguiente = asyncio.create_task(suscripcion.cola.get())
+            hechas, _ = await asyncio.wait({siguiente, desconexion}, return_when=asyncio.FIRST_COMPLETED)
+            if desconexion in hechas:
+                siguiente.cancel()
+                break
+            await websocket.send_json(siguiente.result())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        bus_stock.cancelar(suscripcion)
+        desconexion.cancel()
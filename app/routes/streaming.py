@@ -0,0 +1,128 @@
+"""
+🌊 Respuestas de listado en streaming (JSON y CSV)
+
+Los listados grandes no se construyen como una lista en memoria: el
+servicio devuelve un iterador que lee las filas por lotes (`yield_per`,
+cursor de servidor en PostgreSQL) y la respuesta las serializa y envía en
+bloques de `STREAMING_BLOQUE` bytes a medida que llegan.
+
+La sesión de `get_db` se cierra antes de empezar a enviar el cuerpo, así
+que la lectura usa una sesión propia sobre el mismo bind (el engine o, en
+los tests, la conexión de la transacción de prueba), que se cierra al
+terminar el envío. La consulta se ejecuta antes de responder: los errores
+de parámetros o de base de datos siguen devolviendo 400/500.
+"""
+
+import csv
+import io
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+
+# Bytes que se acumulan antes de enviar un bloque de la respuesta
+STREAMING_BLOQUE = int(os.getenv("STREAMING_BLOQUE", str(64 * 1024)))
+
+# Serialización de filas `dict` idéntica a la de `response_model=List[dict]`
+_FILA = TypeAdapter(Dict[str, Any])
+
+
+def fila_json(fila: Dict[str, Any]) -> bytes:
+    """JSON de una fila `dict` (fechas en ISO 8601, como las respuestas normales)"""
+    return _FILA.dump_json(fila)
+
+
+def _en_bloques(piezas: Iterable[bytes]) -> Iterator[bytes]:
+    """Agrupar piezas pequeñas en bloques de al menos STREAMING_BLOQUE bytes"""
+    bloque, tamano = [], 0
+    for pieza in piezas:
+        bloque.append(pieza)
+        tamano += len(pieza)
+        if tamano >= STREAMING_BLOQUE:
+            yield b"".join(bloque)
+            bloque, tamano = [], 0
+    if bloque:
+        yield b"".join(bloque)
+
+
+def _consultar(db: Session, consultar: Callable[[Session], Iterable[Any]]):
+    """Ejecutar la consulta en una sesión propia sobre el bind de `db`"""
+    sesion = SessionLocal(bind=db.get_bind())
+    try:
+        return sesion, consultar(sesion)
+    except Exception:
+        sesion.close()
+        raise
+
+
+def _enviar(sesion: Session, piezas: Iterable[bytes]) -> Iterator[bytes]:
+    try:
+        yield from _en_bloques(piezas)
+    finally:
+        sesion.close()
+
+
+def respuesta_json_en_streaming(
+    db: Session,
+    consultar: Callable[[Session], Iterable[Any]],
+    serializar: Callable[[Any], bytes],
+    headers: Optional[Dict[str, str]] = None
+) -> StreamingResponse:
+    """
+    Lista JSON enviada por bloques a medida que se leen las filas
+
+    Args:
+        db (Session): Sesión de la petición (solo se usa su bind)
+        consultar (Callable): Recibe la sesión de lectura y devuelve el iterador de filas
+        serializar (Callable): JSON (bytes) de una fila
+        headers (Dict[str, str], optional): Cabeceras de la respuesta (ETag...)
+    """
+    sesion, filas = _consultar(db, consultar)
+
+    def piezas() -> Iterator[bytes]:
+        yield b"["
+        for posicion, fila in enumerate(filas):
+            if posicion:
+                yield b","
+            yield serializar(fila)
+        yield b"]"
+
+    return StreamingResponse(_enviar(sesion, piezas()), media_type="application/json", headers=headers)
+
+
+def respuesta_csv_en_streaming(
+    db: Session,
+    consultar: Callable[[Session], Iterable[Dict[str, Any]]],
+    columnas: Sequence[str],
+    nombre_archivo: str
+) -> StreamingResponse:
+    """
+    CSV (cabecera + una línea por fila) enviado por bloques como descarga
+
+    Args:
+        db (Session): Sesión de la petición (solo se usa su bind)
+        consultar (Callable): Recibe la sesión de lectura y devuelve el iterador de filas `dict`
+        columnas (Sequence[str]): Columnas en orden; el resto de claves se ignora
+        nombre_archivo (str): Nombre propuesto para la descarga
+    """
+    sesion, filas = _consultar(db, consultar)
+
+    def piezas() -> Iterator[bytes]:
+        buffer = io.StringIO()
+        escritor = csv.DictWriter(buffer, fieldnames=columnas, extrasaction="ignore")
+        escritor.writeheader()
+        for fila in filas:
+            escritor.writerow(fila)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+
+    return StreamingResponse(
+        _enviar(sesion, piezas()), media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{nombre_archivo}"'}
+    )
@@ -0,0 +1,48 @@
+"""
+🔄 Rutas de Sincronización
+
+Feed incremental de cambios del catálogo para réplicas de otros servicios.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.db import get_db
+from app.schemas.base_schema import parsear_campos
+from app.services.sync_service import SyncService
+
+router = APIRouter(prefix="/sync", tags=["Sincronización"])
+
+@router.get("/changes", responses={
+    200: {"description": "Cambios obtenidos exitosamente"},
+    400: {"description": "Token o entidades no válidos"},
+    500: {"description": "Error interno del servidor"}
+})
+def obtener_cambios(
+    since: Optional[str] = Query(None, description="Token devuelto por la llamada anterior (vacío = carga completa)"),
+    limite: int = Query(1000, ge=1, le=10000, description="Máximo de filas modificadas por entidad"),
+    entidades: Optional[str] = Query(None, description="Entidades separadas por comas (p.ej. 'articulo,stock')"),
+    db: Session = Depends(get_db)
+):
+    """
+    🔄 Obtener altas, modificaciones y bajas del catálogo desde un token
+
+    La réplica guarda el `token` devuelto y lo envía como `since` en la
+    siguiente llamada. Mientras `hay_mas` sea true debe seguir pidiendo
+    páginas con el nuevo token. Aplicar los cambios debe ser idempotente:
+    una fila puede llegar más de una vez.
+    """
+    try:
+        sync_service = SyncService(db)
+        return sync_service.obtener_cambios(
+            since=since,
+            limite=limite,
+            entidades=parsear_campos(entidades)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al obtener cambios: {str(e)}"
+        )
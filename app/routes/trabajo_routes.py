@@ -0,0 +1,79 @@
+"""
+⚙️ Rutas de Trabajos en segundo plano
+
+Encolar operaciones pesadas, consultar su estado y progreso y cancelarlas.
+Los trabajos los ejecutan los procesos trabajadores
+(`python -m app.services.trabajo_service`), no la petición HTTP.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.db import get_db
+from app.schemas.trabajoDTO import SolicitudTrabajo
+from app.services.trabajo_service import TIPOS_TRABAJO, TrabajoService
+
+router = APIRouter(prefix="/trabajos", tags=["Trabajos"])
+
+@router.get("/tipos", response_model=List[dict])
+def listar_tipos_trabajo():
+    """📋 Tipos de trabajo disponibles"""
+    return [
+        {"tipo": tipo, "descripcion": (funcion.__doc__ or "").strip()}
+        for tipo, funcion in sorted(TIPOS_TRABAJO.items())
+    ]
+
+@router.post("/", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+def encolar_trabajo(solicitud: SolicitudTrabajo, db: Session = Depends(get_db)):
+    """⚙️ Encolar un trabajo; la respuesta incluye su ID para consultar el progreso"""
+    try:
+        trabajo = TrabajoService(db).encolar(solicitud.tipo, solicitud.parametros)
+        return TrabajoService.a_dict(trabajo)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al encolar trabajo: {str(e)}")
+
+@router.get("/", response_model=List[dict])
+def listar_trabajos(
+    estado: Optional[str] = None,
+    tipo: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """📋 Listar trabajos, del más reciente al más antiguo"""
+    try:
+        return [TrabajoService.a_dict(trabajo) for trabajo in TrabajoService(db).listar(estado, tipo, skip, limit)]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al listar trabajos: {str(e)}")
+
+@router.get("/{trabajo_id}", response_model=dict)
+def obtener_trabajo(trabajo_id: int, db: Session = Depends(get_db)):
+    """🔍 Estado, progreso y resultado de un trabajo"""
+    try:
+        trabajo = TrabajoService(db).obtener_por_id(trabajo_id)
+        if not trabajo:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo no encontrado")
+        return TrabajoService.a_dict(trabajo)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al obtener trabajo: {str(e)}")
+
+@router.post("/{trabajo_id}/cancelar", response_model=dict)
+def cancelar_trabajo(trabajo_id: int, db: Session = Depends(get_db)):
+    """🛑 Cancelar un trabajo pendiente o pedir que se detenga uno en curso"""
+    try:
+        trabajo = TrabajoService(db).cancelar(trabajo_id)
+        if not trabajo:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo no encontrado")
+        return TrabajoService.a_dict(trabajo)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al cancelar trabajo: {str(e)}")
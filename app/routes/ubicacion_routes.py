@@ -0,0 +1,110 @@
+"""
+📍 Rutas para el modelo Ubicacion
+
+Endpoints para gestionar la jerarquía almacén → pasillo → estantería → hueco
+y consultar el stock de una zona.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.db import get_db
+from app.services.stock_service import StockService
+from app.services.ubicacion_service import UbicacionService
+
+router = APIRouter(prefix="/ubicaciones", tags=["Ubicaciones"])
+
+def _ubicacion_dict(ubicacion) -> dict:
+    return {
+        "id": ubicacion.id,
+        "codigo": ubicacion.codigo,
+        "tipo": ubicacion.tipo,
+        "nivel": ubicacion.nivel,
+        "ruta": ubicacion.ruta,
+        "posicion": ubicacion.posicion,
+        "id_padre": ubicacion.id_padre
+    }
+
+@router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
+def crear_ubicacion(ruta: str, db: Session = Depends(get_db)):
+    """🆕 Crear una ubicación a partir de su ruta (ALM1/P04/E02/H03), con los niveles que falten"""
+    try:
+        ubicacion = UbicacionService(db).crear_ubicacion(ruta)
+        return {
+            "mensaje": "Ubicación creada exitosamente",
+            "ubicacion": _ubicacion_dict(ubicacion)
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al crear ubicación: {str(e)}")
+
+@router.get("/", response_model=List[dict])
+def listar_ubicaciones(
+    prefijo: Optional[str] = None,
+    tipo: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """📋 Listar ubicaciones en orden de ruta, opcionalmente dentro de una ruta (`prefijo`)"""
+    try:
+        ubicaciones = UbicacionService(db).listar_ubicaciones(prefijo=prefijo, tipo=tipo, skip=skip, limit=limit)
+        return [_ubicacion_dict(ubicacion) for ubicacion in ubicaciones]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al listar ubicaciones: {str(e)}")
+
+@router.get("/{ubicacion_id}", response_model=dict)
+def obtener_ubicacion(ubicacion_id: int, db: Session = Depends(get_db)):
+    """🔍 Obtener una ubicación con sus ubicaciones hijas"""
+    try:
+        ubicacion_service = UbicacionService(db)
+        ubicacion = ubicacion_service.obtener_por_id(ubicacion_id)
+        if not ubicacion:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ubicación no encontrada")
+        return {
+            **_ubicacion_dict(ubicacion),
+            "hijos": [_ubicacion_dict(hijo) for hijo in ubicacion_service.obtener_hijos(ubicacion_id)]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al obtener ubicación: {str(e)}")
+
+@router.get("/{ubicacion_id}/stock", response_model=List[dict])
+def obtener_stock_ubicacion(
+    ubicacion_id: int,
+    incluir_contenidas: bool = True,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """📦 Stock de una ubicación y, por defecto, de todas las que contiene"""
+    try:
+        ubicacion = UbicacionService(db).obtener_por_id(ubicacion_id)
+        if not ubicacion:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ubicación no encontrada")
+        stock_service = StockService(db)
+        if incluir_contenidas:
+            stocks = stock_service.listar_stock(ubicacion=ubicacion.ruta, skip=skip, limit=limit)
+        else:
+            stocks = stock_service.listar_stock(id_ubicacion=ubicacion_id, skip=skip, limit=limit)
+        return [
+            {
+                "id": stock.id,
+                "cantidad_actual": float(stock.cantidad_actual),
+                "cantidad_minima": float(stock.cantidad_minima) if stock.cantidad_minima else None,
+                "ubicacion_almacen": stock.ubicacion_almacen,
+                "id_ubicacion": stock.id_ubicacion,
+                "id_almacen": stock.id_almacen,
+                "id_producto_simple": stock.id_producto_simple,
+                "id_componente": stock.id_componente
+            }
+            for stock in stocks
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al obtener stock: {str(e)}")
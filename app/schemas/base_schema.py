@@ -1,5 +1,6 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, create_model
+from typing import List, Optional, Tuple, Type
 from datetime import datetime
 
 class BaseSchema(BaseModel):
@@ -11,3 +12,36 @@ class BaseResponseSchema(BaseSchema):
     id: int
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+
+def parsear_campos(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Convertir el parámetro `fields` ("id,codigo,nombre") en una lista de campos
+
+    Returns:
+        Optional[List[str]]: Campos solicitados sin duplicados, o None si no se pidió proyección
+    """
+    if not fields:
+        return None
+    campos = [campo.strip() for campo in fields.split(",") if campo.strip()]
+    return list(dict.fromkeys(campos)) or None
+
+@lru_cache(maxsize=256)
+def esquema_parcial(esquema: Type[BaseModel], campos: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Crear (y cachear) un esquema de respuesta con solo los campos indicados
+
+    Args:
+        esquema (Type[BaseModel]): Esquema de respuesta completo
+        campos (Tuple[str, ...]): Campos a conservar
+
+    Raises:
+        ValueError: Si algún campo no pertenece al esquema
+    """
+    desconocidos = [campo for campo in campos if campo not in esquema.model_fields]
+    if desconocidos:
+        raise ValueError(f"Campos no válidos: {', '.join(desconocidos)}")
+    definiciones = {
+        campo: (esquema.model_fields[campo].annotation, esquema.model_fields[campo])
+        for campo in campos
+    }
+    return create_model(f"{esquema.__name__}Parcial", __base__=BaseSchema, **definiciones)
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional, Literal
+
+class LineaPedido(BaseModel):
+    id_producto: Optional[int] = Field(None, description="ID del producto (simple o compuesto)")
+    id_pack: Optional[int] = Field(None, description="ID del pack")
+    cantidad: float = Field(..., gt=0, description="Unidades pedidas")
+    pedido: Optional[str] = Field(None, description="Referencia del pedido dentro de la oleada")
+
+    @model_validator(mode='after')
+    def producto_o_pack(self):
+        if (self.id_producto is None) == (self.id_pack is None):
+            raise ValueError('Cada línea debe indicar id_producto o id_pack, pero no ambos')
+        return self
+
+class SolicitudPicking(BaseModel):
+    lineas: List[LineaPedido] = Field(..., min_length=1, description="Líneas del pedido u oleada")
+    estrategia: Literal["serpentina", "vecino", "ninguna"] = Field("serpentina", description="Estrategia de ordenación de la ruta")
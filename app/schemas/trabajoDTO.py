@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict
+
+class SolicitudTrabajo(BaseModel):
+    tipo: str = Field(..., description="Tipo de trabajo registrado (ver GET /trabajos/tipos)")
+    parametros: Dict[str, Any] = Field(default_factory=dict, description="Argumentos del trabajo")
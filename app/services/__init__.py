@@ -13,18 +13,53 @@ Servicios disponibles:
 - ComponenteService: Gestión de componentes
 - PackService: Gestión de packs
 - StockService: Gestión de inventario y stock
+- UbicacionService: Jerarquía de ubicaciones del almacén
+- PickingService: Listas de picking ordenadas por ruta
+- HistoricoStockService: Movimientos, instantáneas y stock en una fecha
+- ValoracionService: Capas de coste y valoración FIFO / coste medio
+- PrevisionDemandaService: Previsión de demanda y mínimos / máximos dinámicos
+- IntegridadService: Auditoría de integridad del catálogo
+- LimpiezaService: Borrado por lotes de registros huérfanos
 - InventarioService: Servicio principal que coordina todos los demás
+- SyncService: Feed incremental de cambios para réplicas del catálogo
+- OutboxRelay: Publicación de los eventos de cambio de stock
+- TrabajoService / Trabajador: Cola de trabajos en segundo plano
 """
 
-from .familia_service import FamiliaService
-from .color_service import ColorService
-from .proveedor_service import ProveedorService
-from .articulo_service import ArticuloService
-from .producto_service import ProductoService
-from .componente_service import ComponenteService
-from .pack_service import PackService
-from .stock_service import StockService
-from .inventario_service import InventarioService
+from importlib import import_module
+
+# Importación diferida (PEP 562): `from app.services.x_service import X` no
+# carga todos los servicios (numpy, el histórico, los trabajos...) al arrancar
+_MODULOS = {
+    'FamiliaService': '.familia_service',
+    'ColorService': '.color_service',
+    'ProveedorService': '.proveedor_service',
+    'ArticuloService': '.articulo_service',
+    'ProductoService': '.producto_service',
+    'ComponenteService': '.componente_service',
+    'PackService': '.pack_service',
+    'StockService': '.stock_service',
+    'UbicacionService': '.ubicacion_service',
+    'PickingService': '.picking_service',
+    'HistoricoStockService': '.historico_stock_service',
+    'ValoracionService': '.valoracion_service',
+    'PrevisionDemandaService': '.prevision_demanda_service',
+    'IntegridadService': '.integridad_service',
+    'LimpiezaService': '.limpieza_service',
+    'InventarioService': '.inventario_service',
+    'SyncService': '.sync_service',
+    'OutboxRelay': '.outbox_service',
+    'TrabajoService': '.trabajo_service',
+    'Trabajador': '.trabajo_service',
+}
+
+
+def __getattr__(nombre: str):
+    if nombre not in _MODULOS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(import_module(_MODULOS[nombre], __name__), nombre)
+    globals()[nombre] = valor
+    return valor
 
 __all__ = [
     'FamiliaService',
@@ -35,5 +70,16 @@ __all__ = [
     'ComponenteService',
     'PackService',
     'StockService',
-    'InventarioService'
+    'UbicacionService',
+    'PickingService',
+    'HistoricoStockService',
+    'ValoracionService',
+    'PrevisionDemandaService',
+    'IntegridadService',
+    'LimpiezaService',
+    'InventarioService',
+    'SyncService',
+    'OutboxRelay',
+    'TrabajoService',
+    'Trabajador'
 ]
@@ -74,11 +74,11 @@ class ArticuloService(BaseService):
                     
             articulo = self.crear(**nuevo_articulo.model_dump())
             
-            logger.info(f"✅ Articulo '{articulo.nombre}' creado exitosamente")
+            logger.info("✅ Articulo '%s' creado exitosamente", articulo.nombre)
             return articulo
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error creando Articulo '{articulo.nombre}': {e}")
+            logger.error("❌ Error creando Articulo '%s': %s", articulo.nombre, e)
             raise
             
     def obtener_por_nombre(self, nombre: str) -> Optional[ArticuloResponse]:
@@ -94,7 +94,7 @@ class ArticuloService(BaseService):
         try:
             return self.db.query(Articulo).filter(Articulo.nombre == nombre).first()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error buscando articulo por nombre '{nombre}': {e}")
+            logger.error("❌ Error buscando articulo por nombre '%s': %s", nombre, e)
             raise
             
     def obtener_por_codigo(self, codigo: str) -> Optional[ArticuloResponse]:
@@ -110,7 +110,7 @@ class ArticuloService(BaseService):
         try:
             return self.db.query(Articulo).filter(Articulo.codigo == codigo).first()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error buscando Articulo por código '{codigo}': {e}")
+            logger.error("❌ Error buscando Articulo por código '%s': %s", codigo, e)
             raise
             
     def obtener_por_familia(self, familia_id: int) -> List[ArticuloResponse]:
@@ -126,7 +126,7 @@ class ArticuloService(BaseService):
         try:
             return self.db.query(Articulo).filter(Articulo.id_familia == familia_id).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo Articulos de familia {familia_id}: {e}")
+            logger.error("❌ Error obteniendo Articulos de familia %s: %s", familia_id, e)
             raise
         
             
@@ -143,7 +143,7 @@ class ArticuloService(BaseService):
         try:
             return self.db.query(Producto).filter(Producto.id_articulo == articulo_id).first()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo producto de Articulo {articulo_id}: {e}")
+            logger.error("❌ Error obteniendo producto de Articulo %s: %s", articulo_id, e)
             raise
             
     def obtener_pack_asociado(self, articulo_id: int) -> Optional[Pack]:
@@ -159,7 +159,7 @@ class ArticuloService(BaseService):
         try:
             return self.db.query(Pack).filter(Pack.id_articulo == articulo_id).first()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo pack de Articulo {articulo_id}: {e}")
+            logger.error("❌ Error obteniendo pack de Articulo %s: %s", articulo_id, e)
             raise
             
     def obtener_tipo_articulo(self, articulo_id: int) -> Optional[str]:
@@ -184,7 +184,7 @@ class ArticuloService(BaseService):
             return None
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error determinando tipo de Articulo {articulo_id}: {e}")
+            logger.error("❌ Error determinando tipo de Articulo %s: %s", articulo_id, e)
             raise
             
     def obtener_estadisticas_articulo(self, articulo_id: int) -> Dict[str, Any]:
@@ -232,7 +232,7 @@ class ArticuloService(BaseService):
             return resultado
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo estadísticas de Articulo {articulo_id}: {e}")
+            logger.error("❌ Error obteniendo estadísticas de Articulo %s: %s", articulo_id, e)
             raise
             
     def buscar_articulos_por_texto(self, texto: str) -> List[ArticuloResponse]:
@@ -252,7 +252,7 @@ class ArticuloService(BaseService):
                 (Articulo.codigo.ilike(f'%{texto}%'))
             ).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error buscando Articulos por texto '{texto}': {e}")
+            logger.error("❌ Error buscando Articulos por texto '%s': %s", texto, e)
             raise
             
     def validar_eliminacion(self, articulo_id: int) -> Dict[str, Any]:
@@ -293,7 +293,7 @@ class ArticuloService(BaseService):
             return resultado
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error validando eliminación de Articulo {articulo_id}: {e}")
+            logger.error("❌ Error validando eliminación de Articulo %s: %s", articulo_id, e)
             raise
             
     def actualizar_articulo(self, articulo_id: int, articulo_actualizado: ArticuloUpdate) -> Optional[ArticuloResponse]:
@@ -343,7 +343,7 @@ class ArticuloService(BaseService):
             self.db.commit()
             self.db.refresh(articulo_existente)
 
-            logger.info(f"✅ Articulo {articulo_id} actualizado exitosamente")
+            logger.info("✅ Articulo %s actualizado exitosamente", articulo_id)
             return articulo_existente
             
         except ValueError:
@@ -351,5 +351,5 @@ class ArticuloService(BaseService):
         except HTTPException:
             raise
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error actualizando articulo {articulo_id}: {e}")
+            logger.error("❌ Error actualizando articulo %s: %s", articulo_id, e)
             raise
@@ -5,8 +5,10 @@ Este módulo contiene la clase base con funcionalidades compartidas
 por todos los servicios del sistema de inventario.
 """
 
-from typing import Any, List, Optional, Type, TypeVar, Dict
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar, Dict
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
@@ -35,6 +37,48 @@ class BaseService:
         self.db = db_session
         self.model_class = model_class
         
+    def _columnas_proyeccion(self, campos: Optional[Sequence[str]]) -> Optional[List[Any]]:
+        """
+        Resolver los nombres de campos solicitados a columnas del modelo
+        
+        El identificador se incluye siempre para que las instancias parciales
+        sigan siendo identificables por la sesión.
+        
+        Args:
+            campos (Optional[Sequence[str]]): Nombres de columnas a cargar
+            
+        Returns:
+            Optional[List[Any]]: Columnas a cargar o None si se cargan todas
+            
+        Raises:
+            ValueError: Si algún campo no es una columna del modelo
+        """
+        if not campos:
+            return None
+            
+        columnas_modelo = self.model_class.__table__.columns.keys()
+        desconocidos = [campo for campo in campos if campo not in columnas_modelo]
+        if desconocidos:
+            raise ValueError(
+                f"Campos no válidos para {self.model_class.__name__}: {', '.join(desconocidos)}"
+            )
+            
+        nombres = ['id'] + [campo for campo in campos if campo != 'id']
+        return [getattr(self.model_class, nombre) for nombre in dict.fromkeys(nombres)]
+        
+    def _consulta(self, campos: Optional[Sequence[str]] = None):
+        """
+        Construir la consulta base del modelo, limitada a los campos indicados
+        
+        Args:
+            campos (Optional[Sequence[str]]): Columnas a cargar (todas si es None)
+        """
+        query = self.db.query(self.model_class)
+        columnas = self._columnas_proyeccion(campos)
+        if columnas:
+            query = query.options(load_only(*columnas, raiseload=True))
+        return query
+        
     def crear(self, **kwargs) -> ModelType:
         """
         Crear una nueva instancia del modelo
@@ -54,48 +98,79 @@ class BaseService:
             self.db.commit()
             self.db.refresh(instancia)
             
-            logger.info(f"✅ Creado {self.model_class.__name__} con ID: {instancia.id}")
+            logger.info("✅ Creado %s con ID: %s", self.model_class.__name__, instancia.id)
             return instancia
             
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error creando {self.model_class.__name__}: {e}")
+            logger.error("❌ Error creando %s: %s", self.model_class.__name__, e)
             raise
             
-    def obtener_por_id(self, id: int) -> Optional[ModelType]:
+    def obtener_por_id(self, id: int, campos: Optional[Sequence[str]] = None) -> Optional[ModelType]:
         """
         Obtener una instancia por su ID
         
         Args:
             id (int): ID de la instancia a buscar
+            campos (Optional[Sequence[str]]): Columnas a cargar (todas si es None)
             
         Returns:
             Optional[ModelType]: Instancia encontrada o None
         """
         try:
-            return self.db.query(self.model_class).filter(self.model_class.id == id).first()
+            return self._consulta(campos).filter(self.model_class.id == id).first()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo {self.model_class.__name__} con ID {id}: {e}")
+            logger.error("❌ Error obteniendo %s con ID %s: %s", self.model_class.__name__, id, e)
             raise
             
-    def obtener_todos(self, limite: Optional[int] = None, offset: int = 0) -> List[ModelType]:
+    def obtener_todos(self, limite: Optional[int] = None, offset: int = 0,
+                      campos: Optional[Sequence[str]] = None) -> List[ModelType]:
         """
         Obtener todas las instancias del modelo
         
         Args:
             limite (Optional[int]): Límite de resultados
             offset (int): Número de registros a saltar
+            campos (Optional[Sequence[str]]): Columnas a cargar (todas si es None)
             
         Returns:
             List[ModelType]: Lista de instancias
         """
         try:
-            query = self.db.query(self.model_class).offset(offset)
+            # Orden estable: sin ORDER BY, offset/limit pueden repetir o saltar filas
+            query = self._consulta(campos).order_by(self.model_class.id).offset(offset)
             if limite:
                 query = query.limit(limite)
             return query.all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo todos los {self.model_class.__name__}: {e}")
+            logger.error("❌ Error obteniendo todos los %s: %s", self.model_class.__name__, e)
+            raise
+            
+    def iterar_todos(self, limite: Optional[int] = None, offset: int = 0,
+                     campos: Optional[Sequence[str]] = None, lote: int = 500) -> Iterator[ModelType]:
+        """
+        Como `obtener_todos`, pero leyendo las instancias de `lote` en `lote`
+        
+        La consulta se ejecuta al llamar (los errores saltan aquí) y las filas
+        se van leyendo al iterar: con PostgreSQL, de un cursor de servidor,
+        sin cargar el listado completo en memoria.
+        
+        Args:
+            limite (Optional[int]): Límite de resultados
+            offset (int): Número de registros a saltar
+            campos (Optional[Sequence[str]]): Columnas a cargar (todas si es None)
+            lote (int): Filas leídas de la base de datos cada vez
+            
+        Returns:
+            Iterator[ModelType]: Instancias en orden de id
+        """
+        try:
+            query = self._consulta(campos).order_by(self.model_class.id).offset(offset)
+            if limite:
+                query = query.limit(limite)
+            return iter(query.yield_per(lote))
+        except SQLAlchemyError as e:
+            logger.error("❌ Error obteniendo todos los %s: %s", self.model_class.__name__, e)
             raise
             
     def actualizar(self, id: int, **kwargs) -> Optional[ModelType]:
@@ -122,20 +197,23 @@ class BaseService:
             self.db.commit()
             self.db.refresh(instancia)
             
-            logger.info(f"✅ Actualizado {self.model_class.__name__} con ID: {id}")
+            logger.info("✅ Actualizado %s con ID: %s", self.model_class.__name__, id)
             
             instancia_actualizada = self.obtener_por_id(id)
             return instancia_actualizada
             
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error actualizando {self.model_class.__name__} con ID {id}: {e}")
+            logger.error("❌ Error actualizando %s con ID %s: %s", self.model_class.__name__, id, e)
             raise
             
     def eliminar(self, id: int) -> bool:
         """
         Eliminar una instancia por su ID
         
+        Si el modelo se sincroniza, el listener de RegistroEliminado deja la
+        marca de la baja en la misma transacción.
+        
         Args:
             id (int): ID de la instancia a eliminar
             
@@ -150,12 +228,12 @@ class BaseService:
             self.db.delete(instancia)
             self.db.commit()
             
-            logger.info(f"✅ Eliminado {self.model_class.__name__} con ID: {id}")
+            logger.info("✅ Eliminado %s con ID: %s", self.model_class.__name__, id)
             return True
             
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error eliminando {self.model_class.__name__} con ID {id}: {e}")
+            logger.error("❌ Error eliminando %s con ID %s: %s", self.model_class.__name__, id, e)
             raise
             
     def contar(self) -> int:
@@ -168,21 +246,49 @@ class BaseService:
         try:
             return self.db.query(self.model_class).count()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error contando {self.model_class.__name__}: {e}")
+            logger.error("❌ Error contando %s: %s", self.model_class.__name__, e)
+            raise
+            
+    def obtener_version(self, id: Optional[int] = None) -> Optional[Tuple[Optional[datetime], int, Optional[int]]]:
+        """
+        Obtener una versión barata del modelo sin cargar filas completas
+        
+        Sirve para validación condicional (ETag/Last-Modified): cualquier alta,
+        baja o modificación cambia al menos uno de los componentes.
+        
+        Args:
+            id (Optional[int]): ID de una instancia concreta; si es None se calcula para toda la tabla
+            
+        Returns:
+            Optional[Tuple[Optional[datetime], int, Optional[int]]]: (última modificación, total, id máximo),
+            o None si se pidió una instancia que no existe
+        """
+        try:
+            marca = func.coalesce(self.model_class.updated_at, self.model_class.created_at)
+            if id is not None:
+                fila = self.db.query(marca).filter(self.model_class.id == id).first()
+                return (fila[0], 1, id) if fila else None
+            ultima, total, ultimo_id = self.db.query(
+                func.max(marca), func.count(self.model_class.id), func.max(self.model_class.id)
+            ).one()
+            return ultima, total, ultimo_id
+        except SQLAlchemyError as e:
+            logger.error("❌ Error obteniendo versión de %s: %s", self.model_class.__name__, e)
             raise
             
-    def buscar(self, filtros: Dict[str, Any]) -> List[ModelType]:
+    def buscar(self, filtros: Dict[str, Any], campos: Optional[Sequence[str]] = None) -> List[ModelType]:
         """
         Buscar instancias por filtros específicos
         
         Args:
             filtros (Dict[str, Any]): Diccionario con campo -> valor a filtrar
+            campos (Optional[Sequence[str]]): Columnas a cargar (todas si es None)
             
         Returns:
             List[ModelType]: Lista de instancias que coinciden con los filtros
         """
         try:
-            query = self.db.query(self.model_class)
+            query = self._consulta(campos)
             
             for campo, valor in filtros.items():
                 if hasattr(self.model_class, campo):
@@ -190,5 +296,5 @@ class BaseService:
                     
             return query.all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error buscando {self.model_class.__name__}: {e}")
+            logger.error("❌ Error buscando %s: %s", self.model_class.__name__, e)
             raise
@@ -0,0 +1,259 @@
+"""
+🧠 Caché de costes unitarios con invalidación por dependencias
+
+Cada coste calculado (de un componente, un producto simple, un compuesto,
+un producto o un pack) se guarda junto con los costes de los que sale. Al
+cambiar un nodo se descartan él y, siguiendo las dependencias inversas,
+todo lo que se calculó a partir de él: una entrada con coste de un
+componente invalida ese componente, los compuestos que lo usan, sus
+productos y los packs que los incluyen, y nada más.
+
+Nodos:
+    ("componente", id) / ("producto_simple", id): coste de las capas y el stock del elemento
+    ("producto_compuesto", id): suma de sus componentes por `cantidad_necesaria`
+    ("producto", id): coste del producto simple o compuesto correspondiente
+    ("pack", id): suma de sus productos por `cantidad_incluida` menos el descuento
+
+Los cambios se recogen en cada flush del ORM y se aplican al confirmar la
+transacción (un rollback los descarta). Las escrituras masivas o con SQL
+textual sobre tablas de coste vacían la caché entera; sobre otras tablas no
+la tocan. Como la caché de GraphQL, es local al
+proceso: con varios workers, un cambio hecho en otro proceso solo se ve al
+caducar la entrada (`COSTES_CACHE_TTL`).
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import Update, event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from app.models.capa_coste import CapaCoste
+from app.models.componente_producto import ComponenteProducto
+from app.models.disponibilidad_stock import estado_actual, estado_anterior
+from app.models.pack import Pack
+from app.models.pack_producto import PackProducto
+from app.models.producto_compuesto import ProductoCompuesto
+from app.models.producto_simple import ProductoSimple
+from app.models.stock import Stock
+
+TTL_COSTES = float(os.getenv("COSTES_CACHE_TTL", "300"))
+
+Nodo = Tuple[str, int]
+
+# Tablas cuyas escrituras masivas o textuales obligan a vaciar la caché
+TABLAS_COSTE = frozenset({
+    Stock.__tablename__, CapaCoste.__tablename__, ComponenteProducto.__tablename__,
+    PackProducto.__tablename__, Pack.__tablename__, ProductoSimple.__tablename__,
+    ProductoCompuesto.__tablename__,
+})
+# Columnas de stock que no intervienen en el coste (niveles de reposición)
+COLUMNAS_STOCK_SIN_COSTE = frozenset({"cantidad_minima", "cantidad_maxima", "updated_at"})
+# Marca de "invalidar todo"
+TODOS_LOS_NODOS = ("*", 0)
+
+# Tabla destino de un UPDATE/INSERT/DELETE textual de una sola tabla (el resto vacía la caché)
+_TABLA_SQL = re.compile(
+    r"^\s*(?:UPDATE|INSERT\s+INTO|DELETE\s+FROM)\s+(?:ONLY\s+)?\"?(\w+)\"?(?:[\s(;]|$)",
+    re.IGNORECASE
+)
+
+
+class CacheCostes:
+    """🧠 Costes memorizados por nodo con sus dependencias inversas"""
+
+    def __init__(self, ttl: float = TTL_COSTES):
+        self.ttl = ttl
+        self._valores: Dict[Nodo, Tuple[float, Any]] = {}
+        self._dependencias: Dict[Nodo, Set[Nodo]] = {}
+        self._dependientes: Dict[Nodo, Set[Nodo]] = {}
+        # Generación en la que se invalidó por última vez cada nodo, y la del último vaciado
+        self._invalidado_en: Dict[Nodo, int] = {}
+        self._vaciado_en = 0
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generacion(self) -> int:
+        """Contador de invalidaciones; se pasa a `guardar` para no guardar valores calculados antes de una"""
+        return self._generacion
+
+    def _invalidado_desde(self, nodos: Iterable[Nodo], generacion: int) -> bool:
+        """Si alguno de los nodos, o algo de lo que dependen, ha cambiado después de `generacion`"""
+        pendientes, vistos = list(nodos), set()
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo in vistos:
+                continue
+            vistos.add(nodo)
+            if self._invalidado_en.get(nodo, 0) > generacion:
+                return True
+            pendientes.extend(self._dependencias.get(nodo, ()))
+        return False
+
+    def obtener(self, nodo: Nodo) -> Optional[Any]:
+        with self._lock:
+            entrada = self._valores.get(nodo)
+            if entrada is None or entrada[0] < time.monotonic():
+                return None
+            return entrada[1]
+
+    def contiene(self, nodo: Nodo) -> bool:
+        return self.obtener(nodo) is not None
+
+    def guardar(self, nodo: Nodo, valor: Any, dependencias: Iterable[Nodo], generacion: int) -> None:
+        """
+        Guardar el coste de un nodo y de qué nodos depende
+
+        Solo se descarta si desde `generacion` se ha invalidado el propio nodo
+        o algo de lo que depende (o se ha vaciado la caché): los cambios en
+        otros nodos no impiden guardarlo. Las dependencias tienen que estar
+        en caché, para poder seguir sus propias dependencias.
+        """
+        dependencias = set(dependencias)
+        with self._lock:
+            if (self._vaciado_en > generacion or any(d not in self._valores for d in dependencias)
+                    or self._invalidado_desde((nodo, *dependencias), generacion)):
+                return
+            self._valores[nodo] = (time.monotonic() + self.ttl, valor)
+            self._dependencias[nodo] = dependencias
+            for dependencia in dependencias:
+                self._dependientes.setdefault(dependencia, set()).add(nodo)
+
+    def invalidar(self, nodos: Iterable[Nodo]) -> Set[Nodo]:
+        """Descartar los nodos y todo lo calculado a partir de ellos; devuelve los descartados"""
+        with self._lock:
+            self._generacion += 1
+            pendientes = list(nodos)
+            if TODOS_LOS_NODOS in pendientes:
+                descartados = set(self._valores)
+                self._valores.clear()
+                self._dependencias.clear()
+                self._dependientes.clear()
+                self._invalidado_en.clear()
+                self._vaciado_en = self._generacion
+                return descartados
+            descartados = set()
+            while pendientes:
+                nodo = pendientes.pop()
+                if nodo in descartados:
+                    continue
+                descartados.add(nodo)
+                self._invalidado_en[nodo] = self._generacion
+                self._valores.pop(nodo, None)
+                for dependencia in self._dependencias.pop(nodo, ()):
+                    self._dependientes.get(dependencia, set()).discard(nodo)
+                pendientes.extend(self._dependientes.pop(nodo, ()))
+            return descartados
+
+    def limpiar(self) -> None:
+        self.invalidar([TODOS_LOS_NODOS])
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {"nodos": len(self._valores), "generacion": self._generacion}
+
+
+cache_costes = CacheCostes()
+
+
+# ==========================================
+# INVALIDACIÓN DESDE EL ORM
+# ==========================================
+
+def _valores(instancia: Any, atributo: str) -> Set[Any]:
+    """Valor actual y, si ha cambiado en este flush, el anterior"""
+    historial = inspect(instancia).attrs[atributo].history
+    return {valor for valor in (*historial.added, *historial.unchanged, *historial.deleted) if valor is not None}
+
+
+def _nodos_afectados(instancia: Any) -> Iterable[Nodo]:
+    if isinstance(instancia, Stock):
+        for id_producto_simple, id_componente, _, _ in {estado_anterior(instancia), estado_actual(instancia)}:
+            if id_producto_simple is not None:
+                yield ("producto_simple", id_producto_simple)
+            if id_componente is not None:
+                yield ("componente", id_componente)
+    elif isinstance(instancia, CapaCoste):
+        if instancia.id_producto_simple is not None:
+            yield ("producto_simple", instancia.id_producto_simple)
+        if instancia.id_componente is not None:
+            yield ("componente", instancia.id_componente)
+    elif isinstance(instancia, ComponenteProducto):
+        yield from (("producto_compuesto", id_) for id_ in _valores(instancia, "id_producto_compuesto"))
+    elif isinstance(instancia, PackProducto):
+        yield from (("pack", id_) for id_ in _valores(instancia, "id_pack"))
+    elif isinstance(instancia, Pack):
+        yield ("pack", instancia.id)
+    elif isinstance(instancia, (ProductoSimple, ProductoCompuesto)):
+        yield from (("producto", id_) for id_ in _valores(instancia, "id_producto"))
+        if isinstance(instancia, ProductoCompuesto):
+            yield ("producto_compuesto", instancia.id)
+
+
+def _marcar(session: Session, nodos: Iterable[Nodo]) -> None:
+    session.info.setdefault("costes_invalidados", set()).update(nodos)
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_nodos_flush(session: Session, flush_context) -> None:
+    _marcar(session, (
+        nodo
+        for instancia in (*session.new, *session.dirty, *session.deleted)
+        for nodo in _nodos_afectados(instancia)
+    ))
+
+
+def _tabla_de_sentencia(estado) -> Optional[str]:
+    """Tabla que escribe una sentencia, o None si no se puede saber"""
+    sentencia = estado.statement
+    if isinstance(sentencia, TextClause):
+        coincidencia = _TABLA_SQL.match(sentencia.text)
+        return coincidencia.group(1).lower() if coincidencia else None
+    mapper = estado.bind_mapper
+    if mapper is not None:
+        return mapper.local_table.name
+    tabla = getattr(sentencia, "table", None)
+    return getattr(tabla, "name", None)
+
+
+def _solo_niveles_de_stock(estado) -> bool:
+    """UPDATE masivo de stock que solo cambia mínimos y máximos"""
+    sentencia = estado.statement
+    if not isinstance(sentencia, Update) or sentencia.table.name != Stock.__tablename__:
+        return False
+    columnas = {getattr(columna, "key", columna) for columna in getattr(sentencia, "_values", None) or ()}
+    parametros = estado.parameters
+    for fila in [parametros] if isinstance(parametros, dict) else parametros or ():
+        columnas.update(fila)
+    columnas.discard("id")
+    return bool(columnas) and columnas <= COLUMNAS_STOCK_SIN_COSTE
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _registrar_sentencia(estado) -> None:
+    """UPDATE/DELETE masivos o SQL textual sobre tablas de coste (o desconocidas): vaciar la caché"""
+    if estado.is_select:
+        return
+    sentencia = estado.statement
+    if isinstance(sentencia, TextClause) and sentencia.text.lstrip()[:6].upper() in ("SELECT", "LOCK T"):
+        return
+    tabla = _tabla_de_sentencia(estado)
+    if (tabla is None or tabla in TABLAS_COSTE) and not _solo_niveles_de_stock(estado):
+        _marcar(estado.session, (TODOS_LOS_NODOS,))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_nodos(session: Session) -> None:
+    nodos = session.info.pop("costes_invalidados", None)
+    if nodos:
+        cache_costes.invalidar(nodos)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_nodos(session: Session) -> None:
+    session.info.pop("costes_invalidados", None)
@@ -67,11 +67,11 @@ class ColorService(BaseService):
                     
             nuevo_color = self.crear(**color.model_dump())
             
-            logger.info(f"✅ Color '{nuevo_color.nombre}' creado exitosamente")
+            logger.info("✅ Color '%s' creado exitosamente", nuevo_color.nombre)
             return nuevo_color
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error creando color '{nuevo_color.nombre}': {e}")
+            logger.error("❌ Error creando color '%s': %s", nuevo_color.nombre, e)
             raise
             
     def obtener_por_nombre(self, nombre: str) -> Optional[ColorResponse]:
@@ -87,7 +87,7 @@ class ColorService(BaseService):
         try:
             return self.db.query(Color).filter(Color.nombre == nombre).first()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error buscando color por nombre '{nombre}': {e}")
+            logger.error("❌ Error buscando color por nombre '%s': %s", nombre, e)
             raise
             
     def obtener_por_familia(self, familia_id: int) -> List[ColorResponse]:
@@ -103,7 +103,7 @@ class ColorService(BaseService):
         try:
             return self.db.query(Color).filter(Color.id_familia == familia_id).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo colores de familia {familia_id}: {e}")
+            logger.error("❌ Error obteniendo colores de familia %s: %s", familia_id, e)
             raise
             
     def obtener_productos_por_color(self, color_id: int) -> List[ProductoSimple]:
@@ -121,7 +121,7 @@ class ColorService(BaseService):
                 ProductoSimple.id_color == color_id
             ).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo productos por color {color_id}: {e}")
+            logger.error("❌ Error obteniendo productos por color %s: %s", color_id, e)
             raise
             
     def obtener_componentes_por_color(self, color_id: int) -> List[Componente]:
@@ -139,7 +139,7 @@ class ColorService(BaseService):
                 Componente.id_color == color_id
             ).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo componentes por color {color_id}: {e}")
+            logger.error("❌ Error obteniendo componentes por color %s: %s", color_id, e)
             raise
             
     def obtener_estadisticas_color(self, color_id: int) -> dict:
@@ -188,7 +188,7 @@ class ColorService(BaseService):
             }
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo estadísticas de color {color_id}: {e}")
+            logger.error("❌ Error obteniendo estadísticas de color %s: %s", color_id, e)
             raise
             
     def buscar_colores_por_texto(self, texto: str) -> List[ColorResponse]:
@@ -206,7 +206,7 @@ class ColorService(BaseService):
                 Color.nombre.ilike(f'%{texto}%')
             ).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error buscando colores por texto '{texto}': {e}")
+            logger.error("❌ Error buscando colores por texto '%s': %s", texto, e)
             raise
             
     def validar_eliminacion(self, color_id: int) -> dict:
@@ -242,7 +242,7 @@ class ColorService(BaseService):
             return resultado
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error validando eliminación de color {color_id}: {e}")
+            logger.error("❌ Error validando eliminación de color %s: %s", color_id, e)
             raise
             
     def obtener_colores_disponibles_para_familia(self, familia_id: int) -> List[ColorResponse]:
@@ -261,7 +261,7 @@ class ColorService(BaseService):
                 (Color.id_familia == familia_id) | (Color.id_familia.is_(None))
             ).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo colores disponibles para familia {familia_id}: {e}")
+            logger.error("❌ Error obteniendo colores disponibles para familia %s: %s", familia_id, e)
             raise
 
     def actualizar_color(self, color_id: int, color: ColorUpdate) -> ColorResponse:
@@ -310,9 +310,9 @@ class ColorService(BaseService):
             self.db.commit()
             self.db.refresh(existing_color)
             
-            logger.info(f"✅ Color '{existing_color.nombre}' actualizado exitosamente")
+            logger.info("✅ Color '%s' actualizado exitosamente", existing_color.nombre)
             return existing_color
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error actualizando color '{color_id}': {e}")
+            logger.error("❌ Error actualizando color '%s': %s", color_id, e)
             raise HTTPException(status_code=500, detail=f"Error al actualizar color: {str(e)}")
\ No newline at end of file
@@ -2,7 +2,7 @@
 🔩 Servicio de Componente - Gestión de componentes para productos compuestos
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -10,6 +10,7 @@ from app.models.componente import Componente
 from app.models.componente_producto import ComponenteProducto
 from app.models.stock import Stock
 from .base_service import BaseService
+from .ubicacion_service import UbicacionService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,10 +41,11 @@ class ComponenteService(BaseService):
             )
             
             # Crear stock inicial
+            campos_ubicacion = UbicacionService(self.db).campos_stock(ubicacion_almacen)
             stock = Stock(
                 cantidad_actual=stock_inicial,
                 cantidad_minima=stock_minimo,
-                ubicacion_almacen=ubicacion_almacen,
+                **campos_ubicacion,
                 id_componente=componente.id
             )
             
@@ -51,14 +53,30 @@ class ComponenteService(BaseService):
             self.db.commit()
             self.db.refresh(stock)
             
-            logger.info(f"✅ Componente '{nombre}' creado con stock inicial")
+            logger.info("✅ Componente '%s' creado con stock inicial", nombre)
             return {'componente': componente, 'stock': stock}
             
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error creando componente completo: {e}")
+            logger.error("❌ Error creando componente completo: %s", e)
             raise
             
+    def listar_componentes(self, id_proveedor: int = None, id_color: int = None,
+                           skip: int = 0, limit: int = 100,
+                           campos: Optional[Sequence[str]] = None) -> List[Componente]:
+        """Listar componentes con filtros opcionales y proyección de columnas"""
+        query = self._consulta(campos)
+        if id_proveedor is not None:
+            query = query.filter(Componente.id_proveedor == id_proveedor)
+        if id_color is not None:
+            query = query.filter(Componente.id_color == id_color)
+        return query.order_by(Componente.id).offset(skip).limit(limit).all()
+        
+    def obtener_componente(self, componente_id: int,
+                           campos: Optional[Sequence[str]] = None) -> Optional[Componente]:
+        """Obtener un componente por ID, opcionalmente solo con algunas columnas"""
+        return self.obtener_por_id(componente_id, campos=campos)
+        
     def obtener_por_codigo(self, codigo: str) -> Optional[Componente]:
         """Obtener componente por código"""
         return self.db.query(Componente).filter(Componente.codigo == codigo).first()
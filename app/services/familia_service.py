@@ -65,15 +65,15 @@ class FamiliaService(BaseService):
                 
             familia = self.crear(**nueva_familia.model_dump())
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error creando familia '{nombre}': {e}")
+            logger.error("❌ Error creando familia '%s': %s", nombre, e)
             raise
 
         try:
             # Convertir a FamiliaResponse antes de retornar
-            logger.info(f"✅ Familia '{nombre}' creada exitosamente")
+            logger.info("✅ Familia '%s' creada exitosamente", nombre)
             return FamiliaResponse.model_validate(familia)
         except ValidationError as e:
-            logger.error(f"❌ Error validando familia creada: {e}")
+            logger.error("❌ Error validando familia creada: %s", e)
             raise
             
     def obtener_por_nombre(self, nombre: str) -> Optional[FamiliaResponse]:
@@ -89,14 +89,14 @@ class FamiliaService(BaseService):
         try:
             familia = self.db.query(Familia).filter(Familia.nombre.ilike(nombre)).first()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error buscando familia por nombre '{nombre}': {e}")
+            logger.error("❌ Error buscando familia por nombre '%s': %s", nombre, e)
             raise
 
         if familia:
             try:
                 return FamiliaResponse.model_validate(familia)
             except ValidationError as e:
-                logger.error(f"❌ Error validando familia '{nombre}': {e}")
+                logger.error("❌ Error validando familia '%s': %s", nombre, e)
                 raise
         else:
             return None
@@ -114,7 +114,7 @@ class FamiliaService(BaseService):
         try:
             articulos = self.db.query(Articulo).filter(Articulo.id_familia == familia_id).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo artículos de familia {familia_id}: {e}")
+            logger.error("❌ Error obteniendo artículos de familia %s: %s", familia_id, e)
             raise
 
         if not articulos:
@@ -123,7 +123,7 @@ class FamiliaService(BaseService):
             try:
                 return [ArticuloInDB.model_validate(articulo) for articulo in articulos]
             except ValidationError as e:
-                logger.error(f"❌ Error validando artículos de familia {familia_id}: {e}")
+                logger.error("❌ Error validando artículos de familia %s: %s", familia_id, e)
                 raise
             
     def obtener_colores_por_familia(self, familia_id: int) -> List[ColorInDB]:
@@ -139,7 +139,7 @@ class FamiliaService(BaseService):
         try:
             colores = self.db.query(Color).filter(Color.id_familia == familia_id).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo colores de familia {familia_id}: {e}")
+            logger.error("❌ Error obteniendo colores de familia %s: %s", familia_id, e)
             raise
         if not colores:
             return []
@@ -147,7 +147,7 @@ class FamiliaService(BaseService):
             try:
                 return [ColorInDB.model_validate(color) for color in colores]
             except ValidationError as e:
-                logger.error(f"❌ Error validando colores de familia {familia_id}: {e}")
+                logger.error("❌ Error validando colores de familia %s: %s", familia_id, e)
                 raise
             
     def obtener_estadisticas_familia(self, familia_id: int) -> Optional[dict]:
@@ -184,7 +184,7 @@ class FamiliaService(BaseService):
             }
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo estadísticas de familia {familia_id}: {e}")
+            logger.error("❌ Error obteniendo estadísticas de familia %s: %s", familia_id, e)
             raise
             
     def buscar_familias_por_texto(self, texto: str) -> List[FamiliaResponse]:
@@ -203,7 +203,7 @@ class FamiliaService(BaseService):
                 (Familia.descripcion.ilike(f'%{texto}%'))
             ).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error buscando familias por texto '{texto}': {e}")
+            logger.error("❌ Error buscando familias por texto '%s': %s", texto, e)
             raise
         if not familias:
             return []
@@ -211,7 +211,7 @@ class FamiliaService(BaseService):
             try:
                 return [FamiliaResponse.model_validate(familia) for familia in familias]
             except ValidationError as e:
-                logger.error(f"❌ Error validando familias por texto '{texto}': {e}")
+                logger.error("❌ Error validando familias por texto '%s': %s", texto, e)
                 raise
             
     def validar_eliminacion(self, familia_id: int) -> dict:
@@ -247,7 +247,7 @@ class FamiliaService(BaseService):
             return resultado
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error validando eliminación de familia {familia_id}: {e}")
+            logger.error("❌ Error validando eliminación de familia %s: %s", familia_id, e)
             raise
     
     def actualizar_familia(self, familia_id: int, datos_actualizacion: FamiliaUpdate) -> FamiliaResponse:
@@ -289,12 +289,12 @@ class FamiliaService(BaseService):
             self.db.commit()
             self.db.refresh(familia_existente)
             
-            logger.info(f"✅ Familia ID {familia_id} actualizada exitosamente")
+            logger.info("✅ Familia ID %s actualizada exitosamente", familia_id)
             return familia_existente
             
         except ValueError:
             raise
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error actualizando familia {familia_id}: {e}")
+            logger.error("❌ Error actualizando familia %s: %s", familia_id, e)
             raise
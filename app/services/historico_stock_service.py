@@ -0,0 +1,357 @@
+"""
+📜 Servicio de Histórico de Stock - Movimientos, instantáneas y stock en una fecha
+
+`movimiento_stock` está particionada por mes (RANGE sobre `fecha`) con una
+partición DEFAULT de seguridad. Este servicio:
+
+- crea las particiones mensuales por adelantado (moviendo, si las hubiera,
+  las filas que cayeron en la DEFAULT);
+- toma instantáneas de todo el stock como puntos de control;
+- reconstruye el stock en cualquier fecha como la última instantánea
+  anterior más los movimientos entre ambas (la poda de particiones deja
+  fuera los meses que no hacen falta);
+- desacopla meses antiguos para archivarlos o eliminarlos.
+
+Mantenimiento periódico (mensual, por ejemplo desde cron):
+    python -m app.services.historico_stock_service
+"""
+
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import func, insert, literal, select, text, union_all
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models.instantanea_stock import InstantaneaStock, InstantaneaStockLinea
+from app.models.movimiento_stock import MovimientoStock
+from app.models.stock import Stock
+from app.registro import configurar_registro
+from .base_service import BaseService
+import logging
+
+logger = logging.getLogger(__name__)
+
+TABLA_MOVIMIENTOS = MovimientoStock.__tablename__
+PARTICION_DEFECTO = f"{TABLA_MOVIMIENTOS}_default"
+_PATRON_PARTICION = re.compile(rf"^{TABLA_MOVIMIENTOS}_(\d{{4}})_(\d{{2}})$")
+
+
+def nombre_particion(anio: int, mes: int) -> str:
+    """Nombre de la partición mensual (movimiento_stock_2026_10)"""
+    return f"{TABLA_MOVIMIENTOS}_{anio:04d}_{mes:02d}"
+
+
+def limites_mes(anio: int, mes: int) -> Tuple[datetime, datetime]:
+    """Inicio (incluido) y fin (excluido) de un mes en UTC"""
+    inicio = datetime(anio, mes, 1, tzinfo=timezone.utc)
+    fin = datetime(anio + mes // 12, mes % 12 + 1, 1, tzinfo=timezone.utc)
+    return inicio, fin
+
+
+def _sumar_meses(anio: int, mes: int, meses: int) -> Tuple[int, int]:
+    indice = anio * 12 + (mes - 1) + meses
+    return indice // 12, indice % 12 + 1
+
+
+def instante_de_corte(fecha: Union[None, str, date, datetime], inicio_del_dia: bool = False) -> Optional[datetime]:
+    """
+    Convertir una fecha de corte en un instante UTC
+
+    Una fecha sin hora ('2026-03-31') se refiere al final de ese día (o al
+    principio con `inicio_del_dia`); una fecha con hora sin zona se
+    interpreta en UTC.
+
+    Raises:
+        ValueError: Si el texto no es una fecha ISO válida
+    """
+    if fecha is None or fecha == "":
+        return None
+    if isinstance(fecha, str):
+        try:
+            fecha = date.fromisoformat(fecha) if len(fecha) == 10 else datetime.fromisoformat(fecha)
+        except ValueError:
+            raise ValueError(f"Fecha de corte no válida: '{fecha}' (formato ISO: AAAA-MM-DD o AAAA-MM-DDTHH:MM)")
+    if not isinstance(fecha, datetime):
+        return datetime(fecha.year, fecha.month, fecha.day, tzinfo=timezone.utc) + timedelta(days=0 if inicio_del_dia else 1)
+    return fecha if fecha.tzinfo else fecha.replace(tzinfo=timezone.utc)
+
+
+class HistoricoStockService(BaseService):
+    """📜 Servicio para el histórico de movimientos y el stock en una fecha"""
+
+    def __init__(self, db_session: Session):
+        super().__init__(db_session, MovimientoStock)
+
+    # ==========================================
+    # PARTICIONES
+    # ==========================================
+
+    def listar_particiones(self) -> List[Dict[str, Any]]:
+        """Particiones acopladas de `movimiento_stock` con su rango y filas estimadas"""
+        if not self._particionada():
+            return []
+        filas = self.db.execute(text(
+            "SELECT hija.relname AS nombre, greatest(hija.reltuples, 0)::bigint AS filas_estimadas "
+            "FROM pg_inherits JOIN pg_class padre ON padre.oid = pg_inherits.inhparent "
+            "JOIN pg_class hija ON hija.oid = pg_inherits.inhrelid "
+            "WHERE padre.relname = :tabla ORDER BY hija.relname"
+        ), {"tabla": TABLA_MOVIMIENTOS}).all()
+        particiones = []
+        for fila in filas:
+            coincidencia = _PATRON_PARTICION.match(fila.nombre)
+            desde, hasta = limites_mes(int(coincidencia.group(1)), int(coincidencia.group(2))) if coincidencia else (None, None)
+            particiones.append({
+                "nombre": fila.nombre,
+                "desde": desde.isoformat() if desde else None,
+                "hasta": hasta.isoformat() if hasta else None,
+                "filas_estimadas": fila.filas_estimadas
+            })
+        return particiones
+
+    def _particionada(self) -> bool:
+        """Solo PostgreSQL particiona `movimiento_stock`; con SQLite es una tabla normal"""
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    def _crear_particion(self, anio: int, mes: int) -> None:
+        """
+        Crear y acoplar la partición de un mes en la transacción actual
+
+        Se crea como tabla suelta, recibe las filas de ese mes que hubieran
+        caído en la partición DEFAULT y después se acopla: acoplarla con esas
+        filas todavía en la DEFAULT fallaría.
+        """
+        nombre = nombre_particion(anio, mes)
+        inicio, fin = limites_mes(anio, mes)
+        limites = {"inicio": inicio, "fin": fin}
+        self.db.execute(text(f"CREATE TABLE {nombre} (LIKE {TABLA_MOVIMIENTOS} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        self.db.execute(text(
+            f"WITH movidas AS (DELETE FROM {PARTICION_DEFECTO} WHERE fecha >= :inicio AND fecha < :fin RETURNING *) "
+            f"INSERT INTO {nombre} SELECT * FROM movidas"
+        ), limites)
+        self.db.execute(text(
+            f"ALTER TABLE {TABLA_MOVIMIENTOS} ATTACH PARTITION {nombre} "
+            f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fin.isoformat()}')"
+        ))
+
+    def asegurar_particiones(self, meses_adelante: int = 3, desde: Optional[date] = None) -> List[str]:
+        """
+        Crear las particiones mensuales que falten desde `desde` (por defecto el
+        mes actual) hasta `meses_adelante` meses después del actual
+
+        Returns:
+            List[str]: Nombres de las particiones creadas
+        """
+        if not self._particionada():
+            return []
+        hoy = datetime.now(timezone.utc).date()
+        anio, mes = (desde or hoy).year, (desde or hoy).month
+        ultimo = _sumar_meses(hoy.year, hoy.month, meses_adelante)
+        existentes = {particion["nombre"] for particion in self.listar_particiones()}
+        creadas = []
+        try:
+            while (anio, mes) <= ultimo:
+                nombre = nombre_particion(anio, mes)
+                if nombre not in existentes:
+                    self._crear_particion(anio, mes)
+                    creadas.append(nombre)
+                anio, mes = _sumar_meses(anio, mes, 1)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error("❌ Error creando particiones de movimientos: %s", e)
+            raise
+
+        if creadas:
+            logger.info("✅ Particiones de movimientos creadas: %s", ', '.join(creadas))
+        return creadas
+
+    def desacoplar_particion(self, anio: int, mes: int, eliminar: bool = False) -> Dict[str, Any]:
+        """
+        Desacoplar (y opcionalmente eliminar) la partición de un mes
+
+        Sin la partición, el stock de fechas anteriores a su fin ya no se puede
+        reconstruir: se exige una instantánea posterior, que pasa a marcar el
+        inicio del histórico, y se borran las anteriores, de modo que esas
+        fechas den error en lugar de un resultado incompleto. Una partición desacoplada es una
+        tabla normal que puede volcarse (pg_dump -t) y eliminarse después.
+
+        Raises:
+            ValueError: Si la partición no existe o no hay instantánea posterior a su fin
+        """
+        nombre = nombre_particion(anio, mes)
+        _, fin = limites_mes(anio, mes)
+        if nombre not in {particion["nombre"] for particion in self.listar_particiones()}:
+            raise ValueError(f"No existe la partición {nombre}")
+        if not self.db.query(InstantaneaStock.id).filter(InstantaneaStock.fecha >= fin).first():
+            raise ValueError(f"Crea una instantánea posterior a {fin.date()} antes de desacoplar {nombre}")
+
+        try:
+            instantaneas = self.db.query(InstantaneaStock).filter(InstantaneaStock.fecha < fin).delete(synchronize_session=False)
+            primera = self.db.query(InstantaneaStock).filter(InstantaneaStock.fecha >= fin).order_by(InstantaneaStock.fecha).first()
+            primera.inicio_historico = True
+            self.db.execute(text(f"ALTER TABLE {TABLA_MOVIMIENTOS} DETACH PARTITION {nombre}"))
+            if eliminar:
+                self.db.execute(text(f"DROP TABLE {nombre}"))
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error("❌ Error desacoplando la partición %s: %s", nombre, e)
+            raise
+
+        logger.info("✅ Partición %s desacoplada%s", nombre, ' y eliminada' if eliminar else '')
+        return {"particion": nombre, "eliminada": eliminar, "instantaneas_eliminadas": instantaneas}
+
+    # ==========================================
+    # INSTANTÁNEAS
+    # ==========================================
+
+    def crear_instantanea(self) -> InstantaneaStock:
+        """
+        Copiar todo el stock como punto de control
+
+        Bloquea `stock` en modo SHARE mientras copia: espera a que confirmen
+        las transacciones que lo están modificando y frena las nuevas hasta
+        terminar. Así todo movimiento anterior a la fecha de la instantánea
+        está incluido en ella y todo movimiento posterior tiene fecha mayor.
+        """
+        try:
+            if self._particionada():
+                self.db.execute(text(f"LOCK TABLE {Stock.__tablename__} IN SHARE MODE"))
+                fecha = self.db.execute(text("SELECT clock_timestamp()")).scalar()
+            else:
+                # SQLite serializa las escrituras: no hay transacciones concurrentes que esperar
+                fecha = datetime.now(timezone.utc)
+            instantanea = InstantaneaStock(fecha=fecha, registros=0)
+            self.db.add(instantanea)
+            self.db.flush()
+            copiadas = self.db.execute(insert(InstantaneaStockLinea).from_select(
+                ["id_instantanea", "id_stock", "id_producto_simple", "id_componente", "id_almacen", "cantidad"],
+                select(
+                    literal(instantanea.id), Stock.id, Stock.id_producto_simple, Stock.id_componente,
+                    Stock.id_almacen, Stock.cantidad_actual
+                )
+            )).rowcount
+            instantanea.registros = copiadas
+            self.db.commit()
+            self.db.refresh(instantanea)
+
+            logger.info("✅ Instantánea de stock %s creada (%s registros)", instantanea.id, copiadas)
+            return instantanea
+
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error("❌ Error creando instantánea de stock: %s", e)
+            raise
+
+    def listar_instantaneas(self, skip: int = 0, limit: int = 100) -> List[InstantaneaStock]:
+        """Instantáneas de la más reciente a la más antigua"""
+        return self.db.query(InstantaneaStock).order_by(InstantaneaStock.fecha.desc()).offset(skip).limit(limit).all()
+
+    # ==========================================
+    # CONSULTAS
+    # ==========================================
+
+    def stock_en_fecha(self, fecha: Union[None, str, date, datetime] = None) -> Dict[str, Any]:
+        """
+        Stock por elemento y almacén en una fecha (o el actual si no se indica)
+
+        Parte de la última instantánea anterior a la fecha (o de cero si no
+        hay ninguna) y le suma los movimientos entre ambas. La condición
+        sobre `fecha` permite a PostgreSQL leer solo las particiones de esos
+        meses.
+
+        Returns:
+            Dict: `fecha_corte`, `instantanea` (fecha de la base usada) y
+                  `filas` con id_producto_simple, id_componente, id_almacen y cantidad
+
+        Raises:
+            ValueError: Si la fecha no es válida o es anterior al histórico disponible
+        """
+        corte = instante_de_corte(fecha)
+        columnas = ("id_producto_simple", "id_componente", "id_almacen")
+        base = None
+        if corte is None:
+            partes = select(Stock.id_producto_simple, Stock.id_componente, Stock.id_almacen,
+                            Stock.cantidad_actual.label("cantidad"))
+        else:
+            inicio = self.db.query(func.max(InstantaneaStock.fecha)).filter(InstantaneaStock.inicio_historico).scalar()
+            if inicio is not None and corte < inicio:
+                raise ValueError(f"No hay histórico de stock anterior a {inicio.isoformat()}")
+            base = self.db.query(InstantaneaStock).filter(
+                InstantaneaStock.fecha <= corte
+            ).order_by(InstantaneaStock.fecha.desc()).first()
+            movimientos = select(
+                MovimientoStock.id_producto_simple, MovimientoStock.id_componente, MovimientoStock.id_almacen,
+                MovimientoStock.cantidad
+            ).where(MovimientoStock.fecha < corte)
+            if base is not None:
+                movimientos = movimientos.where(MovimientoStock.fecha > base.fecha)
+                partes = union_all(
+                    select(
+                        InstantaneaStockLinea.id_producto_simple, InstantaneaStockLinea.id_componente,
+                        InstantaneaStockLinea.id_almacen, InstantaneaStockLinea.cantidad
+                    ).where(InstantaneaStockLinea.id_instantanea == base.id),
+                    movimientos
+                )
+            else:
+                partes = movimientos
+        partes = partes.subquery()
+
+        agrupadas = select(
+            *(partes.c[columna] for columna in columnas), func.sum(partes.c.cantidad).label("cantidad")
+        ).group_by(*(partes.c[columna] for columna in columnas)).having(
+            func.sum(partes.c.cantidad) != 0
+        ).order_by(*(partes.c[columna] for columna in columnas))
+        filas = self.db.execute(agrupadas).all()
+
+        return {
+            "fecha_corte": corte.isoformat() if corte else None,
+            "instantanea": base.fecha.isoformat() if base else None,
+            "filas": [
+                {
+                    "id_producto_simple": fila.id_producto_simple,
+                    "id_componente": fila.id_componente,
+                    "id_almacen": fila.id_almacen,
+                    "cantidad": Decimal(fila.cantidad)
+                }
+                for fila in filas
+            ]
+        }
+
+    def listar_movimientos(self, id_stock: int, desde: Union[None, str, date, datetime] = None,
+                           hasta: Union[None, str, date, datetime] = None,
+                           skip: int = 0, limit: int = 100) -> List[MovimientoStock]:
+        """
+        Movimientos de un registro de stock, del más reciente al más antiguo
+
+        Raises:
+            ValueError: Si alguna fecha no es válida
+        """
+        query = self.db.query(MovimientoStock).filter(MovimientoStock.id_stock == id_stock)
+        if desde:
+            query = query.filter(MovimientoStock.fecha >= instante_de_corte(desde, inicio_del_dia=True))
+        if hasta:
+            query = query.filter(MovimientoStock.fecha < instante_de_corte(hasta))
+        return query.order_by(MovimientoStock.fecha.desc(), MovimientoStock.id.desc()).offset(skip).limit(limit).all()
+
+
+def ejecutar_mantenimiento(meses_adelante: int = 3) -> Dict[str, Any]:
+    """🧹 Crear las particiones que falten y tomar una instantánea"""
+    db = SessionLocal()
+    try:
+        servicio = HistoricoStockService(db)
+        creadas = servicio.asegurar_particiones(meses_adelante=meses_adelante)
+        instantanea = servicio.crear_instantanea()
+        return {"particiones_creadas": creadas, "instantanea": instantanea.fecha.isoformat()}
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    configurar_registro()
+    print(ejecutar_mantenimiento(int(os.getenv("HISTORICO_MESES_ADELANTE", "3"))))
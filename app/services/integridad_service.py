@@ -0,0 +1,238 @@
+"""
+🔍 Servicio de Integridad - Auditoría del catálogo con consultas de conjunto
+
+Cada chequeo es una única consulta (anti-join con `NOT EXISTS`) que devuelve
+los identificadores de las filas incoherentes; la base de datos resuelve todo
+el catálogo de una vez en lugar de recorrer productos y stock en Python.
+
+Los chequeos se lanzan en paralelo, cada uno en su propia conexión. En
+PostgreSQL todas las conexiones importan la misma instantánea
+(`pg_export_snapshot`), así que la auditoría ve un estado único del catálogo
+aunque se ejecute repartida. Con SQLite (una sola conexión compartida) se
+ejecutan uno tras otro en la conexión de la sesión.
+
+Los chequeos se registran con `@chequeo_integridad("nombre", "tabla")` sobre
+una función sin argumentos que devuelve un `select` de una columna `id`.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, func, or_, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.models.componente import Componente
+from app.models.componente_producto import ComponenteProducto
+from app.models.pack import Pack
+from app.models.pack_producto import PackProducto
+from app.models.producto import Producto
+from app.models.producto_compuesto import ProductoCompuesto
+from app.models.producto_simple import ProductoSimple
+from app.models.stock import Stock
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Registro de chequeos: nombre -> (tabla auditada, función que construye la consulta)
+CHEQUEOS_INTEGRIDAD: Dict[str, Tuple[str, Callable[[], Select]]] = {}
+
+# Conexiones simultáneas por auditoría (cada una ocupa una del pool del engine)
+INTEGRIDAD_CONEXIONES = int(os.getenv("INTEGRIDAD_CONEXIONES", "4"))
+
+
+def chequeo_integridad(nombre: str, tabla: str):
+    """Registrar una función como chequeo de integridad de `tabla`"""
+    def registrar(funcion: Callable[[], Select]) -> Callable[[], Select]:
+        CHEQUEOS_INTEGRIDAD[nombre] = (tabla, funcion)
+        return funcion
+    return registrar
+
+
+def _es_simple():
+    return exists().where(ProductoSimple.id_producto == Producto.id)
+
+
+def _es_compuesto():
+    return exists().where(ProductoCompuesto.id_producto == Producto.id)
+
+
+@chequeo_integridad("producto_sin_detalle", "producto")
+def _producto_sin_detalle() -> Select:
+    """Productos sin fila en producto_simple ni en producto_compuesto"""
+    return select(Producto.id).where(~_es_simple(), ~_es_compuesto())
+
+
+@chequeo_integridad("tipo_producto_incoherente", "producto")
+def _tipo_producto_incoherente() -> Select:
+    """Productos cuyo tipo_producto no coincide con su fila de detalle"""
+    return select(Producto.id).where(or_(
+        Producto.tipo_producto.notin_(("simple", "compuesto")),
+        and_(Producto.tipo_producto == "simple", _es_compuesto()),
+        and_(Producto.tipo_producto == "compuesto", _es_simple()),
+    ))
+
+
+@chequeo_integridad("simple_sin_stock", "producto_simple")
+def _simple_sin_stock() -> Select:
+    """Productos simples sin ningún registro de stock"""
+    return select(ProductoSimple.id).where(~exists().where(Stock.id_producto_simple == ProductoSimple.id))
+
+
+@chequeo_integridad("stock_huerfano", "stock")
+def _stock_huerfano() -> Select:
+    """Registros de stock cuyo producto simple o componente no existe"""
+    return select(Stock.id).where(or_(
+        and_(Stock.id_producto_simple.isnot(None), ~exists().where(ProductoSimple.id == Stock.id_producto_simple)),
+        and_(Stock.id_componente.isnot(None), ~exists().where(Componente.id == Stock.id_componente)),
+    ))
+
+
+@chequeo_integridad("pack_producto_huerfano", "pack_producto")
+def _pack_producto_huerfano() -> Select:
+    """Líneas de pack cuyo pack o producto no existe"""
+    return select(PackProducto.id).where(or_(
+        ~exists().where(Pack.id == PackProducto.id_pack),
+        ~exists().where(Producto.id == PackProducto.id_producto),
+    ))
+
+
+@chequeo_integridad("componente_producto_huerfano", "componente_producto")
+def _componente_producto_huerfano() -> Select:
+    """Líneas de escandallo cuyo producto compuesto o componente no existe"""
+    return select(ComponenteProducto.id).where(or_(
+        ~exists().where(ProductoCompuesto.id == ComponenteProducto.id_producto_compuesto),
+        ~exists().where(Componente.id == ComponenteProducto.id_componente),
+    ))
+
+
+@chequeo_integridad("pack_sin_productos", "pack")
+def _pack_sin_productos() -> Select:
+    """Packs sin ningún producto"""
+    return select(Pack.id).where(~exists().where(PackProducto.id_pack == Pack.id))
+
+
+@chequeo_integridad("compuesto_sin_componentes", "producto_compuesto")
+def _compuesto_sin_componentes() -> Select:
+    """Productos compuestos sin ningún componente"""
+    return select(ProductoCompuesto.id).where(
+        ~exists().where(ComponenteProducto.id_producto_compuesto == ProductoCompuesto.id)
+    )
+
+
+class IntegridadService:
+    """
+    🔍 Auditoría de integridad del catálogo
+
+    En PostgreSQL solo ve datos confirmados: los chequeos usan conexiones
+    propias, no la transacción de la sesión.
+    """
+
+    def __init__(self, db_session: Session):
+        """
+        Constructor del servicio de integridad
+
+        Args:
+            db_session (Session): Sesión de base de datos SQLAlchemy (de ella se toma el engine)
+        """
+        self.db = db_session
+
+    @staticmethod
+    def _ejecutar_chequeo(conexion, nombre: str, muestra: int) -> Dict[str, Any]:
+        """Número de incidencias y primeros IDs de un chequeo, en una sola consulta"""
+        tabla, construir = CHEQUEOS_INTEGRIDAD[nombre]
+        incidencias = construir().subquery()
+        filas = conexion.execute(
+            select(incidencias.c.id, func.count().over())
+            .order_by(incidencias.c.id)
+            .limit(max(muestra, 1))
+        ).all()
+        return {
+            "tabla": tabla,
+            "descripcion": (construir.__doc__ or "").strip(),
+            "incidencias": filas[0][1] if filas else 0,
+            "muestra": [fila[0] for fila in filas[:muestra]],
+        }
+
+    def _ejecutar_en_paralelo(self, motor, nombres: List[str], muestra: int, conexiones: int,
+                              registrar: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Repartir los chequeos entre varias conexiones que importan la misma instantánea"""
+        with motor.connect() as principal:
+            # La conexión principal fija la instantánea y la mantiene abierta
+            # mientras el resto la importa
+            principal = principal.execution_options(isolation_level="REPEATABLE READ")
+            instantanea = principal.execute(text("SELECT pg_export_snapshot()")).scalar()
+
+            def ejecutar(nombre: str) -> Dict[str, Any]:
+                with motor.connect() as conexion:
+                    conexion = conexion.execution_options(isolation_level="REPEATABLE READ")
+                    try:
+                        conexion.execute(text(f"SET TRANSACTION SNAPSHOT '{instantanea}'"))
+                        return self._ejecutar_chequeo(conexion, nombre, muestra)
+                    finally:
+                        conexion.rollback()
+
+            with ThreadPoolExecutor(max_workers=min(conexiones, len(nombres))) as executor:
+                for nombre, resultado in zip(nombres, executor.map(ejecutar, nombres)):
+                    registrar(nombre, resultado)
+            principal.rollback()
+
+    def validar(self, chequeos: Optional[List[str]] = None, muestra: int = 10,
+                conexiones: Optional[int] = None,
+                progreso: Optional[Callable[[int, str], None]] = None) -> Dict[str, Any]:
+        """
+        Ejecutar los chequeos de integridad en paralelo
+
+        Args:
+            chequeos (List[str], optional): Chequeos a ejecutar (todos por defecto)
+            muestra (int): IDs de ejemplo por chequeo
+            conexiones (int, optional): Conexiones simultáneas (INTEGRIDAD_CONEXIONES por defecto)
+            progreso (Callable, optional): Se llama al terminar cada chequeo con (porcentaje, mensaje)
+
+        Returns:
+            Dict[str, Any]: valido, total_incidencias, duracion_ms y el resultado de cada chequeo
+
+        Raises:
+            ValueError: Si algún chequeo no existe o los parámetros no son válidos
+        """
+        nombres = list(chequeos) if chequeos else list(CHEQUEOS_INTEGRIDAD)
+        desconocidos = [nombre for nombre in nombres if nombre not in CHEQUEOS_INTEGRIDAD]
+        if desconocidos:
+            raise ValueError(
+                f"Chequeos desconocidos: {', '.join(desconocidos)}. "
+                f"Disponibles: {', '.join(CHEQUEOS_INTEGRIDAD)}"
+            )
+        if muestra < 0:
+            raise ValueError("La muestra no puede ser negativa")
+        conexiones = conexiones or INTEGRIDAD_CONEXIONES
+        if conexiones < 1:
+            raise ValueError("Se necesita al menos una conexión")
+
+        inicio = time.perf_counter()
+        resultados = {}
+
+        def registrar(nombre: str, resultado: Dict[str, Any]) -> None:
+            resultados[nombre] = resultado
+            if progreso:
+                progreso(100 * len(resultados) // (len(nombres) + 1),
+                         f"{nombre}: {resultado['incidencias']} incidencias")
+
+        motor = self.db.get_bind()
+        if motor.dialect.name == "postgresql":
+            self._ejecutar_en_paralelo(motor, nombres, muestra, conexiones, registrar)
+        else:
+            conexion = self.db.connection()
+            for nombre in nombres:
+                registrar(nombre, self._ejecutar_chequeo(conexion, nombre, muestra))
+
+        total = sum(resultado["incidencias"] for resultado in resultados.values())
+        duracion_ms = round((time.perf_counter() - inicio) * 1000, 1)
+        logger.info("✅ Integridad validada: %s chequeos, %s incidencias en %s ms", len(nombres), total, duracion_ms)
+        return {
+            "valido": total == 0,
+            "total_incidencias": total,
+            "duracion_ms": duracion_ms,
+            "chequeos": resultados,
+        }
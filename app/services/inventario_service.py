@@ -5,13 +5,18 @@ Este servicio actúa como el coordinador principal que utiliza todos los demás
 para realizar operaciones complejas que involucran múltiples entidades.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Columnas de producto de la exportación (con stock se añaden cantidad_actual y registros_stock)
+COLUMNAS_EXPORTACION = ('id_producto', 'tipo_producto', 'id_articulo', 'codigo', 'nombre', 'activo',
+                        'id_familia', 'id_producto_simple')
+
 
 class InventarioService:
     """
@@ -39,6 +44,10 @@ class InventarioService:
         self._componente_service = None
         self._pack_service = None
         self._stock_service = None
+        self._historico_service = None
+        self._valoracion_service = None
+        self._integridad_service = None
+        self._limpieza_service = None
         
     @property
     def familia_service(self):
@@ -104,6 +113,38 @@ class InventarioService:
             self._stock_service = StockService(self.db)
         return self._stock_service
         
+    @property
+    def historico_service(self):
+        """Lazy loading del HistoricoStockService"""
+        if self._historico_service is None:
+            from .historico_stock_service import HistoricoStockService
+            self._historico_service = HistoricoStockService(self.db)
+        return self._historico_service
+        
+    @property
+    def valoracion_service(self):
+        """Lazy loading del ValoracionService"""
+        if self._valoracion_service is None:
+            from .valoracion_service import ValoracionService
+            self._valoracion_service = ValoracionService(self.db)
+        return self._valoracion_service
+        
+    @property
+    def integridad_service(self):
+        """Lazy loading del IntegridadService"""
+        if self._integridad_service is None:
+            from .integridad_service import IntegridadService
+            self._integridad_service = IntegridadService(self.db)
+        return self._integridad_service
+        
+    @property
+    def limpieza_service(self):
+        """Lazy loading del LimpiezaService"""
+        if self._limpieza_service is None:
+            from .limpieza_service import LimpiezaService
+            self._limpieza_service = LimpiezaService(self.db)
+        return self._limpieza_service
+        
     def crear_producto_simple_completo(self, nombre_articulo: str, descripcion_articulo: str = None,
                                      codigo_articulo: str = None, familia_id: int = None,
                                      proveedor_id: int = None, color_id: int = None,
@@ -139,10 +180,12 @@ class InventarioService:
             
             # 3. Crear stock inicial
             from app.models.stock import Stock
+            from .ubicacion_service import UbicacionService
+            campos_ubicacion = UbicacionService(self.db).campos_stock(ubicacion_almacen)
             stock = Stock(
                 cantidad_actual=stock_inicial,
                 cantidad_minima=stock_minimo,
-                ubicacion_almacen=ubicacion_almacen,
+                **campos_ubicacion,
                 id_producto_simple=producto_data['producto_simple'].id
             )
             
@@ -151,12 +194,12 @@ class InventarioService:
             self.db.refresh(stock)
             resultado['stock'] = stock
             
-            logger.info(f"✅ Producto simple completo '{nombre_articulo}' creado exitosamente")
+            logger.info("✅ Producto simple completo '%s' creado exitosamente", nombre_articulo)
             return resultado
             
         except Exception as e:
             self.db.rollback()
-            logger.error(f"❌ Error creando producto simple completo: {e}")
+            logger.error("❌ Error creando producto simple completo: %s", e)
             raise
             
     def crear_producto_compuesto_completo(self, nombre_articulo: str, descripcion_articulo: str = None,
@@ -201,12 +244,12 @@ class InventarioService:
                     
             resultado['componentes_agregados'] = componentes_agregados
             
-            logger.info(f"✅ Producto compuesto '{nombre_articulo}' creado con {len(componentes_agregados)} componentes")
+            logger.info("✅ Producto compuesto '%s' creado con %s componentes", nombre_articulo, len(componentes_agregados))
             return resultado
             
         except Exception as e:
             self.db.rollback()
-            logger.error(f"❌ Error creando producto compuesto completo: {e}")
+            logger.error("❌ Error creando producto compuesto completo: %s", e)
             raise
             
     def crear_pack_completo(self, nombre_pack: str, descripcion_articulo: str = None,
@@ -237,12 +280,12 @@ class InventarioService:
             )
             resultado.update(pack_data)
             
-            logger.info(f"✅ Pack completo '{nombre_pack}' creado exitosamente")
+            logger.info("✅ Pack completo '%s' creado exitosamente", nombre_pack)
             return resultado
             
         except Exception as e:
             self.db.rollback()
-            logger.error(f"❌ Error creando pack completo: {e}")
+            logger.error("❌ Error creando pack completo: %s", e)
             raise
             
     def obtener_dashboard_inventario(self) -> Dict[str, Any]:
@@ -264,7 +307,7 @@ class InventarioService:
             }
             
         except Exception as e:
-            logger.error(f"❌ Error obteniendo dashboard de inventario: {e}")
+            logger.error("❌ Error obteniendo dashboard de inventario: %s", e)
             raise
             
     def buscar_elementos_inventario(self, texto_busqueda: str) -> Dict[str, List]:
@@ -282,5 +325,275 @@ class InventarioService:
             }
             
         except Exception as e:
-            logger.error(f"❌ Error en búsqueda global: {e}")
+            logger.error("❌ Error en búsqueda global: %s", e)
             raise
+            
+    def generar_reporte_valoracion(self, fecha_corte: Optional[str] = None,
+                                   progreso: Optional[Callable[[int, str], None]] = None) -> Dict[str, Any]:
+        """
+        Reporte de valoración del inventario en una fecha de corte (o actual si no se indica)
+        
+        Las cantidades salen de `HistoricoStockService.stock_en_fecha`
+        (instantánea más movimientos) y los costes de las capas de coste
+        (`ValoracionService`), por FIFO y por coste medio ponderado. El valor
+        de cada almacén reparte el del elemento según sus unidades.
+        `progreso` se llama tras cada paso con (porcentaje, mensaje).
+        
+        Raises:
+            ValueError: Si la fecha no es válida o es anterior al histórico disponible
+        """
+        from app.models.articulo import Articulo
+        from app.models.componente import Componente
+        from app.models.producto import Producto
+        from app.models.producto_simple import ProductoSimple
+        from app.models.ubicacion import Ubicacion
+        
+        try:
+            valoracion = self.valoracion_service.valorar_existencias(fecha_corte)
+            filas = valoracion["filas"]
+            costes = {(e["tipo"], e["id"]): e for e in valoracion["elementos"]}
+            if progreso:
+                progreso(60, f"{len(costes)} elementos valorados")
+            
+            ids_simple = {fila["id_producto_simple"] for fila in filas if fila["id_producto_simple"] is not None}
+            ids_componente = {fila["id_componente"] for fila in filas if fila["id_componente"] is not None}
+            ids_almacen = {fila["id_almacen"] for fila in filas if fila["id_almacen"] is not None}
+            nombres_simple = dict(
+                self.db.query(ProductoSimple.id, Articulo.nombre)
+                .join(Producto, Producto.id == ProductoSimple.id_producto)
+                .join(Articulo, Articulo.id == Producto.id_articulo)
+                .filter(ProductoSimple.id.in_(ids_simple))
+            ) if ids_simple else {}
+            nombres_componente = dict(
+                self.db.query(Componente.id, Componente.nombre).filter(Componente.id.in_(ids_componente))
+            ) if ids_componente else {}
+            rutas_almacen = dict(
+                self.db.query(Ubicacion.id, Ubicacion.ruta).filter(Ubicacion.id.in_(ids_almacen))
+            ) if ids_almacen else {}
+            if progreso:
+                progreso(80, "Nombres y almacenes cargados")
+            
+            elementos = []
+            por_almacen: Dict[Optional[int], Dict[str, float]] = {}
+            for fila in filas:
+                cantidad = float(fila["cantidad"])
+                es_simple = fila["id_producto_simple"] is not None
+                tipo = 'producto_simple' if es_simple else 'componente'
+                id_elemento = fila["id_producto_simple"] if es_simple else fila["id_componente"]
+                coste = costes[(tipo, id_elemento)]
+                proporcion = cantidad / coste["unidades"] if coste["unidades"] else 0
+                elemento = {
+                    'tipo': tipo,
+                    'id': id_elemento,
+                    'nombre': nombres_simple.get(id_elemento) if es_simple else nombres_componente.get(id_elemento),
+                    'id_almacen': fila["id_almacen"],
+                    'almacen': rutas_almacen.get(fila["id_almacen"]),
+                    'cantidad': cantidad,
+                    'coste_unitario_fifo': coste["coste_unitario_fifo"],
+                    'coste_unitario_medio': coste["coste_unitario_medio"],
+                    'valor_fifo': round(coste["valor_fifo"] * proporcion, 2),
+                    'valor_medio': round(coste["valor_medio"] * proporcion, 2)
+                }
+                elementos.append(elemento)
+                totales = por_almacen.setdefault(fila["id_almacen"], {'unidades': 0, 'valor_fifo': 0, 'valor_medio': 0})
+                for campo, valor in (('unidades', cantidad), ('valor_fifo', elemento['valor_fifo']), ('valor_medio', elemento['valor_medio'])):
+                    totales[campo] += valor
+                
+            return {
+                'fecha_corte': valoracion["fecha_corte"],
+                'instantanea_base': valoracion["instantanea"],
+                'total_unidades': sum(totales['unidades'] for totales in por_almacen.values()),
+                'total_elementos': len(costes),
+                'valor_total_fifo': round(sum(e["valor_fifo"] for e in valoracion["elementos"]), 2),
+                'valor_total_medio': round(sum(e["valor_medio"] for e in valoracion["elementos"]), 2),
+                'unidades_sin_coste': sum(e["unidades_sin_coste"] for e in valoracion["elementos"]),
+                'por_almacen': [
+                    {
+                        'id_almacen': id_almacen,
+                        'almacen': rutas_almacen.get(id_almacen),
+                        'unidades': totales['unidades'],
+                        'valor_fifo': round(totales['valor_fifo'], 2),
+                        'valor_medio': round(totales['valor_medio'], 2)
+                    }
+                    for id_almacen, totales in sorted(por_almacen.items(), key=lambda item: rutas_almacen.get(item[0]) or "~")
+                ],
+                'elementos': elementos
+            }
+            
+        except Exception as e:
+            logger.error("❌ Error generando reporte de valoración: %s", e)
+            raise
+            
+    def analizar_costos(self, id_producto: Optional[int] = None, id_familia: Optional[int] = None,
+                        fecha_corte: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Coste unitario FIFO y medio de productos y packs
+        
+        Los costes actuales salen de la caché de costes (solo se calculan los
+        productos y packs pedidos cuyas piezas han cambiado); con fecha de
+        corte se calcula el catálogo completo (`ValoracionService.costes_catalogo`).
+        Se filtra por producto o por la familia de su artículo. Los packs
+        se incluyen al filtrar por familia o sin filtro.
+        
+        Raises:
+            ValueError: Si el producto no existe o la fecha no es válida
+        """
+        from app.models.articulo import Articulo
+        from app.models.pack import Pack
+        from app.models.producto import Producto
+        
+        try:
+            costes = self.valoracion_service.costes_catalogo(fecha_corte) if fecha_corte else None
+            
+            productos = self.db.query(Producto.id, Articulo.nombre, Articulo.id_familia).join(
+                Articulo, Articulo.id == Producto.id_articulo
+            )
+            if id_producto is not None:
+                productos = productos.filter(Producto.id == id_producto)
+            if id_familia is not None:
+                productos = productos.filter(Articulo.id_familia == id_familia)
+            productos = productos.order_by(Producto.id).all()
+            if id_producto is not None and not productos:
+                raise ValueError(f"Producto {id_producto} no encontrado")
+            
+            packs = []
+            if id_producto is None:
+                consulta_packs = self.db.query(Pack.id, Pack.nombre).join(Articulo, Articulo.id == Pack.id_articulo)
+                if id_familia is not None:
+                    consulta_packs = consulta_packs.filter(Articulo.id_familia == id_familia)
+                packs = consulta_packs.order_by(Pack.id).all()
+            
+            if costes is None:
+                costes = {
+                    "fecha_corte": None,
+                    "productos": self.valoracion_service.costes_productos(fila.id for fila in productos),
+                    "packs": self.valoracion_service.costes_packs(fila.id for fila in packs),
+                }
+                
+            return {
+                'fecha_corte': costes["fecha_corte"],
+                'productos': [
+                    {'id_producto': fila.id, 'nombre': fila.nombre, **costes["productos"][fila.id]}
+                    for fila in productos if fila.id in costes["productos"]
+                ],
+                'packs': [
+                    {'id_pack': fila.id, 'nombre': fila.nombre, **costes["packs"][fila.id]}
+                    for fila in packs
+                ]
+            }
+            
+        except Exception as e:
+            logger.error("❌ Error en análisis de costos: %s", e)
+            raise
+            
+    # ==========================================
+    # VALIDACIÓN Y MANTENIMIENTO
+    # ==========================================
+    
+    def validar_integridad_datos(self, chequeos: Optional[List[str]] = None, muestra: int = 10) -> Dict[str, Any]:
+        """
+        Auditar la integridad del catálogo
+        
+        Cada chequeo es una consulta de conjunto; se ejecutan en paralelo en
+        conexiones propias (ver IntegridadService).
+        
+        Args:
+            chequeos (List[str], optional): Chequeos a ejecutar (todos por defecto)
+            muestra (int): IDs de ejemplo por chequeo
+            
+        Returns:
+            Dict[str, Any]: Número de incidencias y muestra de IDs por chequeo
+        """
+        try:
+            return self.integridad_service.validar(chequeos, muestra)
+        except Exception as e:
+            logger.error("❌ Error validando integridad: %s", e)
+            raise
+            
+    def limpiar_registros_huerfanos(self, limpiezas: Optional[List[str]] = None, simular: bool = False,
+                                    tamano_lote: Optional[int] = None, pausa: Optional[float] = None,
+                                    desde: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        Borrar los registros huérfanos en lotes cortos
+        
+        Cada lote es una transacción propia que salta las filas bloqueadas,
+        así que puede ejecutarse con el almacén en marcha (ver LimpiezaService).
+        
+        Args:
+            limpiezas (List[str], optional): Tipos de huérfano a limpiar (todos por defecto)
+            simular (bool): Solo contar lo que se borraría
+            tamano_lote (int, optional): Filas por lote
+            pausa (float, optional): Segundos entre lotes
+            desde (Dict[str, int], optional): Cursores de una limpieza anterior, para reanudarla
+            
+        Returns:
+            Dict[str, Any]: Registros borrados (o a borrar) por tipo, cursores y lotes
+        """
+        try:
+            return self.limpieza_service.limpiar(limpiezas, simular, tamano_lote, pausa, desde)
+        except Exception as e:
+            logger.error("❌ Error limpiando registros huérfanos: %s", e)
+            raise
+            
+    def exportar_inventario(self, incluir_stock: bool = True, lote: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Filas de la exportación del inventario: una por producto, en orden de id
+        
+        La consulta se ejecuta al llamar y las filas se leen de `lote` en
+        `lote` al iterar (cursor de servidor en PostgreSQL), para enviarlas en
+        streaming sin cargar el catálogo completo en memoria. El stock de los
+        productos simples sale de la fila total de `disponibilidad_stock`.
+        
+        Args:
+            incluir_stock (bool): Añadir cantidad_actual y registros_stock
+            lote (int): Filas leídas de la base de datos cada vez
+            
+        Returns:
+            Iterator[Dict[str, Any]]: Filas con las claves de `columnas_exportacion`
+        """
+        from app.models.articulo import Articulo
+        from app.models.disponibilidad_stock import DisponibilidadStock
+        from app.models.producto import Producto
+        from app.models.producto_simple import ProductoSimple
+        
+        try:
+            consulta = (
+                select(
+                    Producto.id.label("id_producto"), Producto.tipo_producto,
+                    Articulo.id.label("id_articulo"), Articulo.codigo, Articulo.nombre,
+                    Articulo.activo, Articulo.id_familia, ProductoSimple.id.label("id_producto_simple")
+                )
+                .join(Articulo, Articulo.id == Producto.id_articulo)
+                .outerjoin(ProductoSimple, ProductoSimple.id_producto == Producto.id)
+                .order_by(Producto.id)
+            )
+            if incluir_stock:
+                # Fila total del resumen (id_almacen NULL): todos los almacenes
+                consulta = consulta.outerjoin(DisponibilidadStock, and_(
+                    DisponibilidadStock.id_producto_simple == ProductoSimple.id,
+                    DisponibilidadStock.id_almacen.is_(None)
+                )).add_columns(
+                    DisponibilidadStock.cantidad_actual, DisponibilidadStock.registros.label("registros_stock")
+                )
+            
+            filas = self.db.execute(consulta.execution_options(yield_per=lote)).mappings()
+            return (self._fila_exportacion(fila, incluir_stock) for fila in filas)
+        except Exception as e:
+            logger.error("❌ Error exportando inventario: %s", e)
+            raise
+            
+    @staticmethod
+    def columnas_exportacion(incluir_stock: bool = True) -> List[str]:
+        """Columnas de la exportación, en orden (cabecera del CSV)"""
+        columnas = list(COLUMNAS_EXPORTACION)
+        return columnas + ['cantidad_actual', 'registros_stock'] if incluir_stock else columnas
+        
+    @staticmethod
+    def _fila_exportacion(fila, incluir_stock: bool) -> Dict[str, Any]:
+        """Fila de la exportación; los simples sin stock cuentan 0 unidades, los compuestos no tienen"""
+        resultado = {columna: fila[columna] for columna in COLUMNAS_EXPORTACION}
+        if incluir_stock:
+            es_simple = fila["id_producto_simple"] is not None
+            resultado['cantidad_actual'] = float(fila["cantidad_actual"] or 0) if es_simple else None
+            resultado['registros_stock'] = int(fila["registros_stock"] or 0) if es_simple else None
+        return resultado
@@ -0,0 +1,196 @@
+"""
+🧹 Servicio de Limpieza - Borrado por lotes de registros huérfanos
+
+Un único DELETE sobre todo el catálogo bloquearía durante minutos tablas
+calientes como `stock`. Aquí cada tipo de huérfano se borra en lotes
+acotados (`WITH lote AS (SELECT ... LIMIT n) DELETE ...`), cada lote en su
+propia transacción corta:
+
+- Las filas candidatas se toman con `FOR UPDATE SKIP LOCKED`: una fila que
+  está moviendo otra transacción se salta (queda para la próxima pasada) en
+  lugar de esperarla.
+- `lock_timeout` evita quedarse en cola detrás de un bloqueo de tabla (y
+  bloquear a su vez a los movimientos que lleguen después); el lote se
+  reintenta tras una pausa.
+- Entre lotes se hace una pausa para no saturar la base de datos.
+
+Los huérfanos se detectan con los chequeos de `integridad_service`, y el
+recorrido avanza por ID: cada lote confirmado queda hecho, así que una
+limpieza interrumpida se reanuda volviendo a lanzarla (o desde los cursores
+devueltos con `desde`).
+"""
+
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.componente_producto import ComponenteProducto
+from app.models.disponibilidad_stock import descontar_bajas
+from app.models.evento_stock_outbox import evento_eliminacion, publicar_eventos
+from app.models.movimiento_stock import registrar_bajas
+from app.models.pack_producto import PackProducto
+from app.models.registro_eliminado import RegistroEliminado
+from app.models.stock import Stock
+from .integridad_service import CHEQUEOS_INTEGRIDAD
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Huérfanos que se pueden borrar, en orden de limpieza: chequeo de integridad -> modelo
+LIMPIEZAS_HUERFANOS = {
+    "pack_producto_huerfano": PackProducto,
+    "componente_producto_huerfano": ComponenteProducto,
+    "stock_huerfano": Stock,
+}
+
+LIMPIEZA_TAMANO_LOTE = int(os.getenv("LIMPIEZA_TAMANO_LOTE", "1000"))
+LIMPIEZA_PAUSA = float(os.getenv("LIMPIEZA_PAUSA", "0.05"))
+LIMPIEZA_LOCK_TIMEOUT_MS = int(os.getenv("LIMPIEZA_LOCK_TIMEOUT_MS", "2000"))
+LIMPIEZA_REINTENTOS = 5
+MOTIVO_LIMPIEZA = "Limpieza de huérfanos"
+
+# SQLSTATE de PostgreSQL para lock_timeout
+_LOCK_NO_DISPONIBLE = "55P03"
+
+
+class LimpiezaService:
+    """
+    🧹 Limpieza de registros huérfanos por lotes
+
+    Confirma cada lote en la sesión recibida: no debe tener cambios pendientes.
+    """
+
+    def __init__(self, db_session: Session):
+        """
+        Constructor del servicio de limpieza
+
+        Args:
+            db_session (Session): Sesión de base de datos SQLAlchemy
+        """
+        self.db = db_session
+
+    def _lote(self, nombre: str, cursor: int, tamano_lote: int, simular: bool) -> List[int]:
+        """
+        Borrar (o solo localizar, si `simular`) el siguiente lote de huérfanos
+
+        Returns:
+            List[int]: IDs del lote, en orden
+        """
+        modelo = LIMPIEZAS_HUERFANOS[nombre]
+        _, construir = CHEQUEOS_INTEGRIDAD[nombre]
+        candidatos = construir().where(modelo.id > cursor).order_by(modelo.id).limit(tamano_lote)
+        if simular:
+            ids = list(self.db.execute(candidatos).scalars())
+            self.db.rollback()
+            return ids
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(text(f"SET LOCAL lock_timeout = {int(LIMPIEZA_LOCK_TIMEOUT_MS)}"))
+        # CTE materializada: como subconsulta del IN, PostgreSQL puede volver a
+        # evaluarla (y con SKIP LOCKED tomar filas nuevas) y borrar más del lote
+        lote = candidatos.with_for_update(skip_locked=True).cte("lote").prefix_with("MATERIALIZED")
+        filas = self.db.execute(
+            delete(modelo).where(modelo.id.in_(select(lote.c.id))).returning(*modelo.__table__.c)
+        ).all()
+        if filas:
+            # El DELETE masivo no pasa por los listeners del flush: marcas de
+            # borrado para /sync/changes y, para el stock, lo mismo que haría una
+            # baja con el ORM (movimiento, resumen de disponibilidad y evento)
+            self.db.execute(
+                insert(RegistroEliminado),
+                [{"tabla": modelo.__tablename__, "id_registro": fila.id} for fila in filas]
+            )
+            if modelo is Stock:
+                conexion = self.db.connection()
+                registrar_bajas(conexion, filas, MOTIVO_LIMPIEZA)
+                descontar_bajas(conexion, filas)
+                publicar_eventos(conexion, [evento_eliminacion(fila) for fila in filas])
+        self.db.commit()
+        return sorted(fila.id for fila in filas)
+
+    def limpiar(self, limpiezas: Optional[List[str]] = None, simular: bool = False,
+                tamano_lote: Optional[int] = None, pausa: Optional[float] = None,
+                desde: Optional[Dict[str, int]] = None,
+                progreso: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Borrar los registros huérfanos por lotes
+
+        Args:
+            limpiezas (List[str], optional): Tipos de huérfano a limpiar (todos por defecto)
+            simular (bool): Solo contar lo que se borraría, sin bloquear ni borrar
+            tamano_lote (int, optional): Filas por lote (LIMPIEZA_TAMANO_LOTE por defecto)
+            pausa (float, optional): Segundos entre lotes (LIMPIEZA_PAUSA por defecto)
+            desde (Dict[str, int], optional): Cursor (último ID procesado) por tipo, para reanudar
+            progreso (Callable, optional): Se llama tras cada lote con (tipo, filas acumuladas, cursor)
+
+        Returns:
+            Dict[str, Any]: Filas borradas (o a borrar) y cursor final por tipo, lotes y duración
+
+        Raises:
+            ValueError: Si algún tipo no existe o los parámetros no son válidos
+        """
+        nombres = list(limpiezas) if limpiezas else list(LIMPIEZAS_HUERFANOS)
+        desconocidos = [nombre for nombre in nombres if nombre not in LIMPIEZAS_HUERFANOS]
+        if desconocidos:
+            raise ValueError(
+                f"Limpiezas desconocidas: {', '.join(desconocidos)}. "
+                f"Disponibles: {', '.join(LIMPIEZAS_HUERFANOS)}"
+            )
+        tamano_lote = LIMPIEZA_TAMANO_LOTE if tamano_lote is None else tamano_lote
+        pausa = LIMPIEZA_PAUSA if pausa is None else pausa
+        if tamano_lote < 1:
+            raise ValueError("El tamaño de lote debe ser positivo")
+        if pausa < 0:
+            raise ValueError("La pausa no puede ser negativa")
+        cursores = {nombre: int((desde or {}).get(nombre, 0)) for nombre in nombres}
+
+        inicio = time.perf_counter()
+        filas = {nombre: 0 for nombre in nombres}
+        lotes = 0
+        for nombre in nombres:
+            reintentos = 0
+            while True:
+                try:
+                    ids = self._lote(nombre, cursores[nombre], tamano_lote, simular)
+                except OperationalError as e:
+                    self.db.rollback()
+                    if getattr(e.orig, "pgcode", None) != _LOCK_NO_DISPONIBLE or reintentos >= LIMPIEZA_REINTENTOS:
+                        logger.error("❌ Error limpiando %s: %s", nombre, e)
+                        raise
+                    reintentos += 1
+                    time.sleep(max(pausa, 0.1) * reintentos)
+                    continue
+                except SQLAlchemyError as e:
+                    self.db.rollback()
+                    logger.error("❌ Error limpiando %s: %s", nombre, e)
+                    raise
+
+                reintentos = 0
+                if not ids:
+                    break
+                lotes += 1
+                filas[nombre] += len(ids)
+                cursores[nombre] = ids[-1]
+                if progreso:
+                    progreso(nombre, filas[nombre], cursores[nombre])
+                if len(ids) < tamano_lote:
+                    break
+                if pausa:
+                    time.sleep(pausa)
+
+        total = sum(filas.values())
+        duracion_ms = round((time.perf_counter() - inicio) * 1000, 1)
+        accion = "a eliminar" if simular else "eliminados"
+        logger.info("✅ Limpieza de huérfanos: %s registros %s en %s lotes (%s ms)", total, accion, lotes, duracion_ms)
+        return {
+            "simulacion": simular,
+            "total": total,
+            "por_tipo": filas,
+            "cursores": cursores,
+            "lotes": lotes,
+            "duracion_ms": duracion_ms,
+        }
@@ -0,0 +1,229 @@
+"""
+📮 Servicio de Outbox - Publicación de eventos de cambio de stock
+
+Los eventos se escriben en `evento_stock_outbox` en la misma transacción que
+cada cambio de Stock (ver `app.models.evento_stock_outbox`). Este módulo
+contiene el relay que los lee por lotes y los entrega a un publicador.
+
+La entrega es "al menos una vez": si el relay cae entre publicar y marcar
+el lote, esos eventos se vuelven a publicar. Los consumidores deben
+descartar duplicados por `id` del evento.
+
+Ejecución como proceso independiente:
+    python -m app.services.outbox_service
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import SessionLocal
+from app.models.evento_stock_outbox import EventoStockOutbox
+from app.registro import configurar_registro
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================
+# PUBLICADORES
+# ==========================================
+
+class PublicadorMemoria:
+    """
+    🧠 Publicador en proceso
+
+    Guarda los eventos publicados y los reenvía a los suscriptores
+    registrados. Pensado para desarrollo local y tests.
+    """
+
+    def __init__(self):
+        self.eventos: List[Dict[str, Any]] = []
+        self._suscriptores: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+    def suscribir(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Registrar una función que recibirá cada evento publicado"""
+        with self._lock:
+            self._suscriptores.append(callback)
+
+    def publicar(self, eventos: List[Dict[str, Any]]) -> None:
+        """Publicar un lote de eventos"""
+        with self._lock:
+            self.eventos.extend(eventos)
+            suscriptores = list(self._suscriptores)
+        for evento in eventos:
+            for callback in suscriptores:
+                callback(evento)
+
+
+class PublicadorArchivo:
+    """
+    📄 Publicador a fichero JSON Lines
+
+    Añade un evento por línea al fichero indicado. Otros procesos pueden
+    consumirlo con `tail -f` o leyendo desde el último `id` procesado.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+
+    def publicar(self, eventos: List[Dict[str, Any]]) -> None:
+        """Publicar un lote de eventos (una escritura y un fsync por lote)"""
+        lineas = "".join(json.dumps(evento, ensure_ascii=False) + "\n" for evento in eventos)
+        with open(self.ruta, "a", encoding="utf-8") as fichero:
+            fichero.write(lineas)
+            fichero.flush()
+            os.fsync(fichero.fileno())
+
+
+def crear_publicador_desde_entorno():
+    """
+    Crear el publicador configurado en el entorno para el relay
+
+    Solo admite publicadores duraderos: en un proceso aparte, el publicador
+    en memoria no tiene suscriptores y los eventos se marcarían como
+    publicados sin haber llegado a nadie. `PublicadorMemoria` se construye
+    directamente, en el mismo proceso que sus suscriptores (tests).
+
+    Variables:
+        OUTBOX_PUBLICADOR: 'archivo' (por defecto)
+        OUTBOX_ARCHIVO: Ruta del fichero para el publicador 'archivo'
+
+    Raises:
+        ValueError: Si el publicador configurado no existe o no es duradero
+    """
+    tipo = os.getenv("OUTBOX_PUBLICADOR", "archivo")
+    if tipo == "archivo":
+        return PublicadorArchivo(os.getenv("OUTBOX_ARCHIVO", "eventos_stock.jsonl"))
+    if tipo == "memoria":
+        raise ValueError("El publicador 'memoria' no es duradero: el relay perdería los eventos")
+    raise ValueError(f"Publicador de outbox no válido: '{tipo}'")
+
+
+# ==========================================
+# RELAY
+# ==========================================
+
+class OutboxRelay:
+    """
+    🚚 Relay del outbox de stock
+
+    Bloquea un lote de eventos pendientes con `FOR UPDATE SKIP LOCKED`, lo
+    publica y lo marca como publicado en la misma transacción. Varios relays
+    pueden ejecutarse a la vez sin repartirse el mismo evento.
+    """
+
+    def __init__(self, publicador, session_factory: sessionmaker = SessionLocal,
+                 tamano_lote: int = 100, max_intentos: int = 10):
+        """
+        Constructor del relay
+
+        Args:
+            publicador: Objeto con un método `publicar(eventos: List[dict])`
+            session_factory (sessionmaker): Fábrica de sesiones de base de datos
+            tamano_lote (int): Máximo de eventos por lote
+            max_intentos (int): Intentos tras los que un evento deja de reintentarse
+        """
+        self.publicador = publicador
+        self.session_factory = session_factory
+        self.tamano_lote = tamano_lote
+        self.max_intentos = max_intentos
+
+    @staticmethod
+    def _a_mensaje(evento: EventoStockOutbox) -> Dict[str, Any]:
+        """Serializar un evento del outbox al mensaje publicado"""
+        return {
+            "id": evento.id,
+            "tipo": evento.tipo,
+            "id_stock": evento.id_stock,
+            "datos": evento.datos,
+            "created_at": evento.created_at.isoformat() if evento.created_at else None,
+        }
+
+    def procesar_lote(self) -> int:
+        """
+        Publicar un lote de eventos pendientes
+
+        Returns:
+            int: Número de eventos publicados (0 si no había o falló la publicación)
+        """
+        db: Session = self.session_factory()
+        try:
+            eventos = db.query(EventoStockOutbox).filter(
+                EventoStockOutbox.publicado_at.is_(None),
+                EventoStockOutbox.intentos < self.max_intentos
+            ).order_by(EventoStockOutbox.id).limit(self.tamano_lote).with_for_update(skip_locked=True).all()
+            if not eventos:
+                db.rollback()
+                return 0
+
+            try:
+                self.publicador.publicar([self._a_mensaje(evento) for evento in eventos])
+            except Exception as e:
+                for evento in eventos:
+                    evento.intentos += 1
+                    evento.ultimo_error = str(e)[:1000]
+                db.commit()
+                logger.error("❌ Error publicando %s eventos de stock: %s", len(eventos), e)
+                return 0
+
+            db.query(EventoStockOutbox).filter(
+                EventoStockOutbox.id.in_([evento.id for evento in eventos])
+            ).update({EventoStockOutbox.publicado_at: func.now()}, synchronize_session=False)
+            db.commit()
+            logger.info("✅ %s eventos de stock publicados", len(eventos))
+            return len(eventos)
+
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error("❌ Error leyendo el outbox de stock: %s", e)
+            raise
+        finally:
+            db.close()
+
+    def procesar_pendientes(self) -> int:
+        """
+        Publicar lotes hasta vaciar el outbox
+
+        Returns:
+            int: Total de eventos publicados
+        """
+        total = 0
+        while True:
+            publicados = self.procesar_lote()
+            total += publicados
+            if publicados < self.tamano_lote:
+                return total
+
+    def ejecutar(self, intervalo: float = 1.0, detener: Optional[threading.Event] = None) -> None:
+        """
+        Bucle del relay: publica mientras haya eventos y espera `intervalo`
+        segundos cuando el outbox está vacío
+
+        Args:
+            intervalo (float): Espera entre sondeos sin eventos
+            detener (Optional[threading.Event]): Señal para terminar el bucle
+        """
+        detener = detener or threading.Event()
+        logger.info("✅ Relay de outbox iniciado (lote=%s, intervalo=%ss)", self.tamano_lote, intervalo)
+        while not detener.is_set():
+            try:
+                publicados = self.procesar_pendientes()
+            except SQLAlchemyError:
+                publicados = 0
+            if not publicados:
+                detener.wait(intervalo)
+
+
+if __name__ == "__main__":
+    configurar_registro()
+    OutboxRelay(
+        crear_publicador_desde_entorno(),
+        tamano_lote=int(os.getenv("OUTBOX_TAMANO_LOTE", "100"))
+    ).ejecutar(intervalo=float(os.getenv("OUTBOX_INTERVALO", "1.0")))
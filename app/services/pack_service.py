@@ -56,12 +56,12 @@ class PackService(BaseService):
                 for pp in pack_productos:
                     self.db.refresh(pp)
             
-            logger.info(f"✅ Pack '{nombre}' creado con {len(pack_productos)} productos")
+            logger.info("✅ Pack '%s' creado con %s productos", nombre, len(pack_productos))
             return {'pack': pack, 'pack_productos': pack_productos}
             
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error creando pack completo: {e}")
+            logger.error("❌ Error creando pack completo: %s", e)
             raise
             
     def agregar_producto_a_pack(self, pack_id: int, producto_id: int, 
@@ -82,7 +82,7 @@ class PackService(BaseService):
             
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error agregando producto a pack: {e}")
+            logger.error("❌ Error agregando producto a pack: %s", e)
             raise
             
     def obtener_productos_del_pack(self, pack_id: int) -> List[PackProducto]:
@@ -0,0 +1,343 @@
+"""
+🧺 Servicio de Picking - Listas de preparación de pedidos
+
+Convierte un pedido (o una oleada de pedidos) en una lista de recogida:
+explota los packs en sus productos y los productos compuestos en sus
+componentes, reparte las cantidades entre las ubicaciones con stock y
+ordena las paradas para recorrer el almacén una sola vez.
+
+Modelo de distancias: los pasillos son paralelos y se cruzan por el frente
+o por el fondo. Dentro de un pasillo se avanza una unidad por estantería;
+pasar a otro pasillo cuesta DISTANCIA_ENTRE_PASILLOS por pasillo más el
+tramo hasta el cruce más cercano (frente o fondo). El hueco (altura) no
+cuenta en la distancia, solo en el orden dentro de la estantería.
+"""
+
+import bisect
+from collections import defaultdict
+from functools import lru_cache
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.componente_producto import ComponenteProducto
+from app.models.pack_producto import PackProducto
+from app.models.producto_compuesto import ProductoCompuesto
+from app.models.producto_simple import ProductoSimple
+from app.models.stock import Stock
+from app.models.ubicacion import SEPARADOR_RUTA, posicion_de_codigo
+import logging
+
+logger = logging.getLogger(__name__)
+
+ESTRATEGIAS_RUTA = ("serpentina", "vecino", "ninguna")
+
+# Coste de pasar de un pasillo al siguiente, en estanterías
+DISTANCIA_ENTRE_PASILLOS = 3
+
+# Orden del stock sin ubicación: al final de la ruta
+_SIN_UBICACION = "~"
+
+
+# ==========================================
+# RUTAS
+# ==========================================
+
+@lru_cache(maxsize=65536)
+def coordenadas(ruta: Optional[str]) -> Tuple[str, int, int, int]:
+    """
+    Coordenadas de una ruta de ubicación: (almacén, pasillo, estantería, hueco)
+
+    Los niveles ausentes o sin número cuentan como posición 0. Se memoriza:
+    en una oleada las mismas ubicaciones se repiten mucho.
+    """
+    if not ruta:
+        return (_SIN_UBICACION, 0, 0, 0)
+    segmentos = ruta.split(SEPARADOR_RUTA)
+    posiciones = [posicion_de_codigo(segmento) or 0 for segmento in segmentos[1:]]
+    posiciones += [0] * (3 - len(posiciones))
+    return (segmentos[0], posiciones[0], posiciones[1], posiciones[2])
+
+
+def _distancia(origen: Tuple[int, int], destino: Tuple[int, int], largo: int) -> int:
+    """Distancia entre dos posiciones (pasillo, estantería) de un mismo almacén"""
+    (pasillo_a, estanteria_a), (pasillo_b, estanteria_b) = origen, destino
+    if pasillo_a == pasillo_b:
+        return abs(estanteria_a - estanteria_b)
+    return (abs(pasillo_a - pasillo_b) * DISTANCIA_ENTRE_PASILLOS
+            + min(estanteria_a + estanteria_b, 2 * largo - estanteria_a - estanteria_b))
+
+
+def _por_almacen(recogidas: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    grupos: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for recogida in recogidas:
+        grupos[coordenadas(recogida.get("ubicacion"))[0]].append(recogida)
+    return grupos
+
+
+def _largo_pasillo(recogidas: List[Dict[str, Any]]) -> int:
+    """Estantería del cruce del fondo: una más que la última visitada"""
+    return max(coordenadas(recogida.get("ubicacion"))[2] for recogida in recogidas) + 1
+
+
+def longitud_ruta(recogidas: List[Dict[str, Any]]) -> int:
+    """
+    Distancia recorrida visitando las recogidas en el orden dado
+
+    Cada almacén se recorre desde su origen (pasillo 0, frente) y vuelve a él.
+    """
+    total = 0
+    for recogidas_almacen in _por_almacen(recogidas).values():
+        largo = _largo_pasillo(recogidas_almacen)
+        actual = (0, 0)
+        for recogida in recogidas_almacen:
+            _, pasillo, estanteria, _ = coordenadas(recogida.get("ubicacion"))
+            total += _distancia(actual, (pasillo, estanteria), largo)
+            actual = (pasillo, estanteria)
+        total += _distancia(actual, (0, 0), largo)
+    return total
+
+
+def ordenar_serpentina(recogidas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Ordenar en serpentina (S-shape): los pasillos visitados se recorren por
+    orden, alternando el sentido, y cada pasillo se recorre entero
+
+    O(n log n): válido para oleadas de decenas de miles de recogidas.
+    """
+    ordenadas = []
+    for almacen, recogidas_almacen in sorted(_por_almacen(recogidas).items()):
+        claves = {id(recogida): coordenadas(recogida.get("ubicacion")) for recogida in recogidas_almacen}
+        pasillos = sorted({clave[1] for clave in claves.values()})
+        sentido = {pasillo: 1 if indice % 2 == 0 else -1 for indice, pasillo in enumerate(pasillos)}
+
+        def clave_serpentina(recogida):
+            _, pasillo, estanteria, hueco = claves[id(recogida)]
+            return (pasillo, sentido[pasillo] * estanteria, hueco, recogida.get("ubicacion") or "")
+
+        ordenadas.extend(sorted(recogidas_almacen, key=clave_serpentina))
+    return ordenadas
+
+
+def ordenar_vecino_mas_cercano(recogidas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Ordenar visitando siempre la posición pendiente más cercana
+
+    Con pasillos paralelos, el candidato más cercano de otro pasillo es su
+    estantería pendiente más próxima al frente o al fondo, y el del pasillo
+    actual una de las dos vecinas por bisección: cada paso cuesta
+    O(pasillos) en lugar de O(posiciones pendientes).
+    """
+    ordenadas = []
+    for almacen, recogidas_almacen in sorted(_por_almacen(recogidas).items()):
+        largo = _largo_pasillo(recogidas_almacen)
+
+        # (pasillo, estantería) -> recogidas, en orden de hueco
+        por_posicion: Dict[Tuple[int, int], List[Dict[str, Any]]] = defaultdict(list)
+        for recogida in sorted(recogidas_almacen, key=lambda r: (coordenadas(r.get("ubicacion"))[3], r.get("ubicacion") or "")):
+            _, pasillo, estanteria, _ = coordenadas(recogida.get("ubicacion"))
+            por_posicion[(pasillo, estanteria)].append(recogida)
+        pendientes: Dict[int, List[int]] = defaultdict(list)
+        for pasillo, estanteria in sorted(por_posicion):
+            pendientes[pasillo].append(estanteria)
+
+        actual = (0, 0)
+        while pendientes:
+            mejor = None
+            for pasillo, estanterias in pendientes.items():
+                if pasillo == actual[0]:
+                    indice = bisect.bisect_left(estanterias, actual[1])
+                    candidatas = estanterias[max(indice - 1, 0):indice + 1]
+                else:
+                    candidatas = (estanterias[0], estanterias[-1])
+                for estanteria in candidatas:
+                    clave = (_distancia(actual, (pasillo, estanteria), largo), pasillo, estanteria)
+                    if mejor is None or clave < mejor:
+                        mejor = clave
+            _, pasillo, estanteria = mejor
+            estanterias = pendientes[pasillo]
+            estanterias.pop(bisect.bisect_left(estanterias, estanteria))
+            if not estanterias:
+                del pendientes[pasillo]
+            ordenadas.extend(por_posicion[(pasillo, estanteria)])
+            actual = (pasillo, estanteria)
+    return ordenadas
+
+
+def ordenar_recogidas(recogidas: List[Dict[str, Any]], estrategia: str = "serpentina") -> List[Dict[str, Any]]:
+    """
+    Ordenar las recogidas con la estrategia indicada
+
+    Raises:
+        ValueError: Si la estrategia no existe
+    """
+    if estrategia == "serpentina":
+        return ordenar_serpentina(recogidas)
+    if estrategia == "vecino":
+        return ordenar_vecino_mas_cercano(recogidas)
+    if estrategia == "ninguna":
+        return list(recogidas)
+    raise ValueError(f"Estrategia de ruta no válida: '{estrategia}'. Opciones: {', '.join(ESTRATEGIAS_RUTA)}")
+
+
+# ==========================================
+# SERVICIO
+# ==========================================
+
+class PickingService:
+    """
+    🧺 Servicio para generar listas de picking
+
+    Explota toda la oleada con una consulta por nivel (packs, productos
+    simples, compuestos) y lee las ubicaciones con stock de todos los
+    elementos en una sola consulta, sea cual sea el tamaño de la
+    oleada.
+    """
+
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def _explotar(self, lineas: List[Dict[str, Any]]) -> List[Tuple[Optional[str], str, int, Decimal]]:
+        """
+        Convertir las líneas del pedido en necesidades por elemento con stock
+
+        Returns:
+            List[Tuple]: (pedido, 'producto_simple' | 'componente', id, cantidad)
+
+        Raises:
+            ValueError: Si algún pack o producto no existe o no tiene nada que recoger
+        """
+        ids_pack = {linea["id_pack"] for linea in lineas if linea.get("id_pack") is not None}
+        ids_producto = {linea["id_producto"] for linea in lineas if linea.get("id_producto") is not None}
+
+        contenido_pack: Dict[int, List[Tuple[int, Decimal]]] = defaultdict(list)
+        if ids_pack:
+            for id_pack, id_producto, cantidad in self.db.query(
+                PackProducto.id_pack, PackProducto.id_producto, PackProducto.cantidad_incluida
+            ).filter(PackProducto.id_pack.in_(ids_pack)):
+                contenido_pack[id_pack].append((id_producto, cantidad))
+                ids_producto.add(id_producto)
+        sin_contenido = ids_pack - contenido_pack.keys()
+        if sin_contenido:
+            raise ValueError(f"Packs sin productos o inexistentes: {sorted(sin_contenido)}")
+
+        # Producto -> elementos con stock (simple: él mismo; compuesto: sus componentes)
+        elementos: Dict[int, List[Tuple[str, int, Decimal]]] = defaultdict(list)
+        if ids_producto:
+            for id_producto, id_simple in self.db.query(
+                ProductoSimple.id_producto, ProductoSimple.id
+            ).filter(ProductoSimple.id_producto.in_(ids_producto)):
+                elementos[id_producto].append(("producto_simple", id_simple, Decimal(1)))
+            for id_producto, id_componente, cantidad_necesaria in self.db.query(
+                ProductoCompuesto.id_producto, ComponenteProducto.id_componente, ComponenteProducto.cantidad_necesaria
+            ).join(ComponenteProducto, ComponenteProducto.id_producto_compuesto == ProductoCompuesto.id).filter(
+                ProductoCompuesto.id_producto.in_(ids_producto)
+            ).order_by(ComponenteProducto.id):
+                elementos[id_producto].append(("componente", id_componente, Decimal(cantidad_necesaria)))
+        sin_elementos = ids_producto - elementos.keys()
+        if sin_elementos:
+            raise ValueError(f"Productos sin elementos que recoger o inexistentes: {sorted(sin_elementos)}")
+
+        necesidades = []
+        for linea in lineas:
+            cantidad = Decimal(str(linea["cantidad"]))
+            productos = (
+                contenido_pack[linea["id_pack"]] if linea.get("id_pack") is not None
+                else [(linea["id_producto"], Decimal(1))]
+            )
+            for id_producto, por_unidad in productos:
+                for tipo, id_elemento, por_producto in elementos[id_producto]:
+                    necesidades.append((linea.get("pedido"), tipo, id_elemento, cantidad * por_unidad * por_producto))
+        return necesidades
+
+    def _ubicaciones_con_stock(self, ids_simple: List[int], ids_componente: List[int]) -> Dict[Tuple[str, int], List[Dict[str, Any]]]:
+        """Stock disponible de todos los elementos, en una sola consulta"""
+        filtros = []
+        if ids_simple:
+            filtros.append(Stock.id_producto_simple.in_(ids_simple))
+        if ids_componente:
+            filtros.append(Stock.id_componente.in_(ids_componente))
+        disponibles: Dict[Tuple[str, int], List[Dict[str, Any]]] = defaultdict(list)
+        if not filtros:
+            return disponibles
+        for fila in self.db.query(
+            Stock.id, Stock.id_producto_simple, Stock.id_componente, Stock.cantidad_actual,
+            Stock.id_ubicacion, Stock.ubicacion_almacen
+        ).filter(or_(*filtros), Stock.cantidad_actual > 0).order_by(Stock.id):
+            clave = ("producto_simple", fila.id_producto_simple) if fila.id_producto_simple else ("componente", fila.id_componente)
+            disponibles[clave].append({
+                "id_stock": fila.id,
+                "id_ubicacion": fila.id_ubicacion,
+                "ubicacion": fila.ubicacion_almacen,
+                "disponible": Decimal(fila.cantidad_actual)
+            })
+        return disponibles
+
+    def generar_lista(self, lineas: List[Dict[str, Any]], estrategia: str = "serpentina") -> Dict[str, Any]:
+        """
+        Generar la lista de picking de un pedido u oleada
+
+        Cada necesidad se cubre primero desde una ubicación que tenga toda la
+        cantidad (la primera de la ruta) y, si ninguna basta, desde las de más
+        stock, para hacer el mínimo de paradas. Lo que no se puede cubrir se
+        devuelve en `faltantes`.
+
+        Args:
+            lineas: Dicts con 'id_producto' o 'id_pack', 'cantidad' y opcionalmente 'pedido'
+            estrategia (str): 'serpentina', 'vecino' o 'ninguna'
+
+        Raises:
+            ValueError: Si alguna línea no es válida o la estrategia no existe
+        """
+        if estrategia not in ESTRATEGIAS_RUTA:
+            raise ValueError(f"Estrategia de ruta no válida: '{estrategia}'. Opciones: {', '.join(ESTRATEGIAS_RUTA)}")
+        try:
+            necesidades = self._explotar(lineas)
+            disponibles = self._ubicaciones_con_stock(
+                sorted({id_elemento for _, tipo, id_elemento, _ in necesidades if tipo == "producto_simple"}),
+                sorted({id_elemento for _, tipo, id_elemento, _ in necesidades if tipo == "componente"})
+            )
+        except SQLAlchemyError as e:
+            logger.error("❌ Error generando lista de picking: %s", e)
+            raise
+
+        recogidas = []
+        faltantes = []
+        for pedido, tipo, id_elemento, cantidad in necesidades:
+            pendiente = cantidad
+            candidatas = sorted(
+                (stock for stock in disponibles.get((tipo, id_elemento), []) if stock["disponible"] > 0),
+                key=lambda stock: (stock["disponible"] < pendiente, coordenadas(stock["ubicacion"]) if stock["disponible"] >= pendiente else -stock["disponible"])
+            )
+            for stock in candidatas:
+                if pendiente <= 0:
+                    break
+                tomada = min(pendiente, stock["disponible"])
+                stock["disponible"] -= tomada
+                pendiente -= tomada
+                recogidas.append({
+                    "pedido": pedido,
+                    "id_stock": stock["id_stock"],
+                    "id_ubicacion": stock["id_ubicacion"],
+                    "ubicacion": stock["ubicacion"],
+                    f"id_{tipo}": id_elemento,
+                    "cantidad": float(tomada)
+                })
+            if pendiente > 0:
+                faltantes.append({"pedido": pedido, f"id_{tipo}": id_elemento, "cantidad_pendiente": float(pendiente)})
+
+        ordenadas = ordenar_recogidas(recogidas, estrategia)
+        for orden, recogida in enumerate(ordenadas, start=1):
+            recogida["orden"] = orden
+
+        logger.info("✅ Lista de picking generada: %s recogidas, %s faltantes", len(ordenadas), len(faltantes))
+        return {
+            "estrategia": estrategia,
+            "recogidas": ordenadas,
+            "faltantes": faltantes,
+            "paradas": len({recogida["ubicacion"] for recogida in ordenadas}),
+            "distancia_estimada": longitud_ruta(ordenadas)
+        }
@@ -0,0 +1,322 @@
+"""
+📈 Servicio de Previsión de Demanda - Mínimos y máximos dinámicos
+
+La demanda de cada registro de stock (elemento en una ubicación) sale de sus
+salidas en el histórico de movimientos, sumadas por día. Con la demanda
+diaria y su variabilidad se proponen nuevos niveles:
+
+- Stock de seguridad = z(nivel de servicio) × desviación diaria × √plazo
+- Mínimo (punto de pedido) = demanda diaria × plazo + stock de seguridad
+- Máximo = mínimo + demanda diaria × días entre revisiones
+
+La demanda se estima por suavizado exponencial (más peso a los días
+recientes) o por media móvil de los últimos días. Todo el cálculo se hace
+con numpy por bloques de registros, que pueden repartirse entre varios
+procesos.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from functools import partial
+from statistics import NormalDist
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import DateTime, Integer, cast, func, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models.evento_stock_outbox import evento_actualizacion, publicar_eventos
+from app.models.movimiento_stock import MovimientoStock
+from app.models.stock import Stock
+from app.registro import configurar_registro
+from .base_service import BaseService
+
+logger = logging.getLogger(__name__)
+
+METODOS_PREVISION = ("exponencial", "media_movil")
+# Registros de stock por bloque de cálculo (y por tarea en modo multiproceso)
+TAMANO_BLOQUE = 50_000
+# Registros por sentencia al aplicar los niveles
+TAMANO_LOTE_APLICAR = 10_000
+
+
+# ==========================================
+# MOTOR VECTORIZADO
+# ==========================================
+
+def serie_diaria(filas: np.ndarray, dias: np.ndarray, cantidades: np.ndarray, n: int, n_dias: int) -> np.ndarray:
+    """Matriz n × n_dias con las unidades que salieron de cada registro cada día (0 si ninguna)"""
+    return np.bincount(filas * n_dias + dias, weights=cantidades, minlength=n * n_dias).reshape(n, n_dias)
+
+
+def suavizado_exponencial(serie: np.ndarray, alfa: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Demanda diaria y desviación por suavizado exponencial
+
+    Media y varianza ponderadas con pesos alfa·(1-alfa)^k, donde k son los
+    días transcurridos desde cada observación (normalizados para sumar 1).
+    Es un producto matriz-vector por fila, sin recorrer los días.
+    """
+    pesos = alfa * (1 - alfa) ** np.arange(serie.shape[1] - 1, -1, -1, dtype=float)
+    pesos /= pesos.sum()
+    nivel = serie @ pesos
+    varianza = (serie - nivel[:, None]) ** 2 @ pesos
+    return nivel, np.sqrt(varianza)
+
+
+def media_movil(serie: np.ndarray, ventana: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Demanda diaria y desviación de los últimos `ventana` días"""
+    recientes = serie[:, -ventana:]
+    return recientes.mean(axis=1), recientes.std(axis=1)
+
+
+def niveles_reposicion(demanda: np.ndarray, desviacion: np.ndarray, plazo_reposicion: float,
+                       dias_revision: float, z: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stock de seguridad, mínimo (punto de pedido) y máximo de cada registro"""
+    seguridad = z * desviacion * np.sqrt(plazo_reposicion)
+    minimo = demanda * plazo_reposicion + seguridad
+    maximo = minimo + demanda * dias_revision
+    return seguridad, minimo, maximo
+
+
+def prever_bloque(bloque: Tuple[np.ndarray, np.ndarray, np.ndarray, int], n_dias: int, metodo: str, alfa: float,
+                  ventana: int, plazo_reposicion: float, dias_revision: float, z: float) -> np.ndarray:
+    """
+    Previsión de un bloque de registros (función de nivel de módulo para poder
+    ejecutarse en otro proceso)
+
+    Args:
+        bloque: (fila de cada salida dentro del bloque, día, unidades, registros del bloque)
+
+    Returns:
+        np.ndarray: n × 5 con demanda diaria, desviación, stock de seguridad, mínimo y máximo
+    """
+    filas, dias, cantidades, n = bloque
+    serie = serie_diaria(filas, dias, cantidades, n, n_dias)
+    if metodo == "exponencial":
+        demanda, desviacion = suavizado_exponencial(serie, alfa)
+    else:
+        demanda, desviacion = media_movil(serie, ventana)
+    return np.column_stack([demanda, desviacion, *niveles_reposicion(demanda, desviacion, plazo_reposicion, dias_revision, z)])
+
+
+def prever(filas: np.ndarray, dias: np.ndarray, cantidades: np.ndarray, n: int, n_dias: int,
+           procesos: int = 1, tamano_bloque: int = TAMANO_BLOQUE, **parametros) -> np.ndarray:
+    """
+    Previsión de n registros por bloques de `tamano_bloque`, en este proceso o
+    repartidos entre `procesos` procesos
+
+    Returns:
+        np.ndarray: n × 5 (ver `prever_bloque`)
+    """
+    orden = np.argsort(filas, kind="stable")
+    filas, dias, cantidades = filas[orden], dias[orden], cantidades[orden]
+    inicios = range(0, n, tamano_bloque)
+    cortes = np.searchsorted(filas, [*inicios, n])
+    bloques = [
+        (filas[cortes[i]:cortes[i + 1]] - inicio, dias[cortes[i]:cortes[i + 1]],
+         cantidades[cortes[i]:cortes[i + 1]], min(tamano_bloque, n - inicio))
+        for i, inicio in enumerate(inicios)
+    ]
+    calcular = partial(prever_bloque, n_dias=n_dias, **parametros)
+    if procesos > 1 and len(bloques) > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            resultados = list(ejecutor.map(calcular, bloques))
+    else:
+        resultados = [calcular(bloque) for bloque in bloques]
+    return np.concatenate(resultados) if resultados else np.empty((0, 5))
+
+
+def _decimal(valor: float) -> Decimal:
+    return Decimal(f"{valor:.2f}")
+
+
+class PrevisionDemandaService(BaseService):
+    """📈 Servicio de previsión de demanda y recálculo de mínimos y máximos"""
+
+    def __init__(self, db_session: Session):
+        super().__init__(db_session, Stock)
+
+    def _cargar_salidas(self, desde: datetime, hasta: datetime) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Unidades salidas por registro de stock y día (índice de día desde `desde`)"""
+        if self.db.get_bind().dialect.name == "sqlite":
+            # Diferencia en días julianos; CAST trunca, y con fecha >= desde equivale a floor
+            dia = cast(func.julianday(MovimientoStock.fecha) - func.julianday(literal(desde, DateTime(timezone=True))), Integer)
+        else:
+            dia = cast(func.floor(func.extract("epoch", MovimientoStock.fecha - desde) / 86400), Integer)
+        dia = dia.label("dia")
+        filas = self.db.execute(
+            select(MovimientoStock.id_stock, dia, func.sum(-MovimientoStock.cantidad))
+            .where(MovimientoStock.tipo == "salida", MovimientoStock.fecha >= desde, MovimientoStock.fecha < hasta)
+            .group_by(MovimientoStock.id_stock, dia)
+        ).all()
+        datos = np.array([(id_stock, dia, float(cantidad)) for id_stock, dia, cantidad in filas], dtype=float).reshape(-1, 3)
+        return datos[:, 0].astype(np.int64), datos[:, 1].astype(np.int64), datos[:, 2]
+
+    def calcular_niveles(self, metodo: str = "exponencial", dias_historico: int = 90, alfa: float = 0.2,
+                         ventana: int = 28, plazo_reposicion: float = 7, dias_revision: float = 14,
+                         nivel_servicio: float = 0.95, procesos: int = 1) -> Dict[str, Any]:
+        """
+        Proponer mínimo, máximo y stock de seguridad de cada registro de stock
+        con salidas en los últimos `dias_historico` días completos
+
+        Args:
+            metodo: 'exponencial' (suavizado con `alfa`) o 'media_movil' (últimos `ventana` días)
+            plazo_reposicion: Días desde que se pide hasta que llega la mercancía
+            dias_revision: Días entre pedidos, que cubre el margen entre mínimo y máximo
+            nivel_servicio: Probabilidad de no romper stock durante el plazo
+            procesos: Procesos entre los que repartir el cálculo
+
+        Returns:
+            Dict: `parametros`, `registros` (stocks analizados), `sin_demanda` y
+                  `propuestas` por registro con los niveles actuales y propuestos
+
+        Raises:
+            ValueError: Si algún parámetro no es válido
+        """
+        if metodo not in METODOS_PREVISION:
+            raise ValueError(f"Método de previsión no válido: '{metodo}'. Opciones: {', '.join(METODOS_PREVISION)}")
+        if dias_historico < 1 or not 1 <= ventana <= dias_historico:
+            raise ValueError("dias_historico debe ser al menos 1 y la ventana estar entre 1 y dias_historico")
+        if not 0 < alfa <= 1:
+            raise ValueError("alfa debe estar en (0, 1]")
+        if not 0 < nivel_servicio < 1:
+            raise ValueError("nivel_servicio debe estar en (0, 1)")
+        if plazo_reposicion <= 0 or dias_revision < 0:
+            raise ValueError("plazo_reposicion debe ser positivo y dias_revision no negativo")
+
+        hasta = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        desde = hasta - timedelta(days=dias_historico)
+        id_salidas, dias, cantidades = self._cargar_salidas(desde, hasta)
+        todos = self.db.execute(
+            select(Stock.id, Stock.cantidad_minima, Stock.cantidad_maxima).order_by(Stock.id)
+        ).all()
+        stocks = [fila for fila, con_demanda in zip(todos, np.isin([f.id for f in todos], id_salidas)) if con_demanda]
+        ids = np.array([fila.id for fila in stocks], dtype=np.int64)
+        # Las salidas de registros ya eliminados no cuentan
+        existe = np.isin(id_salidas, ids)
+        posicion = np.searchsorted(ids, id_salidas[existe])
+
+        parametros = {
+            "metodo": metodo, "alfa": alfa, "ventana": ventana, "plazo_reposicion": plazo_reposicion,
+            "dias_revision": dias_revision, "z": NormalDist().inv_cdf(nivel_servicio),
+        }
+        resultado = prever(posicion, dias[existe], cantidades[existe], len(ids), dias_historico,
+                           procesos=procesos, **parametros)
+
+        logger.info("✅ Previsión de demanda calculada para %s registros de stock (%s)", len(ids), metodo)
+        return {
+            "parametros": {
+                **{clave: valor for clave, valor in parametros.items() if clave != "z"},
+                "dias_historico": dias_historico, "nivel_servicio": nivel_servicio,
+                "desde": desde.isoformat(), "hasta": hasta.isoformat(),
+            },
+            "registros": len(todos),
+            "sin_demanda": len(todos) - len(stocks),
+            "propuestas": [
+                {
+                    "id_stock": fila.id,
+                    "demanda_diaria": round(float(resultado[i, 0]), 4),
+                    "desviacion_diaria": round(float(resultado[i, 1]), 4),
+                    "stock_seguridad": round(float(resultado[i, 2]), 2),
+                    "cantidad_minima": float(fila.cantidad_minima) if fila.cantidad_minima is not None else None,
+                    "cantidad_maxima": float(fila.cantidad_maxima) if fila.cantidad_maxima is not None else None,
+                    "cantidad_minima_propuesta": round(float(resultado[i, 3]), 2),
+                    "cantidad_maxima_propuesta": round(float(resultado[i, 4]), 2),
+                }
+                for i, fila in enumerate(stocks)
+            ],
+        }
+
+    def aplicar_niveles(self, propuestas: List[Dict[str, Any]]) -> int:
+        """
+        Guardar los mínimos y máximos propuestos en bloque
+
+        Solo se actualizan los registros cuyos niveles cambian. Como la
+        actualización es masiva (no pasa por el flush del ORM), los eventos
+        `stock.actualizado` del outbox se escriben aquí, en la misma
+        transacción. Cada lote se confirma por separado: los bloqueos duran
+        un lote y `updated_at` (`now()`) es la hora de su transacción, no la
+        del inicio de todo el proceso. Si un lote falla, los anteriores
+        quedan aplicados.
+
+        Returns:
+            int: Registros actualizados
+        """
+        cambios = {
+            propuesta["id_stock"]: (_decimal(propuesta["cantidad_minima_propuesta"]), _decimal(propuesta["cantidad_maxima_propuesta"]))
+            for propuesta in propuestas
+        }
+        actualizados = 0
+        try:
+            ids = sorted(cambios)
+            for inicio in range(0, len(ids), TAMANO_LOTE_APLICAR):
+                # Bloquear los registros para que el evento refleje su estado al actualizarlos
+                filas = self.db.execute(
+                    select(Stock.id, Stock.id_producto_simple, Stock.id_componente, Stock.ubicacion_almacen,
+                           Stock.id_ubicacion, Stock.id_almacen, Stock.cantidad_actual, Stock.cantidad_minima,
+                           Stock.cantidad_maxima)
+                    .where(Stock.id.in_(ids[inicio:inicio + TAMANO_LOTE_APLICAR]))
+                    .order_by(Stock.id)
+                    .with_for_update()
+                ).all()
+                filas = [fila for fila in filas if (fila.cantidad_minima, fila.cantidad_maxima) != cambios[fila.id]]
+                if not filas:
+                    continue
+                self.db.execute(update(Stock), [
+                    {"id": fila.id, "cantidad_minima": cambios[fila.id][0], "cantidad_maxima": cambios[fila.id][1]}
+                    for fila in filas
+                ])
+                publicar_eventos(self.db.connection(), [
+                    evento_actualizacion(
+                        SimpleNamespace(**{**fila._asdict(), "cantidad_minima": cambios[fila.id][0], "cantidad_maxima": cambios[fila.id][1]}),
+                        fila.cantidad_actual, fila.cantidad_minima
+                    )
+                    for fila in filas
+                ])
+                self.db.commit()
+                actualizados += len(filas)
+            logger.info("✅ Niveles de reposición actualizados en %s registros de stock", actualizados)
+            return actualizados
+        except Exception as e:
+            self.db.rollback()
+            logger.error("❌ Error aplicando niveles de reposición: %s", e)
+            raise
+
+    def recalcular_niveles(self, aplicar: bool = False, **parametros) -> Dict[str, Any]:
+        """
+        Calcular los niveles propuestos y, con `aplicar`, guardarlos
+
+        Raises:
+            ValueError: Si algún parámetro no es válido
+        """
+        resultado = self.calcular_niveles(**parametros)
+        resultado["aplicadas"] = self.aplicar_niveles(resultado["propuestas"]) if aplicar else 0
+        return resultado
+
+
+def ejecutar_recalculo(aplicar: bool = False, procesos: int = 1, metodo: str = "exponencial") -> Dict[str, Any]:
+    """📈 Recalcular (y opcionalmente aplicar) los niveles de todo el stock"""
+    db = SessionLocal()
+    try:
+        resultado = PrevisionDemandaService(db).recalcular_niveles(aplicar=aplicar, procesos=procesos, metodo=metodo)
+        return {clave: valor for clave, valor in resultado.items() if clave != "propuestas"} | {
+            "propuestas": len(resultado["propuestas"])
+        }
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    configurar_registro()
+    resultado = ejecutar_recalculo(
+        aplicar=os.getenv("PREVISION_APLICAR", "0") == "1",
+        procesos=int(os.getenv("PREVISION_PROCESOS", str(os.cpu_count() or 1))),
+        metodo=os.getenv("PREVISION_METODO", "exponencial"),
+    )
+    logger.info("✅ Recálculo de niveles terminado: %s", resultado)
@@ -6,6 +6,7 @@ incluyendo la gestión polimórfica de productos simples y compuestos.
 """
 
 from typing import List, Optional, Dict, Any
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from decimal import Decimal
@@ -14,7 +15,9 @@ from app.models.producto import Producto
 from app.models.producto_simple import ProductoSimple
 from app.models.producto_compuesto import ProductoCompuesto
 from app.models.articulo import Articulo
+from app.models.componente import Componente
 from app.models.componente_producto import ComponenteProducto
+from app.models.disponibilidad_stock import DisponibilidadStock
 from app.models.stock import Stock
 from .base_service import BaseService
 import logging
@@ -60,7 +63,7 @@ class ProductoService(BaseService):
             self.db.commit()
             self.db.refresh(producto_simple)
             
-            logger.info(f"✅ Producto simple completo creado para artículo {id_articulo}")
+            logger.info("✅ Producto simple completo creado para artículo %s", id_articulo)
             # Crear un stock vacío para el producto simple
             stock = Stock(
                 id_producto_simple=producto.id,
@@ -78,7 +81,7 @@ class ProductoService(BaseService):
             
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error creando producto simple: {e}")
+            logger.error("❌ Error creando producto simple: %s", e)
             raise
             
     def crear_producto_compuesto_completo(self, id_articulo: int, 
@@ -103,7 +106,7 @@ class ProductoService(BaseService):
             self.db.commit()
             self.db.refresh(producto_compuesto)
             
-            logger.info(f"✅ Producto compuesto completo creado para artículo {id_articulo}")
+            logger.info("✅ Producto compuesto completo creado para artículo %s", id_articulo)
             return {
                 'producto': producto,
                 'producto_compuesto': producto_compuesto
@@ -111,7 +114,7 @@ class ProductoService(BaseService):
             
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error creando producto compuesto: {e}")
+            logger.error("❌ Error creando producto compuesto: %s", e)
             raise
             
     def obtener_producto_simple(self, producto_id: int) -> Optional[ProductoSimple]:
@@ -121,7 +124,7 @@ class ProductoService(BaseService):
                 ProductoSimple.id_producto == producto_id
             ).first()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo producto simple {producto_id}: {e}")
+            logger.error("❌ Error obteniendo producto simple %s: %s", producto_id, e)
             raise
             
     def obtener_producto_compuesto(self, producto_id: int) -> Optional[ProductoCompuesto]:
@@ -131,7 +134,7 @@ class ProductoService(BaseService):
                 ProductoCompuesto.id_producto == producto_id
             ).first()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo producto compuesto {producto_id}: {e}")
+            logger.error("❌ Error obteniendo producto compuesto %s: %s", producto_id, e)
             raise
             
     def agregar_componente_a_producto(self, id_producto_compuesto: int, 
@@ -158,50 +161,66 @@ class ProductoService(BaseService):
             self.db.commit()
             self.db.refresh(componente_producto)
             
-            logger.info(f"✅ Componente {id_componente} agregado a producto compuesto {id_producto_compuesto}")
+            logger.info("✅ Componente %s agregado a producto compuesto %s", id_componente, id_producto_compuesto)
             return componente_producto
             
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error agregando componente a producto: {e}")
+            logger.error("❌ Error agregando componente a producto: %s", e)
             raise
             
     def verificar_disponibilidad_fabricacion(self, producto_compuesto_id: int, 
-                                           cantidad_deseada: int = 1) -> Dict[str, Any]:
+                                           cantidad_deseada: int = 1,
+                                           id_almacen: Optional[int] = None) -> Dict[str, Any]:
         """
         Verificar si se puede fabricar una cantidad específica de un producto compuesto
+        
+        La disponibilidad de cada componente se lee del resumen
+        `disponibilidad_stock` (una búsqueda por índice por componente, en una
+        sola consulta): el total de todos los almacenes o, con `id_almacen`,
+        solo el de ese almacén.
         """
         try:
-            componentes_productos = self.db.query(ComponenteProducto).filter(
+            filas = self.db.query(
+                ComponenteProducto.id_componente,
+                ComponenteProducto.cantidad_necesaria,
+                Componente.nombre,
+                DisponibilidadStock.cantidad_actual
+            ).join(
+                Componente, Componente.id == ComponenteProducto.id_componente
+            ).outerjoin(
+                DisponibilidadStock,
+                and_(
+                    DisponibilidadStock.id_componente == ComponenteProducto.id_componente,
+                    DisponibilidadStock.id_almacen == id_almacen if id_almacen is not None else DisponibilidadStock.id_almacen.is_(None)
+                )
+            ).filter(
                 ComponenteProducto.id_producto_compuesto == producto_compuesto_id
-            ).all()
+            ).order_by(ComponenteProducto.id).all()
             
             puede_fabricar = True
             detalles_componentes = []
             faltantes = []
             
-            for cp in componentes_productos:
-                cantidad_necesaria_total = cp.cantidad_necesaria * cantidad_deseada
-                stock_componente = self.db.query(Stock).filter(
-                    Stock.id_componente == cp.id_componente
-                ).first()
-                
-                cantidad_disponible = float(stock_componente.cantidad_actual) if stock_componente else 0
-                suficiente = cantidad_disponible >= cantidad_necesaria_total
+            for fila in filas:
+                cantidad_necesaria_total = fila.cantidad_necesaria * cantidad_deseada
+                disponible = fila.cantidad_actual or Decimal(0)
+                cantidad_disponible = float(disponible)
+                suficiente = disponible >= cantidad_necesaria_total
                 
                 if not suficiente:
                     puede_fabricar = False
                     faltantes.append({
-                        'componente_id': cp.id_componente,
-                        'nombre': cp.componente.nombre,
+                        'componente_id': fila.id_componente,
+                        'nombre': fila.nombre,
                         'cantidad_necesaria': float(cantidad_necesaria_total),
                         'cantidad_disponible': cantidad_disponible,
-                        'cantidad_faltante': float(cantidad_necesaria_total - cantidad_disponible)
+                        'cantidad_faltante': float(cantidad_necesaria_total - disponible)
                     })
                     
                 detalles_componentes.append({
-                    'componente_id': cp.id_componente,
-                    'nombre': cp.componente.nombre,
+                    'componente_id': fila.id_componente,
+                    'nombre': fila.nombre,
                     'cantidad_necesaria': float(cantidad_necesaria_total),
                     'cantidad_disponible': cantidad_disponible,
                     'suficiente': suficiente
@@ -210,13 +229,14 @@ class ProductoService(BaseService):
             return {
                 'puede_fabricar': puede_fabricar,
                 'cantidad_deseada': cantidad_deseada,
+                'id_almacen': id_almacen,
                 'detalles_componentes': detalles_componentes,
                 'componentes_faltantes': faltantes,
-                'total_componentes': len(componentes_productos)
+                'total_componentes': len(filas)
             }
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error verificando disponibilidad de fabricación: {e}")
+            logger.error("❌ Error verificando disponibilidad de fabricación: %s", e)
             raise
             
     def obtener_productos_por_tipo(self, tipo_producto: str) -> List[Producto]:
@@ -228,5 +248,5 @@ class ProductoService(BaseService):
                 Producto.tipo_producto == tipo_producto
             ).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo productos por tipo {tipo_producto}: {e}")
+            logger.error("❌ Error obteniendo productos por tipo %s: %s", tipo_producto, e)
             raise
@@ -66,11 +66,11 @@ class ProveedorService(BaseService):
                     
             proveedor = self.crear(**nuevo_proveedor.model_dump())
             
-            logger.info(f"✅ Proveedor '{nuevo_proveedor.nombre}' creado exitosamente")
+            logger.info("✅ Proveedor '%s' creado exitosamente", nuevo_proveedor.nombre)
             return proveedor
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error creando proveedor '{nuevo_proveedor.nombre}': {e}")
+            logger.error("❌ Error creando proveedor '%s': %s", nuevo_proveedor.nombre, e)
             raise
             
     def obtener_por_nombre(self, nombre: str) -> Optional[ProveedorResponse]:
@@ -86,7 +86,7 @@ class ProveedorService(BaseService):
         try:
             return self.db.query(Proveedor).filter(Proveedor.nombre == nombre).first()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error buscando proveedor por nombre '{nombre}': {e}")
+            logger.error("❌ Error buscando proveedor por nombre '%s': %s", nombre, e)
             raise
             
     def obtener_por_nif_cif(self, nif_cif: str) -> Optional[ProveedorResponse]:
@@ -102,7 +102,7 @@ class ProveedorService(BaseService):
         try:
             return self.db.query(Proveedor).filter(Proveedor.nif_cif == nif_cif).first()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error buscando proveedor por NIF/CIF '{nif_cif}': {e}")
+            logger.error("❌ Error buscando proveedor por NIF/CIF '%s': %s", nif_cif, e)
             raise
             
     def obtener_productos_suministrados(self, proveedor_id: int) -> List[ProductoSimple]:
@@ -120,7 +120,7 @@ class ProveedorService(BaseService):
                 ProductoSimple.id_proveedor == proveedor_id
             ).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo productos de proveedor {proveedor_id}: {e}")
+            logger.error("❌ Error obteniendo productos de proveedor %s: %s", proveedor_id, e)
             raise
             
     def obtener_componentes_suministrados(self, proveedor_id: int) -> List[ComponenteResponse]:
@@ -138,7 +138,7 @@ class ProveedorService(BaseService):
                 Componente.id_proveedor == proveedor_id
             ).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo componentes de proveedor {proveedor_id}: {e}")
+            logger.error("❌ Error obteniendo componentes de proveedor %s: %s", proveedor_id, e)
             raise
             
     def obtener_estadisticas_proveedor(self, proveedor_id: int) -> dict:
@@ -179,7 +179,7 @@ class ProveedorService(BaseService):
             }
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error obteniendo estadísticas de proveedor {proveedor_id}: {e}")
+            logger.error("❌ Error obteniendo estadísticas de proveedor %s: %s", proveedor_id, e)
             raise
             
     def buscar_proveedores_por_texto(self, texto: str) -> List[ProveedorResponse]:
@@ -199,7 +199,7 @@ class ProveedorService(BaseService):
                 (Proveedor.email.ilike(f'%{texto}%'))
             ).all()
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error buscando proveedores por texto '{texto}': {e}")
+            logger.error("❌ Error buscando proveedores por texto '%s': %s", texto, e)
             raise
             
     def validar_eliminacion(self, proveedor_id: int) -> dict:
@@ -235,7 +235,7 @@ class ProveedorService(BaseService):
             return resultado
             
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error validando eliminación de proveedor {proveedor_id}: {e}")
+            logger.error("❌ Error validando eliminación de proveedor %s: %s", proveedor_id, e)
             raise
         
     def actualizar_proveedor(self, proveedor_id: int, proveedor: ProveedorUpdate) -> Optional[ProveedorResponse]:
@@ -277,11 +277,11 @@ class ProveedorService(BaseService):
             self.db.commit()
             self.db.refresh(existing_proveedor)
 
-            logger.info(f"✅ Proveedor {proveedor_id} actualizado exitosamente")
+            logger.info("✅ Proveedor %s actualizado exitosamente", proveedor_id)
             return existing_proveedor
             
         except ValueError:
             raise
         except SQLAlchemyError as e:
-            logger.error(f"❌ Error actualizando proveedor '{proveedor_id}': {e}")
+            logger.error("❌ Error actualizando proveedor '%s': %s", proveedor_id, e)
             raise HTTPException(status_code=500, detail=f"Error al actualizar proveedor: {str(e)}")
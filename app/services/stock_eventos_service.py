@@ -0,0 +1,234 @@
+"""
+📡 Servicio de Eventos de Stock en Tiempo Real
+
+Reparte los cambios de stock a los suscriptores de `/stock/ws` sin que
+cada panel tenga que sondear `/stock/`.
+
+Cada proceso mantiene una única conexión `LISTEN` a PostgreSQL (canal
+`CANAL_STOCK`, alimentado por el listener del outbox de stock) y reenvía
+las notificaciones a un bus en memoria que filtra por suscripción.
+"""
+
+import asyncio
+import json
+import select
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.engine import Engine
+
+from app.db import engine
+from app.models.evento_stock_outbox import CANAL_STOCK
+from app.models.ubicacion import SEPARADOR_RUTA
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Eventos encolados por suscriptor antes de empezar a descartar los más antiguos
+MAX_COLA_SUSCRIPCION = 1000
+
+
+class SuscripcionStock:
+    """
+    🎫 Suscripción de un cliente a los cambios de stock
+
+    Los eventos llegan desde el hilo de escucha y se entregan en el bucle
+    asyncio del cliente. Si el cliente no consume a tiempo, se descartan
+    los eventos más antiguos en lugar de bloquear al resto.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, ubicacion: Optional[str] = None,
+                 id_producto_simple: Optional[int] = None, id_componente: Optional[int] = None,
+                 solo_umbral: bool = False):
+        self.loop = loop
+        self.ubicacion = ubicacion
+        self.id_producto_simple = id_producto_simple
+        self.id_componente = id_componente
+        self.solo_umbral = solo_umbral
+        self.cola: asyncio.Queue = asyncio.Queue(maxsize=MAX_COLA_SUSCRIPCION)
+        self.descartados = 0
+
+    def coincide(self, evento: Dict[str, Any]) -> bool:
+        """Comprobar si un evento pasa los filtros de la suscripción"""
+        datos = evento.get("datos", {})
+        if self.solo_umbral and evento.get("tipo") != "stock.umbral":
+            return False
+        if self.ubicacion is not None and not self._en_ubicacion(datos.get("ubicacion_almacen")):
+            return False
+        if self.id_producto_simple is not None and datos.get("id_producto_simple") != self.id_producto_simple:
+            return False
+        if self.id_componente is not None and datos.get("id_componente") != self.id_componente:
+            return False
+        return True
+
+    def _en_ubicacion(self, ruta: Optional[str]) -> bool:
+        """La ruta del evento es la ubicación suscrita o está dentro de ella"""
+        return ruta is not None and (ruta == self.ubicacion or ruta.startswith(self.ubicacion + SEPARADOR_RUTA))
+
+    def entregar(self, evento: Dict[str, Any]) -> None:
+        """Encolar un evento desde cualquier hilo"""
+        self.loop.call_soon_threadsafe(self._encolar, evento)
+
+    def _encolar(self, evento: Dict[str, Any]) -> None:
+        if self.cola.full():
+            self.cola.get_nowait()
+            self.descartados += 1
+        self.cola.put_nowait(evento)
+
+
+class BusStock:
+    """
+    🚌 Bus en memoria de eventos de stock
+
+    Además de reenviar cada evento, emite un evento `stock.umbral` cuando
+    un cambio hace que `necesita_reposicion` pase de falso a verdadero o al revés.
+    """
+
+    def __init__(self):
+        self._suscripciones: List[SuscripcionStock] = []
+        self._lock = threading.Lock()
+
+    def suscribir(self, suscripcion: SuscripcionStock) -> SuscripcionStock:
+        """Registrar una suscripción"""
+        with self._lock:
+            self._suscripciones.append(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion: SuscripcionStock) -> None:
+        """Eliminar una suscripción"""
+        with self._lock:
+            if suscripcion in self._suscripciones:
+                self._suscripciones.remove(suscripcion)
+
+    @staticmethod
+    def _eventos_derivados(evento: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Evento original más el cruce de umbral, si lo hay"""
+        eventos = [evento]
+        datos = evento.get("datos", {})
+        anterior, actual = datos.get("necesita_reposicion_anterior"), datos.get("necesita_reposicion")
+        if evento.get("tipo") == "stock.actualizado" and anterior is not None and actual is not None and anterior != actual:
+            eventos.append({"tipo": "stock.umbral", "id_stock": evento.get("id_stock"), "datos": datos})
+        return eventos
+
+    def publicar(self, evento: Dict[str, Any]) -> None:
+        """Repartir un evento a las suscripciones que coinciden con él"""
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        for derivado in self._eventos_derivados(evento):
+            for suscripcion in suscripciones:
+                if suscripcion.coincide(derivado):
+                    suscripcion.entregar(derivado)
+
+
+class EscuchaNotificaciones:
+    """
+    👂 Hilo de escucha LISTEN/NOTIFY
+
+    Abre una conexión dedicada fuera del pool, escucha `canal` y pasa cada
+    notificación a `_notificar`. Se reconecta si la conexión cae. Solo en
+    PostgreSQL: con otros motores no hay NOTIFY ni hilo que arrancar.
+    """
+
+    canal: str = ""
+    nombre_hilo: str = "escucha"
+    # Escuchas arrancadas en el proceso, para pararlas todas al apagar
+    _activas: set = set()
+
+    def __init__(self, motor: Engine = engine, reintento: float = 2.0):
+        self.motor = motor
+        self.reintento = reintento
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self._lista = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def lista(self) -> bool:
+        """Si la conexión está escuchando ahora mismo"""
+        return self._lista.is_set()
+
+    def iniciar(self, espera: float = 5.0) -> None:
+        """Arrancar el hilo si no está en marcha y esperar a que escuche"""
+        if self.motor.dialect.name != "postgresql":
+            return
+        with self._lock:
+            if self._hilo and self._hilo.is_alive():
+                return
+            self._detener.clear()
+            self._lista.clear()
+            self._hilo = threading.Thread(target=self._ejecutar, name=self.nombre_hilo, daemon=True)
+            self._hilo.start()
+            EscuchaNotificaciones._activas.add(self)
+        self._lista.wait(espera)
+
+    def detener(self) -> None:
+        """Parar el hilo de escucha"""
+        self._detener.set()
+        if self._hilo:
+            self._hilo.join(timeout=5)
+        EscuchaNotificaciones._activas.discard(self)
+
+    @classmethod
+    def detener_todas(cls) -> None:
+        """Parar todas las escuchas arrancadas en el proceso (cierra sus conexiones)"""
+        for escucha in list(EscuchaNotificaciones._activas):
+            escucha.detener()
+
+    def _conectar(self):
+        conexion = self.motor.raw_connection()
+        pg = conexion.driver_connection
+        conexion.detach()
+        pg.autocommit = True
+        with pg.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.canal}")
+        return pg
+
+    def _al_conectar(self) -> None:
+        """Se llama cada vez que la conexión empieza a escuchar"""
+
+    def _notificar(self, payload: str) -> None:
+        raise NotImplementedError
+
+    def _ejecutar(self) -> None:
+        while not self._detener.is_set():
+            pg = None
+            try:
+                pg = self._conectar()
+                self._al_conectar()
+                logger.info("✅ Escuchando el canal '%s'", self.canal)
+                self._lista.set()
+                while not self._detener.is_set():
+                    if select.select([pg], [], [], 1.0) == ([], [], []):
+                        continue
+                    pg.poll()
+                    while pg.notifies:
+                        self._notificar(pg.notifies.pop(0).payload)
+            except Exception as e:
+                logger.error("❌ Error en la escucha del canal '%s': %s", self.canal, e)
+                self._lista.clear()
+                self._detener.wait(self.reintento)
+            finally:
+                if pg is not None:
+                    pg.close()
+
+
+class EscuchaStock(EscuchaNotificaciones):
+    """👂 Escucha de `CANAL_STOCK`: publica cada cambio de stock en el bus"""
+
+    canal = CANAL_STOCK
+    nombre_hilo = "escucha-stock"
+
+    def __init__(self, bus: BusStock, motor: Engine = engine, reintento: float = 2.0):
+        super().__init__(motor, reintento)
+        self.bus = bus
+
+    def _notificar(self, payload: str) -> None:
+        try:
+            self.bus.publicar(json.loads(payload))
+        except ValueError:
+            logger.error("❌ Notificación de stock no válida: %s", payload)
+
+
+# Instancias compartidas por el proceso
+bus_stock = BusStock()
+escucha_stock = EscuchaStock(bus_stock)
@@ -2,26 +2,74 @@
 🏬 Servicio de Stock - Gestión de inventario y stock
 """
 
-from typing import List, Optional, Dict, Any
+import functools
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from decimal import Decimal
 
 from app.models.stock import Stock
+from app.models.disponibilidad_stock import DisponibilidadStock
+from app.models.movimiento_stock import INFO_MOVIMIENTO
 from app.models.producto_simple import ProductoSimple
 from app.models.componente import Componente
+from app.models.ubicacion import Ubicacion, normalizar_ruta
 from .base_service import BaseService
+from .ubicacion_service import UbicacionService, filtro_ruta
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class OperacionesEnCurso:
+    """
+    🚦 Operaciones en curso en este proceso, para esperar a que terminen
+
+    Decorador: cada llamada a la función decorada cuenta como una operación
+    en curso hasta que termina (con o sin error).
+    """
+
+    def __init__(self):
+        self._en_curso = 0
+        self._condicion = threading.Condition()
+
+    def __call__(self, funcion: Callable) -> Callable:
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with self._condicion:
+                self._en_curso += 1
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                with self._condicion:
+                    self._en_curso -= 1
+                    if not self._en_curso:
+                        self._condicion.notify_all()
+        return envoltura
+
+    @property
+    def en_curso(self) -> int:
+        return self._en_curso
+
+    def esperar(self, espera: Optional[float] = None) -> bool:
+        """Esperar hasta `espera` segundos a que no quede ninguna; False si quedan"""
+        with self._condicion:
+            return self._condicion.wait_for(lambda: not self._en_curso, espera)
+
+
+# Escrituras de stock en curso: el apagado del proceso espera a que terminen
+movimientos_en_curso = OperacionesEnCurso()
+
+
 class StockService(BaseService):
     """🏬 Servicio para gestión de stock e inventario"""
     
     def __init__(self, db_session: Session):
         super().__init__(db_session, Stock)
         
+    @movimientos_en_curso
     def actualizar_stock(self, stock_id: int, nueva_cantidad: float, 
                         motivo: str = None) -> Optional[Stock]:
         """Actualizar cantidad de stock con log del motivo"""
@@ -33,40 +81,271 @@ class StockService(BaseService):
             cantidad_anterior = stock.cantidad_actual
             stock.cantidad_actual = Decimal(nueva_cantidad)
             
+            self.db.info[INFO_MOVIMIENTO] = {"tipo": "ajuste", "motivo": motivo}
             self.db.commit()
             self.db.refresh(stock)
             
-            logger.info(f"✅ Stock {stock_id} actualizado: {cantidad_anterior} → {nueva_cantidad}. Motivo: {motivo}")
+            logger.info("✅ Stock %s actualizado: %s → %s. Motivo: %s", stock_id, cantidad_anterior, nueva_cantidad, motivo)
             return stock
             
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error actualizando stock {stock_id}: {e}")
+            logger.error("❌ Error actualizando stock %s: %s", stock_id, e)
+            raise
+        finally:
+            self.db.info.pop(INFO_MOVIMIENTO, None)
+            
+    @movimientos_en_curso
+    def _crear_stock(self, datos: Dict[str, Any], coste_unitario: Optional[float] = None) -> Stock:
+        """
+        Crear un registro de stock ignorando los valores no informados
+        
+        La ubicación se resuelve a partir de su ruta (creando los niveles que
+        falten), `ubicacion_almacen` guarda la ruta normalizada e `id_almacen`
+        la raíz de la ruta. Con `coste_unitario` la cantidad inicial abre una
+        capa de coste.
+        
+        Raises:
+            ValueError: Si la ruta no es válida, el coste es negativo o el elemento ya tiene stock en esa ubicación
+        """
+        if coste_unitario is not None and coste_unitario < 0:
+            raise ValueError("El coste unitario no puede ser negativo")
+        datos = {**datos, **UbicacionService(self.db).campos_stock(datos.get("ubicacion_almacen"))}
+            
+        elemento = "id_producto_simple" if datos.get("id_producto_simple") is not None else "id_componente"
+        existente = self.db.query(Stock.id).filter(
+            getattr(Stock, elemento) == datos[elemento],
+            Stock.id_ubicacion == datos["id_ubicacion"] if datos.get("id_ubicacion") else Stock.id_ubicacion.is_(None)
+        ).first()
+        if existente:
+            raise ValueError(
+                f"Ya existe stock para {elemento} {datos[elemento]} en '{datos.get('ubicacion_almacen') or 'sin ubicación'}'"
+            )
+        try:
+            if coste_unitario is not None:
+                self.db.info[INFO_MOVIMIENTO] = {"tipo": "alta", "coste_unitario": coste_unitario}
+            return self.crear(**{clave: valor for clave, valor in datos.items() if valor is not None})
+        finally:
+            self.db.info.pop(INFO_MOVIMIENTO, None)
+        
+    def crear_stock_producto(self, producto_simple_id: int, cantidad_actual: float,
+                             cantidad_minima: Optional[float] = None,
+                             cantidad_maxima: Optional[float] = None,
+                             ubicacion_almacen: Optional[str] = None,
+                             coste_unitario: Optional[float] = None) -> Stock:
+        """Crear el stock de un producto simple en una ubicación (ruta), opcionalmente con su coste"""
+        if not self.db.get(ProductoSimple, producto_simple_id):
+            raise ValueError(f"Producto simple {producto_simple_id} no encontrado")
+        return self._crear_stock({
+            "id_producto_simple": producto_simple_id,
+            "cantidad_actual": cantidad_actual,
+            "cantidad_minima": cantidad_minima,
+            "cantidad_maxima": cantidad_maxima,
+            "ubicacion_almacen": ubicacion_almacen
+        }, coste_unitario)
+        
+    def crear_stock_componente(self, componente_id: int, cantidad_actual: float,
+                               cantidad_minima: Optional[float] = None,
+                               cantidad_maxima: Optional[float] = None,
+                               ubicacion_almacen: Optional[str] = None,
+                               coste_unitario: Optional[float] = None) -> Stock:
+        """Crear el stock de un componente en una ubicación (ruta), opcionalmente con su coste"""
+        if not self.db.get(Componente, componente_id):
+            raise ValueError(f"Componente {componente_id} no encontrado")
+        return self._crear_stock({
+            "id_componente": componente_id,
+            "cantidad_actual": cantidad_actual,
+            "cantidad_minima": cantidad_minima,
+            "cantidad_maxima": cantidad_maxima,
+            "ubicacion_almacen": ubicacion_almacen
+        }, coste_unitario)
+        
+    def listar_stock(self, bajo_minimo: Optional[bool] = None, ubicacion: Optional[str] = None,
+                     skip: int = 0, limit: Optional[int] = 100,
+                     id_producto_simple: Optional[int] = None,
+                     id_componente: Optional[int] = None,
+                     id_ubicacion: Optional[int] = None,
+                     despues_de_id: Optional[int] = None) -> List[Stock]:
+        """
+        Listar registros de stock con filtros opcionales (sin límite si limit es None)
+        
+        `despues_de_id` pagina por clave: solo registros con id mayor.
+        
+        `ubicacion` es una ruta: devuelve el stock de esa ubicación y de todas
+        las que contiene ('ALM1/P04' incluye 'ALM1/P04/E02/H03'). Se resuelve
+        con el índice de rutas de `ubicacion` y el de `stock.id_ubicacion`.
+        
+        Raises:
+            ValueError: Si la ruta no es válida
+        """
+        return self._consulta_stock(
+            bajo_minimo, ubicacion, id_producto_simple, id_componente, id_ubicacion, despues_de_id
+        ).offset(skip).limit(limit).all()
+        
+    def iterar_stock(self, bajo_minimo: Optional[bool] = None, ubicacion: Optional[str] = None,
+                     skip: int = 0, limit: Optional[int] = 100,
+                     id_ubicacion: Optional[int] = None, lote: int = 500) -> Iterator[Stock]:
+        """
+        Como `listar_stock`, pero leyendo los registros de `lote` en `lote`
+        
+        La consulta se ejecuta al llamar (los errores saltan aquí) y las filas
+        se van leyendo al iterar: con PostgreSQL, de un cursor de servidor.
+        
+        Raises:
+            ValueError: Si la ruta no es válida
+        """
+        query = self._consulta_stock(bajo_minimo, ubicacion, id_ubicacion=id_ubicacion)
+        return iter(query.offset(skip).limit(limit).yield_per(lote))
+        
+    def _consulta_stock(self, bajo_minimo: Optional[bool] = None, ubicacion: Optional[str] = None,
+                        id_producto_simple: Optional[int] = None,
+                        id_componente: Optional[int] = None,
+                        id_ubicacion: Optional[int] = None,
+                        despues_de_id: Optional[int] = None):
+        """Consulta de stock filtrada y ordenada por id (ver `listar_stock`)"""
+        query = self.db.query(Stock)
+        if bajo_minimo is not None:
+            # Sin mínimo no hay reposición: esas filas cuentan como no bajo mínimo
+            condicion = Stock.filtro_necesita_reposicion()
+            query = query.filter(condicion if bajo_minimo else ~condicion)
+        if ubicacion:
+            ubicaciones = self.db.query(Ubicacion.id).filter(filtro_ruta(Ubicacion.ruta, normalizar_ruta(ubicacion)))
+            query = query.filter(Stock.id_ubicacion.in_(ubicaciones.scalar_subquery()))
+        if id_ubicacion is not None:
+            query = query.filter(Stock.id_ubicacion == id_ubicacion)
+        if id_producto_simple is not None:
+            query = query.filter(Stock.id_producto_simple == id_producto_simple)
+        if id_componente is not None:
+            query = query.filter(Stock.id_componente == id_componente)
+        if despues_de_id is not None:
+            query = query.filter(Stock.id > despues_de_id)
+        return query.order_by(Stock.id)
+        
+    def obtener_disponibilidad(self, id_producto_simple: Optional[int] = None,
+                               id_componente: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Disponibilidad agregada de un elemento: total y desglose por almacén
+        
+        Se lee del resumen `disponibilidad_stock`, sin sumar registros de stock.
+        
+        Raises:
+            ValueError: Si no se indica exactamente uno de los dos elementos
+        """
+        if (id_producto_simple is None) == (id_componente is None):
+            raise ValueError("Indica id_producto_simple o id_componente, pero no ambos")
+        columna, valor = (
+            (DisponibilidadStock.id_producto_simple, id_producto_simple) if id_producto_simple is not None
+            else (DisponibilidadStock.id_componente, id_componente)
+        )
+        filas = self.db.query(
+            DisponibilidadStock.id_almacen, Ubicacion.ruta, DisponibilidadStock.cantidad_actual, DisponibilidadStock.registros
+        ).outerjoin(Ubicacion, Ubicacion.id == DisponibilidadStock.id_almacen).filter(
+            columna == valor
+        ).order_by(Ubicacion.ruta.nullsfirst()).all()
+        
+        total = next((fila for fila in filas if fila.id_almacen is None), None)
+        return {
+            "id_producto_simple": id_producto_simple,
+            "id_componente": id_componente,
+            "cantidad_total": float(total.cantidad_actual) if total else 0,
+            "registros": total.registros if total else 0,
+            "por_almacen": [
+                {
+                    "id_almacen": fila.id_almacen,
+                    "almacen": fila.ruta,
+                    "cantidad_actual": float(fila.cantidad_actual),
+                    "registros": fila.registros
+                }
+                for fila in filas if fila.id_almacen is not None and fila.registros > 0
+            ]
+        }
+        
+    def recalcular_disponibilidad(self, progreso: Optional[Callable[[int, str], None]] = None) -> int:
+        """
+        Reconstruir el resumen `disponibilidad_stock` desde la tabla de stock
+        
+        El resumen se mantiene solo con los cambios hechos con el ORM; esto lo
+        corrige tras cargas con SQL directo o actualizaciones masivas.
+        
+        Args:
+            progreso (Callable, optional): Se llama tras cada paso con (porcentaje, mensaje)
+        
+        Returns:
+            int: Número de filas del resumen
+        """
+        tabla = DisponibilidadStock.__table__
+        try:
+            self.db.execute(delete(tabla))
+            if progreso:
+                progreso(10, "Resumen vaciado")
+            for por_almacen in (True, False):
+                claves = [Stock.id_producto_simple, Stock.id_componente] + ([Stock.id_almacen] if por_almacen else [])
+                consulta = select(*claves, func.sum(Stock.cantidad_actual), func.count()).group_by(*claves)
+                if por_almacen:
+                    consulta = consulta.where(Stock.id_almacen.isnot(None))
+                destino = [clave.key for clave in claves] + ["cantidad_actual", "registros"]
+                self.db.execute(insert(tabla).from_select(destino, consulta))
+                if progreso:
+                    progreso(55 if por_almacen else 90, "Totales por almacén" if por_almacen else "Totales globales")
+            filas = self.db.query(func.count(DisponibilidadStock.id)).scalar()
+            self.db.commit()
+            
+            logger.info("✅ Resumen de disponibilidad recalculado: %s filas", filas)
+            return filas
+            
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error("❌ Error recalculando disponibilidad: %s", e)
             raise
             
+    def obtener_stock(self, stock_id: int) -> Optional[Stock]:
+        """Obtener un registro de stock por ID"""
+        return self.obtener_por_id(stock_id)
+        
+    def actualizar_cantidad(self, stock_id: int, nueva_cantidad: float) -> Optional[Stock]:
+        """Fijar la cantidad actual de un registro de stock"""
+        return self.actualizar_stock(stock_id, nueva_cantidad, motivo="Ajuste manual")
+        
+    def registrar_movimiento(self, stock_id: int, cantidad: float, tipo_movimiento: str,
+                             motivo: str = None, coste_unitario: Optional[float] = None) -> Stock:
+        """
+        Registrar una entrada o salida de stock (las entradas, opcionalmente con su coste)
+        
+        Raises:
+            ValueError: Si el stock no existe o el movimiento no es válido
+        """
+        resultado = self.crear_movimiento_stock(stock_id, tipo_movimiento, cantidad, motivo, coste_unitario)
+        if 'error' in resultado:
+            raise ValueError(resultado['error'])
+        return self.obtener_por_id(stock_id)
+            
     def obtener_stock_bajo_minimo(self) -> List[Stock]:
-        """Obtener todos los stocks que están por debajo del mínimo"""
-        return self.db.query(Stock).filter(
-            Stock.cantidad_actual < Stock.cantidad_minima
-        ).all()
+        """Obtener todos los stocks que necesitan reposición (en el mínimo o por debajo)"""
+        return self.db.query(Stock).filter(Stock.filtro_necesita_reposicion()).order_by(Stock.id).all()
         
     def obtener_stock_por_producto(self, producto_id: int) -> Optional[Stock]:
-        """Obtener stock de un producto simple"""
-        return self.db.query(Stock).filter(Stock.id_producto_simple == producto_id).first()
+        """Obtener el primer registro de stock de un producto simple (ver `listar_stock` para todas sus ubicaciones)"""
+        return self.db.query(Stock).filter(Stock.id_producto_simple == producto_id).order_by(Stock.id).first()
         
     def obtener_stock_por_componente(self, componente_id: int) -> Optional[Stock]:
-        """Obtener stock de un componente"""
-        return self.db.query(Stock).filter(Stock.id_componente == componente_id).first()
+        """Obtener el primer registro de stock de un componente (ver `listar_stock` para todas sus ubicaciones)"""
+        return self.db.query(Stock).filter(Stock.id_componente == componente_id).order_by(Stock.id).first()
         
+    @movimientos_en_curso
     def crear_movimiento_stock(self, stock_id: int, tipo_movimiento: str,
-                             cantidad: float, motivo: str = None) -> Dict[str, Any]:
+                             cantidad: float, motivo: str = None,
+                             coste_unitario: Optional[float] = None) -> Dict[str, Any]:
         """
         Crear un movimiento de stock (entrada/salida)
         
         Args:
             tipo_movimiento: 'entrada' o 'salida'
+            coste_unitario: Coste de cada unidad de una entrada (abre una capa de coste)
         """
         try:
+            if coste_unitario is not None and (tipo_movimiento != 'entrada' or coste_unitario < 0):
+                return {'error': 'El coste unitario solo se indica en entradas y no puede ser negativo'}
+                
             stock = self.obtener_por_id(stock_id)
             if not stock:
                 return {'error': 'Stock no encontrado'}
@@ -83,6 +362,7 @@ class StockService(BaseService):
                 return {'error': 'Tipo de movimiento inválido'}
                 
             stock.cantidad_actual = nueva_cantidad
+            self.db.info[INFO_MOVIMIENTO] = {"tipo": tipo_movimiento, "motivo": motivo, "coste_unitario": coste_unitario}
             self.db.commit()
             self.db.refresh(stock)
             
@@ -92,10 +372,13 @@ class StockService(BaseService):
                 'cantidad_movida': cantidad,
                 'cantidad_anterior': cantidad_anterior,
                 'cantidad_nueva': float(nueva_cantidad),
-                'motivo': motivo
+                'motivo': motivo,
+                'coste_unitario': coste_unitario
             }
             
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"❌ Error en movimiento de stock: {e}")
-            raise
\ No newline at end of file
+            logger.error("❌ Error en movimiento de stock: %s", e)
+            raise
+        finally:
+            self.db.info.pop(INFO_MOVIMIENTO, None)
\ No newline at end of file
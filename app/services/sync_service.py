@@ -0,0 +1,204 @@
+"""
+🔄 Servicio de Sincronización - Feed incremental de cambios del catálogo
+
+Este servicio permite a las réplicas (pedidos, facturación, TPV) mantenerse
+al día descargando solo lo que ha cambiado desde su último token, en lugar
+de volver a descargar los listados completos.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.registro_eliminado import MODELOS_SINCRONIZADOS, RegistroEliminado
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Entidades publicadas en el feed, por nombre de tabla
+ENTIDADES_SYNC = {modelo.__tablename__: modelo for modelo in MODELOS_SINCRONIZADOS}
+
+# Margen mínimo entre el corte y el momento de la consulta
+MARGEN_SEGURIDAD = timedelta(seconds=5)
+
+# Inicio de la transacción abierta más antigua de otra sesión de la base de datos
+_TRANSACCION_MAS_ANTIGUA = text("""
+    SELECT min(xact_start) FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid()
+      AND backend_type = 'client backend' AND xact_start IS NOT NULL
+""")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def codificar_token(marca: datetime) -> str:
+    """Convertir una marca temporal en un token opaco (microsegundos desde epoch)"""
+    if marca.tzinfo is None:
+        marca = marca.replace(tzinfo=timezone.utc)
+    delta = marca - _EPOCH
+    return str((delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+def decodificar_token(token: str) -> datetime:
+    """
+    Convertir un token en la marca temporal que representa
+
+    Raises:
+        ValueError: Si el token no es válido
+    """
+    try:
+        microsegundos = int(token)
+    except (TypeError, ValueError):
+        raise ValueError(f"Token de sincronización no válido: '{token}'")
+    if microsegundos < 0:
+        raise ValueError(f"Token de sincronización no válido: '{token}'")
+    return _EPOCH + timedelta(microseconds=microsegundos)
+
+
+class SyncService:
+    """
+    🔄 Servicio de cambios incrementales ("changes since")
+
+    Las altas y modificaciones se leen por los índices de `created_at` y
+    `updated_at`; las bajas, de la tabla de RegistroEliminado (la escribe un
+    listener en cada baja con el ORM).
+
+    Las marcas (`now()`, `clock_timestamp()`) son como pronto la hora de
+    inicio de la transacción que escribe la fila, pero la fila solo se ve
+    al confirmarse, quizá mucho después. Por eso el corte de cada respuesta
+    queda por detrás de la transacción abierta más antigua: todo lo marcado
+    hasta el corte lo escribieron transacciones ya terminadas y ninguna
+    confirmación posterior puede aparecer por detrás del token. Una
+    transacción larga (carga completa, trabajos) retiene el avance del token
+    mientras dura, sin que se pierdan sus filas.
+    """
+
+    def __init__(self, db_session: Session):
+        """
+        Constructor del servicio de sincronización
+
+        Args:
+            db_session (Session): Sesión de base de datos SQLAlchemy
+        """
+        self.db = db_session
+
+    @staticmethod
+    def _a_diccionario(instancia: Any) -> Dict[str, Any]:
+        """Serializar las columnas de una fila del catálogo"""
+        return {
+            columna.key: getattr(instancia, columna.key)
+            for columna in instancia.__mapper__.column_attrs
+        }
+
+    def _modificados(self, modelo: Any, desde: Optional[datetime], hasta: datetime,
+                     limite: int) -> Tuple[List[Any], Optional[datetime], bool]:
+        """
+        Obtener filas creadas o modificadas en el intervalo (desde, hasta]
+
+        Nunca corta un grupo de filas con la misma marca temporal (p.ej. una
+        actualización masiva en una sola transacción), para que el token
+        devuelto no salte filas pendientes.
+
+        Returns:
+            Tuple: (filas, última marca entregada, hay más filas pendientes)
+        """
+        marca = func.coalesce(modelo.updated_at, modelo.created_at)
+        query = self.db.query(modelo, marca).filter(marca <= hasta)
+        if desde is not None:
+            query = query.filter(or_(modelo.updated_at > desde, modelo.created_at > desde))
+        filas = query.order_by(marca, modelo.id).limit(limite + 1).all()
+
+        hay_mas = len(filas) > limite
+        if not hay_mas:
+            ultima = filas[-1][1] if filas else None
+            return [fila[0] for fila in filas], ultima, False
+
+        filas = filas[:limite]
+        ultima_marca, ultimo_id = filas[-1][1], filas[-1][0].id
+        resto = self.db.query(modelo).filter(
+            marca == ultima_marca, modelo.id > ultimo_id
+        ).order_by(modelo.id).all()
+        return [fila[0] for fila in filas] + resto, ultima_marca, True
+
+    def _eliminados(self, tabla: str, desde: Optional[datetime], hasta: datetime) -> List[int]:
+        """Obtener los IDs de una tabla eliminados en el intervalo (desde, hasta]"""
+        query = self.db.query(RegistroEliminado.id_registro).filter(
+            RegistroEliminado.tabla == tabla,
+            RegistroEliminado.eliminado_at <= hasta
+        )
+        if desde is not None:
+            query = query.filter(RegistroEliminado.eliminado_at > desde)
+        return [fila[0] for fila in query.order_by(RegistroEliminado.eliminado_at)]
+
+    def _corte(self, desde: Optional[datetime]) -> datetime:
+        """Marca hasta la que se puede entregar todo sin saltar confirmaciones pendientes"""
+        ahora = self.db.execute(select(func.now())).scalar_one()
+        corte = ahora - MARGEN_SEGURIDAD
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Sin permiso para ver otras sesiones (pg_read_all_stats), xact_start
+            # llega nulo y solo queda el margen
+            mas_antigua = self.db.execute(_TRANSACCION_MAS_ANTIGUA).scalar()
+            if mas_antigua is not None:
+                corte = min(corte, mas_antigua - timedelta(microseconds=1))
+        if desde is not None and corte < desde:
+            corte = desde
+        return corte
+
+    def obtener_cambios(self, since: Optional[str] = None, limite: int = 1000,
+                        entidades: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Obtener los cambios del catálogo desde un token
+
+        Args:
+            since (Optional[str]): Token devuelto por la llamada anterior; None para una carga completa
+            limite (int): Máximo de filas modificadas por entidad en esta página
+            entidades (Optional[Iterable[str]]): Subconjunto de entidades a consultar
+
+        Returns:
+            Dict[str, Any]: Diccionario con:
+                - token: Token a enviar en la siguiente llamada
+                - hay_mas: True si quedan cambios por descargar con el nuevo token
+                - cambios: Por entidad, filas 'actualizados' e IDs 'eliminados'
+
+        Raises:
+            ValueError: Si el token o alguna entidad no son válidos
+        """
+        desde = decodificar_token(since) if since else None
+        nombres = list(entidades) if entidades else list(ENTIDADES_SYNC)
+        desconocidas = [nombre for nombre in nombres if nombre not in ENTIDADES_SYNC]
+        if desconocidas:
+            raise ValueError(f"Entidades no sincronizables: {', '.join(desconocidas)}")
+
+        try:
+            # Los cambios posteriores al corte se entregan en la siguiente llamada
+            corte = self._corte(desde)
+
+            cambios = {}
+            cortes_pendientes = []
+            for nombre in nombres:
+                modelo = ENTIDADES_SYNC[nombre]
+                filas, ultima_marca, hay_mas = self._modificados(modelo, desde, corte, limite)
+                eliminados = self._eliminados(nombre, desde, corte)
+                if hay_mas:
+                    cortes_pendientes.append(ultima_marca)
+                cambios[nombre] = {
+                    "actualizados": [self._a_diccionario(fila) for fila in filas],
+                    "eliminados": eliminados,
+                }
+
+            # Las entidades que no han llegado al corte marcan hasta dónde se ha
+            # entregado todo; el resto reenvía algunas filas ya vistas (idempotente).
+            nuevo_token = min([corte] + cortes_pendientes)
+
+            return {
+                "token": codificar_token(nuevo_token),
+                "hay_mas": bool(cortes_pendientes),
+                "cambios": cambios,
+            }
+
+        except SQLAlchemyError as e:
+            logger.error("❌ Error obteniendo cambios de sincronización: %s", e)
+            raise
@@ -0,0 +1,468 @@
+"""
+⚙️ Servicio de Trabajos - Operaciones pesadas en segundo plano
+
+Las operaciones largas (mantenimiento del histórico, recálculos masivos,
+reportes) no se ejecutan en la petición HTTP: la ruta encola un `Trabajo` y
+responde al momento, y los procesos trabajadores lo ejecutan.
+
+- Cola en la tabla `trabajo`: cada trabajador reclama el siguiente pendiente
+  con `FOR UPDATE SKIP LOCKED`, de modo que varios trabajadores (en uno o en
+  varias máquinas) se reparten la cola sin tomar el mismo trabajo.
+- Progreso y cancelación: la función del trabajo llama a
+  `contexto.avanzar(progreso, mensaje)`, que guarda el progreso y lanza
+  `TrabajoCancelado` si se ha pedido cancelarlo.
+- Latido: mientras un trabajo está en curso su trabajador renueva
+  `latido_at`; un trabajo sin latido en `TRABAJOS_ABANDONO` segundos se
+  vuelve a encolar (hasta `MAX_INTENTOS`).
+
+Los tipos de trabajo se registran con `@tipo_trabajo("nombre")` sobre una
+función `(db, contexto, **parametros) -> dict`.
+
+Ejecución de los trabajadores (un proceso por núcleo por defecto):
+    TRABAJOS_PROCESOS=4 python -m app.services.trabajo_service
+"""
+
+import inspect
+import json
+import os
+import signal
+import socket
+import threading
+from multiprocessing import Process
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import SessionLocal, engine
+from app.models.trabajo import ESTADOS_FINALES, ESTADOS_TRABAJO, Trabajo
+from app.registro import configurar_registro
+from .base_service import BaseService
+import logging
+
+logger = logging.getLogger(__name__)
+
+LATIDO_SEGUNDOS = float(os.getenv("TRABAJOS_LATIDO", "10"))
+ABANDONO_SEGUNDOS = float(os.getenv("TRABAJOS_ABANDONO", "120"))
+MAX_INTENTOS = int(os.getenv("TRABAJOS_MAX_INTENTOS", "3"))
+
+TIPOS_TRABAJO: Dict[str, Callable[..., Dict[str, Any]]] = {}
+
+
+class TrabajoCancelado(Exception):
+    """Se lanza desde `ContextoTrabajo.avanzar` cuando se ha pedido cancelar el trabajo"""
+
+
+def tipo_trabajo(nombre: str):
+    """Registrar una función `(db, contexto, **parametros) -> dict` como tipo de trabajo"""
+    def registrar(funcion):
+        TIPOS_TRABAJO[nombre] = funcion
+        return funcion
+    return registrar
+
+
+def _a_json(valor: Any) -> Any:
+    """Resultado serializable en JSONB (fechas, Decimal... como texto)"""
+    return json.loads(json.dumps(valor, default=str))
+
+
+class ContextoTrabajo:
+    """📍 Progreso y cancelación de un trabajo en curso, visibles fuera de su transacción"""
+
+    def __init__(self, id_trabajo: int, session_factory: sessionmaker = SessionLocal):
+        self.id_trabajo = id_trabajo
+        self.session_factory = session_factory
+
+    def avanzar(self, progreso: int, mensaje: Optional[str] = None, avance: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Guardar el progreso (0-100) en una transacción propia
+
+        `avance` guarda el estado parcial del trabajo (se sustituye el anterior
+        si se indica), para consultarlo o reanudar el trabajo desde él.
+
+        Raises:
+            TrabajoCancelado: Si se ha pedido cancelar el trabajo
+        """
+        valores = {"progreso": max(0, min(100, int(progreso))), "mensaje": mensaje, "latido_at": func.now()}
+        if avance is not None:
+            valores["avance"] = _a_json(avance)
+        db = self.session_factory()
+        try:
+            cancelado = db.execute(
+                update(Trabajo).where(Trabajo.id == self.id_trabajo).values(**valores)
+                .returning(Trabajo.cancelacion_solicitada)
+            ).scalar()
+            db.commit()
+        finally:
+            db.close()
+        if cancelado:
+            raise TrabajoCancelado(f"Trabajo {self.id_trabajo} cancelado")
+
+
+class TrabajoService(BaseService):
+    """⚙️ Servicio para encolar, consultar y cancelar trabajos"""
+
+    def __init__(self, db_session: Session):
+        super().__init__(db_session, Trabajo)
+
+    @staticmethod
+    def a_dict(trabajo: Trabajo) -> Dict[str, Any]:
+        """Representación del trabajo para la API"""
+        return {
+            "id": trabajo.id,
+            "tipo": trabajo.tipo,
+            "parametros": trabajo.parametros,
+            "estado": trabajo.estado,
+            "progreso": trabajo.progreso,
+            "mensaje": trabajo.mensaje,
+            "avance": trabajo.avance,
+            "resultado": trabajo.resultado,
+            "error": trabajo.error,
+            "cancelacion_solicitada": trabajo.cancelacion_solicitada,
+            "intentos": trabajo.intentos,
+            "trabajador": trabajo.trabajador,
+            "created_at": trabajo.created_at.isoformat() if trabajo.created_at else None,
+            "iniciado_at": trabajo.iniciado_at.isoformat() if trabajo.iniciado_at else None,
+            "finalizado_at": trabajo.finalizado_at.isoformat() if trabajo.finalizado_at else None,
+        }
+
+    def encolar(self, tipo: str, parametros: Optional[Dict[str, Any]] = None) -> Trabajo:
+        """
+        Encolar un trabajo
+
+        Raises:
+            ValueError: Si el tipo no existe o los parámetros no son los de su función
+        """
+        funcion = TIPOS_TRABAJO.get(tipo)
+        if funcion is None:
+            raise ValueError(f"Tipo de trabajo no válido: '{tipo}'. Opciones: {', '.join(sorted(TIPOS_TRABAJO))}")
+        parametros = parametros or {}
+        try:
+            inspect.signature(funcion).bind(None, None, **parametros)
+        except TypeError as e:
+            raise ValueError(f"Parámetros no válidos para '{tipo}': {e}")
+        trabajo = self.crear(tipo=tipo, parametros=_a_json(parametros))
+        logger.info("✅ Trabajo %s (%s) encolado", trabajo.id, tipo)
+        return trabajo
+
+    def listar(self, estado: Optional[str] = None, tipo: Optional[str] = None,
+               skip: int = 0, limit: int = 100) -> List[Trabajo]:
+        """Trabajos del más reciente al más antiguo"""
+        if estado is not None and estado not in ESTADOS_TRABAJO:
+            raise ValueError(f"Estado no válido: '{estado}'. Opciones: {', '.join(ESTADOS_TRABAJO)}")
+        query = self.db.query(Trabajo)
+        if estado is not None:
+            query = query.filter(Trabajo.estado == estado)
+        if tipo is not None:
+            query = query.filter(Trabajo.tipo == tipo)
+        return query.order_by(Trabajo.id.desc()).offset(skip).limit(limit).all()
+
+    def cancelar(self, id_trabajo: int) -> Optional[Trabajo]:
+        """
+        Cancelar un trabajo: uno pendiente se cancela al momento; uno en curso
+        se detiene en su siguiente `avanzar`
+
+        Returns:
+            Optional[Trabajo]: El trabajo, o None si no existe
+
+        Raises:
+            ValueError: Si el trabajo ya ha terminado
+        """
+        try:
+            trabajo = self.db.query(Trabajo).filter(Trabajo.id == id_trabajo).with_for_update().first()
+            if trabajo is None or trabajo.estado in ESTADOS_FINALES:
+                self.db.rollback()
+            if trabajo is None:
+                return None
+            if trabajo.estado in ESTADOS_FINALES:
+                raise ValueError(f"El trabajo {id_trabajo} ya ha terminado ({trabajo.estado})")
+            if trabajo.estado == "pendiente":
+                trabajo.estado = "cancelado"
+                trabajo.finalizado_at = func.now()
+            trabajo.cancelacion_solicitada = True
+            self.db.commit()
+            self.db.refresh(trabajo)
+            logger.info("✅ Cancelación del trabajo %s solicitada (%s)", id_trabajo, trabajo.estado)
+            return trabajo
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error("❌ Error cancelando trabajo %s: %s", id_trabajo, e)
+            raise
+
+
+# ==========================================
+# TRABAJADOR
+# ==========================================
+
+class Trabajador:
+    """
+    👷 Proceso trabajador de la cola
+
+    Reclama trabajos pendientes de uno en uno con `FOR UPDATE SKIP LOCKED` y
+    los ejecuta en una sesión propia. Varios trabajadores pueden ejecutarse a
+    la vez sin repartirse el mismo trabajo.
+    """
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal, nombre: Optional[str] = None,
+                 latido: float = LATIDO_SEGUNDOS, abandono: float = ABANDONO_SEGUNDOS,
+                 max_intentos: int = MAX_INTENTOS):
+        self.session_factory = session_factory
+        self.nombre = nombre or f"{socket.gethostname()}:{os.getpid()}"
+        self.latido = latido
+        self.abandono = abandono
+        self.max_intentos = max_intentos
+
+    def recuperar_abandonados(self) -> int:
+        """
+        Volver a encolar los trabajos en curso sin latido reciente (su
+        trabajador ha caído); los que agotan sus intentos pasan a error
+
+        Returns:
+            int: Trabajos recuperados o dados por fallidos
+        """
+        db = self.session_factory()
+        try:
+            abandonados = (Trabajo.estado == "en_curso") & (
+                Trabajo.latido_at < func.now() - func.make_interval(0, 0, 0, 0, 0, 0, self.abandono)
+            )
+            fallidos = db.execute(
+                update(Trabajo).where(abandonados, Trabajo.intentos >= self.max_intentos).values(
+                    estado="error", error="Trabajador caído: intentos agotados", finalizado_at=func.now()
+                )
+            ).rowcount
+            reencolados = db.execute(
+                update(Trabajo).where(abandonados).values(estado="pendiente", trabajador=None)
+            ).rowcount
+            db.commit()
+            if fallidos or reencolados:
+                logger.info("✅ Trabajos abandonados: %s reencolados, %s fallidos", reencolados, fallidos)
+            return fallidos + reencolados
+        finally:
+            db.close()
+
+    def reclamar(self) -> Optional[Tuple[int, str, Dict[str, Any]]]:
+        """
+        Reclamar el siguiente trabajo pendiente
+
+        Returns:
+            Optional[Tuple]: (id, tipo, parametros) o None si la cola está vacía
+        """
+        db = self.session_factory()
+        try:
+            trabajo = db.query(Trabajo).filter(Trabajo.estado == "pendiente").order_by(
+                Trabajo.id
+            ).limit(1).with_for_update(skip_locked=True).first()
+            if trabajo is None:
+                db.rollback()
+                return None
+            trabajo.estado = "en_curso"
+            trabajo.intentos += 1
+            trabajo.trabajador = self.nombre
+            trabajo.iniciado_at = func.now()
+            trabajo.latido_at = func.now()
+            reclamado = (trabajo.id, trabajo.tipo, dict(trabajo.parametros or {}))
+            db.commit()
+            return reclamado
+        finally:
+            db.close()
+
+    def _finalizar(self, id_trabajo: int, **valores) -> None:
+        """Guardar el estado final si el trabajo sigue siendo de este trabajador"""
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(Trabajo).where(
+                    Trabajo.id == id_trabajo, Trabajo.estado == "en_curso", Trabajo.trabajador == self.nombre
+                ).values(finalizado_at=func.now(), latido_at=func.now(), **valores)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _latir(self, id_trabajo: int, detener: threading.Event) -> None:
+        """Renovar `latido_at` cada `latido` segundos hasta que termine el trabajo"""
+        while not detener.wait(self.latido):
+            try:
+                db = self.session_factory()
+                try:
+                    db.execute(update(Trabajo).where(Trabajo.id == id_trabajo).values(latido_at=func.now()))
+                    db.commit()
+                finally:
+                    db.close()
+            except SQLAlchemyError as e:
+                logger.error("❌ Error renovando el latido del trabajo %s: %s", id_trabajo, e)
+
+    def ejecutar_trabajo(self, id_trabajo: int, tipo: str, parametros: Dict[str, Any]) -> str:
+        """
+        Ejecutar un trabajo reclamado y guardar su estado final
+
+        Returns:
+            str: Estado final (completado, cancelado o error)
+        """
+        contexto = ContextoTrabajo(id_trabajo, self.session_factory)
+        fin_latido = threading.Event()
+        latido = threading.Thread(target=self._latir, args=(id_trabajo, fin_latido), daemon=True)
+        latido.start()
+        db = self.session_factory()
+        try:
+            funcion = TIPOS_TRABAJO.get(tipo)
+            if funcion is None:
+                raise ValueError(f"Tipo de trabajo no registrado: '{tipo}'")
+            resultado = funcion(db, contexto, **parametros)
+            db.commit()
+            self._finalizar(id_trabajo, estado="completado", progreso=100, resultado=_a_json(resultado or {}))
+            logger.info("✅ Trabajo %s (%s) completado", id_trabajo, tipo)
+            return "completado"
+        except TrabajoCancelado:
+            db.rollback()
+            self._finalizar(id_trabajo, estado="cancelado")
+            logger.info("✅ Trabajo %s (%s) cancelado", id_trabajo, tipo)
+            return "cancelado"
+        except Exception as e:
+            db.rollback()
+            self._finalizar(id_trabajo, estado="error", error=str(e)[:4000])
+            logger.error("❌ Error en el trabajo %s (%s): %s", id_trabajo, tipo, e)
+            return "error"
+        finally:
+            db.close()
+            fin_latido.set()
+            latido.join()
+
+    def procesar_siguiente(self) -> Optional[str]:
+        """
+        Reclamar y ejecutar un trabajo
+
+        Returns:
+            Optional[str]: Estado final, o None si no había trabajos pendientes
+        """
+        reclamado = self.reclamar()
+        return self.ejecutar_trabajo(*reclamado) if reclamado else None
+
+    def ejecutar(self, intervalo: float = 1.0, detener: Optional[threading.Event] = None) -> None:
+        """
+        Bucle del trabajador: ejecuta trabajos mientras haya y espera
+        `intervalo` segundos cuando la cola está vacía
+        """
+        detener = detener or threading.Event()
+        logger.info("✅ Trabajador %s iniciado (intervalo=%ss)", self.nombre, intervalo)
+        while not detener.is_set():
+            try:
+                self.recuperar_abandonados()
+                estado = self.procesar_siguiente()
+            except SQLAlchemyError as e:
+                logger.error("❌ Error leyendo la cola de trabajos: %s", e)
+                estado = None
+            if estado is None:
+                detener.wait(intervalo)
+
+
+def _proceso_trabajador(intervalo: float) -> None:
+    """Punto de entrada de cada proceso del pool de trabajadores"""
+    # Las conexiones heredadas del proceso padre no se comparten
+    engine.dispose(close=False)
+    detener = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: detener.set())
+    signal.signal(signal.SIGINT, lambda *_: detener.set())
+    Trabajador().ejecutar(intervalo=intervalo, detener=detener)
+
+
+def ejecutar_trabajadores(procesos: int, intervalo: float = 1.0) -> None:
+    """👷 Lanzar `procesos` trabajadores en procesos separados y esperar a que terminen"""
+    hijos = [Process(target=_proceso_trabajador, args=(intervalo,), name=f"trabajador-{i}") for i in range(procesos)]
+    for hijo in hijos:
+        hijo.start()
+    logger.info("✅ %s trabajadores iniciados", procesos)
+
+    def terminar(*_):
+        for hijo in hijos:
+            if hijo.is_alive():
+                hijo.terminate()
+    signal.signal(signal.SIGTERM, terminar)
+    try:
+        for hijo in hijos:
+            hijo.join()
+    except KeyboardInterrupt:
+        terminar()
+        for hijo in hijos:
+            hijo.join()
+
+
+# ==========================================
+# TIPOS DE TRABAJO
+# ==========================================
+
+@tipo_trabajo("mantenimiento_historico")
+def _mantenimiento_historico(db: Session, contexto: ContextoTrabajo, meses_adelante: int = 3) -> Dict[str, Any]:
+    """Crear las particiones que falten del histórico y tomar una instantánea"""
+    from .historico_stock_service import HistoricoStockService
+    servicio = HistoricoStockService(db)
+    creadas = servicio.asegurar_particiones(meses_adelante=meses_adelante)
+    contexto.avanzar(30, "Particiones creadas")
+    instantanea = servicio.crear_instantanea()
+    return {"particiones_creadas": creadas, "instantanea": instantanea.fecha.isoformat()}
+
+
+@tipo_trabajo("recalcular_disponibilidad")
+def _recalcular_disponibilidad(db: Session, contexto: ContextoTrabajo) -> Dict[str, Any]:
+    """Reconstruir el resumen de disponibilidad desde los registros de stock"""
+    from .stock_service import StockService
+    return {"filas": StockService(db).recalcular_disponibilidad(progreso=contexto.avanzar)}
+
+
+@tipo_trabajo("recalcular_niveles_reposicion")
+def _recalcular_niveles_reposicion(db: Session, contexto: ContextoTrabajo, aplicar: bool = False,
+                                   **parametros) -> Dict[str, Any]:
+    """Proponer o aplicar mínimos y máximos según la demanda"""
+    from .prevision_demanda_service import PrevisionDemandaService
+    servicio = PrevisionDemandaService(db)
+    resultado = servicio.calcular_niveles(**parametros)
+    contexto.avanzar(60, f"{len(resultado['propuestas'])} propuestas calculadas")
+    resultado["aplicadas"] = servicio.aplicar_niveles(resultado["propuestas"]) if aplicar else 0
+    resultado["propuestas"] = len(resultado["propuestas"])
+    return resultado
+
+
+@tipo_trabajo("reporte_valoracion")
+def _reporte_valoracion(db: Session, contexto: ContextoTrabajo, fecha_corte: Optional[str] = None) -> Dict[str, Any]:
+    """Reporte de valoración del inventario en una fecha"""
+    from .inventario_service import InventarioService
+    return InventarioService(db).generar_reporte_valoracion(fecha_corte, progreso=contexto.avanzar)
+
+
+@tipo_trabajo("validacion_integridad")
+def _validacion_integridad(db: Session, contexto: ContextoTrabajo, chequeos: Optional[List[str]] = None,
+                           muestra: int = 10) -> Dict[str, Any]:
+    """Auditar la integridad del catálogo"""
+    from .integridad_service import IntegridadService
+    return IntegridadService(db).validar(chequeos, muestra, progreso=contexto.avanzar)
+
+
+@tipo_trabajo("limpieza_huerfanos")
+def _limpieza_huerfanos(db: Session, contexto: ContextoTrabajo, limpiezas: Optional[List[str]] = None,
+                        simular: bool = False, tamano_lote: Optional[int] = None, pausa: Optional[float] = None,
+                        desde: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Borrar por lotes los registros huérfanos"""
+    from .limpieza_service import LIMPIEZAS_HUERFANOS, LimpiezaService
+    nombres = list(limpiezas or LIMPIEZAS_HUERFANOS)
+
+    cursores = dict(desde or {})
+
+    def informar(nombre: str, filas: int, cursor: int) -> None:
+        # Los cursores quedan en `avance`: un trabajo interrumpido se reanuda con `desde`
+        cursores[nombre] = cursor
+        contexto.avanzar(
+            100 * nombres.index(nombre) // len(nombres),
+            f"{nombre}: {filas} registros, último ID {cursor}",
+            avance={"desde": cursores},
+        )
+
+    return LimpiezaService(db).limpiar(nombres, simular, tamano_lote, pausa, desde, progreso=informar)
+
+
+if __name__ == "__main__":
+    configurar_registro()
+    ejecutar_trabajadores(
+        int(os.getenv("TRABAJOS_PROCESOS", str(os.cpu_count() or 1))),
+        intervalo=float(os.getenv("TRABAJOS_INTERVALO", "1.0"))
+    )
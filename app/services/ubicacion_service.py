@@ -0,0 +1,151 @@
+"""
+📍 Servicio de Ubicaciones - Jerarquía física del almacén
+
+Gestiona el árbol almacén → pasillo → estantería → hueco. Las búsquedas
+por zona usan la ruta materializada, así que "todo el pasillo 4" es un
+recorrido de rango sobre el índice de `ruta` y no una comparación de texto
+fila a fila.
+"""
+
+from typing import Any, Dict, List, Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models.ubicacion import (
+    SEPARADOR_RUTA, TIPOS_UBICACION, Ubicacion, normalizar_ruta, posicion_de_codigo, rutas_ancestras
+)
+from .base_service import BaseService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def patron_descendientes(ruta: str) -> str:
+    """Patrón LIKE de las ubicaciones contenidas en `ruta` (escapando comodines)"""
+    escapada = ruta.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escapada}{SEPARADOR_RUTA}%"
+
+
+def filtro_ruta(columna, ruta: str):
+    """Condición "la ruta es `ruta` o está dentro de ella" sobre una columna de rutas"""
+    return or_(columna == ruta, columna.like(patron_descendientes(ruta), escape="\\"))
+
+
+class UbicacionService(BaseService):
+    """📍 Servicio para gestión de ubicaciones del almacén"""
+
+    def __init__(self, db_session: Session):
+        super().__init__(db_session, Ubicacion)
+
+    def obtener_por_ruta(self, ruta: str) -> Optional[Ubicacion]:
+        """
+        Obtener una ubicación por su ruta
+
+        Raises:
+            ValueError: Si la ruta no es válida
+        """
+        return self.db.query(Ubicacion).filter(Ubicacion.ruta == normalizar_ruta(ruta)).first()
+
+    def resolver_ruta(self, ruta: str) -> Ubicacion:
+        """
+        Obtener la ubicación de una ruta creando los niveles que falten
+
+        Los niveles existentes se leen en una sola consulta. Solo hace flush:
+        confirmar la transacción queda a cargo de quien llama.
+
+        Args:
+            ruta (str): Ruta completa (ej: 'ALM1/P04/E02/H03')
+
+        Returns:
+            Ubicacion: Ubicación hoja de la ruta
+
+        Raises:
+            ValueError: Si la ruta no es válida
+        """
+        rutas = rutas_ancestras(normalizar_ruta(ruta))
+        existentes = {
+            ubicacion.ruta: ubicacion
+            for ubicacion in self.db.query(Ubicacion).filter(Ubicacion.ruta.in_(rutas)).all()
+        }
+
+        padre = None
+        for nivel, ruta_nivel in enumerate(rutas, start=1):
+            ubicacion = existentes.get(ruta_nivel)
+            if ubicacion is None:
+                codigo = ruta_nivel.rsplit(SEPARADOR_RUTA, 1)[-1]
+                ubicacion = Ubicacion(
+                    codigo=codigo,
+                    tipo=TIPOS_UBICACION[nivel - 1],
+                    nivel=nivel,
+                    ruta=ruta_nivel,
+                    posicion=posicion_de_codigo(codigo),
+                    id_padre=padre.id if padre else None
+                )
+                self.db.add(ubicacion)
+                self.db.flush()
+            padre = ubicacion
+        return padre
+
+    def campos_stock(self, ruta: Optional[str]) -> Dict[str, Any]:
+        """
+        Columnas de ubicación de un registro de stock a partir de su ruta
+
+        Resuelve la ruta (creando los niveles que falten) y devuelve la ruta
+        normalizada, la ubicación hoja y su almacén (la raíz de la ruta).
+
+        Raises:
+            ValueError: Si la ruta no es válida
+        """
+        if not ruta:
+            return {"ubicacion_almacen": None, "id_ubicacion": None, "id_almacen": None}
+        ubicacion = self.resolver_ruta(ruta)
+        almacen = ubicacion
+        while almacen.padre is not None:
+            almacen = almacen.padre
+        return {"ubicacion_almacen": ubicacion.ruta, "id_ubicacion": ubicacion.id, "id_almacen": almacen.id}
+
+    def crear_ubicacion(self, ruta: str) -> Ubicacion:
+        """
+        Crear una ubicación (y los niveles superiores que falten)
+
+        Raises:
+            ValueError: Si la ruta no es válida o ya existe
+        """
+        try:
+            if self.obtener_por_ruta(ruta):
+                raise ValueError(f"Ya existe la ubicación '{normalizar_ruta(ruta)}'")
+            ubicacion = self.resolver_ruta(ruta)
+            self.db.commit()
+            self.db.refresh(ubicacion)
+
+            logger.info("✅ Ubicación '%s' creada", ubicacion.ruta)
+            return ubicacion
+
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error("❌ Error creando ubicación '%s': %s", ruta, e)
+            raise
+
+    def listar_ubicaciones(self, prefijo: Optional[str] = None, tipo: Optional[str] = None,
+                           skip: int = 0, limit: Optional[int] = 100) -> List[Ubicacion]:
+        """
+        Listar ubicaciones en orden de ruta, opcionalmente dentro de `prefijo`
+
+        Raises:
+            ValueError: Si el prefijo o el tipo no son válidos
+        """
+        query = self.db.query(Ubicacion)
+        if prefijo:
+            query = query.filter(filtro_ruta(Ubicacion.ruta, normalizar_ruta(prefijo)))
+        if tipo:
+            if tipo not in TIPOS_UBICACION:
+                raise ValueError(f"Tipo de ubicación no válido: '{tipo}'")
+            query = query.filter(Ubicacion.tipo == tipo)
+        return query.order_by(Ubicacion.ruta).offset(skip).limit(limit).all()
+
+    def obtener_hijos(self, ubicacion_id: int) -> List[Ubicacion]:
+        """Obtener las ubicaciones contenidas directamente en una ubicación"""
+        return self.db.query(Ubicacion).filter(
+            Ubicacion.id_padre == ubicacion_id
+        ).order_by(Ubicacion.posicion, Ubicacion.codigo).all()
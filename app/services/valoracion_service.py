@@ -0,0 +1,458 @@
+"""
+💶 Servicio de Valoración - Capas de coste, FIFO y coste medio ponderado
+
+Las existencias de cada elemento (producto simple o componente) en una
+fecha salen del histórico de stock y su coste de las capas abiertas por las
+entradas con coste (`CapaCoste`):
+
+- FIFO: las unidades en stock son las de las capas más recientes que las
+  cubren (las antiguas se consumieron antes). Las unidades que ninguna capa
+  cubre (stock anterior a las capas) se valoran al coste de la más antigua.
+- Coste medio ponderado: importe de todas las capas hasta la fecha entre
+  sus unidades.
+
+El coste de los productos compuestos se obtiene de sus componentes
+(`ComponenteProducto.cantidad_necesaria`) y el de los packs de sus productos
+(`PackProducto.cantidad_incluida`) con el descuento del pack. Todo el
+cálculo se hace con numpy sobre el catálogo completo, sin bucles por
+elemento, para poder valorar el cierre de mes de una vez.
+
+Los costes actuales se memorizan por nodo (`cache_costes`) con las piezas de
+las que salen, de modo que una entrada con coste de un componente solo obliga
+a recalcular ese componente, sus compuestos y los packs que los incluyen.
+"""
+
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.models.capa_coste import CapaCoste
+from app.models.componente_producto import ComponenteProducto
+from app.models.disponibilidad_stock import DisponibilidadStock
+from app.models.pack import Pack
+from app.models.pack_producto import PackProducto
+from app.models.producto_compuesto import ProductoCompuesto
+from app.models.producto_simple import ProductoSimple
+from .base_service import BaseService
+from .cache_costes import Nodo, cache_costes
+from .historico_stock_service import HistoricoStockService, instante_de_corte
+import logging
+
+logger = logging.getLogger(__name__)
+
+METODOS_VALORACION = ("fifo", "medio")
+
+
+# ==========================================
+# MOTOR VECTORIZADO
+# ==========================================
+
+def valorar_fifo(grupos: np.ndarray, cantidades: np.ndarray, costes: np.ndarray,
+                 existencias: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Valor FIFO de las existencias de cada grupo (elemento)
+
+    Args:
+        grupos: Grupo de cada capa; las capas van ordenadas por grupo y, dentro, por fecha
+        cantidades: Unidades de cada capa
+        costes: Coste unitario de cada capa
+        existencias: Unidades en stock de cada grupo
+
+    Returns:
+        Tuple: valor de las unidades cubiertas por capas y unidades sin capa de cada grupo
+    """
+    n = len(existencias)
+    total = np.bincount(grupos, weights=cantidades, minlength=n)
+    inicio_grupo = np.cumsum(total) - total
+    # Unidades de las capas más recientes que cada capa dentro de su grupo
+    posteriores = total[grupos] - (np.cumsum(cantidades) - inicio_grupo[grupos])
+    restantes = np.clip(existencias[grupos] - posteriores, 0, cantidades)
+    valor = np.bincount(grupos, weights=restantes * costes, minlength=n)
+    return valor, np.maximum(existencias - total, 0)
+
+
+def coste_medio_ponderado(grupos: np.ndarray, cantidades: np.ndarray, costes: np.ndarray, n: int) -> np.ndarray:
+    """Coste medio ponderado de cada grupo (NaN si no tiene capas)"""
+    unidades = np.bincount(grupos, weights=cantidades, minlength=n)
+    importe = np.bincount(grupos, weights=cantidades * costes, minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(unidades > 0, importe / unidades, np.nan)
+
+
+def coste_extremo(grupos: np.ndarray, costes: np.ndarray, n: int, ultimo: bool = False) -> np.ndarray:
+    """Coste de la capa más antigua (o la más reciente) de cada grupo (NaN si no tiene capas)"""
+    resultado = np.full(n, np.nan)
+    if len(grupos):
+        cambios = grupos[1:] != grupos[:-1]
+        posiciones = np.flatnonzero(np.r_[cambios, True] if ultimo else np.r_[True, cambios])
+        resultado[grupos[posiciones]] = costes[posiciones]
+    return resultado
+
+
+def repercutir_costes(costes_origen: np.ndarray, destinos: np.ndarray, origenes: np.ndarray,
+                      cantidades: np.ndarray, n_destinos: int) -> np.ndarray:
+    """
+    Coste de cada destino como suma de cantidad × coste de sus orígenes
+
+    Un destino sin líneas o con algún origen sin coste queda sin coste (NaN).
+    """
+    coste = np.bincount(destinos, weights=cantidades * costes_origen[origenes], minlength=n_destinos)
+    lineas = np.bincount(destinos, minlength=n_destinos)
+    return np.where(lineas > 0, coste, np.nan)
+
+
+def _numero(valor: float, decimales: int = 2) -> Optional[float]:
+    return None if np.isnan(valor) else round(float(valor), decimales)
+
+
+def _clave(id_producto_simple: Optional[int], id_componente: Optional[int]) -> Nodo:
+    return ("producto_simple", id_producto_simple) if id_producto_simple is not None else ("componente", id_componente)
+
+
+class ValoracionService(BaseService):
+    """💶 Servicio de capas de coste y valoración del inventario"""
+
+    def __init__(self, db_session: Session):
+        super().__init__(db_session, CapaCoste)
+
+    def listar_capas(self, id_producto_simple: Optional[int] = None, id_componente: Optional[int] = None,
+                     skip: int = 0, limit: int = 100) -> List[CapaCoste]:
+        """Capas de coste, de la más antigua a la más reciente"""
+        query = self.db.query(CapaCoste)
+        if id_producto_simple is not None:
+            query = query.filter(CapaCoste.id_producto_simple == id_producto_simple)
+        if id_componente is not None:
+            query = query.filter(CapaCoste.id_componente == id_componente)
+        return query.order_by(CapaCoste.fecha, CapaCoste.id).offset(skip).limit(limit).all()
+
+    def _cargar_capas(self, claves: Optional[Iterable[Nodo]] = None, corte: Optional[datetime] = None) -> list:
+        """Capas de coste (todas o las de los elementos indicados) anteriores al corte, por fecha"""
+        consulta = select(
+            CapaCoste.id_producto_simple, CapaCoste.id_componente, CapaCoste.cantidad, CapaCoste.coste_unitario
+        ).order_by(CapaCoste.fecha, CapaCoste.id)
+        if claves is not None:
+            claves = list(claves)
+            consulta = consulta.where(or_(
+                CapaCoste.id_producto_simple.in_([id_ for tipo, id_ in claves if tipo == "producto_simple"]),
+                CapaCoste.id_componente.in_([id_ for tipo, id_ in claves if tipo == "componente"])
+            ))
+        if corte is not None:
+            consulta = consulta.where(CapaCoste.fecha < corte)
+        return self.db.execute(consulta).all()
+
+    def _valorar(self, existencias: Dict[Nodo, float], capas: list) -> List[Dict[str, Any]]:
+        """Unidades, valor y coste unitario FIFO y medio de cada elemento con existencias o capas"""
+        claves = sorted(set(existencias) | {_clave(capa.id_producto_simple, capa.id_componente) for capa in capas})
+        indice = {clave: posicion for posicion, clave in enumerate(claves)}
+        n = len(claves)
+
+        unidades = np.array([existencias.get(clave, 0.0) for clave in claves], dtype=float)
+        grupos = np.fromiter((indice[_clave(c.id_producto_simple, c.id_componente)] for c in capas), dtype=np.int64, count=len(capas))
+        cantidades = np.fromiter((float(c.cantidad) for c in capas), dtype=float, count=len(capas))
+        costes = np.fromiter((float(c.coste_unitario) for c in capas), dtype=float, count=len(capas))
+        # Orden estable por grupo: dentro de cada grupo se mantiene el orden por fecha
+        orden = np.argsort(grupos, kind="stable")
+        grupos, cantidades, costes = grupos[orden], cantidades[orden], costes[orden]
+
+        valor_capas, sin_capa = valorar_fifo(grupos, cantidades, costes, unidades)
+        primer_coste = coste_extremo(grupos, costes, n)
+        ultimo_coste = coste_extremo(grupos, costes, n, ultimo=True)
+        medio = coste_medio_ponderado(grupos, cantidades, costes, n)
+        con_coste = ~np.isnan(primer_coste)
+        valor_fifo = np.where(con_coste, valor_capas + sin_capa * np.nan_to_num(primer_coste), 0.0)
+        valor_medio = np.where(con_coste, unidades * np.nan_to_num(medio), 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            coste_fifo = np.where(unidades > 0, valor_fifo / unidades, ultimo_coste)
+        coste_fifo = np.where(con_coste, coste_fifo, np.nan)
+
+        return [
+            {
+                "tipo": tipo,
+                "id": id_elemento,
+                "unidades": float(unidades[i]),
+                "unidades_sin_coste": 0.0 if con_coste[i] else float(unidades[i]),
+                "valor_fifo": round(float(valor_fifo[i]), 2),
+                "valor_medio": round(float(valor_medio[i]), 2),
+                "coste_unitario_fifo": _numero(coste_fifo[i], 4),
+                "coste_unitario_medio": _numero(medio[i], 4),
+            }
+            for i, (tipo, id_elemento) in enumerate(claves)
+        ]
+
+    def valorar_existencias(self, fecha_corte: Union[None, str, date, datetime] = None) -> Dict[str, Any]:
+        """
+        Existencias de cada elemento en una fecha valoradas por FIFO y coste medio
+
+        Returns:
+            Dict: `fecha_corte`, `instantanea`, `filas` (stock por elemento y
+                  almacén, de `HistoricoStockService.stock_en_fecha`) y
+                  `elementos` con unidades, valor y coste unitario por método
+
+        Raises:
+            ValueError: Si la fecha no es válida o es anterior al histórico disponible
+        """
+        corte = instante_de_corte(fecha_corte)
+        stock = HistoricoStockService(self.db).stock_en_fecha(corte)
+
+        existencias: Dict[Nodo, float] = {}
+        for fila in stock["filas"]:
+            clave = _clave(fila["id_producto_simple"], fila["id_componente"])
+            existencias[clave] = existencias.get(clave, 0.0) + float(fila["cantidad"])
+        elementos = self._valorar(existencias, self._cargar_capas(corte=corte))
+        return {
+            "fecha_corte": stock["fecha_corte"],
+            "instantanea": stock["instantanea"],
+            "filas": stock["filas"],
+            "elementos": elementos,
+        }
+
+    def costes_catalogo(self, fecha_corte: Union[None, str, date, datetime] = None) -> Dict[str, Any]:
+        """
+        Coste unitario FIFO y medio de todo el catálogo en una fecha
+
+        Los productos simples toman el coste de su stock; los compuestos, la
+        suma de sus componentes por `cantidad_necesaria`; los packs, la suma
+        de sus productos por `cantidad_incluida` menos `descuento_porcentaje`.
+        Sin coste (None) si falta el de alguna pieza.
+
+        Returns:
+            Dict: `fecha_corte`, `productos` {id_producto: {...}} y `packs` {id_pack: {...}}
+
+        Raises:
+            ValueError: Si la fecha no es válida o es anterior al histórico disponible
+        """
+        valoracion = self.valorar_existencias(fecha_corte)
+        costes_elemento = {
+            (elemento["tipo"], elemento["id"]): (elemento["coste_unitario_fifo"], elemento["coste_unitario_medio"])
+            for elemento in valoracion["elementos"]
+        }
+
+        def coste(tipo, id_elemento, metodo):
+            valor = costes_elemento.get((tipo, id_elemento), (None, None))[metodo]
+            return np.nan if valor is None else valor
+
+        simples = self.db.execute(select(ProductoSimple.id, ProductoSimple.id_producto)).all()
+        compuestos = self.db.execute(select(ProductoCompuesto.id, ProductoCompuesto.id_producto)).all()
+        componentes = self.db.execute(select(
+            ComponenteProducto.id_producto_compuesto, ComponenteProducto.id_componente, ComponenteProducto.cantidad_necesaria
+        )).all()
+        packs = self.db.execute(select(Pack.id, Pack.descuento_porcentaje)).all()
+        lineas_pack = self.db.execute(select(
+            PackProducto.id_pack, PackProducto.id_producto, PackProducto.cantidad_incluida
+        )).all()
+
+        ids_producto = [fila.id_producto for fila in simples] + [fila.id_producto for fila in compuestos]
+        indice_producto = {id_producto: i for i, id_producto in enumerate(ids_producto)}
+        indice_compuesto = {fila.id: i for i, fila in enumerate(compuestos)}
+        ids_componente = sorted({fila.id_componente for fila in componentes})
+        indice_componente = {id_componente: i for i, id_componente in enumerate(ids_componente)}
+        indice_pack = {fila.id: i for i, fila in enumerate(packs)}
+        lineas_pack = [fila for fila in lineas_pack if fila.id_producto in indice_producto]
+
+        compuesto_destinos = np.array([indice_compuesto[f.id_producto_compuesto] for f in componentes], dtype=np.int64)
+        compuesto_origenes = np.array([indice_componente[f.id_componente] for f in componentes], dtype=np.int64)
+        compuesto_cantidades = np.array([float(f.cantidad_necesaria) for f in componentes], dtype=float)
+        pack_destinos = np.array([indice_pack[f.id_pack] for f in lineas_pack], dtype=np.int64)
+        pack_origenes = np.array([indice_producto[f.id_producto] for f in lineas_pack], dtype=np.int64)
+        pack_cantidades = np.array([float(f.cantidad_incluida) for f in lineas_pack], dtype=float)
+        factor_descuento = 1 - np.array([fila.descuento_porcentaje or 0 for fila in packs], dtype=float) / 100
+
+        resultado = {}
+        for metodo, nombre in enumerate(METODOS_VALORACION):
+            coste_simple = np.array([coste("producto_simple", fila.id, metodo) for fila in simples], dtype=float)
+            coste_componente = np.array([coste("componente", id_c, metodo) for id_c in ids_componente], dtype=float)
+            coste_compuesto = repercutir_costes(
+                coste_componente, compuesto_destinos, compuesto_origenes, compuesto_cantidades, len(compuestos)
+            )
+            coste_producto = np.concatenate([coste_simple, coste_compuesto])
+            coste_pack = repercutir_costes(
+                coste_producto, pack_destinos, pack_origenes, pack_cantidades, len(packs)
+            ) * factor_descuento
+            resultado[nombre] = (coste_producto, coste_pack)
+
+        return {
+            "fecha_corte": valoracion["fecha_corte"],
+            "productos": {
+                id_producto: {
+                    "tipo": "simple" if i < len(simples) else "compuesto",
+                    **{f"coste_{nombre}": _numero(resultado[nombre][0][i], 4) for nombre in METODOS_VALORACION},
+                }
+                for id_producto, i in indice_producto.items()
+            },
+            "packs": {
+                fila.id: {
+                    "descuento_porcentaje": fila.descuento_porcentaje or 0,
+                    **{f"coste_{nombre}": _numero(resultado[nombre][1][i], 4) for nombre in METODOS_VALORACION},
+                }
+                for i, fila in enumerate(packs)
+            },
+        }
+
+    # ==========================================
+    # COSTES ACTUALES MEMORIZADOS
+    # ==========================================
+
+    def _memorizados(self, nodos: Iterable[Nodo],
+                     calcular: Callable[[List[Nodo]], Dict[Nodo, Tuple[Any, Iterable[Nodo]]]]) -> Dict[Nodo, Any]:
+        """
+        Valor de cada nodo desde la caché, calculando juntos los que falten
+
+        `calcular` recibe los nodos que faltan y devuelve {nodo: (valor, dependencias)}.
+        Una sesión con cambios de coste sin confirmar no lee ni guarda en la
+        caché: sus valores no son los que ven las demás sesiones.
+        """
+        usar_cache = not self.db.info.get("costes_invalidados")
+        valores, faltan = {}, []
+        for nodo in dict.fromkeys(nodos):
+            valor = cache_costes.obtener(nodo) if usar_cache else None
+            if valor is None:
+                faltan.append(nodo)
+            else:
+                valores[nodo] = valor
+        if faltan:
+            generacion = cache_costes.generacion
+            for nodo, (valor, dependencias) in calcular(faltan).items():
+                valores[nodo] = valor
+                if usar_cache:
+                    cache_costes.guardar(nodo, valor, dependencias, generacion)
+        return valores
+
+    def costes_elementos(self, claves: Iterable[Nodo]) -> Dict[Nodo, Tuple[float, float]]:
+        """Coste unitario actual (FIFO, medio) de productos simples y componentes; NaN sin coste"""
+        def calcular(faltan: List[Nodo]):
+            simples = [id_ for tipo, id_ in faltan if tipo == "producto_simple"]
+            componentes = [id_ for tipo, id_ in faltan if tipo == "componente"]
+            filas = self.db.execute(select(
+                DisponibilidadStock.id_producto_simple, DisponibilidadStock.id_componente,
+                DisponibilidadStock.cantidad_actual
+            ).where(
+                DisponibilidadStock.id_almacen.is_(None),
+                or_(DisponibilidadStock.id_producto_simple.in_(simples), DisponibilidadStock.id_componente.in_(componentes))
+            )).all()
+            existencias = {_clave(f.id_producto_simple, f.id_componente): float(f.cantidad_actual) for f in filas}
+            for clave in faltan:
+                existencias.setdefault(clave, 0.0)
+            return {
+                (e["tipo"], e["id"]): (
+                    tuple(np.nan if e[campo] is None else e[campo] for campo in ("coste_unitario_fifo", "coste_unitario_medio")),
+                    ()
+                )
+                for e in self._valorar(existencias, self._cargar_capas(faltan))
+            }
+        return self._memorizados(claves, calcular)
+
+    def costes_compuestos(self, ids: Iterable[int]) -> Dict[int, Tuple[float, float]]:
+        """Coste unitario actual (FIFO, medio) de productos compuestos por id de `ProductoCompuesto`"""
+        def calcular(faltan: List[Nodo]):
+            ids_faltan = [id_ for _, id_ in faltan]
+            lineas = self.db.execute(select(
+                ComponenteProducto.id_producto_compuesto, ComponenteProducto.id_componente, ComponenteProducto.cantidad_necesaria
+            ).where(ComponenteProducto.id_producto_compuesto.in_(ids_faltan))).all()
+            ids_componente = sorted({fila.id_componente for fila in lineas})
+            costes = self.costes_elementos(("componente", id_c) for id_c in ids_componente)
+            indice_compuesto = {id_: i for i, id_ in enumerate(ids_faltan)}
+            indice_componente = {id_c: i for i, id_c in enumerate(ids_componente)}
+            destinos = np.array([indice_compuesto[f.id_producto_compuesto] for f in lineas], dtype=np.int64)
+            origenes = np.array([indice_componente[f.id_componente] for f in lineas], dtype=np.int64)
+            cantidades = np.array([float(f.cantidad_necesaria) for f in lineas], dtype=float)
+            por_metodo = [
+                repercutir_costes(
+                    np.array([costes[("componente", id_c)][metodo] for id_c in ids_componente], dtype=float),
+                    destinos, origenes, cantidades, len(ids_faltan)
+                )
+                for metodo in range(len(METODOS_VALORACION))
+            ]
+            componentes: Dict[int, List[Nodo]] = {}
+            for fila in lineas:
+                componentes.setdefault(fila.id_producto_compuesto, []).append(("componente", fila.id_componente))
+            return {
+                ("producto_compuesto", id_): (
+                    tuple(float(coste[i]) for coste in por_metodo),
+                    componentes.get(id_, [])
+                )
+                for id_, i in indice_compuesto.items()
+            }
+        return {id_: valor for (_, id_), valor in self._memorizados((("producto_compuesto", id_) for id_ in ids), calcular).items()}
+
+    def _costes_productos(self, ids: Iterable[int]) -> Dict[int, Tuple[str, float, float]]:
+        """(tipo, coste FIFO, coste medio) actual de productos; NaN sin coste"""
+        def calcular(faltan: List[Nodo]):
+            ids_faltan = [id_ for _, id_ in faltan]
+            simples = self.db.execute(select(ProductoSimple.id, ProductoSimple.id_producto).where(
+                ProductoSimple.id_producto.in_(ids_faltan))).all()
+            compuestos = self.db.execute(select(ProductoCompuesto.id, ProductoCompuesto.id_producto).where(
+                ProductoCompuesto.id_producto.in_(ids_faltan))).all()
+            costes_simples = self.costes_elementos(("producto_simple", fila.id) for fila in simples)
+            costes_compuestos = self.costes_compuestos(fila.id for fila in compuestos)
+            calculados = {
+                ("producto", f.id_producto): (("simple", *costes_simples[("producto_simple", f.id)]), [("producto_simple", f.id)])
+                for f in simples
+            }
+            calculados.update({
+                ("producto", f.id_producto): (("compuesto", *costes_compuestos[f.id]), [("producto_compuesto", f.id)])
+                for f in compuestos
+            })
+            return calculados
+        return {id_: valor for (_, id_), valor in self._memorizados((("producto", id_) for id_ in ids), calcular).items()}
+
+    def costes_productos(self, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Coste unitario actual FIFO y medio de productos (simples o compuestos)
+
+        Returns:
+            Dict: {id_producto: {tipo, coste_fifo, coste_medio}}; los ids sin producto no aparecen
+        """
+        return {
+            id_: {"tipo": tipo, **{f"coste_{nombre}": _numero(coste, 4) for nombre, coste in zip(METODOS_VALORACION, costes)}}
+            for id_, (tipo, *costes) in self._costes_productos(ids).items()
+        }
+
+    def costes_packs(self, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Coste unitario actual FIFO y medio de packs con su descuento aplicado
+
+        Returns:
+            Dict: {id_pack: {descuento_porcentaje, coste_fifo, coste_medio}}; los ids sin pack no aparecen
+        """
+        def calcular(faltan: List[Nodo]):
+            packs = self.db.execute(select(Pack.id, Pack.descuento_porcentaje).where(
+                Pack.id.in_([id_ for _, id_ in faltan]))).all()
+            lineas = self.db.execute(select(
+                PackProducto.id_pack, PackProducto.id_producto, PackProducto.cantidad_incluida
+            ).where(PackProducto.id_pack.in_([fila.id for fila in packs]))).all()
+            costes = self._costes_productos({fila.id_producto for fila in lineas})
+            lineas = [fila for fila in lineas if fila.id_producto in costes]
+            ids_producto = sorted({fila.id_producto for fila in lineas})
+            indice_pack = {fila.id: i for i, fila in enumerate(packs)}
+            indice_producto = {id_p: i for i, id_p in enumerate(ids_producto)}
+            destinos = np.array([indice_pack[f.id_pack] for f in lineas], dtype=np.int64)
+            origenes = np.array([indice_producto[f.id_producto] for f in lineas], dtype=np.int64)
+            cantidades = np.array([float(f.cantidad_incluida) for f in lineas], dtype=float)
+            factor_descuento = 1 - np.array([fila.descuento_porcentaje or 0 for fila in packs], dtype=float) / 100
+            por_metodo = [
+                repercutir_costes(
+                    np.array([costes[id_p][metodo + 1] for id_p in ids_producto], dtype=float),
+                    destinos, origenes, cantidades, len(packs)
+                ) * factor_descuento
+                for metodo in range(len(METODOS_VALORACION))
+            ]
+            productos_pack: Dict[int, List[Nodo]] = {}
+            for fila in lineas:
+                productos_pack.setdefault(fila.id_pack, []).append(("producto", fila.id_producto))
+            return {
+                ("pack", fila.id): (
+                    (fila.descuento_porcentaje or 0, *(float(coste[i]) for coste in por_metodo)),
+                    productos_pack.get(fila.id, [])
+                )
+                for i, fila in enumerate(packs)
+            }
+        return {
+            id_: {
+                "descuento_porcentaje": descuento,
+                **{f"coste_{nombre}": _numero(coste, 4) for nombre, coste in zip(METODOS_VALORACION, costes)},
+            }
+            for (_, id_), (descuento, *costes) in self._memorizados((("pack", id_) for id_ in ids), calcular).items()
+        }
@@ -0,0 +1,166 @@
+"""
+🏭 Servidor de producción - uvicorn con varios workers
+
+    python -m app.servidor
+
+Arranca `WEB_WORKERS` procesos de uvicorn (por defecto, uno por núcleo
+disponible) sobre el mismo puerto, con uvloop y httptools si están
+instalados. El proceso principal reinicia los workers que caen y, con
+SIGTERM/SIGINT, les pide un apagado ordenado: dejan de aceptar conexiones,
+terminan las peticiones en curso durante `WEB_APAGADO` segundos y después
+`app.arranque.apagar()` espera a las escrituras de stock pendientes.
+
+El pool de conexiones de cada worker sale de `DB_POOL_SIZE` y
+`DB_MAX_OVERFLOW` (ver `app.db`), recortado para que todos los workers
+juntos no superen las conexiones que admite PostgreSQL: `DB_CONEXIONES_MAX`
+o, si no se indica, `max_connections` del servidor menos las reservadas a
+superusuarios y `DB_CONEXIONES_RESERVADAS` (migraciones, trabajadores de
+la cola, administración).
+
+Configuración (variables de entorno):
+    WEB_HOST (0.0.0.0), WEB_PORT (8000), WEB_WORKERS (núcleos disponibles)
+    WEB_KEEPALIVE: segundos que se mantiene abierta una conexión inactiva (75,
+        por encima del timeout de los balanceadores habituales)
+    WEB_APAGADO: segundos para terminar las peticiones en curso al apagar (30)
+    WEB_BACKLOG: conexiones pendientes de aceptar (2048)
+    WEB_CONCURRENCIA: máximo de conexiones por worker antes de responder 503 (sin límite)
+    WEB_MAX_PETICIONES: reciclar el worker tras N peticiones (sin reciclar)
+    WEB_ACCESS_LOG: 1 para el log de accesos de uvicorn (0; la app ya registra
+        cada petición con su id y duración, ver `app.registro`)
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import uvicorn
+
+from app.registro import configurar_registro
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Conexiones de cada worker fuera del pool: las de LISTEN de la caché GraphQL
+# y del websocket de stock
+CONEXIONES_FUERA_DEL_POOL = 2
+
+
+def _entero(nombre: str, por_defecto: Optional[int] = None) -> Optional[int]:
+    valor = os.getenv(nombre)
+    return int(valor) if valor else por_defecto
+
+
+def nucleos_disponibles() -> int:
+    """Núcleos que puede usar el proceso (respeta la afinidad de CPU del contenedor)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def conexiones_disponibles() -> int:
+    """
+    Conexiones de PostgreSQL que pueden repartirse entre los workers
+
+    `DB_CONEXIONES_MAX` si se indica; si no, se consulta al servidor.
+    """
+    configuradas = _entero("DB_CONEXIONES_MAX")
+    if configuradas is not None:
+        return configuradas
+
+    from sqlalchemy import text
+    from app.db import engine
+
+    try:
+        with engine.connect() as conexion:
+            maximo = conexion.execute(text(
+                "SELECT current_setting('max_connections')::int "
+                "- current_setting('superuser_reserved_connections')::int"
+            )).scalar()
+    finally:
+        engine.dispose()
+    return maximo - _entero("DB_CONEXIONES_RESERVADAS", 10)
+
+
+def dimensionar_pool(workers: int, conexiones: int, pool_size: int, max_overflow: int) -> Tuple[int, int]:
+    """
+    Pool de cada worker para que `workers` procesos no pasen de `conexiones`
+
+    Se respeta lo configurado en el engine y solo se recorta si no cabe:
+    primero el desbordamiento y después el pool fijo.
+
+    Returns:
+        Tuple[int, int]: (pool_size, max_overflow) de cada worker
+
+    Raises:
+        ValueError: Si no queda al menos una conexión de pool por worker
+    """
+    por_worker = conexiones // workers - CONEXIONES_FUERA_DEL_POOL
+    if por_worker < 1:
+        raise ValueError(
+            f"{workers} workers no caben en {conexiones} conexiones "
+            f"({CONEXIONES_FUERA_DEL_POOL} por worker quedan fuera del pool): reduce WEB_WORKERS"
+        )
+    pool = min(pool_size, por_worker)
+    return pool, min(max_overflow, por_worker - pool)
+
+
+def configurar_pool(workers: int) -> None:
+    """Fijar DB_POOL_SIZE/DB_MAX_OVERFLOW para los workers (heredan el entorno)"""
+    from app.db import DB_MAX_OVERFLOW, DB_POOL_SIZE, ES_SQLITE
+
+    if ES_SQLITE:
+        # Cada proceso tendría su propia base en memoria
+        if workers > 1:
+            raise ValueError("DB_BACKEND=sqlite es una base en memoria por proceso: usa WEB_WORKERS=1")
+        return
+    conexiones = conexiones_disponibles()
+    pool, desbordamiento = dimensionar_pool(workers, conexiones, DB_POOL_SIZE, DB_MAX_OVERFLOW)
+    os.environ["DB_POOL_SIZE"] = str(pool)
+    os.environ["DB_MAX_OVERFLOW"] = str(desbordamiento)
+    logger.info(
+        "✅ Pool por worker: %s + %s de desbordamiento (%s workers, %s conexiones disponibles)",
+        pool, desbordamiento, workers, conexiones
+    )
+
+
+def _disponible(modulo: str) -> bool:
+    try:
+        __import__(modulo)
+        return True
+    except ImportError:
+        return False
+
+
+def opciones_uvicorn(workers: int) -> Dict[str, Any]:
+    """Opciones de `uvicorn.run` para producción a partir del entorno"""
+    return {
+        "host": os.getenv("WEB_HOST", "0.0.0.0"),
+        "port": _entero("WEB_PORT", 8000),
+        "workers": workers,
+        "loop": "uvloop" if _disponible("uvloop") else "asyncio",
+        "http": "httptools" if _disponible("httptools") else "h11",
+        "timeout_keep_alive": _entero("WEB_KEEPALIVE", 75),
+        "timeout_graceful_shutdown": _entero("WEB_APAGADO", 30),
+        "backlog": _entero("WEB_BACKLOG", 2048),
+        "limit_concurrency": _entero("WEB_CONCURRENCIA"),
+        "limit_max_requests": _entero("WEB_MAX_PETICIONES"),
+        "access_log": os.getenv("WEB_ACCESS_LOG", "0") == "1",
+        "proxy_headers": True,
+        "server_header": False,
+        "log_level": "info",
+    }
+
+
+def main() -> None:
+    configurar_registro()
+    workers = _entero("WEB_WORKERS") or nucleos_disponibles()
+    configurar_pool(workers)
+    opciones = opciones_uvicorn(workers)
+    logger.info(
+        "🚀 Arrancando %s workers en %s:%s (bucle %s, HTTP %s)",
+        workers, opciones["host"], opciones["port"], opciones["loop"], opciones["http"]
+    )
+    uvicorn.run("app.main:app", **opciones)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,94 @@
 # Tests package
 import os
+import pytest
 from sqlalchemy import text
 
+# Tests de funciones propias de PostgreSQL (particiones, LISTEN/NOTIFY,
+# SKIP LOCKED, SQL directo del dialecto...): se saltan con DB_BACKEND=sqlite
+solo_postgresql = pytest.mark.skipif(
+    os.getenv("DB_BACKEND", "postgresql").lower() == "sqlite",
+    reason="Requiere PostgreSQL"
+)
+
+# Reinicia todas las secuencias. `setval` no es transaccional ni bloquea la
+# secuencia (ALTER SEQUENCE ... RESTART sí, hasta el final de la transacción,
+# y dejaría esperando a cualquier otra conexión que inserte): como todo lo
+# hecho en una TransaccionPrueba se deshace, las tablas vuelven a quedar vacías
+REINICIAR_SECUENCIAS = """
+SELECT setval(format('%I.%I', schemaname, sequencename)::regclass, 1, false)
+FROM pg_sequences
+"""
+
+def reiniciar_secuencias(conexion) -> None:
+    """Reiniciar las secuencias; en SQLite las claves se reinician solas al vaciar las tablas"""
+    from app.db import reiniciar_secuencias as reiniciar_secuencias_emuladas
+
+    if conexion.dialect.name == "sqlite":
+        reiniciar_secuencias_emuladas()
+    else:
+        conexion.execute(text(REINICIAR_SECUENCIAS))
+
+
 def reset_db(db):
     """
     Limpia todas las tablas de la base de datos.
     """
+    if db.bind.dialect.name == "sqlite":
+        from app.db import Base
+
+        for tabla in reversed(Base.metadata.sorted_tables):
+            db.execute(tabla.delete())
+        reiniciar_secuencias(db.connection())
+        db.commit()
+        return
     base_dir = os.path.dirname(os.path.abspath(__file__))
     file_path = os.path.join(base_dir, '..', '..', 'scripts', 'clean_all_tables.sql')
     with open(file_path, "r", encoding="utf-8") as f:
         sql_script = f.read()
     db.execute(text(sql_script))
     db.commit()
+
+
+class TransaccionPrueba:
+    """
+    Sesión de un test dentro de una transacción que se deshace al terminar.
+
+    La sesión trabaja sobre SAVEPOINTs de la transacción externa
+    (`join_transaction_mode="create_savepoint"`): los commit y rollback de
+    los servicios y las rutas no la cierran. La dependencia `get_db` de la
+    app se sustituye por esta sesión, así que las peticiones del TestClient
+    ven y deshacen lo mismo que el test. Las secuencias empiezan en 1.
+
+    No sirve para código que abre sus propias conexiones (trabajadores,
+    auditorías en paralelo, LISTEN/NOTIFY): esos tests siguen con `reset_db`.
+    """
+
+    def __init__(self):
+        # Importaciones diferidas: conftest.py fija la base de datos del
+        # proceso antes de que se cree el engine
+        from app.db import SessionLocal, engine, get_db
+        from app.main import app
+
+        self.app = app
+        self.get_db = get_db
+        self.conexion = engine.connect()
+        self.transaccion = self.conexion.begin()
+        reiniciar_secuencias(self.conexion)
+        self.db = SessionLocal(bind=self.conexion, join_transaction_mode="create_savepoint")
+        app.dependency_overrides[get_db] = self._sesion
+
+    def _sesion(self):
+        yield self.db
+
+    def deshacer(self):
+        """Deshacer todo lo hecho en el test y restaurar la dependencia"""
+        from app.graphql.cache import resultados
+        from app.services.cache_costes import cache_costes
+
+        self.app.dependency_overrides.pop(self.get_db, None)
+        self.db.close()
+        self.transaccion.rollback()
+        self.conexion.close()
+        # Las cachés del proceso pueden guardar datos que ya no existen
+        cache_costes.limpiar()
+        resultados.limpiar()
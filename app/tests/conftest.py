@@ -0,0 +1,83 @@
+"""
+🧪 Configuración de pytest
+
+Con pytest-xdist cada proceso trabajador usa su propia base de datos,
+clonada de la base de pruebas configurada (`POSTGRES_DB`, ya migrada) con
+`CREATE DATABASE ... TEMPLATE`. El clon se crea antes de importar la app,
+para que su engine apunte a él, y se elimina al terminar la sesión.
+
+    pytest -n auto --dist loadscope
+
+`loadscope` mantiene juntas las clases que comparten datos entre tests.
+Sin xdist se usa directamente la base de pruebas configurada.
+
+Con `DB_BACKEND=sqlite` no hace falta ningún servicio: cada proceso
+trabaja sobre su propia base en memoria, que la app crea al importarse.
+Los tests marcados con `solo_postgresql` se saltan.
+
+    DB_BACKEND=sqlite pytest
+"""
+
+import os
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+load_dotenv()
+
+TRABAJADOR = os.getenv("PYTEST_XDIST_WORKER")
+SQLITE = os.getenv("DB_BACKEND", "postgresql").lower() == "sqlite"
+PLANTILLA = None if SQLITE else os.getenv("POSTGRES_DB")
+
+
+def _motor_administracion():
+    """Engine en AUTOCOMMIT contra la base `postgres`, para crear y borrar bases"""
+    url = (
+        f"postgresql+psycopg2://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}"
+        f"@{os.getenv('POSTGRES_HOST')}:{os.getenv('POSTGRES_PORT')}/postgres"
+    )
+    return create_engine(url, isolation_level="AUTOCOMMIT")
+
+
+def _clonar_plantilla(destino: str, intentos: int = 5) -> None:
+    """
+    Crear `destino` como copia de la base de pruebas
+
+    Varios trabajadores pueden clonar a la vez; si PostgreSQL rechaza la
+    copia porque la plantilla está en uso, se reintenta.
+    """
+    motor = _motor_administracion()
+    try:
+        with motor.connect() as conexion:
+            conexion.execute(text(f'DROP DATABASE IF EXISTS "{destino}" WITH (FORCE)'))
+            for intento in range(1, intentos + 1):
+                try:
+                    conexion.execute(text(f'CREATE DATABASE "{destino}" TEMPLATE "{PLANTILLA}"'))
+                    return
+                except OperationalError:
+                    if intento == intentos:
+                        raise
+                    time.sleep(0.2 * intento)
+    finally:
+        motor.dispose()
+
+
+if TRABAJADOR and PLANTILLA:
+    os.environ["POSTGRES_DB"] = f"{PLANTILLA}_{TRABAJADOR}"
+    _clonar_plantilla(os.environ["POSTGRES_DB"])
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Eliminar la base de datos clonada del trabajador"""
+    if not (TRABAJADOR and PLANTILLA):
+        return
+    from app.db import engine
+    engine.dispose()
+    motor = _motor_administracion()
+    try:
+        with motor.connect() as conexion:
+            conexion.execute(text(f'DROP DATABASE IF EXISTS "{os.environ["POSTGRES_DB"]}" WITH (FORCE)'))
+    finally:
+        motor.dispose()
@@ -1,53 +1,29 @@
-from time import sleep
 from fastapi.testclient import TestClient
-from app.db import SessionLocal
 from app.main import app
 from app.schemas.articuloDTO import ArticuloCreate, ArticuloUpdate
 from app.services.articulo_service import ArticuloService
 from sqlalchemy import text
 
 from app.services.familia_service import FamiliaService
-from app.tests import reset_db
+from app.tests import TransaccionPrueba
 
 client = TestClient(app)
 
 class TestEmptyArticulosDB:
-    @classmethod
-    def setup_class(cls):
-        """
-        Configuración inicial para la clase de pruebas.
-        Se ejecuta una vez antes de todos los tests de la clase.
-        Limpia la tabla de familias en la base de datos.
-        """
-        cls.db = SessionLocal()
-        try:
-            reset_db(cls.db)
-            sleep(1)  # Esperar un segundo para asegurar que la base de datos esté limpia
-        finally:
-            cls.db.close()
-        pass
-        
     def setup_method(self, method):
         """
-        Configuración antes de cada método de prueba.
+        Se ejecuta antes de cada test.
+        Abre una transacción que se deshace al terminar el test.
         """
-        self.db = SessionLocal()
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
 
     def teardown_method(self, method):
         """
-        Limpieza después de cada método de prueba.
-        """     
-        self.db.close()
-
-    @classmethod
-    def teardown_class(cls):
-        """
-        Limpieza final para la clase de pruebas.
-        Se ejecuta una vez después de todos los tests de la clase.
+        Se ejecuta después de cada test.
+        Deshace todo lo hecho en el test.
         """
-        cls.db = SessionLocal()
-        reset_db(cls.db)
-        cls.db.close()
+        self.transaccion.deshacer()
 
     
     def test_listar_articulos_vacias(self):
@@ -175,81 +151,61 @@ class TestEmptyArticulosDB:
         assert response.json() == {"detail": "Articulo no encontrado"}
 
 class TestArticulosDBWithData:
-    @classmethod
-    def setup_class(cls):
-        """
-        Configuración inicial para la clase de pruebas.
-        Se ejecuta una vez antes de todos los tests de la clase.
-        Limpia la tabla de familias en la base de datos y crea un Articulo de prueba.
-        """
-        cls.db = SessionLocal()
-        try:
-            reset_db(cls.db)
-            familia_service = FamiliaService(cls.db)
-            familia_data = [
-                {"nombre": "Familia 1", "descripcion": "Descripción de la familia 1"},
-                {"nombre": "Familia 2", "descripcion": "Descripción de la familia 2"}
-            ]
-
-            for familia in familia_data:
-                cls.db.execute(
-                    text("INSERT INTO familia (nombre, descripcion) VALUES (:nombre, :descripcion)"),
-                    {"nombre": familia["nombre"], "descripcion": familia["descripcion"]}
-                )
-            
-            articulo_service = ArticuloService(cls.db)
-            articulo_data = [{
-                "nombre": "Articulo 1",
-                "descripcion": "Descripción del Articulo 1",
-                "codigo": "ART-001",
-                "activo": True,
-                "id_familia": 1
-            }, {
-                "nombre": "Articulo 2",
-                "descripcion": "Descripción del Articulo 2",
-                "codigo": "ART-002",
-                "activo": True,
-                "id_familia": 2
-            }]
-            
-            for articulo in articulo_data:
-                cls.db.execute(
-                    text("INSERT INTO articulo (nombre, descripcion, codigo, activo, id_familia) VALUES (:nombre, :descripcion, :codigo, :activo, :id_familia)"),
-                    {
-                        "nombre": articulo["nombre"],
-                        "descripcion": articulo["descripcion"],
-                        "codigo": articulo["codigo"],
-                        "activo": articulo["activo"],
-                        "id_familia": articulo["id_familia"]
-                    }
-                )
-
-            cls.db.commit()
-        finally:
-            cls.db.close()
-        pass
-        
     def setup_method(self, method):
         """
-        Configuración antes de cada método de prueba.
-        """
-        self.db = SessionLocal()
+        Se ejecuta antes de cada test.
+        Abre una transacción que se deshace al terminar el test.
+        Crea dos familias y un artículo en cada una.
+        """
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
+        familia_service = FamiliaService(self.db)
+        familia_data = [
+            {"nombre": "Familia 1", "descripcion": "Descripción de la familia 1"},
+            {"nombre": "Familia 2", "descripcion": "Descripción de la familia 2"}
+        ]
+
+        for familia in familia_data:
+            self.db.execute(
+                text("INSERT INTO familia (nombre, descripcion) VALUES (:nombre, :descripcion)"),
+                {"nombre": familia["nombre"], "descripcion": familia["descripcion"]}
+            )
+        
+        articulo_service = ArticuloService(self.db)
+        articulo_data = [{
+            "nombre": "Articulo 1",
+            "descripcion": "Descripción del Articulo 1",
+            "codigo": "ART-001",
+            "activo": True,
+            "id_familia": 1
+        }, {
+            "nombre": "Articulo 2",
+            "descripcion": "Descripción del Articulo 2",
+            "codigo": "ART-002",
+            "activo": True,
+            "id_familia": 2
+        }]
+        
+        for articulo in articulo_data:
+            self.db.execute(
+                text("INSERT INTO articulo (nombre, descripcion, codigo, activo, id_familia) VALUES (:nombre, :descripcion, :codigo, :activo, :id_familia)"),
+                {
+                    "nombre": articulo["nombre"],
+                    "descripcion": articulo["descripcion"],
+                    "codigo": articulo["codigo"],
+                    "activo": articulo["activo"],
+                    "id_familia": articulo["id_familia"]
+                }
+            )
+
+        self.db.commit()
 
     def teardown_method(self, method):
         """
-        Limpieza después de cada método de prueba.
-        """     
-        self.db.close()
-
-    @classmethod
-    def teardown_class(cls):
-        """
-        Limpieza final para la clase de pruebas.
-        Se ejecuta una vez después de todos los tests de la clase.
+        Se ejecuta después de cada test.
+        Deshace todo lo hecho en el test.
         """
-        cls.db = SessionLocal()
-        reset_db(cls.db)
-        cls.db.close()
+        self.transaccion.deshacer()
 
     def test_listar_articulos_con_datos(self):
         """
@@ -280,6 +236,32 @@ class TestArticulosDBWithData:
         articulo = response.json()
         assert articulo["id"] == 1
 
+    def test_listar_articulos_con_proyeccion(self):
+        """
+        Test para obtener solo algunos campos de los Articulos
+        """
+        response = client.get("/articulos/", params={"fields": "id,codigo,nombre"})
+        assert response.status_code == 200
+        articulos = response.json()
+        assert len(articulos) > 0
+        for articulo in articulos:
+            assert set(articulo.keys()) == {"id", "codigo", "nombre"}
+
+    def test_obtener_articulo_con_proyeccion(self):
+        """
+        Test para obtener un Articulo existente con solo algunos campos
+        """
+        response = client.get("/articulos/2", params={"fields": "codigo"})
+        assert response.status_code == 200
+        assert response.json() == {"codigo": "ART-002"}
+
+    def test_listar_articulos_con_campo_invalido(self):
+        """
+        Test para intentar proyectar un campo que no existe
+        """
+        response = client.get("/articulos/", params={"fields": "id,no_existe"})
+        assert response.status_code == 400
+
     def test_obtener_articulo_no_existente(self):
         """
         Test para intentar obtener un Articulo que no existe
@@ -390,7 +372,7 @@ class TestArticulosDBWithData:
         Test para intentar actualizar un Articulo con el mismo nombre que otro existente
         """
         articulo_update_data = {
-            "nombre": "Articulo 1 actualizado",  # Nombre ya existente
+            "nombre": "Articulo 1",  # Nombre ya existente
             "descripcion": "Descripción del Articulo 1 duplicado",
             "codigo": "ART-005",
             "activo": True,
@@ -0,0 +1,174 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.db import SessionLocal
+from app.main import app
+from app.services.cache_costes import CacheCostes, cache_costes
+from app.services.stock_service import StockService
+from app.services.valoracion_service import ValoracionService
+
+from app.tests import reset_db
+
+client = TestClient(app)
+
+class TestCacheCostes:
+    @classmethod
+    def setup_class(cls):
+        """
+        Se ejecuta una vez antes de todos los tests de la clase.
+        Crea una silla (10 a 5 €), una mesa de 4 tornillos (100 a 0,10 €) y
+        un pack de 2 sillas y 1 mesa con un 10 % de descuento.
+        """
+        cls.db = SessionLocal()
+        try:
+            reset_db(cls.db)
+            cls.db.execute(text("INSERT INTO articulo (nombre, codigo) VALUES ('Silla', 'SILLA-1'), ('Mesa', 'MESA-1'), ('Pack oficina', 'PACK-1')"))
+            cls.db.execute(text("INSERT INTO producto (tipo_producto, id_articulo) VALUES ('simple', 1), ('compuesto', 2)"))
+            cls.db.execute(text("INSERT INTO producto_simple (id_producto) VALUES (1)"))
+            cls.db.execute(text("INSERT INTO producto_compuesto (id_producto) VALUES (2)"))
+            cls.db.execute(text("INSERT INTO componente (nombre, codigo) VALUES ('Tornillo', 'COMP-001')"))
+            cls.db.execute(text("INSERT INTO componente_producto (id_producto_compuesto, id_componente, cantidad_necesaria) VALUES (1, 1, 4)"))
+            cls.db.execute(text("INSERT INTO pack (nombre, id_articulo, descuento_porcentaje) VALUES ('Pack oficina', 3, 10)"))
+            cls.db.execute(text("INSERT INTO pack_producto (id_pack, id_producto, cantidad_incluida) VALUES (1, 1, 2), (1, 2, 1)"))
+            cls.db.commit()
+            stock_service = StockService(cls.db)
+            stock_service.crear_stock_producto(1, 10, ubicacion_almacen="ALM1/P01", coste_unitario=5)
+            stock_service.crear_stock_componente(1, 100, ubicacion_almacen="ALM1/P02", coste_unitario=0.10)
+        finally:
+            cls.db.close()
+
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        """
+        self.db = SessionLocal()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Cierra la sesión de base de datos.
+        """
+        self.db.close()
+
+    @classmethod
+    def teardown_class(cls):
+        """
+        Se ejecuta una vez después de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def test_invalidacion_en_cascada(self):
+        """
+        Test de la caché aislada: invalidar un nodo descarta sus dependientes y
+        no se guardan valores calculados antes de una invalidación.
+        """
+        cache = CacheCostes()
+        generacion = cache.generacion
+        cache.guardar(("componente", 1), 1.0, [], generacion)
+        cache.guardar(("componente", 2), 2.0, [], generacion)
+        cache.guardar(("producto_compuesto", 1), 4.0, [("componente", 1)], generacion)
+        cache.guardar(("pack", 1), 3.6, [("producto_compuesto", 1)], generacion)
+
+        assert cache.invalidar([("componente", 1)]) == {("componente", 1), ("producto_compuesto", 1), ("pack", 1)}
+        assert cache.contiene(("componente", 2)) and not cache.contiene(("pack", 1))
+
+        cache.guardar(("componente", 1), 1.5, [], generacion)
+        assert not cache.contiene(("componente", 1))
+
+    def test_cambio_ajeno_no_impide_guardar(self):
+        """
+        Test de la caché aislada: una invalidación durante el cálculo solo impide
+        guardar los valores que dependen del nodo invalidado.
+        """
+        cache = CacheCostes()
+        generacion = cache.generacion
+        cache.invalidar([("componente", 2)])
+
+        cache.guardar(("componente", 1), 1.0, [], generacion)
+        cache.guardar(("producto_compuesto", 1), 4.0, [("componente", 1)], generacion)
+        cache.guardar(("producto_compuesto", 2), 8.0, [("componente", 1), ("componente", 2)], generacion)
+
+        assert cache.contiene(("componente", 1)) and cache.contiene(("producto_compuesto", 1))
+        assert not cache.contiene(("producto_compuesto", 2))
+
+    def test_costes_memorizados(self):
+        """
+        Test de los costes memorizados frente al cálculo del catálogo completo.
+        """
+        cache_costes.limpiar()
+        servicio = ValoracionService(self.db)
+        catalogo = servicio.costes_catalogo()
+        assert servicio.costes_productos([1, 2]) == catalogo["productos"]
+        assert servicio.costes_packs([1]) == catalogo["packs"]
+        assert servicio.costes_packs([1])[1]["coste_fifo"] == 9.36
+        for nodo in [("componente", 1), ("producto_simple", 1), ("producto_compuesto", 1),
+                     ("producto", 1), ("producto", 2), ("pack", 1)]:
+            assert cache_costes.contiene(nodo)
+
+    def test_entrada_invalida_solo_lo_afectado(self):
+        """
+        Test para una entrada con coste de tornillos: se recalculan el tornillo,
+        la mesa y el pack, y la silla sigue en caché.
+        """
+        servicio = ValoracionService(self.db)
+        servicio.costes_packs([1])
+
+        StockService(self.db).registrar_movimiento(2, 100, "entrada", motivo="Compra", coste_unitario=0.30)
+        for nodo in [("componente", 1), ("producto_compuesto", 1), ("producto", 2), ("pack", 1)]:
+            assert not cache_costes.contiene(nodo)
+        assert cache_costes.contiene(("producto_simple", 1)) and cache_costes.contiene(("producto", 1))
+
+        # 200 tornillos: 100 a 0,10 y 100 a 0,30 → 0,20 cada uno; mesa 0,80
+        assert servicio.costes_productos([2])[2]["coste_fifo"] == 0.8
+        assert servicio.costes_packs([1]) == servicio.costes_catalogo()["packs"]
+
+    def test_rollback_no_invalida(self):
+        """
+        Test para cambios sin confirmar: la sesión que los hace calcula sin
+        caché, las demás siguen viendo el valor confirmado y un rollback no
+        invalida nada.
+        """
+        servicio = ValoracionService(self.db)
+        servicio.costes_packs([1])
+        generacion = cache_costes.generacion
+
+        self.db.execute(text("UPDATE pack SET descuento_porcentaje = 50 WHERE id = 1"))
+        assert servicio.costes_packs([1])[1]["descuento_porcentaje"] == 50
+        otra = SessionLocal()
+        try:
+            assert ValoracionService(otra).costes_packs([1])[1]["descuento_porcentaje"] == 10
+        finally:
+            otra.close()
+        self.db.rollback()
+
+        assert cache_costes.generacion == generacion and cache_costes.contiene(("pack", 1))
+        assert servicio.costes_packs([1])[1]["descuento_porcentaje"] == 10
+
+    def test_api_analisis_costos(self):
+        """
+        Test para el análisis de costos actual (memorizado) y a una fecha.
+        """
+        response = client.get("/inventario/analisis/costos")
+        assert response.status_code == 200
+        actual = response.json()
+        assert actual["fecha_corte"] is None
+        assert actual["packs"][0]["coste_fifo"] == 9.72
+
+        response = client.get("/inventario/analisis/costos?fecha_corte=2100-01-01")
+        assert response.status_code == 200
+        assert response.json()["packs"] == actual["packs"]
+
+    def test_escritura_ajena_no_vacia_la_cache(self):
+        """
+        Test para SQL textual sobre una tabla que no interviene en los costes:
+        no debe vaciar la caché.
+        """
+        servicio = ValoracionService(self.db)
+        servicio.costes_packs([1])
+
+        self.db.execute(text("UPDATE articulo SET nombre = 'Silla de oficina' WHERE codigo = 'SILLA-1'"))
+        self.db.commit()
+
+        assert cache_costes.contiene(("pack", 1)) and cache_costes.contiene(("componente", 1))
@@ -1,52 +1,27 @@
-from time import sleep
 from fastapi.testclient import TestClient
-from app.db import SessionLocal
 from app.main import app
 from app.schemas.colorDTO import ColorCreate, ColorUpdate
 from sqlalchemy import text
 
-from app.tests import reset_db
+from app.tests import TransaccionPrueba
 
 client = TestClient(app)
 
 class TestEmptyColorDB:
-    @classmethod
-    def setup_class(cls):
-        """
-        Se ejecuta una vez antes de todos los tests de la clase.
-        Limpia la base de datos.
-        """
-        cls.db = SessionLocal()
-        try:
-            reset_db(cls.db)
-            sleep(1)  # Esperar un segundo para asegurar que la base de datos esté limpia
-        finally:
-            cls.db.close()
-            
     def setup_method(self, method):
         """
         Se ejecuta antes de cada test.
-        Limpia la tabla de colores en la base de datos.
+        Abre una transacción que se deshace al terminar el test.
         """
-        self.db = SessionLocal()
-        pass
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
 
     def teardown_method(self, method):
         """
         Se ejecuta después de cada test.
-        Cierra la sesión de base de datos.
+        Deshace todo lo hecho en el test.
         """
-        self.db.close()
-
-    @classmethod
-    def teardown_class(cls):
-        """
-        Se ejecuta una vez después de todos los tests de la clase.
-        Cierra la sesión de base de datos.
-        """
-        cls.db = SessionLocal()
-        reset_db(cls.db)
-        cls.db.close()
+        self.transaccion.deshacer()
 
     def test_listar_colores_vacíos(self):
         """
@@ -216,86 +191,64 @@ class TestEmptyColorDB:
         assert response.json() == {"detail": "Color no encontrado"}
 
 class TestColorDBWithData:
-    @classmethod
-    def setup_class(cls):
-        """
-        Se ejecuta una vez antes de todos los tests de la clase.
-        Limpia la tabla de colores en la base de datos y crea un color inicial.
-        """
-        cls.db = SessionLocal()
-        try:
-            reset_db(cls.db)
-            sleep(1)  # Esperar un segundo para asegurar que la base de datos esté limpia
-            # Crear familias iniciales
-            familia_data = [{
-                "nombre": "Familia de prueba",
-                "descripcion": "Descripción de la familia de prueba"
-                }, {
-                "nombre": "Familia de prueba 2",
-                "descripcion": "Descripción de la familia de prueba 2"
-            }]
-            color_data = [{
-                "nombre": "Verde",
-                "codigo_hex": "#00FF00",
-                "url_imagen": "http://example.com/verde.png",
-                "activo": True,
-                "descripcion": "Color verde brillante",
-                "id_familia": 1
-            }, {
-                "nombre": "Azul",
-                "codigo_hex": "#0000FF",
-                "url_imagen": "http://example.com/azul.png",
-                "activo": True,
-                "descripcion": "Color azul brillante",
-                "id_familia": None
-            }]
-            # Insertar familias
-            for familia in familia_data:
-                cls.db.execute(
-                    text("INSERT INTO familia (nombre, descripcion) VALUES (:nombre, :descripcion)"),
-                    {"nombre": familia["nombre"], "descripcion": familia["descripcion"]}
-                )
-            # Insertar colores
-            for color in color_data:
-                cls.db.execute(
-                    text("INSERT INTO color (nombre, codigo_hex, url_imagen, activo, descripcion, id_familia) VALUES (:nombre, :codigo_hex, :url_imagen, :activo, :descripcion, :id_familia)"),
-                    {
-                        "nombre": color["nombre"],
-                        "codigo_hex": color["codigo_hex"],
-                        "url_imagen": color["url_imagen"],
-                        "activo": color["activo"],
-                        "descripcion": color["descripcion"],
-                        "id_familia": color["id_familia"]
-                    }
-                )
-            cls.db.commit()
-            sleep(1)  # Esperar un segundo para asegurar que el color se haya creado
-        finally:
-            cls.db.close()
-
     def setup_method(self, method):
         """
         Se ejecuta antes de cada test.
-        """
-        self.db = SessionLocal()
-        pass
+        Abre una transacción que se deshace al terminar el test.
+        Crea dos familias y los colores Verde (familia 1) y Azul.
+        """
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
+        # Crear familias iniciales
+        familia_data = [{
+            "nombre": "Familia de prueba",
+            "descripcion": "Descripción de la familia de prueba"
+            }, {
+            "nombre": "Familia de prueba 2",
+            "descripcion": "Descripción de la familia de prueba 2"
+        }]
+        color_data = [{
+            "nombre": "Verde",
+            "codigo_hex": "#00FF00",
+            "url_imagen": "http://example.com/verde.png",
+            "activo": True,
+            "descripcion": "Color verde brillante",
+            "id_familia": 1
+        }, {
+            "nombre": "Azul",
+            "codigo_hex": "#0000FF",
+            "url_imagen": "http://example.com/azul.png",
+            "activo": True,
+            "descripcion": "Color azul brillante",
+            "id_familia": None
+        }]
+        # Insertar familias
+        for familia in familia_data:
+            self.db.execute(
+                text("INSERT INTO familia (nombre, descripcion) VALUES (:nombre, :descripcion)"),
+                {"nombre": familia["nombre"], "descripcion": familia["descripcion"]}
+            )
+        # Insertar colores
+        for color in color_data:
+            self.db.execute(
+                text("INSERT INTO color (nombre, codigo_hex, url_imagen, activo, descripcion, id_familia) VALUES (:nombre, :codigo_hex, :url_imagen, :activo, :descripcion, :id_familia)"),
+                {
+                    "nombre": color["nombre"],
+                    "codigo_hex": color["codigo_hex"],
+                    "url_imagen": color["url_imagen"],
+                    "activo": color["activo"],
+                    "descripcion": color["descripcion"],
+                    "id_familia": color["id_familia"]
+                }
+            )
+        self.db.commit()
 
     def teardown_method(self, method):
         """
         Se ejecuta después de cada test.
-        Cierra la sesión de base de datos.
+        Deshace todo lo hecho en el test.
         """
-        self.db.close()
-
-    @classmethod
-    def teardown_class(cls):
-        """
-        Se ejecuta una vez después de todos los tests de la clase.
-        Limpia la base de datos.
-        """
-        cls.db = SessionLocal()
-        reset_db(cls.db)
-        cls.db.close()
+        self.transaccion.deshacer()
 
     def test_listar_colores_con_datos(self):
         """
@@ -334,6 +287,37 @@ class TestColorDBWithData:
         assert color["id"] == 1
         assert color["nombre"] == "Verde"
 
+    def test_listar_colores_no_modificados(self):
+        """
+        Test para la validación condicional del listado de colores.
+        Con el ETag vigente debe devolver 304 sin cuerpo.
+        """
+        response = client.get("/colores/")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        response = client.get("/colores/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        response = client.get("/colores/", headers={"If-None-Match": 'W/"otra-version"'})
+        assert response.status_code == 200
+
+    def test_obtener_color_no_modificado(self):
+        """
+        Test para la validación condicional de un color por ETag y Last-Modified.
+        """
+        response = client.get("/colores/1")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+
+        response = client.get("/colores/1", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        response = client.get("/colores/1", headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 304
+
     def test_obtener_color_no_existente(self):
         """
         Test para obtener un color que no existe.
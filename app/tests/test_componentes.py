@@ -0,0 +1,76 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from sqlalchemy import text
+
+from app.tests import TransaccionPrueba
+
+client = TestClient(app)
+
+class TestComponentesDBWithData:
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Abre una transacción que se deshace al terminar el test.
+        Crea los componentes Tornillo y Tuerca.
+        """
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
+        self.db.execute(text(
+            "INSERT INTO componente (nombre, descripcion, codigo) VALUES "
+            "('Tornillo', 'Tornillo M4', 'COMP-001'), ('Tuerca', 'Tuerca M4', 'COMP-002')"
+        ))
+        self.db.commit()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Deshace todo lo hecho en el test.
+        """
+        self.transaccion.deshacer()
+
+    def test_listar_componentes(self):
+        """
+        Test para listar componentes con todos sus campos.
+        """
+        response = client.get("/componentes/")
+        assert response.status_code == 200
+        componentes = response.json()
+        assert [c["codigo"] for c in componentes] == ["COMP-001", "COMP-002"]
+        assert componentes[0]["descripcion"] == "Tornillo M4"
+
+    def test_listar_componentes_con_proyeccion(self):
+        """
+        Test para listar componentes con solo algunos campos.
+        Cada componente debe traer exactamente los campos pedidos.
+        """
+        response = client.get("/componentes/", params={"fields": "id,codigo"})
+        assert response.status_code == 200
+        componentes = response.json()
+        assert len(componentes) == 2
+        for componente in componentes:
+            assert set(componente.keys()) == {"id", "codigo"}
+
+    def test_obtener_componente_con_proyeccion(self):
+        """
+        Test para obtener un componente existente con solo algunos campos.
+        """
+        response = client.get("/componentes/2", params={"fields": "nombre,codigo"})
+        assert response.status_code == 200
+        assert response.json() == {"nombre": "Tuerca", "codigo": "COMP-002"}
+
+    def test_obtener_componente_no_existente(self):
+        """
+        Test para intentar obtener un componente que no existe.
+        Debe retornar un error 404.
+        """
+        response = client.get("/componentes/9999", params={"fields": "codigo"})
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Componente no encontrado"}
+
+    def test_proyeccion_con_campo_invalido(self):
+        """
+        Test para intentar proyectar un campo que no existe.
+        Debe retornar un error 400 en el listado y en el detalle.
+        """
+        assert client.get("/componentes/", params={"fields": "id,no_existe"}).status_code == 400
+        assert client.get("/componentes/1", params={"fields": "no_existe"}).status_code == 400
@@ -0,0 +1,219 @@
+import csv
+import gzip
+import io
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.compresion import Compresion, elegir_codificacion
+from app.main import app
+from app.services.stock_service import StockService
+
+from app.tests import TransaccionPrueba
+
+client = TestClient(app)
+
+
+def _app_prueba() -> FastAPI:
+    """App mínima con respuestas pequeñas, grandes, en streaming y ya comprimidas"""
+    prueba = FastAPI()
+    prueba.add_middleware(Compresion, minimo=1000, codificaciones=["gzip"])
+
+    @prueba.get("/pequena")
+    def pequena():
+        return PlainTextResponse("x" * 999)
+
+    @prueba.get("/grande")
+    def grande():
+        return PlainTextResponse("x" * 5000, headers={"ETag": '"v1"'})
+
+    @prueba.get("/streaming")
+    def streaming():
+        return StreamingResponse(iter([b"a" * 600, b"b" * 600, b"c" * 600]), media_type="text/plain")
+
+    @prueba.get("/streaming-pequeno")
+    def streaming_pequeno():
+        return StreamingResponse(iter([b"a" * 10, b"b" * 10]), media_type="text/plain")
+
+    @prueba.get("/codificada")
+    def codificada():
+        return PlainTextResponse(gzip.compress(b"y" * 5000), headers={"Content-Encoding": "gzip"})
+
+    return prueba
+
+
+class TestCompresion:
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Cliente de una app mínima que solo comprime con gzip a partir de 1000 bytes.
+        """
+        self.cliente = TestClient(_app_prueba())
+
+    def _get(self, ruta, codificacion="gzip"):
+        # Sin descomprimir: se comprueba el cuerpo tal como llega
+        with self.cliente.stream("GET", ruta, headers={"Accept-Encoding": codificacion}) as respuesta:
+            return respuesta, b"".join(respuesta.iter_raw())
+
+    def test_elegir_codificacion(self):
+        """
+        Test de la negociación de Accept-Encoding: calidad, comodín y preferencia.
+        """
+        assert elegir_codificacion("gzip, br", ["br", "gzip"]) == "br"
+        assert elegir_codificacion("gzip;q=1, br;q=0.5", ["br", "gzip"]) == "gzip"
+        assert elegir_codificacion("br;q=0, *", ["br", "gzip"]) == "gzip"
+        assert elegir_codificacion("identity", ["br", "gzip"]) is None
+        assert elegir_codificacion("gzip;q=0", ["gzip"]) is None
+        assert elegir_codificacion("", ["gzip"]) is None
+
+    def test_umbral(self):
+        """
+        Test del umbral: por debajo sale tal cual y por encima con gzip,
+        Content-Length del cuerpo comprimido, Vary y ETag débil.
+        """
+        respuesta, cuerpo = self._get("/pequena")
+        assert "content-encoding" not in respuesta.headers
+        assert cuerpo == b"x" * 999
+
+        respuesta, cuerpo = self._get("/grande")
+        assert respuesta.headers["content-encoding"] == "gzip"
+        assert respuesta.headers["vary"] == "Accept-Encoding"
+        assert respuesta.headers["etag"] == 'W/"v1"'
+        assert int(respuesta.headers["content-length"]) == len(cuerpo) < 5000
+        assert gzip.decompress(cuerpo) == b"x" * 5000
+
+    def test_sin_compresion_aceptada(self):
+        """
+        Test de un cliente que no acepta gzip: respuesta sin tocar.
+        """
+        respuesta, cuerpo = self._get("/grande", codificacion="identity")
+        assert "content-encoding" not in respuesta.headers
+        assert respuesta.headers["etag"] == '"v1"'
+        assert cuerpo == b"x" * 5000
+
+    def test_streaming(self):
+        """
+        Test de una respuesta en streaming: se comprime por bloques al superar
+        el umbral y, si termina antes, sale sin comprimir.
+        """
+        respuesta, cuerpo = self._get("/streaming")
+        assert respuesta.headers["content-encoding"] == "gzip"
+        assert "content-length" not in respuesta.headers
+        assert gzip.decompress(cuerpo) == b"a" * 600 + b"b" * 600 + b"c" * 600
+
+        respuesta, cuerpo = self._get("/streaming-pequeno")
+        assert "content-encoding" not in respuesta.headers
+        assert cuerpo == b"a" * 10 + b"b" * 10
+
+    def test_respuesta_ya_codificada(self):
+        """
+        Test de una respuesta que ya trae Content-Encoding: no se vuelve a comprimir.
+        """
+        respuesta, cuerpo = self._get("/codificada")
+        assert respuesta.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(cuerpo) == b"y" * 5000
+
+
+class TestListadosEnStreaming:
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Crea 60 artículos con producto simple y stock, y un producto compuesto.
+        Todo se deshace al terminar el test.
+        """
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
+        for numero in range(1, 61):
+            self.db.execute(text(
+                f"INSERT INTO articulo (nombre, codigo, activo) VALUES ('Artículo {numero}', 'ART-{numero:03d}', true)"
+            ))
+        self.db.execute(text("INSERT INTO producto (tipo_producto, id_articulo) SELECT 'simple', id FROM articulo"))
+        self.db.execute(text("INSERT INTO producto_simple (id_producto) SELECT id FROM producto"))
+        self.db.execute(text("INSERT INTO articulo (nombre, codigo, activo) VALUES ('Mesa', 'MESA-1', true)"))
+        self.db.execute(text("INSERT INTO producto (tipo_producto, id_articulo) VALUES ('compuesto', 61)"))
+        self.db.execute(text("INSERT INTO producto_compuesto (id_producto) VALUES (61)"))
+        self.db.commit()
+        stock_service = StockService(self.db)
+        for numero in range(1, 61):
+            stock_service.crear_stock_producto(numero, numero, ubicacion_almacen="ALM1/P01")
+        stock_service.crear_stock_producto(1, 5, ubicacion_almacen="ALM2/P01")
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Deshace todo lo hecho en el test.
+        """
+        self.transaccion.deshacer()
+
+    def test_listar_stock_comprimido(self):
+        """
+        Test del listado de stock en streaming: lista JSON completa, comprimida
+        con gzip y en el orden de id.
+        """
+        response = client.get("/stock/?limit=1000", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        stocks = response.json()
+        assert len(stocks) == 61
+        assert [s["id"] for s in stocks] == list(range(1, 62))
+        assert stocks[0]["cantidad_actual"] == 1.0
+        assert stocks[0]["ubicacion_almacen"] == "ALM1/P01"
+
+    def test_listar_stock_ruta_no_valida(self):
+        """
+        Test de un filtro no válido: 400 antes de empezar a enviar la lista.
+        """
+        response = client.get("/stock/?ubicacion=ALM1//P01")
+        assert response.status_code == 400
+
+    def test_listar_articulos_en_streaming(self):
+        """
+        Test del listado de artículos en streaming, completo y con proyección.
+        """
+        response = client.get("/articulos/?limite=0")
+        assert response.status_code == 200
+        assert "etag" in response.headers
+        articulos = response.json()
+        assert len(articulos) == 61
+        assert articulos[0]["codigo"] == "ART-001"
+        assert "created_at" in articulos[0]
+
+        response = client.get("/articulos/?limite=2&offset=1&fields=codigo")
+        assert response.json() == [{"codigo": "ART-002"}, {"codigo": "ART-003"}]
+
+    def test_exportar_json(self):
+        """
+        Test de la exportación JSON: una fila por producto, con el stock de los
+        simples sumado entre almacenes y sin stock en los compuestos.
+        """
+        response = client.get("/inventario/exportar/json")
+        assert response.status_code == 200
+        filas = response.json()
+        assert len(filas) == 61
+        assert filas[0] == {
+            "id_producto": 1, "tipo_producto": "simple", "id_articulo": 1, "codigo": "ART-001",
+            "nombre": "Artículo 1", "activo": True, "id_familia": None, "id_producto_simple": 1,
+            "cantidad_actual": 6.0, "registros_stock": 2
+        }
+        assert filas[-1]["tipo_producto"] == "compuesto"
+        assert filas[-1]["cantidad_actual"] is None
+
+    def test_exportar_csv(self):
+        """
+        Test de la exportación CSV: cabecera y una línea por producto, como descarga.
+        """
+        response = client.get("/inventario/exportar/csv?incluir_stock=false")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        filas = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(filas) == 61
+        assert filas[1]["codigo"] == "ART-002"
+        assert "cantidad_actual" not in filas[1]
+
+    def test_exportar_formato_no_valido(self):
+        """
+        Test de un formato de exportación no soportado.
+        """
+        response = client.get("/inventario/exportar/excel")
+        assert response.status_code == 400
@@ -0,0 +1,130 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.main import app
+from app.services.producto_service import ProductoService
+from app.services.stock_service import StockService
+from app.services.ubicacion_service import UbicacionService
+
+from app.tests import TransaccionPrueba
+
+client = TestClient(app)
+
+class TestDisponibilidad:
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Crea un producto compuesto (Mesa = 4 tornillos + 1 tablero) y stock de
+        sus componentes en dos almacenes y sin ubicación.
+        Todo se deshace al terminar el test.
+        """
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
+        self.db.execute(text("INSERT INTO componente (nombre, codigo) VALUES ('Tornillo', 'COMP-001'), ('Tablero', 'COMP-002')"))
+        self.db.execute(text("INSERT INTO articulo (nombre, codigo) VALUES ('Mesa', 'MESA-1')"))
+        self.db.execute(text("INSERT INTO producto (tipo_producto, id_articulo) VALUES ('compuesto', 1)"))
+        self.db.execute(text("INSERT INTO producto_compuesto (id_producto) VALUES (1)"))
+        self.db.execute(text(
+            "INSERT INTO componente_producto (id_producto_compuesto, id_componente, cantidad_necesaria) VALUES (1, 1, 4), (1, 2, 1)"
+        ))
+        self.db.commit()
+        stock_service = StockService(self.db)
+        stock_service.crear_stock_componente(1, 10, ubicacion_almacen="ALM1/P01/E01")
+        stock_service.crear_stock_componente(1, 5, ubicacion_almacen="ALM1/P02/E03")
+        stock_service.crear_stock_componente(1, 6, ubicacion_almacen="ALM2/P01")
+        stock_service.crear_stock_componente(1, 2)
+        stock_service.crear_stock_componente(2, 3, ubicacion_almacen="ALM2/P05")
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Deshace todo lo hecho en el test.
+        """
+        self.transaccion.deshacer()
+
+    def _almacen(self, ruta):
+        return UbicacionService(self.db).obtener_por_ruta(ruta).id
+
+    def test_almacen_del_stock(self):
+        """
+        Test para el almacén asignado al stock: la raíz de su ruta.
+        """
+        stocks = StockService(self.db).listar_stock(id_componente=1)
+        assert [stock.id_almacen for stock in stocks] == [
+            self._almacen("ALM1"), self._almacen("ALM1"), self._almacen("ALM2"), None
+        ]
+
+    def test_disponibilidad_por_almacen(self):
+        """
+        Test para el resumen de disponibilidad.
+        El total incluye todos los almacenes y el stock sin ubicación.
+        """
+        disponibilidad = StockService(self.db).obtener_disponibilidad(id_componente=1)
+        assert disponibilidad["cantidad_total"] == 23
+        assert disponibilidad["registros"] == 4
+        assert [(d["almacen"], d["cantidad_actual"], d["registros"]) for d in disponibilidad["por_almacen"]] == [
+            ("ALM1", 15, 2), ("ALM2", 6, 1)
+        ]
+
+    def test_resumen_sigue_los_cambios(self):
+        """
+        Test para el mantenimiento incremental del resumen.
+        Movimientos, bajas y rollbacks deben reflejarse sin recalcular.
+        """
+        stock_service = StockService(self.db)
+        alm1 = stock_service.listar_stock(id_componente=1, ubicacion="ALM1/P02")[0]
+        stock_service.registrar_movimiento(alm1.id, 4, "salida")
+        assert stock_service.obtener_disponibilidad(id_componente=1)["por_almacen"][0]["cantidad_actual"] == 11
+
+        alm2 = stock_service.listar_stock(id_componente=1, ubicacion="ALM2")[0]
+        alm2.cantidad_actual = 100
+        self.db.flush()
+        self.db.rollback()
+        assert stock_service.obtener_disponibilidad(id_componente=1)["cantidad_total"] == 19
+
+        stock_service.eliminar(alm2.id)
+        disponibilidad = stock_service.obtener_disponibilidad(id_componente=1)
+        assert disponibilidad["cantidad_total"] == 13
+        assert [d["almacen"] for d in disponibilidad["por_almacen"]] == ["ALM1"]
+
+        stock_service.crear_stock_componente(1, 6, ubicacion_almacen="ALM2/P01")
+        assert stock_service.obtener_disponibilidad(id_componente=1)["cantidad_total"] == 19
+
+    def test_verificar_fabricacion_por_almacen(self):
+        """
+        Test para la disponibilidad de fabricación con el resumen.
+        En total hay material para 3 mesas; en ALM1 faltan tableros.
+        """
+        producto_service = ProductoService(self.db)
+        resultado = producto_service.verificar_disponibilidad_fabricacion(1, 3)
+        assert resultado["puede_fabricar"] is True
+        assert [d["cantidad_disponible"] for d in resultado["detalles_componentes"]] == [23, 3]
+
+        resultado = producto_service.verificar_disponibilidad_fabricacion(1, 1, id_almacen=self._almacen("ALM1"))
+        assert resultado["puede_fabricar"] is False
+        assert resultado["componentes_faltantes"][0]["nombre"] == "Tablero"
+        assert resultado["componentes_faltantes"][0]["cantidad_faltante"] == 1
+
+    def test_recalcular_disponibilidad(self):
+        """
+        Test para la reconstrucción del resumen tras un cambio con SQL directo.
+        """
+        self.db.execute(text("UPDATE stock SET cantidad_actual = cantidad_actual + 1 WHERE id_componente = 2"))
+        self.db.commit()
+        stock_service = StockService(self.db)
+        assert stock_service.obtener_disponibilidad(id_componente=2)["cantidad_total"] == 3
+
+        response = client.post("/stock/disponibilidad/recalcular")
+        assert response.status_code == 200
+        assert stock_service.obtener_disponibilidad(id_componente=2)["cantidad_total"] == 4
+        assert stock_service.obtener_disponibilidad(id_componente=1)["cantidad_total"] == 23
+
+    def test_api_disponibilidad(self):
+        """
+        Test para el endpoint de disponibilidad.
+        """
+        response = client.get("/stock/disponibilidad?id_componente=2")
+        assert response.status_code == 200
+        assert response.json()["por_almacen"][0]["almacen"] == "ALM2"
+
+        response = client.get("/stock/disponibilidad")
+        assert response.status_code == 400
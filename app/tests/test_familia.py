@@ -1,51 +1,28 @@
-from time import sleep
 from fastapi.testclient import TestClient
-from app.db import SessionLocal
 from app.main import app
 from app.schemas.familiaDTO import FamiliaCreate
 from app.services.familia_service import FamiliaService
 from sqlalchemy import text
 
-from app.tests import reset_db
+from app.tests import TransaccionPrueba, solo_postgresql
 
 client = TestClient(app)
 
 class TestEmptyFamiliaDB:
-    @classmethod
-    def setup_class(cls):
-        """
-        Configuración inicial para la clase de pruebas.
-        Se ejecuta una vez antes de todos los tests de la clase.
-        Limpia la tabla de familias en la base de datos.
-        """
-        cls.db = SessionLocal()
-        try:
-            reset_db(cls.db)
-            sleep(1)  # Esperar un segundo para asegurar que la base de datos esté limpia
-        finally:
-            cls.db.close()
-        pass
-        
     def setup_method(self, method):
         """
-        Configuración antes de cada método de prueba.
+        Se ejecuta antes de cada test.
+        Abre una transacción que se deshace al terminar el test.
         """
-        self.db = SessionLocal()
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
 
     def teardown_method(self, method):
         """
-        Limpieza después de cada método de prueba.
-        """     
-        self.db.close()
-
-    def teardown_class(cls):
-        """
-        Limpieza final para la clase de pruebas.
-        Se ejecuta una vez después de todos los tests de la clase.
+        Se ejecuta después de cada test.
+        Deshace todo lo hecho en el test.
         """
-        cls.db = SessionLocal()
-        reset_db(cls.db)
-        cls.db.close()
+        self.transaccion.deshacer()
 
     
     def test_listar_familias_vacias(self):
@@ -128,6 +105,7 @@ class TestEmptyFamiliaDB:
         response = client.post("/familias/", json=datos_incorrectos)
         assert response.status_code == 400
         
+    @solo_postgresql
     def test_crear_familia_nombre_muy_largo(self):
         """
         Test para crear una familia con nombre muy largo
@@ -189,47 +167,27 @@ class TestEmptyFamiliaDB:
         assert response.json() == {"detail": "Familia no encontrada"}
 
 class TestFamiliaDBWithData:
-    @classmethod
-    def setup_class(cls):
-        """
-        Configuración inicial para la clase de pruebas.
-        Se ejecuta una vez antes de todos los tests de la clase.
-        Crea una familia de ejemplo en la base de datos.
-        """
-        cls.db = SessionLocal()
-        try:
-            reset_db(cls.db)
-            sleep(1)  # Esperar un segundo para asegurar que la base de datos esté limpia
-            familia = {
-                "nombre": "Electrónica",
-                "descripcion": "Familia de productos electrónicos"
-            }
-            cls.db.execute(text("INSERT INTO familia (nombre, descripcion) VALUES (:nombre, :descripcion)"), familia)
-            cls.db.commit()
-        finally:
-            cls.db.close()
-
     def setup_method(self, method):
         """
-        Configuración antes de cada método de prueba.
+        Se ejecuta antes de cada test.
+        Abre una transacción que se deshace al terminar el test.
+        Crea la familia Electrónica.
         """
-        self.db = SessionLocal()
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
+        familia = {
+            "nombre": "Electrónica",
+            "descripcion": "Familia de productos electrónicos"
+        }
+        self.db.execute(text("INSERT INTO familia (nombre, descripcion) VALUES (:nombre, :descripcion)"), familia)
+        self.db.commit()
 
     def teardown_method(self, method):
         """
-        Limpieza después de cada método de prueba.
-        """
-        self.db.close()
-
-    def teardown_class(cls):
-        """
-        Limpieza final para la clase de pruebas.
-        Se ejecuta una vez después de todos los tests de la clase.
-        Elimina todas las familias de la base de datos.
+        Se ejecuta después de cada test.
+        Deshace todo lo hecho en el test.
         """
-        cls.db = SessionLocal()
-        reset_db(cls.db)
-        cls.db.close()
+        self.transaccion.deshacer()
 
     def test_listar_familias_con_datos(self):
         """
@@ -362,6 +320,7 @@ class TestFamiliaDBWithData:
         response = client.put("/familias/1", json=datos_incorrectos)
         assert response.status_code == 400
 
+    @solo_postgresql
     def test_actualizar_familia_nombre_muy_largo(self):
         """
         Test para intentar actualizar una familia con nombre muy largo
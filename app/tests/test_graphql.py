@@ -0,0 +1,250 @@
+import time
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from app.db import SessionLocal, engine
+from app.graphql.cache import hash_consulta
+from app.graphql.versiones import CANAL_TABLAS, escucha_tablas
+from app.main import app
+from app.services.articulo_service import ArticuloService
+
+from app.tests import reset_db, solo_postgresql
+
+client = TestClient(app)
+
+NUM_PACKS = 30
+
+CONSULTA_PACKS = """
+query Packs($limite: Int!) {
+    packs(limite: $limite) {
+        nombre
+        productos {
+            cantidad_incluida
+            producto {
+                articulo { codigo }
+                producto_simple { stock { cantidad_actual necesita_reposicion } }
+            }
+        }
+    }
+}
+"""
+
+def contar_selects(funcion):
+    """Ejecutar `funcion` y devolver (resultado, número de SELECT ejecutados)"""
+    sentencias = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        resultado = funcion()
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+    return resultado, len([s for s in sentencias if s.lstrip().upper().startswith("SELECT")])
+
+@solo_postgresql
+class TestGraphQL:
+    @classmethod
+    def setup_class(cls):
+        """
+        Se ejecuta una vez antes de todos los tests de la clase.
+        Limpia la base de datos y crea packs de dos productos simples con stock.
+        Arranca la escucha de invalidaciones de la caché de resultados.
+        """
+        escucha_tablas.iniciar()
+        cls.db = SessionLocal()
+        try:
+            reset_db(cls.db)
+            cls.db.execute(text("INSERT INTO familia (nombre) VALUES ('Familia 1')"))
+            cls.db.execute(text(
+                "INSERT INTO articulo (nombre, codigo, activo, id_familia) "
+                "SELECT 'Producto ' || i, 'PROD-' || i, true, 1 FROM generate_series(1, :n) AS i"
+            ), {"n": NUM_PACKS * 2})
+            cls.db.execute(text("INSERT INTO producto (tipo_producto, id_articulo) SELECT 'simple', id FROM articulo ORDER BY id"))
+            cls.db.execute(text("INSERT INTO producto_simple (id_producto) SELECT id FROM producto ORDER BY id"))
+            cls.db.execute(text(
+                "INSERT INTO stock (cantidad_actual, cantidad_minima, id_producto_simple) "
+                "SELECT id, 5, id FROM producto_simple ORDER BY id"
+            ))
+            cls.db.execute(text(
+                "INSERT INTO articulo (nombre, codigo, activo, id_familia) "
+                "SELECT 'Pack ' || i, 'PACK-' || i, true, 1 FROM generate_series(1, :n) AS i"
+            ), {"n": NUM_PACKS})
+            cls.db.execute(text(
+                "INSERT INTO pack (nombre, id_articulo) SELECT nombre, id FROM articulo WHERE codigo LIKE 'PACK-%' ORDER BY id"
+            ))
+            cls.db.execute(text(
+                "INSERT INTO pack_producto (id_pack, id_producto, cantidad_incluida) "
+                "SELECT p.id, p.id * 2 - 1, 1 FROM pack p UNION ALL SELECT p.id, p.id * 2, 2 FROM pack p"
+            ))
+            cls.db.commit()
+        finally:
+            cls.db.close()
+
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        """
+        self.db = SessionLocal()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Cierra la sesión de base de datos.
+        """
+        self.db.close()
+
+    @classmethod
+    def teardown_class(cls):
+        """
+        Se ejecuta una vez después de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def test_packs_productos_stock_en_lote(self):
+        """
+        Test para la consulta pack → productos → stock.
+        Debe devolver todos los packs con una consulta SQL por nivel, no por fila.
+        """
+        response, selects = contar_selects(
+            lambda: client.post("/graphql", json={"query": CONSULTA_PACKS, "variables": {"limite": NUM_PACKS}})
+        )
+
+        assert response.status_code == 200
+        datos = response.json()
+        assert "errors" not in datos
+        packs = datos["data"]["packs"]
+        assert len(packs) == NUM_PACKS
+        primero = packs[0]["productos"]
+        assert [linea["producto"]["articulo"]["codigo"] for linea in primero] == ["PROD-1", "PROD-2"]
+        assert primero[1]["producto"]["producto_simple"]["stock"] == {"cantidad_actual": 2.0, "necesita_reposicion": True}
+        # packs, pack_producto, producto, articulo, producto_simple y stock
+        assert selects <= 6
+
+    def test_familia_con_articulos(self):
+        """
+        Test para una consulta por ID con relación uno a muchos.
+        """
+        response = client.post("/graphql", json={"query": "{ familia(id: 1) { nombre articulos { codigo } } }"})
+
+        assert response.status_code == 200
+        familia = response.json()["data"]["familia"]
+        assert familia["nombre"] == "Familia 1"
+        assert len(familia["articulos"]) == NUM_PACKS * 3
+
+    def test_profundidad_maxima(self):
+        """
+        Test para una consulta demasiado profunda.
+        Debe rechazarse antes de ejecutarse.
+        """
+        consulta = "{ familias { articulos { familia { articulos { familia { articulos { familia { articulos { familia { nombre } } } } } } } } } }"
+        response = client.post("/graphql", json={"query": consulta})
+
+        errores = response.json()["errors"]
+        assert "exceeds maximum operation depth" in errores[0]["message"]
+
+    def test_complejidad_maxima(self):
+        """
+        Test para una consulta con listas anidadas demasiado grandes.
+        Debe rechazarse antes de ejecutarse.
+        """
+        consulta = "{ familias(limite: 1000) { articulos { producto { articulo { pack { productos { id } } } } } } }"
+        response = client.post("/graphql", json={"query": consulta})
+
+        errores = response.json()["errors"]
+        assert "complejidad máxima" in errores[0]["message"]
+
+    def test_consulta_persistida(self):
+        """
+        Test para el protocolo de consultas persistidas.
+        Un hash desconocido se rechaza; tras registrarlo basta con enviar el hash.
+        """
+        consulta = "{ articulo(id: 1) { codigo } }"
+        persistida = {"persistedQuery": {"version": 1, "sha256Hash": hash_consulta(consulta)}}
+
+        response = client.post("/graphql", json={"extensions": persistida})
+        assert response.json()["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+
+        response = client.post("/graphql", json={"query": consulta, "extensions": persistida})
+        assert response.json()["data"]["articulo"]["codigo"] == "PROD-1"
+
+        response = client.post("/graphql", json={"extensions": persistida})
+        assert response.json()["data"]["articulo"]["codigo"] == "PROD-1"
+
+    def test_consulta_persistida_hash_incorrecto(self):
+        """
+        Test para un hash que no corresponde a la consulta enviada.
+        """
+        persistida = {"persistedQuery": {"version": 1, "sha256Hash": "0" * 64}}
+        response = client.post("/graphql", json={"query": "{ familias { id } }", "extensions": persistida})
+
+        assert response.json()["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_HASH_MISMATCH"
+
+    def test_cache_resultados_e_invalidacion(self):
+        """
+        Test para la caché de resultados.
+        La segunda ejecución no consulta la base de datos; una escritura en una
+        tabla leída por la consulta la invalida.
+        """
+        peticion = {"query": "query Articulo($id: Int!) { articulo(id: $id) { nombre familia { nombre } } }",
+                    "variables": {"id": 2}}
+
+        primera, selects_primera = contar_selects(lambda: client.post("/graphql", json=peticion))
+        segunda, selects_segunda = contar_selects(lambda: client.post("/graphql", json=peticion))
+        assert selects_primera > 0
+        assert selects_segunda == 0
+        assert segunda.json() == primera.json()
+
+        ArticuloService(self.db).actualizar(2, nombre="Producto 2 renombrado")
+
+        tercera, selects_tercera = contar_selects(lambda: client.post("/graphql", json=peticion))
+        assert selects_tercera > 0
+        assert tercera.json()["data"]["articulo"]["nombre"] == "Producto 2 renombrado"
+
+    def test_escritura_anuncia_sus_tablas(self):
+        """
+        Test para el anuncio de invalidación entre procesos.
+        Al confirmar una escritura del ORM, la notificación con sus tablas llega a
+        cualquier conexión que escuche el canal.
+        """
+        conexion = engine.raw_connection()
+        try:
+            pg = conexion.driver_connection
+            pg.autocommit = True
+            with pg.cursor() as cursor:
+                cursor.execute(f"LISTEN {CANAL_TABLAS}")
+
+            ArticuloService(self.db).actualizar(3, nombre="Producto 3 renombrado")
+
+            limite = time.monotonic() + 5
+            while not pg.notifies and time.monotonic() < limite:
+                time.sleep(0.05)
+                pg.poll()
+            assert "articulo" in [n.payload for n in pg.notifies]
+        finally:
+            conexion.invalidate()
+
+    def test_invalidacion_desde_otro_proceso(self):
+        """
+        Test para una escritura confirmada por otro proceso.
+        No pasa por los eventos de sesión de este proceso: la entrada en caché
+        se invalida al llegar la notificación.
+        """
+        peticion = {"query": "query Articulo($id: Int!) { articulo(id: $id) { nombre } }", "variables": {"id": 4}}
+        client.post("/graphql", json=peticion)
+        _, selects = contar_selects(lambda: client.post("/graphql", json=peticion))
+        assert selects == 0
+
+        with engine.begin() as conexion:
+            conexion.execute(text("UPDATE articulo SET nombre = 'Producto 4 remoto' WHERE id = 4"))
+            conexion.execute(text("SELECT pg_notify(:canal, 'articulo')"), {"canal": CANAL_TABLAS})
+
+        limite = time.monotonic() + 5
+        nombre = None
+        while nombre != "Producto 4 remoto" and time.monotonic() < limite:
+            time.sleep(0.05)
+            nombre = client.post("/graphql", json=peticion).json()["data"]["articulo"]["nombre"]
+        assert nombre == "Producto 4 remoto"
@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.db import SessionLocal
+from app.main import app
+from app.services.historico_stock_service import HistoricoStockService, instante_de_corte
+from app.services.stock_service import StockService
+
+from app.tests import reset_db, solo_postgresql
+
+client = TestClient(app)
+
+AHORA = datetime.now(timezone.utc)
+
+class TestHistorico:
+    @classmethod
+    def setup_class(cls):
+        """
+        Se ejecuta una vez antes de todos los tests de la clase.
+        Crea un componente con alta de 10, entrada de 5 y salida de 3, y fecha
+        los movimientos hace 10, 5 y 1 días.
+        """
+        cls.db = SessionLocal()
+        try:
+            reset_db(cls.db)
+            cls.db.execute(text("INSERT INTO componente (nombre, codigo) VALUES ('Tornillo', 'COMP-001')"))
+            cls.db.commit()
+            stock_service = StockService(cls.db)
+            stock = stock_service.crear_stock_componente(1, 10, ubicacion_almacen="ALM1/P01")
+            stock_service.registrar_movimiento(stock.id, 5, "entrada", motivo="Compra")
+            stock_service.registrar_movimiento(stock.id, 3, "salida", motivo="Pedido PED-1")
+            for id_movimiento, dias in ((1, 10), (2, 5), (3, 1)):
+                cls.db.execute(
+                    text("UPDATE movimiento_stock SET fecha = :fecha WHERE id = :id"),
+                    {"fecha": AHORA - timedelta(days=dias), "id": id_movimiento}
+                )
+            cls.db.commit()
+        finally:
+            cls.db.close()
+
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        """
+        self.db = SessionLocal()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Cierra la sesión de base de datos.
+        """
+        self.db.close()
+
+    @classmethod
+    def teardown_class(cls):
+        """
+        Se ejecuta una vez después de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def _cantidad(self, fecha):
+        filas = HistoricoStockService(self.db).stock_en_fecha(fecha)["filas"]
+        return sum(fila["cantidad"] for fila in filas)
+
+    def test_instante_de_corte(self):
+        """
+        Test para la interpretación de fechas de corte.
+        """
+        assert instante_de_corte("2026-03-31") == datetime(2026, 4, 1, tzinfo=timezone.utc)
+        assert instante_de_corte("2026-03-31", inicio_del_dia=True) == datetime(2026, 3, 31, tzinfo=timezone.utc)
+        assert instante_de_corte("2026-03-31T12:00") == datetime(2026, 3, 31, 12, tzinfo=timezone.utc)
+        with pytest.raises(ValueError):
+            instante_de_corte("31/03/2026")
+
+    def test_movimientos_registrados(self):
+        """
+        Test para el registro automático de movimientos.
+        Cada cambio de stock deja su tipo, variación, cantidad resultante y motivo.
+        """
+        movimientos = HistoricoStockService(self.db).listar_movimientos(1)
+        assert [(m.tipo, float(m.cantidad), float(m.cantidad_resultante)) for m in movimientos] == [
+            ("salida", -3, 12), ("entrada", 5, 15), ("alta", 10, 10)
+        ]
+        assert movimientos[0].motivo == "Pedido PED-1"
+        assert movimientos[0].id_almacen is not None
+
+    def test_stock_en_fecha(self):
+        """
+        Test para la reconstrucción del stock en fechas pasadas sin instantáneas.
+        """
+        assert self._cantidad(AHORA - timedelta(days=20)) == 0
+        assert self._cantidad(AHORA - timedelta(days=7)) == 10
+        assert self._cantidad(AHORA - timedelta(days=3)) == 15
+        assert self._cantidad(None) == 12
+
+    def test_stock_en_fecha_con_instantanea(self):
+        """
+        Test para la reconstrucción desde una instantánea.
+        Los movimientos posteriores se suman a la instantánea, y las fechas
+        anteriores siguen resolviéndose con el histórico completo.
+        """
+        servicio = HistoricoStockService(self.db)
+        instantanea = servicio.crear_instantanea()
+        assert instantanea.registros == 1
+
+        StockService(self.db).actualizar_cantidad(1, 20)
+        resultado = servicio.stock_en_fecha(datetime.now(timezone.utc) + timedelta(seconds=1))
+        assert resultado["instantanea"] == instantanea.fecha.isoformat()
+        assert sum(fila["cantidad"] for fila in resultado["filas"]) == 20
+        assert servicio.listar_movimientos(1)[0].tipo == "ajuste"
+
+        assert self._cantidad(AHORA - timedelta(days=3)) == 15
+
+    def test_api_historico(self):
+        """
+        Test para los endpoints del histórico y el reporte de valoración.
+        """
+        response = client.get("/inventario/reporte/valoracion?fecha_corte=" + (AHORA - timedelta(days=3)).isoformat().replace("+00:00", ""))
+        assert response.status_code == 200
+        reporte = response.json()
+        assert reporte["total_unidades"] == 15
+        assert reporte["elementos"][0]["nombre"] == "Tornillo"
+        assert reporte["por_almacen"][0]["almacen"] == "ALM1"
+
+        response = client.get("/inventario/reporte/valoracion?fecha_corte=ayer")
+        assert response.status_code == 400
+
+        response = client.get("/stock/1/movimientos?limit=1")
+        assert response.json()[0]["tipo"] == "ajuste"
+
+        response = client.get("/historico/stock")
+        assert response.json()["filas"][0]["cantidad"] == 20
+
+        response = client.delete("/historico/particiones/1999/1")
+        assert response.status_code == 400
+
+    @solo_postgresql
+    def test_particiones(self):
+        """
+        Test para la creación de particiones y el desacople de meses archivados.
+        Los movimientos de un mes sin partición quedan en la DEFAULT y se mueven
+        al crearla; al desacoplar un mes, sus fechas dejan de reconstruirse.
+        """
+        servicio = HistoricoStockService(self.db)
+        self.db.execute(text(
+            "INSERT INTO movimiento_stock (tipo, id_stock, id_componente, cantidad, cantidad_resultante, fecha) "
+            "VALUES ('entrada', 99, 1, 0, 0, '2020-01-15T00:00:00+00:00')"
+        ))
+        self.db.commit()
+        creadas = servicio.asegurar_particiones(desde=datetime(2020, 1, 1).date(), meses_adelante=0)
+        assert "movimiento_stock_2020_01" in creadas
+        filas = self.db.execute(text("SELECT count(*) FROM movimiento_stock_2020_01")).scalar()
+        assert filas == 1
+
+        resultado = servicio.desacoplar_particion(2020, 1, eliminar=True)
+        assert resultado["eliminada"] is True
+        assert "movimiento_stock_2020_01" not in {p["nombre"] for p in servicio.listar_particiones()}
+        assert servicio.listar_instantaneas()[0].inicio_historico is True
+        with pytest.raises(ValueError):
+            servicio.stock_en_fecha("2020-01-20")
@@ -0,0 +1,125 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.db import SessionLocal
+from app.main import app
+from app.services.integridad_service import CHEQUEOS_INTEGRIDAD, IntegridadService
+from app.models.trabajo import Trabajo
+from app.services.trabajo_service import Trabajador, TrabajoService
+
+from app.tests import reset_db, solo_postgresql
+
+client = TestClient(app)
+
+@solo_postgresql
+class TestIntegridad:
+    @classmethod
+    def setup_class(cls):
+        """
+        Se ejecuta una vez antes de todos los tests de la clase.
+        Crea un catálogo con una incidencia de cada tipo: un producto sin
+        detalle (3), uno simple con fila de compuesto (4), un simple sin stock
+        (el de 4), un compuesto sin componentes (el de 4), un pack vacío (2) y
+        líneas de pack y de escandallo que apuntan a filas inexistentes.
+        """
+        cls.db = SessionLocal()
+        try:
+            reset_db(cls.db)
+            cls.db.execute(text(
+                "INSERT INTO articulo (nombre, codigo) VALUES ('Silla', 'A1'), ('Mesa', 'A2'), ('Lámpara', 'A3'), "
+                "('Armario', 'A4'), ('Pack oficina', 'A5'), ('Pack vacío', 'A6')"
+            ))
+            cls.db.execute(text(
+                "INSERT INTO producto (tipo_producto, id_articulo) VALUES "
+                "('simple', 1), ('compuesto', 2), ('simple', 3), ('simple', 4)"
+            ))
+            cls.db.execute(text("INSERT INTO producto_simple (id_producto) VALUES (1), (4)"))
+            cls.db.execute(text("INSERT INTO producto_compuesto (id_producto) VALUES (2), (4)"))
+            cls.db.execute(text("INSERT INTO componente (nombre, codigo) VALUES ('Tornillo', 'C1')"))
+            cls.db.execute(text("INSERT INTO componente_producto (id_producto_compuesto, id_componente, cantidad_necesaria) VALUES (1, 1, 4)"))
+            cls.db.execute(text("INSERT INTO pack (nombre, id_articulo) VALUES ('Pack oficina', 5), ('Pack vacío', 6)"))
+            cls.db.execute(text("INSERT INTO pack_producto (id_pack, id_producto, cantidad_incluida) VALUES (1, 1, 2)"))
+            cls.db.execute(text("INSERT INTO stock (id_producto_simple, cantidad_actual) VALUES (1, 5)"))
+            # Filas huérfanas como las que deja una carga con las claves ajenas desactivadas
+            cls.db.execute(text("SET LOCAL session_replication_role = replica"))
+            cls.db.execute(text("INSERT INTO pack_producto (id_pack, id_producto, cantidad_incluida) VALUES (1, 999, 1)"))
+            cls.db.execute(text("INSERT INTO componente_producto (id_producto_compuesto, id_componente, cantidad_necesaria) VALUES (1, 999, 1)"))
+            cls.db.commit()
+        finally:
+            cls.db.close()
+
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        """
+        self.db = SessionLocal()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Cierra la sesión de base de datos.
+        """
+        self.db.close()
+
+    @classmethod
+    def teardown_class(cls):
+        """
+        Se ejecuta una vez después de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def test_validacion_completa(self):
+        """
+        Test de la auditoría completa: cada chequeo detecta su incidencia.
+        """
+        response = client.get("/inventario/validacion/integridad")
+        assert response.status_code == 200
+        validacion = response.json()
+        assert not validacion["valido"]
+        assert set(validacion["chequeos"]) == set(CHEQUEOS_INTEGRIDAD)
+
+        muestras = {nombre: chequeo["muestra"] for nombre, chequeo in validacion["chequeos"].items()}
+        assert muestras["producto_sin_detalle"] == [3]
+        assert muestras["tipo_producto_incoherente"] == [4]
+        assert muestras["simple_sin_stock"] == [2]
+        assert muestras["pack_sin_productos"] == [2]
+        assert muestras["compuesto_sin_componentes"] == [2]
+        assert muestras["pack_producto_huerfano"] == [2]
+        assert muestras["componente_producto_huerfano"] == [2]
+        assert validacion["total_incidencias"] == 7
+
+    def test_muestra_y_seleccion(self):
+        """
+        Test de la muestra limitada y de la selección de chequeos.
+        """
+        validacion = IntegridadService(self.db).validar(["producto_sin_detalle", "pack_sin_productos"], muestra=0)
+        assert list(validacion["chequeos"]) == ["producto_sin_detalle", "pack_sin_productos"]
+        assert all(c["incidencias"] == 1 and c["muestra"] == [] for c in validacion["chequeos"].values())
+
+        response = client.get("/inventario/validacion/integridad?chequeos=simple_sin_stock&muestra=5")
+        assert list(response.json()["chequeos"]) == ["simple_sin_stock"]
+        assert client.get("/inventario/validacion/integridad?chequeos=no_existe").status_code == 400
+        assert client.get("/inventario/validacion/integridad?muestra=-1").status_code == 400
+
+    def test_solo_datos_confirmados(self):
+        """
+        Test para cambios sin confirmar de la sesión: no los ven las conexiones
+        de la auditoría.
+        """
+        self.db.execute(text("INSERT INTO stock (id_producto_simple, cantidad_actual) VALUES (2, 1)"))
+        validacion = IntegridadService(self.db).validar(["simple_sin_stock"])
+        assert validacion["chequeos"]["simple_sin_stock"]["incidencias"] == 1
+        self.db.rollback()
+
+    def test_trabajo_de_integridad(self):
+        """
+        Test del tipo de trabajo para auditar fuera de la petición HTTP.
+        """
+        self.db.query(Trabajo).delete()
+        self.db.commit()
+        trabajo = TrabajoService(self.db).encolar("validacion_integridad", {"muestra": 1})
+        assert Trabajador().procesar_siguiente() == "completado"
+        self.db.refresh(trabajo)
+        assert trabajo.resultado["total_incidencias"] == 7
@@ -0,0 +1,184 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.db import SessionLocal
+from app.main import app
+from app.models.disponibilidad_stock import DisponibilidadStock
+from app.models.evento_stock_outbox import EventoStockOutbox
+from app.models.movimiento_stock import MovimientoStock
+from app.models.registro_eliminado import RegistroEliminado
+from app.models.stock import Stock
+from app.models.trabajo import Trabajo
+from app.services.historico_stock_service import HistoricoStockService
+from app.services.integridad_service import IntegridadService
+from app.services.limpieza_service import LimpiezaService
+from app.services.trabajo_service import Trabajador, TrabajoService
+
+from app.tests import reset_db, solo_postgresql
+
+client = TestClient(app)
+
+@solo_postgresql
+class TestLimpieza:
+    @classmethod
+    def setup_class(cls):
+        """
+        Se ejecuta una vez antes de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Crea una silla con stock (1) y una mesa (2) con su escandallo, un
+        pack con la silla y, con las claves ajenas desactivadas, 5 registros
+        de stock, 1 línea de pack y 1 de escandallo huérfanos.
+        """
+        self.db = SessionLocal()
+        reset_db(self.db)
+        self.db.execute(text("INSERT INTO articulo (nombre, codigo) VALUES ('Silla', 'A1'), ('Mesa', 'A2'), ('Pack', 'A3')"))
+        self.db.execute(text("INSERT INTO producto (tipo_producto, id_articulo) VALUES ('simple', 1), ('compuesto', 2)"))
+        self.db.execute(text("INSERT INTO producto_simple (id_producto) VALUES (1)"))
+        self.db.execute(text("INSERT INTO producto_compuesto (id_producto) VALUES (2)"))
+        self.db.execute(text("INSERT INTO componente (nombre, codigo) VALUES ('Tornillo', 'C1')"))
+        self.db.execute(text("INSERT INTO componente_producto (id_producto_compuesto, id_componente, cantidad_necesaria) VALUES (1, 1, 4)"))
+        self.db.execute(text("INSERT INTO pack (nombre, id_articulo) VALUES ('Pack', 3)"))
+        self.db.execute(text("INSERT INTO pack_producto (id_pack, id_producto, cantidad_incluida) VALUES (1, 1, 2)"))
+        self.db.execute(text("INSERT INTO stock (id_producto_simple, cantidad_actual) VALUES (1, 5)"))
+        self.db.execute(text("SET LOCAL session_replication_role = replica"))
+        self.db.execute(text(
+            "INSERT INTO stock (id_producto_simple, cantidad_actual) "
+            "SELECT 900 + n, n FROM generate_series(1, 5) AS n"
+        ))
+        self.db.execute(text("INSERT INTO pack_producto (id_pack, id_producto, cantidad_incluida) VALUES (1, 999, 1)"))
+        self.db.execute(text("INSERT INTO componente_producto (id_producto_compuesto, id_componente, cantidad_necesaria) VALUES (1, 999, 1)"))
+        self.db.commit()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Cierra la sesión de base de datos.
+        """
+        self.db.close()
+
+    @classmethod
+    def teardown_class(cls):
+        """
+        Se ejecuta una vez después de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def test_simulacion(self):
+        """
+        Test de la simulación: cuenta los huérfanos sin borrar nada.
+        """
+        response = client.post("/inventario/mantenimiento/limpiar-huerfanos?simular=true")
+        assert response.status_code == 200
+        resultado = response.json()["registros_eliminados"]
+        assert resultado["simulacion"] and resultado["total"] == 7
+        assert resultado["por_tipo"] == {"pack_producto_huerfano": 1, "componente_producto_huerfano": 1, "stock_huerfano": 5}
+        assert self.db.query(Stock).count() == 6
+
+    def test_limpieza_por_lotes(self):
+        """
+        Test del borrado por lotes: solo los huérfanos, con marcas de borrado,
+        eventos de stock y progreso tras cada lote.
+        """
+        avances = []
+        resultado = LimpiezaService(self.db).limpiar(
+            tamano_lote=2, pausa=0, progreso=lambda *avance: avances.append(avance)
+        )
+        assert resultado["total"] == 7 and resultado["lotes"] == 5
+        assert [avance for avance in avances if avance[0] == "stock_huerfano"] == [
+            ("stock_huerfano", 2, 3), ("stock_huerfano", 4, 5), ("stock_huerfano", 5, 6)
+        ]
+        assert resultado["cursores"]["stock_huerfano"] == 6
+
+        assert self.db.query(Stock.id).all() == [(1,)]
+        assert IntegridadService(self.db).validar()["valido"]
+        assert self.db.query(RegistroEliminado).filter(RegistroEliminado.tabla == "stock").count() == 5
+        eventos = self.db.query(EventoStockOutbox).filter(EventoStockOutbox.tipo == "stock.eliminado").all()
+        assert sorted(evento.id_stock for evento in eventos) == [2, 3, 4, 5, 6]
+        assert eventos[0].datos["id_producto_simple"] > 900
+
+        assert LimpiezaService(self.db).limpiar()["total"] == 0
+
+    def test_bajas_en_historico_y_disponibilidad(self):
+        """
+        Test de las bajas del borrado masivo: como una baja con el ORM, dejan
+        su movimiento y se descuentan del resumen de disponibilidad.
+        """
+        # Un huérfano creado con el ORM (con alta en el histórico y en el resumen)
+        self.db.execute(text("SET LOCAL session_replication_role = replica"))
+        huerfano = Stock(id_producto_simple=950, cantidad_actual=7)
+        self.db.add(huerfano)
+        self.db.commit()
+        id_huerfano = huerfano.id
+        resumen = self.db.query(DisponibilidadStock).filter(DisponibilidadStock.id_producto_simple == 950)
+        assert [(fila.cantidad_actual, fila.registros) for fila in resumen] == [(7, 1)]
+
+        LimpiezaService(self.db).limpiar(["stock_huerfano"], pausa=0)
+
+        movimientos = self.db.query(MovimientoStock).filter(
+            MovimientoStock.id_stock == id_huerfano
+        ).order_by(MovimientoStock.fecha).all()
+        assert [(movimiento.tipo, movimiento.cantidad) for movimiento in movimientos] == [
+            ("alta", Decimal(7)), ("baja", Decimal(-7))
+        ]
+        assert movimientos[-1].cantidad_resultante == 0 and movimientos[-1].id_producto_simple == 950
+        assert all(fila.cantidad_actual == 0 and fila.registros == 0 for fila in resumen)
+
+        futuro = datetime.now(timezone.utc) + timedelta(minutes=1)
+        filas = HistoricoStockService(self.db).stock_en_fecha(futuro)["filas"]
+        assert not [fila for fila in filas if fila["id_producto_simple"] == 950]
+
+    def test_salta_filas_bloqueadas(self):
+        """
+        Test de convivencia con los movimientos: un stock bloqueado por otra
+        transacción se salta sin esperar y se borra en la siguiente pasada.
+        """
+        otra = SessionLocal()
+        try:
+            otra.query(Stock).filter(Stock.id == 4).with_for_update().one()
+            resultado = LimpiezaService(self.db).limpiar(["stock_huerfano"], pausa=0)
+            assert resultado["total"] == 4
+            otra.rollback()
+        finally:
+            otra.close()
+        assert LimpiezaService(self.db).limpiar(["stock_huerfano"], pausa=0)["total"] == 1
+
+    def test_reanudar_y_validacion(self):
+        """
+        Test para reanudar desde un cursor y para parámetros no válidos.
+        """
+        resultado = LimpiezaService(self.db).limpiar(["stock_huerfano"], desde={"stock_huerfano": 4}, pausa=0)
+        assert resultado["total"] == 2 and resultado["cursores"] == {"stock_huerfano": 6}
+
+        response = client.post("/inventario/mantenimiento/limpiar-huerfanos?desde=stock_huerfano:5,pack_producto_huerfano:0")
+        assert response.status_code == 200
+        assert response.json()["registros_eliminados"]["por_tipo"] == {
+            "pack_producto_huerfano": 1, "componente_producto_huerfano": 1, "stock_huerfano": 0
+        }
+        assert client.post("/inventario/mantenimiento/limpiar-huerfanos?desde=stock_huerfano").status_code == 400
+        assert client.post("/inventario/mantenimiento/limpiar-huerfanos?limpiezas=no_existe").status_code == 400
+        assert client.post("/inventario/mantenimiento/limpiar-huerfanos?tamano_lote=0").status_code == 400
+
+    def test_trabajo_de_limpieza(self):
+        """
+        Test del tipo de trabajo: limpia con progreso fuera de la petición HTTP.
+        """
+        self.db.query(Trabajo).delete()
+        self.db.commit()
+        trabajo = TrabajoService(self.db).encolar("limpieza_huerfanos", {"tamano_lote": 2, "pausa": 0})
+        assert Trabajador().procesar_siguiente() == "completado"
+        self.db.refresh(trabajo)
+        assert trabajo.resultado["total"] == 7
+        assert trabajo.mensaje == "stock_huerfano: 5 registros, último ID 6"
+        assert trabajo.avance == {"desde": {"pack_producto_huerfano": 2, "componente_producto_huerfano": 2, "stock_huerfano": 6}}
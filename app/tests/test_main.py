@@ -1,3 +1,5 @@
+import json
+import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -17,4 +19,111 @@ def test_health_check():
     assert 'estado' in response.json()
     assert response.json()['estado'] == "✅ Saludable"
     assert 'base_datos' in response.json()
-    assert response.json()['base_datos'] == "✅ Conectada"
\ No newline at end of file
+    assert response.json()['base_datos'] == "✅ Conectada"
+
+# Routers diferidos: se montan con la primera petición bajo su prefijo
+def test_router_diferido_se_monta_bajo_demanda():
+    from fastapi import FastAPI
+    from app.arranque import RegistroRouters
+
+    app_diferida = FastAPI()
+    registro = RegistroRouters(app_diferida, [("/colores", "app.routes.color_routes", "router")])
+    registro.registrar(["/colores"])
+    assert registro.pendientes
+    assert not any(getattr(ruta, "path", "").startswith("/colores") for ruta in app_diferida.routes)
+
+    with TestClient(app_diferida) as cliente_diferido:
+        assert cliente_diferido.get("/colores/").status_code == 200
+    assert not registro.pendientes
+
+
+# Un prefijo diferido que no está registrado es un error de configuración
+def test_router_diferido_desconocido():
+    from fastapi import FastAPI
+    from app.arranque import RegistroRouters
+
+    registro = RegistroRouters(FastAPI(), [("/colores", "app.routes.color_routes", "router")])
+    with pytest.raises(ValueError, match="/noexiste"):
+        registro.registrar(["/noexiste"])
+
+
+# El esquema precalculado (app/openapi.json) coincide con las rutas reales
+def test_openapi_artefacto_al_dia():
+    from app.main import registro_routers
+    from app.openapi import OPENAPI_ARTEFACTO, diferencias, generar_esquema
+
+    registro_routers.montar_pendientes()
+    with open(OPENAPI_ARTEFACTO, "rb") as artefacto:
+        cambios = diferencias(generar_esquema(app), json.load(artefacto))
+    assert not cambios, f"Regenerar con python scripts/generar_openapi.py: {cambios}"
+
+
+# /openapi.json se sirve con ETag fuerte, gzip y 304 si no ha cambiado
+def test_openapi_etag_y_gzip():
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].startswith('"')
+    assert "422" not in json.dumps(response.json()["paths"]["/colores/"])
+
+    sin_comprimir = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in sin_comprimir.headers
+    assert sin_comprimir.headers["etag"] != response.headers["etag"]
+
+    no_modificado = client.get(
+        "/openapi.json", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]}
+    )
+    assert no_modificado.status_code == 304
+    assert not no_modificado.content
+
+
+# Pool por worker: se respeta lo configurado y se recorta si no cabe
+def test_dimensionar_pool_por_worker():
+    from app.servidor import dimensionar_pool
+
+    assert dimensionar_pool(4, 100, pool_size=5, max_overflow=10) == (5, 10)
+    # 90 // 8 = 11 conexiones por worker, 2 de ellas LISTEN
+    assert dimensionar_pool(8, 90, pool_size=5, max_overflow=10) == (5, 4)
+    assert dimensionar_pool(8, 40, pool_size=5, max_overflow=10) == (3, 0)
+    with pytest.raises(ValueError):
+        dimensionar_pool(16, 40, pool_size=5, max_overflow=10)
+
+
+# Opciones de uvicorn para producción a partir del entorno
+def test_opciones_uvicorn(monkeypatch):
+    from app.servidor import opciones_uvicorn
+
+    monkeypatch.setenv("WEB_KEEPALIVE", "20")
+    monkeypatch.setenv("WEB_CONCURRENCIA", "100")
+    opciones = opciones_uvicorn(4)
+    assert opciones["workers"] == 4
+    assert opciones["timeout_keep_alive"] == 20
+    assert opciones["limit_concurrency"] == 100
+    assert opciones["limit_max_requests"] is None
+    assert opciones["loop"] in ("uvloop", "asyncio")
+    assert opciones["http"] in ("httptools", "h11")
+
+
+# El apagado espera a que terminen las escrituras de stock en curso
+def test_apagado_espera_movimientos_en_curso():
+    import threading
+    from app.services.stock_service import OperacionesEnCurso, movimientos_en_curso
+
+    operaciones = OperacionesEnCurso()
+    empezada, terminar = threading.Event(), threading.Event()
+
+    @operaciones
+    def escritura():
+        empezada.set()
+        terminar.wait(5)
+
+    hilo = threading.Thread(target=escritura)
+    hilo.start()
+    empezada.wait(5)
+    assert operaciones.en_curso == 1
+    assert not operaciones.esperar(0.05)
+    terminar.set()
+    assert operaciones.esperar(5)
+    hilo.join()
+
+    assert movimientos_en_curso.en_curso == 0
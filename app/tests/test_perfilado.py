@@ -0,0 +1,114 @@
+import pstats
+import shutil
+import tempfile
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.perfilado import ConfiguracionPerfilado, configuracion, fracciones_por_ruta
+
+from app.tests import TransaccionPrueba
+
+client = TestClient(app)
+
+TOKEN = "secreto-perfilado"
+
+
+class TestPerfilado:
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Activa el perfilado con un token y un directorio temporal, sin muestreo.
+        """
+        self.transaccion = TransaccionPrueba()
+        self.original = vars(configuracion).copy()
+        configuracion.directorio = Path(tempfile.mkdtemp())
+        configuracion.token = TOKEN
+        configuracion.fracciones = {}
+        configuracion.maximo = 3
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Restaura la configuración y deshace todo lo hecho en el test.
+        """
+        shutil.rmtree(configuracion.directorio)
+        vars(configuracion).update(self.original)
+        self.transaccion.deshacer()
+
+    def _admin(self, metodo, ruta, **kwargs):
+        return client.request(metodo, ruta, headers={"X-Perfilado-Token": TOKEN}, **kwargs)
+
+    def test_perfil_bajo_demanda(self):
+        """
+        Test de una petición marcada con X-Perfilar: cProfile del endpoint y
+        SQL atribuido al método de servicio que lo lanzó.
+        """
+        response = client.get("/inventario/reporte/valoracion", headers={"X-Perfilar": TOKEN})
+        assert response.status_code == 200
+        perfil_id = response.headers["x-perfil"]
+
+        perfil = self._admin("GET", f"/perfilado/{perfil_id}").json()
+        assert (perfil["metodo"], perfil["ruta"], perfil["estado"]) == ("GET", "/inventario/reporte/valoracion", 200)
+        assert perfil["sql"]["consultas"] > 0
+        assert "inventario_service:InventarioService.generar_reporte_valoracion" in perfil["sql"]["por_servicio"]
+        assert all(s["servicio"][0].startswith("inventario_service:") for s in perfil["sql"]["sentencias"])
+        assert any("generar_reporte_valoracion" in f["funcion"] for f in perfil["funciones"])
+
+        prof = self._admin("GET", f"/perfilado/{perfil_id}/prof")
+        assert prof.status_code == 200
+        descargado = configuracion.directorio / "descargado.prof"
+        descargado.write_bytes(prof.content)
+        estadisticas = pstats.Stats(str(descargado))
+        assert any(nombre == "generar_reporte_valoracion" for _, _, nombre in estadisticas.stats)
+
+    def test_sin_token_no_se_perfila(self):
+        """
+        Test de X-Perfilar con un token incorrecto: la petición no se perfila.
+        """
+        response = client.get("/health", headers={"X-Perfilar": "otro"})
+        assert response.status_code == 200
+        assert "x-perfil" not in response.headers
+
+    def test_muestreo_por_ruta(self):
+        """
+        Test del muestreo: fracción 1 perfila todas las peticiones del prefijo,
+        0 ninguna; el listado conserva los últimos `maximo` perfiles.
+        """
+        response = self._admin("PUT", "/perfilado/configuracion", json={"/health": 1, "/health/no": 0})
+        assert response.status_code == 200
+        assert response.json()["fracciones"] == {"/health": 1.0, "/health/no": 0.0}
+
+        ids = [client.get("/health").headers["x-perfil"] for _ in range(4)]
+        assert "x-perfil" not in client.get("/").headers
+
+        perfiles = self._admin("GET", "/perfilado/", params={"ruta": "/health"}).json()
+        assert [p["id"] for p in perfiles] == sorted(ids, reverse=True)[:3]
+        assert perfiles[0]["sql_consultas"] == 1
+
+    def test_administracion(self):
+        """
+        Test de la protección y validación de las rutas de /perfilado.
+        """
+        assert client.get("/perfilado/").status_code == 403
+        assert self._admin("PUT", "/perfilado/configuracion", json={"/health": 2}).status_code == 400
+        assert self._admin("PUT", "/perfilado/configuracion", json={"health": 1}).status_code == 400
+        assert self._admin("GET", "/perfilado/../../etc/passwd").status_code == 404
+        assert self._admin("GET", "/perfilado/20260101T000000000000-00000000").status_code == 404
+
+        configuracion.token = ""
+        assert self._admin("GET", "/perfilado/").status_code == 404
+
+    def test_fracciones_por_ruta(self):
+        """
+        Test de PERFILADO_RUTAS y de la fracción del prefijo más largo.
+        """
+        ajustes = ConfiguracionPerfilado()
+        ajustes.fracciones = fracciones_por_ruta("/inventario=0.1, /inventario/dashboard=1,")
+        assert ajustes.fraccion("/inventario/dashboard") == 1.0
+        assert ajustes.fraccion("/inventario/resumen/general") == 0.1
+        assert ajustes.fraccion("/inventariox") == 0.0
+        with pytest.raises(ValueError):
+            fracciones_por_ruta("/inventario")
+        with pytest.raises(ValueError):
+            fracciones_por_ruta("/inventario=1.5")
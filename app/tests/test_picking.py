@@ -0,0 +1,110 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.main import app
+from app.services.picking_service import (
+    PickingService, longitud_ruta, ordenar_serpentina, ordenar_vecino_mas_cercano
+)
+from app.services.stock_service import StockService
+
+from app.tests import TransaccionPrueba
+
+client = TestClient(app)
+
+class TestPicking:
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Crea un producto simple (Silla), un compuesto (Mesa = 4 tornillos) y un
+        pack con 2 sillas y 1 mesa, con stock repartido en varios pasillos.
+        Todo se deshace al terminar el test.
+        """
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
+        self.db.execute(text("INSERT INTO articulo (nombre, codigo) VALUES ('Silla', 'SILLA-1'), ('Mesa', 'MESA-1'), ('Pack oficina', 'PACK-1')"))
+        self.db.execute(text("INSERT INTO producto (tipo_producto, id_articulo) VALUES ('simple', 1), ('compuesto', 2)"))
+        self.db.execute(text("INSERT INTO producto_simple (id_producto) VALUES (1)"))
+        self.db.execute(text("INSERT INTO producto_compuesto (id_producto) VALUES (2)"))
+        self.db.execute(text("INSERT INTO componente (nombre, codigo) VALUES ('Tornillo', 'COMP-001')"))
+        self.db.execute(text("INSERT INTO componente_producto (id_producto_compuesto, id_componente, cantidad_necesaria) VALUES (1, 1, 4)"))
+        self.db.execute(text("INSERT INTO pack (nombre, id_articulo) VALUES ('Pack oficina', 3)"))
+        self.db.execute(text("INSERT INTO pack_producto (id_pack, id_producto, cantidad_incluida) VALUES (1, 1, 2), (1, 2, 1)"))
+        self.db.commit()
+        stock_service = StockService(self.db)
+        stock_service.crear_stock_producto(1, 3, ubicacion_almacen="ALM1/P03/E05/H1")
+        stock_service.crear_stock_producto(1, 10, ubicacion_almacen="ALM1/P01/E02/H1")
+        stock_service.crear_stock_componente(1, 6, ubicacion_almacen="ALM1/P02/E10/H2")
+        stock_service.crear_stock_componente(1, 2, ubicacion_almacen="ALM1/P01/E08/H1")
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Deshace todo lo hecho en el test.
+        """
+        self.transaccion.deshacer()
+
+    def test_ordenar_serpentina(self):
+        """
+        Test para la ruta en serpentina.
+        Los pasillos visitados se recorren alternando el sentido.
+        """
+        recogidas = [{"ubicacion": ruta} for ruta in (
+            "ALM1/P05/E01", "ALM1/P02/E09", "ALM1/P02/E01", "ALM1/P05/E09", "ALM1/P09/E04", "ALM1/P09/E02"
+        )]
+        ordenadas = [recogida["ubicacion"] for recogida in ordenar_serpentina(recogidas)]
+        assert ordenadas == [
+            "ALM1/P02/E01", "ALM1/P02/E09", "ALM1/P05/E09", "ALM1/P05/E01", "ALM1/P09/E02", "ALM1/P09/E04"
+        ]
+        assert longitud_ruta(ordenar_serpentina(recogidas)) < longitud_ruta(recogidas)
+
+    def test_ordenar_vecino_mas_cercano(self):
+        """
+        Test para la ruta de vecino más cercano.
+        Debe visitar todas las recogidas una vez, agotando el pasillo actual antes de saltar.
+        """
+        recogidas = [{"ubicacion": ruta} for ruta in (
+            "ALM1/P03/E02", "ALM1/P01/E05", "ALM1/P01/E01", "ALM1/P01/E05/H2", "ALM2/P01/E01"
+        )]
+        ordenadas = [recogida["ubicacion"] for recogida in ordenar_vecino_mas_cercano(recogidas)]
+        assert ordenadas == ["ALM1/P01/E01", "ALM1/P01/E05", "ALM1/P01/E05/H2", "ALM1/P03/E02", "ALM2/P01/E01"]
+
+    def test_generar_lista_pack(self):
+        """
+        Test para la lista de picking de un pack.
+        Explota el pack y el producto compuesto, prefiere una ubicación con toda
+        la cantidad y reparte entre ubicaciones cuando ninguna basta.
+        """
+        lista = PickingService(self.db).generar_lista([{"id_pack": 1, "cantidad": 2, "pedido": "PED-1"}])
+        assert lista["faltantes"] == []
+        assert [(r["ubicacion"], r["cantidad"]) for r in lista["recogidas"]] == [
+            ("ALM1/P01/E02/H1", 4), ("ALM1/P01/E08/H1", 2), ("ALM1/P02/E10/H2", 6)
+        ]
+        assert [r["orden"] for r in lista["recogidas"]] == [1, 2, 3]
+        assert lista["recogidas"][0]["id_producto_simple"] == 1
+        assert lista["recogidas"][1]["id_componente"] == 1
+        assert all(r["pedido"] == "PED-1" for r in lista["recogidas"])
+
+    def test_generar_lista_faltantes(self):
+        """
+        Test para una oleada con más demanda que stock.
+        Lo que no se puede cubrir se devuelve como faltante.
+        """
+        lista = PickingService(self.db).generar_lista([
+            {"id_producto": 1, "cantidad": 8, "pedido": "PED-1"},
+            {"id_producto": 1, "cantidad": 7, "pedido": "PED-2"}
+        ], estrategia="vecino")
+        assert sum(r["cantidad"] for r in lista["recogidas"]) == 13
+        assert lista["faltantes"] == [{"pedido": "PED-2", "id_producto_simple": 1, "cantidad_pendiente": 2}]
+
+    def test_api_picking(self):
+        """
+        Test para el endpoint de listas de picking.
+        """
+        response = client.post("/picking/lista", json={"lineas": [{"id_producto": 2, "cantidad": 1}]})
+        assert response.status_code == 200
+        assert [r["ubicacion"] for r in response.json()["recogidas"]] == ["ALM1/P02/E10/H2"]
+
+        response = client.post("/picking/lista", json={"lineas": [{"id_pack": 99, "cantidad": 1}]})
+        assert response.status_code == 400
+
+        response = client.post("/picking/lista", json={"lineas": [{"id_pack": 1, "id_producto": 1, "cantidad": 1}]})
+        assert response.status_code == 400
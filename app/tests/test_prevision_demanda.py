@@ -0,0 +1,158 @@
+import numpy as np
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.db import SessionLocal
+from app.main import app
+from app.models.evento_stock_outbox import EventoStockOutbox
+from app.models.stock import Stock
+from app.services.prevision_demanda_service import (
+    PrevisionDemandaService, media_movil, niveles_reposicion, prever, suavizado_exponencial
+)
+from app.services.cache_costes import cache_costes
+from app.services.stock_service import StockService
+from app.services.valoracion_service import ValoracionService
+
+from app.tests import reset_db, solo_postgresql
+
+client = TestClient(app)
+
+@solo_postgresql
+class TestPrevisionDemanda:
+    @classmethod
+    def setup_class(cls):
+        """
+        Se ejecuta una vez antes de todos los tests de la clase.
+        Crea un stock de tornillos con 5 salidas diarias los últimos 28 días y
+        uno de tuercas sin salidas.
+        """
+        cls.db = SessionLocal()
+        try:
+            reset_db(cls.db)
+            cls.db.execute(text("INSERT INTO componente (nombre, codigo) VALUES ('Tornillo', 'COMP-001'), ('Tuerca', 'COMP-002')"))
+            cls.db.commit()
+            stock_service = StockService(cls.db)
+            tornillos = stock_service.crear_stock_componente(1, 500, ubicacion_almacen="ALM1/P01", cantidad_minima=10)
+            stock_service.crear_stock_componente(2, 50, ubicacion_almacen="ALM1/P02", cantidad_minima=10)
+            cls.db.execute(text(
+                "INSERT INTO movimiento_stock (fecha, tipo, id_stock, id_componente, cantidad, cantidad_resultante) "
+                "SELECT date_trunc('day', now()) - make_interval(days => d) + interval '10 hours', "
+                "'salida', :id_stock, 1, -5, 500 FROM generate_series(1, 28) AS d"
+            ), {"id_stock": tornillos.id})
+            cls.db.commit()
+            cls.id_tornillos = tornillos.id
+        finally:
+            cls.db.close()
+
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        """
+        self.db = SessionLocal()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Cierra la sesión de base de datos.
+        """
+        self.db.close()
+
+    @classmethod
+    def teardown_class(cls):
+        """
+        Se ejecuta una vez después de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def test_suavizado_y_media_movil(self):
+        """
+        Test de los estimadores: una demanda constante no tiene variabilidad y
+        el suavizado exponencial pesa más los días recientes.
+        """
+        serie = np.array([[4.0] * 10, [10.0] + [0.0] * 9, [0.0] * 9 + [10.0]])
+        nivel, desviacion = suavizado_exponencial(serie, 0.3)
+        assert np.isclose(nivel[0], 4) and desviacion[0] < 1e-6
+        assert nivel[1] < nivel[2]
+
+        media, desviacion = media_movil(serie, 5)
+        assert list(media) == [4, 0, 2] and desviacion[1] == 0
+
+    def test_niveles_y_bloques(self):
+        """
+        Test de los niveles de reposición y de que el cálculo por bloques no
+        cambia el resultado.
+        """
+        seguridad, minimo, maximo = niveles_reposicion(np.array([2.0]), np.array([1.0]), 4, 10, 1.5)
+        assert seguridad[0] == 3 and minimo[0] == 11 and maximo[0] == 31
+
+        generador = np.random.default_rng(3)
+        filas = generador.integers(0, 1000, 20000)
+        dias = generador.integers(0, 60, 20000)
+        cantidades = generador.uniform(1, 10, 20000)
+        parametros = {"metodo": "exponencial", "alfa": 0.2, "ventana": 28, "plazo_reposicion": 7, "dias_revision": 14, "z": 1.65}
+        completo = prever(filas, dias, cantidades, 1000, 60, tamano_bloque=1000, **parametros)
+        por_bloques = prever(filas, dias, cantidades, 1000, 60, tamano_bloque=64, **parametros)
+        assert np.allclose(completo, por_bloques)
+
+    def test_calcular_niveles(self):
+        """
+        Test de las propuestas: 5 unidades diarias, plazo de 7 días y revisión
+        cada 14 → mínimo 35 y máximo 105 sin stock de seguridad.
+        """
+        resultado = PrevisionDemandaService(self.db).calcular_niveles(metodo="media_movil", ventana=28)
+        assert resultado["registros"] == 2 and resultado["sin_demanda"] == 1
+        propuesta = resultado["propuestas"][0]
+        assert propuesta["id_stock"] == self.id_tornillos
+        assert propuesta["demanda_diaria"] == 5 and propuesta["stock_seguridad"] == 0
+        assert propuesta["cantidad_minima"] == 10
+        assert propuesta["cantidad_minima_propuesta"] == 35 and propuesta["cantidad_maxima_propuesta"] == 105
+
+        # En 90 días hay 62 sin salidas: la demanda baja y aparece stock de seguridad
+        propuesta = PrevisionDemandaService(self.db).calcular_niveles(metodo="media_movil", ventana=90)["propuestas"][0]
+        assert propuesta["demanda_diaria"] < 5 and propuesta["stock_seguridad"] > 0
+
+    def test_api_aplicar_niveles(self):
+        """
+        Test para aplicar los niveles: se actualiza el stock con demanda y se
+        escribe su evento en el outbox.
+        """
+        response = client.post("/stock/reposicion/recalcular?metodo=media_movil&ventana=28&aplicar=true")
+        assert response.status_code == 200
+        assert response.json()["aplicadas"] == 1
+
+        tornillos = self.db.get(Stock, self.id_tornillos)
+        assert float(tornillos.cantidad_minima) == 35 and float(tornillos.cantidad_maxima) == 105
+        evento = self.db.query(EventoStockOutbox).filter(
+            EventoStockOutbox.id_stock == self.id_tornillos, EventoStockOutbox.tipo == "stock.actualizado"
+        ).order_by(EventoStockOutbox.id.desc()).first()
+        assert evento.datos["cantidad_minima"] == 35 and evento.datos["necesita_reposicion"] is False
+
+        # Sin cambios no se vuelve a actualizar
+        response = client.post("/stock/reposicion/recalcular?metodo=media_movil&ventana=28&aplicar=true")
+        assert response.json()["aplicadas"] == 0
+
+        response = client.post("/stock/reposicion/recalcular?metodo=arima")
+        assert response.status_code == 400
+
+    def test_aplicar_por_lotes(self, monkeypatch):
+        """
+        Test para aplicar niveles en varios lotes: cada lote se confirma en su
+        propia transacción y, como solo cambian mínimos y máximos, la caché de
+        costes no se invalida.
+        """
+        monkeypatch.setattr("app.services.prevision_demanda_service.TAMANO_LOTE_APLICAR", 1)
+        ValoracionService(self.db).costes_elementos([("componente", 1), ("componente", 2)])
+        self.db.commit()
+        ids = [fila[0] for fila in self.db.execute(text("SELECT id FROM stock ORDER BY id"))]
+        propuestas = [
+            {"id_stock": id_stock, "cantidad_minima_propuesta": 40 + i, "cantidad_maxima_propuesta": 120 + i}
+            for i, id_stock in enumerate(ids)
+        ]
+
+        assert PrevisionDemandaService(self.db).aplicar_niveles(propuestas) == 2
+
+        marcas = self.db.execute(text("SELECT updated_at FROM stock ORDER BY id")).scalars().all()
+        assert marcas[0] != marcas[1]
+        assert cache_costes.contiene(("componente", 1)) and cache_costes.contiene(("componente", 2))
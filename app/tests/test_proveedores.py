@@ -1,52 +1,27 @@
-from time import sleep
 from fastapi.testclient import TestClient
-from app.db import SessionLocal
 from app.main import app
 from app.schemas.proveedorDTO import ProveedorCreate, ProveedorUpdate
 from sqlalchemy import text
 
-from app.tests import reset_db
+from app.tests import TransaccionPrueba
 
 client = TestClient(app)
 
 class TestEmptyProveedorDB:
-    @classmethod
-    def setup_class(cls):
-        """
-        Se ejecuta una vez antes de todos los tests de la clase.
-        Limpia la tabla de colores en la base de datos.
-        """
-        cls.db = SessionLocal()
-        try:
-            reset_db(cls.db)
-            sleep(1)  # Esperar un segundo para asegurar que la base de datos esté limpia
-        finally:
-            cls.db.close()
-            
     def setup_method(self, method):
         """
         Se ejecuta antes de cada test.
-        Limpia la tabla de colores en la base de datos.
+        Abre una transacción que se deshace al terminar el test.
         """
-        self.db = SessionLocal()
-        pass
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
 
     def teardown_method(self, method):
         """
         Se ejecuta después de cada test.
-        Cierra la sesión de base de datos.
+        Deshace todo lo hecho en el test.
         """
-        self.db.close()
-
-    @classmethod
-    def teardown_class(cls):
-        """
-        Se ejecuta una vez después de todos los tests de la clase.
-        Cierra la sesión de base de datos.
-        """
-        cls.db = SessionLocal()
-        reset_db(cls.db)
-        cls.db.close()
+        self.transaccion.deshacer()
 
     def test_listar_proveedores_vacio(self):
         """
@@ -111,9 +86,10 @@ class TestEmptyProveedorDB:
 
     def test_crear_proveedor_sin_nif_cif(self):
         """
-        Test para crear un proveedor sin NIF/CIF.
+        Test para crear un proveedor sin NIF/CIF con un nombre ya existente.
         Debe retornar un error de validación.
         """
+        client.post("/proveedores/", json={"nombre": "Proveedor Test", "nif_cif": "12345678A"})
         proveedor_data = {
             "nombre": "Proveedor Test",
             "nif_cif": "",
@@ -186,79 +162,56 @@ class TestEmptyProveedorDB:
         assert response.json() == {"detail": "Proveedor no encontrado"}
 
 class TestProveedorDBWithData:
-    @classmethod
-    def setup_class(cls):
-        """
-        Se ejecuta una vez antes de todos los tests de la clase.
-        Limpia la tabla de proveedores en la base de datos y crea un proveedor de prueba.
-        """
-        cls.db = SessionLocal()
-        try:
-            reset_db(cls.db)
-            sleep(1)  # Esperar un segundo para asegurar que la base de datos esté limpia
-            
-            # Crear un proveedor de prueba
-            proveedor_data = [
-                {
-                    "nombre": "Proveedor Uno",
-                    "nif_cif": "11111111A",
-                    "telefono": "+39 600111111",
-                    "email": "uno@proveedor.com",
-                    "direccion": "Calle Uno 1",
-                    "activo": True
-                },
-                {
-                    "nombre": "Proveedor Dos",
-                    "nif_cif": "22222222B",
-                    "telefono": "600222222",
-                    "email": "dos@proveedor.com",
-                    "direccion": "Calle Dos 2",
-                    "activo": False
-                }
-            ]
-            for proveedor in proveedor_data:
-                cls.db.execute(
-                    text("""
-                        INSERT INTO proveedor (nombre, nif_cif, telefono, email, direccion, activo)
-                        VALUES (:nombre, :nif_cif, :telefono, :email, :direccion, :activo)
-                    """), 
-                    {
-                        "nombre": proveedor["nombre"],
-                        "nif_cif": proveedor["nif_cif"],
-                        "telefono": proveedor["telefono"],
-                        "email": proveedor["email"],
-                        "direccion": proveedor["direccion"],
-                        "activo": proveedor["activo"]
-                    }
-                )
-            cls.db.commit()
-            sleep(1)  # Esperar un segundo para asegurar que los datos estén disponibles
-        finally:
-            cls.db.close()
-
     def setup_method(self, method):
         """
         Se ejecuta antes de cada test.
-        Limpia la tabla de proveedores en la base de datos.
-        """
-        self.db = SessionLocal()
+        Abre una transacción que se deshace al terminar el test.
+        Crea los proveedores Uno (activo) y Dos (inactivo).
+        """
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
+        # Crear un proveedor de prueba
+        proveedor_data = [
+            {
+                "nombre": "Proveedor Uno",
+                "nif_cif": "11111111A",
+                "telefono": "+39 600111111",
+                "email": "uno@proveedor.com",
+                "direccion": "Calle Uno 1",
+                "activo": True
+            },
+            {
+                "nombre": "Proveedor Dos",
+                "nif_cif": "22222222B",
+                "telefono": "600222222",
+                "email": "dos@proveedor.com",
+                "direccion": "Calle Dos 2",
+                "activo": False
+            }
+        ]
+        for proveedor in proveedor_data:
+            self.db.execute(
+                text("""
+                    INSERT INTO proveedor (nombre, nif_cif, telefono, email, direccion, activo)
+                    VALUES (:nombre, :nif_cif, :telefono, :email, :direccion, :activo)
+                """), 
+                {
+                    "nombre": proveedor["nombre"],
+                    "nif_cif": proveedor["nif_cif"],
+                    "telefono": proveedor["telefono"],
+                    "email": proveedor["email"],
+                    "direccion": proveedor["direccion"],
+                    "activo": proveedor["activo"]
+                }
+            )
+        self.db.commit()
 
     def teardown_method(self, method):
         """
         Se ejecuta después de cada test.
-        Cierra la sesión de base de datos.
-        """
-        self.db.close()
-
-    @classmethod
-    def teardown_class(cls):
+        Deshace todo lo hecho en el test.
         """
-        Se ejecuta una vez después de todos los tests de la clase.
-        Cierra la sesión de base de datos.
-        """
-        cls.db = SessionLocal()
-        reset_db(cls.db)
-        cls.db.close()
+        self.transaccion.deshacer()
 
     def test_listar_proveedores_con_datos(self):
         """
@@ -300,6 +253,34 @@ class TestProveedorDBWithData:
         assert response.status_code == 404
         assert response.json() == {"detail": "Proveedor no encontrado"}
 
+    def test_listar_proveedores_con_proyeccion(self):
+        """
+        Test para listar proveedores con solo algunos campos.
+        Cada proveedor debe traer exactamente los campos pedidos.
+        """
+        response = client.get("/proveedores/", params={"fields": "id,nombre,nif_cif"})
+        assert response.status_code == 200
+        proveedores = response.json()
+        assert [p["nif_cif"] for p in proveedores] == ["11111111A", "22222222B"]
+        for proveedor in proveedores:
+            assert set(proveedor.keys()) == {"id", "nombre", "nif_cif"}
+
+    def test_obtener_proveedor_con_proyeccion(self):
+        """
+        Test para obtener un proveedor existente con solo algunos campos.
+        """
+        response = client.get("/proveedores/2", params={"fields": "nombre,activo"})
+        assert response.status_code == 200
+        assert response.json() == {"nombre": "Proveedor Dos", "activo": False}
+
+    def test_proyeccion_con_campo_invalido(self):
+        """
+        Test para intentar proyectar un campo que no existe.
+        Debe retornar un error 400 en el listado y en el detalle.
+        """
+        assert client.get("/proveedores/", params={"fields": "id,no_existe"}).status_code == 400
+        assert client.get("/proveedores/1", params={"fields": "no_existe"}).status_code == 400
+
     def test_crear_proveedor_con_datos(self):
         """
         Test para crear un nuevo proveedor cuando ya existen datos.
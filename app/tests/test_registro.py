@@ -0,0 +1,127 @@
+import json
+import logging
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.registro import FormatoJSON, crear_cola, id_peticion, niveles_por_modulo
+
+client = TestClient(app)
+
+
+class _Captura(logging.Handler):
+    """Handler que guarda los registros y su línea formateada"""
+
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(FormatoJSON())
+        self.registros = []
+        self.lineas = []
+
+    def emit(self, record):
+        self.registros.append(record)
+        self.lineas.append(json.loads(self.format(record)))
+
+
+class TestRegistro:
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Logger propio que escribe a través de una cola en un handler de captura.
+        """
+        self.captura = _Captura()
+        self.handler, self.escucha = crear_cola(self.captura)
+        self.logger = logging.getLogger(f"prueba.registro.{method.__name__}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(self.handler)
+        self.escucha.start()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Para la escucha y retira el handler.
+        """
+        self.escucha.stop()
+        self.logger.removeHandler(self.handler)
+
+    def test_linea_json(self):
+        """
+        Test del formato JSON: mensaje, nivel, id de petición, campos de extra y excepción.
+        """
+        token = id_peticion.set("abc123")
+        try:
+            self.logger.info("✅ Stock %s actualizado", 7, extra={"duracion_ms": 1.5})
+            try:
+                raise ValueError("cantidad negativa")
+            except ValueError:
+                self.logger.exception("❌ Error en movimiento")
+        finally:
+            id_peticion.reset(token)
+        self.escucha.stop()
+        self.escucha.start()
+
+        linea, error = self.captura.lineas
+        assert linea["mensaje"] == "✅ Stock 7 actualizado"
+        assert linea["nivel"] == "INFO"
+        assert linea["id_peticion"] == "abc123"
+        assert linea["duracion_ms"] == 1.5
+        assert "ValueError: cantidad negativa" in error["excepcion"]
+
+    def test_formateo_diferido(self):
+        """
+        Test del formateo diferido: con argumentos inmutables el mensaje se
+        compone en el hilo de fondo; con objetos mutables, al registrarlo.
+        """
+        lista = [1, 2]
+        self.logger.info("Stock %s: %s", 7, 2.5)
+        self.logger.info("Lotes %s", lista)
+        lista.append(3)
+        self.logger.debug("Desactivado %s", 1)
+        self.escucha.stop()
+        self.escucha.start()
+
+        diferido, inmediato = self.captura.registros
+        assert diferido.args == (7, 2.5)
+        assert inmediato.args is None
+        assert inmediato.getMessage() == "Lotes [1, 2]"
+
+    def test_niveles_por_modulo(self):
+        """
+        Test de la configuración de niveles por módulo y de sus errores.
+        """
+        assert niveles_por_modulo("app.services=warning, sqlalchemy.engine=INFO,") == {
+            "app.services": logging.WARNING, "sqlalchemy.engine": logging.INFO
+        }
+        assert niveles_por_modulo("") == {}
+        with pytest.raises(ValueError):
+            niveles_por_modulo("app.services")
+        with pytest.raises(ValueError):
+            niveles_por_modulo("app.services=MUCHO")
+
+
+class TestIdPeticion:
+    def test_id_generado_y_respetado(self):
+        """
+        Test del id de petición: se genera si no llega y se respeta el recibido
+        si es válido.
+        """
+        generado = client.get("/").headers["x-request-id"]
+        assert len(generado) == 32
+
+        response = client.get("/", headers={"X-Request-ID": "balanceador-42"})
+        assert response.headers["x-request-id"] == "balanceador-42"
+
+        for no_valido in ("con espacios", "x" * 65):
+            response = client.get("/", headers={"X-Request-ID": no_valido})
+            assert len(response.headers["x-request-id"]) == 32
+
+    def test_registro_de_peticion(self, caplog):
+        """
+        Test del registro de cada petición con método, ruta, estado y duración.
+        """
+        with caplog.at_level(logging.INFO, logger="app.peticiones"):
+            client.get("/health", headers={"X-Request-ID": "salud-1"})
+        registro = next(r for r in caplog.records if r.name == "app.peticiones")
+        assert (registro.metodo, registro.ruta, registro.estado) == ("GET", "/health", 200)
+        assert registro.duracion_ms >= 0
+        assert registro.getMessage().startswith("GET /health 200")
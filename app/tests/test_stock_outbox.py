@@ -0,0 +1,185 @@
+import json
+import pytest
+from decimal import Decimal
+from fastapi.testclient import TestClient
+from app.db import SessionLocal
+from app.main import app
+from app.models.evento_stock_outbox import EventoStockOutbox
+from app.services.outbox_service import OutboxRelay, PublicadorArchivo, PublicadorMemoria, crear_publicador_desde_entorno
+from app.services.stock_service import StockService
+from sqlalchemy import text
+
+from app.tests import reset_db
+
+client = TestClient(app)
+
+class PublicadorRoto:
+    """Publicador que siempre falla, para probar los reintentos"""
+    def publicar(self, eventos):
+        raise ConnectionError("broker no disponible")
+
+class TestStockOutbox:
+    @classmethod
+    def setup_class(cls):
+        """
+        Se ejecuta una vez antes de todos los tests de la clase.
+        Limpia la base de datos y crea un componente sin stock.
+        """
+        cls.db = SessionLocal()
+        try:
+            reset_db(cls.db)
+            cls.db.execute(text("INSERT INTO componente (nombre, codigo) VALUES ('Tornillo', 'COMP-001')"))
+            cls.db.commit()
+        finally:
+            cls.db.close()
+
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Vacía el outbox para que cada test vea solo sus eventos.
+        """
+        self.db = SessionLocal()
+        self.db.execute(text("DELETE FROM evento_stock_outbox"))
+        self.db.commit()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Cierra la sesión de base de datos.
+        """
+        self.db.close()
+
+    @classmethod
+    def teardown_class(cls):
+        """
+        Se ejecuta una vez después de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def _eventos(self):
+        return self.db.query(EventoStockOutbox).order_by(EventoStockOutbox.id).all()
+
+    def test_crear_y_mover_stock_escribe_eventos(self):
+        """
+        Test para las mutaciones de stock a través de la API.
+        Cada una debe dejar su evento en el outbox con la cantidad anterior y la nueva.
+        """
+        response = client.post("/stock/componente/1?cantidad_actual=10&cantidad_minima=2")
+        assert response.status_code == 201
+        stock_id = response.json()["stock"]["id"]
+
+        response = client.post(f"/stock/{stock_id}/movimiento?cantidad=9&tipo_movimiento=salida")
+        assert response.status_code == 200
+
+        eventos = self._eventos()
+        assert [e.tipo for e in eventos] == ["stock.creado", "stock.actualizado"]
+        assert all(e.id_stock == stock_id for e in eventos)
+        assert eventos[1].datos["cantidad_anterior"] == 10
+        assert eventos[1].datos["cantidad_actual"] == 1
+        assert eventos[1].datos["necesita_reposicion"] is True
+        assert all(e.publicado_at is None for e in eventos)
+
+    def test_rollback_no_escribe_eventos(self):
+        """
+        Test para un cambio de stock que no llega a confirmarse.
+        El evento debe deshacerse junto con el cambio.
+        """
+        stock = StockService(self.db).obtener_stock_por_componente(1)
+        stock.cantidad_actual = Decimal("50")
+        self.db.flush()
+        self.db.rollback()
+
+        assert self._eventos() == []
+
+    def test_relay_publica_y_marca_eventos(self):
+        """
+        Test para el relay con el publicador en memoria.
+        Debe publicar los pendientes en orden, marcarlos y no volver a publicarlos.
+        """
+        stock_service = StockService(self.db)
+        stock = stock_service.obtener_stock_por_componente(1)
+        stock_service.actualizar_stock(stock.id, 5)
+        stock_service.actualizar_stock(stock.id, 6)
+
+        publicador = PublicadorMemoria()
+        recibidos = []
+        publicador.suscribir(recibidos.append)
+        relay = OutboxRelay(publicador, tamano_lote=1)
+
+        assert relay.procesar_pendientes() == 2
+        assert [e["datos"]["cantidad_actual"] for e in recibidos] == [5, 6]
+        assert recibidos == publicador.eventos
+        assert relay.procesar_pendientes() == 0
+        self.db.expire_all()
+        assert all(e.publicado_at is not None for e in self._eventos())
+
+    def test_relay_reintenta_si_falla_la_publicacion(self):
+        """
+        Test para un publicador que falla.
+        Los eventos deben quedar pendientes con el intento y el error registrados.
+        """
+        stock_service = StockService(self.db)
+        stock = stock_service.obtener_stock_por_componente(1)
+        stock_service.actualizar_stock(stock.id, 7)
+
+        assert OutboxRelay(PublicadorRoto()).procesar_lote() == 0
+
+        evento = self._eventos()[0]
+        assert evento.publicado_at is None
+        assert evento.intentos == 1
+        assert "broker no disponible" in evento.ultimo_error
+
+    def test_publicador_archivo(self, tmp_path):
+        """
+        Test para el publicador a fichero.
+        Debe escribir un evento JSON por línea.
+        """
+        stock_service = StockService(self.db)
+        stock = stock_service.obtener_stock_por_componente(1)
+        stock_service.actualizar_stock(stock.id, 8)
+        ruta = tmp_path / "eventos.jsonl"
+
+        assert OutboxRelay(PublicadorArchivo(str(ruta))).procesar_pendientes() == 1
+
+        lineas = ruta.read_text(encoding="utf-8").splitlines()
+        assert len(lineas) == 1
+        assert json.loads(lineas[0])["tipo"] == "stock.actualizado"
+
+    def test_publicador_desde_entorno(self, monkeypatch):
+        """
+        Test para el publicador del relay como proceso independiente.
+        Por defecto escribe a fichero; el de memoria se rechaza porque
+        perdería los eventos.
+        """
+        monkeypatch.delenv("OUTBOX_PUBLICADOR", raising=False)
+        assert isinstance(crear_publicador_desde_entorno(), PublicadorArchivo)
+
+        monkeypatch.setenv("OUTBOX_PUBLICADOR", "memoria")
+        with pytest.raises(ValueError):
+            crear_publicador_desde_entorno()
+
+    def test_regla_de_reposicion_coincide_con_el_listado(self):
+        """
+        Test para el umbral de reposición: el listado bajo mínimo y el
+        indicador de los eventos usan la misma regla (en el mínimo también
+        cuenta, y sin mínimo nunca).
+        """
+        stock_service = StockService(self.db)
+        en_minimo = stock_service.crear_stock_componente(1, 2, cantidad_minima=2, ubicacion_almacen="ALM9/P01")
+        sin_minimo = stock_service.crear_stock_componente(1, 0, ubicacion_almacen="ALM9/P02")
+        sin_minimo.cantidad_minima = None
+        self.db.commit()
+
+        bajo_minimo = {stock.id for stock in stock_service.listar_stock(bajo_minimo=True, id_componente=1)}
+        resto = {stock.id for stock in stock_service.listar_stock(bajo_minimo=False, id_componente=1)}
+        assert en_minimo.id in bajo_minimo and sin_minimo.id in resto
+        assert sin_minimo.id not in bajo_minimo and en_minimo.id not in resto
+        assert en_minimo.id in {stock.id for stock in stock_service.obtener_stock_bajo_minimo()}
+        assert en_minimo.necesita_reposicion is True and sin_minimo.necesita_reposicion is False
+
+        datos = {evento.id_stock: evento.datos for evento in self._eventos()}
+        assert datos[en_minimo.id]["necesita_reposicion"] is True
+        assert datos[sin_minimo.id]["necesita_reposicion"] is False
@@ -0,0 +1,133 @@
+import asyncio
+from fastapi.testclient import TestClient
+from app.db import SessionLocal
+from app.main import app
+from app.services.stock_eventos_service import BusStock, SuscripcionStock
+from app.services.stock_service import StockService
+from sqlalchemy import text
+
+from app.tests import reset_db, solo_postgresql
+
+client = TestClient(app)
+
+@solo_postgresql
+class TestStockTiempoReal:
+    @classmethod
+    def setup_class(cls):
+        """
+        Se ejecuta una vez antes de todos los tests de la clase.
+        Limpia la base de datos y crea dos componentes con stock.
+        """
+        cls.db = SessionLocal()
+        try:
+            reset_db(cls.db)
+            cls.db.execute(text("INSERT INTO componente (nombre, codigo) VALUES ('Tornillo', 'COMP-001'), ('Tuerca', 'COMP-002')"))
+            cls.db.commit()
+            stock_service = StockService(cls.db)
+            stock_service.crear_stock_componente(1, 10, cantidad_minima=5, ubicacion_almacen="A-01")
+            stock_service.crear_stock_componente(2, 10, cantidad_minima=5, ubicacion_almacen="B-01")
+        finally:
+            cls.db.close()
+
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        """
+        self.db = SessionLocal()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Cierra la sesión de base de datos.
+        """
+        self.db.close()
+
+    @classmethod
+    def teardown_class(cls):
+        """
+        Se ejecuta una vez después de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def test_snapshot_y_cambios_filtrados(self):
+        """
+        Test para una suscripción filtrada por componente.
+        Debe recibir el snapshot, ignorar los cambios de otros componentes
+        y avisar del cruce de umbral.
+        """
+        stock_service = StockService(self.db)
+        with client.websocket_connect("/stock/ws?id_componente=1") as websocket:
+            snapshot = websocket.receive_json()
+            assert snapshot["tipo"] == "snapshot"
+            assert snapshot["completo"] is True
+            assert [s["id_componente"] for s in snapshot["stocks"]] == [1]
+
+            stock_service.actualizar_stock(stock_service.obtener_stock_por_componente(2).id, 1)
+            stock_service.actualizar_stock(stock_service.obtener_stock_por_componente(1).id, 3)
+
+            cambio = websocket.receive_json()
+            assert cambio["tipo"] == "stock.actualizado"
+            assert cambio["datos"]["id_componente"] == 1
+            assert cambio["datos"]["cantidad_anterior"] == 10
+            assert cambio["datos"]["cantidad_actual"] == 3
+
+            umbral = websocket.receive_json()
+            assert umbral["tipo"] == "stock.umbral"
+            assert umbral["datos"]["necesita_reposicion"] is True
+
+    def test_solo_umbral_por_ubicacion(self):
+        """
+        Test para una suscripción a cruces de umbral de una ubicación.
+        No debe recibir cambios que no cruzan el umbral.
+        """
+        stock_service = StockService(self.db)
+        stock_id = stock_service.obtener_stock_por_componente(2).id
+        with client.websocket_connect("/stock/ws?ubicacion=B-01&solo_umbral=true") as websocket:
+            assert websocket.receive_json()["tipo"] == "snapshot"
+
+            stock_service.actualizar_stock(stock_id, 2)
+            stock_service.actualizar_stock(stock_id, 8)
+
+            umbral = websocket.receive_json()
+            assert umbral["tipo"] == "stock.umbral"
+            assert umbral["datos"]["cantidad_actual"] == 8
+            assert umbral["datos"]["necesita_reposicion"] is False
+
+    def test_snapshot_paginado(self, monkeypatch):
+        """
+        Test para un snapshot mayor que una página.
+        Debe llegar en varios mensajes ordenados por id, el último marcado como completo.
+        """
+        monkeypatch.setattr("app.routes.stock_routes.TAMANO_PAGINA_SNAPSHOT", 1)
+        with client.websocket_connect("/stock/ws") as websocket:
+            paginas = [websocket.receive_json()]
+            while not paginas[-1]["completo"]:
+                paginas.append(websocket.receive_json())
+
+        assert all(pagina["tipo"] == "snapshot" for pagina in paginas)
+        assert [len(pagina["stocks"]) for pagina in paginas] == [1, 1, 0]
+        assert [s["id_componente"] for pagina in paginas for s in pagina["stocks"]] == [1, 2]
+
+class TestBusStock:
+    def test_descarta_eventos_antiguos_si_la_cola_esta_llena(self, monkeypatch):
+        """
+        Test para un suscriptor lento.
+        Debe conservar los eventos más recientes sin bloquear la publicación.
+        """
+        monkeypatch.setattr("app.services.stock_eventos_service.MAX_COLA_SUSCRIPCION", 2)
+        loop = asyncio.new_event_loop()
+        try:
+            bus = BusStock()
+            suscripcion = bus.suscribir(SuscripcionStock(loop))
+            for cantidad in (1, 2, 3):
+                bus.publicar({"tipo": "stock.actualizado", "id_stock": 1, "datos": {"cantidad_actual": cantidad}})
+            loop.run_until_complete(asyncio.sleep(0))
+
+            recibidos = [suscripcion.cola.get_nowait()["datos"]["cantidad_actual"] for _ in range(2)]
+            assert recibidos == [2, 3]
+            assert suscripcion.descartados == 1
+        finally:
+            loop.close()
@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from app.db import SessionLocal
+from app.main import app
+from app.models.articulo import Articulo
+from app.services import sync_service
+from app.services.sync_service import codificar_token
+from sqlalchemy import text
+
+from app.tests import reset_db, solo_postgresql
+
+client = TestClient(app)
+
+@solo_postgresql
+class TestSyncChanges:
+    @classmethod
+    def setup_class(cls):
+        """
+        Se ejecuta una vez antes de todos los tests de la clase.
+        Limpia la base de datos y crea artículos con fecha de alta de hace una hora,
+        fuera del margen de seguridad del feed.
+        """
+        cls.db = SessionLocal()
+        try:
+            reset_db(cls.db)
+            cls.db.execute(
+                text("INSERT INTO familia (nombre, descripcion) VALUES ('Familia 1', 'Descripción de la familia 1')")
+            )
+            for i in range(1, 4):
+                cls.db.execute(
+                    text("INSERT INTO articulo (nombre, codigo, activo, id_familia, created_at) "
+                         "VALUES (:nombre, :codigo, true, 1, now() - interval '1 hour')"),
+                    {"nombre": f"Articulo {i}", "codigo": f"ART-00{i}"}
+                )
+            cls.db.commit()
+        finally:
+            cls.db.close()
+
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        """
+        self.db = SessionLocal()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Cierra la sesión de base de datos.
+        """
+        self.db.close()
+
+    @classmethod
+    def teardown_class(cls):
+        """
+        Se ejecuta una vez después de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def test_carga_completa(self):
+        """
+        Test para la carga inicial sin token.
+        Debe devolver todas las filas y un token para la siguiente llamada.
+        """
+        response = client.get("/sync/changes?entidades=articulo")
+
+        assert response.status_code == 200
+        datos = response.json()
+        assert datos["token"]
+        assert datos["hay_mas"] is False
+        assert [a["codigo"] for a in datos["cambios"]["articulo"]["actualizados"]] == ["ART-001", "ART-002", "ART-003"]
+        assert datos["cambios"]["articulo"]["eliminados"] == []
+
+    def test_carga_completa_paginada(self):
+        """
+        Test para la carga inicial con un límite menor que el número de filas.
+        Debe indicar que hay más páginas y no perder ninguna fila al seguirlas.
+        """
+        codigos = []
+        token = None
+        for _ in range(5):
+            params = {"entidades": "articulo", "limite": 2}
+            if token:
+                params["since"] = token
+            datos = client.get("/sync/changes", params=params).json()
+            codigos.extend(a["codigo"] for a in datos["cambios"]["articulo"]["actualizados"])
+            token = datos["token"]
+            if not datos["hay_mas"]:
+                break
+
+        assert set(codigos) == {"ART-001", "ART-002", "ART-003"}
+
+    def test_cambios_desde_token(self):
+        """
+        Test para una llamada incremental.
+        Debe devolver solo las filas modificadas y los IDs eliminados después del token.
+        """
+        token = codificar_token(datetime.now(timezone.utc) - timedelta(minutes=30))
+
+        self.db.execute(
+            text("UPDATE articulo SET nombre = 'Articulo 2 modificado', "
+                 "updated_at = now() - interval '10 minutes' WHERE codigo = 'ART-002'")
+        )
+        self.db.commit()
+        response = client.delete("/articulos/3")
+        assert response.status_code == 200
+        # Sacar la baja del margen de seguridad del feed
+        self.db.execute(text("UPDATE registro_eliminado SET eliminado_at = now() - interval '10 minutes'"))
+        self.db.commit()
+
+        response = client.get(f"/sync/changes?since={token}&entidades=articulo")
+
+        assert response.status_code == 200
+        cambios = response.json()["cambios"]["articulo"]
+        assert [a["nombre"] for a in cambios["actualizados"]] == ["Articulo 2 modificado"]
+        assert cambios["eliminados"] == [3]
+
+    def test_cambios_recientes_esperan_al_margen(self):
+        """
+        Test para cambios todavía dentro del margen de seguridad.
+        No deben entregarse ni adelantar el token.
+        """
+        token = codificar_token(datetime.now(timezone.utc) - timedelta(minutes=5))
+        self.db.execute(text("UPDATE articulo SET nombre = 'Articulo 1 reciente', updated_at = now() WHERE codigo = 'ART-001'"))
+        self.db.commit()
+
+        datos = client.get(f"/sync/changes?since={token}&entidades=articulo").json()
+
+        nombres = [a["nombre"] for a in datos["cambios"]["articulo"]["actualizados"]]
+        assert "Articulo 1 reciente" not in nombres
+        assert int(datos["token"]) < int(codificar_token(datetime.now(timezone.utc)))
+
+    def test_token_no_valido(self):
+        """
+        Test para un token mal formado.
+        Debe devolver un error 400.
+        """
+        response = client.get("/sync/changes?since=no-es-un-token")
+
+        assert response.status_code == 400
+
+    def test_entidad_no_valida(self):
+        """
+        Test para una entidad que no se publica en el feed.
+        Debe devolver un error 400.
+        """
+        response = client.get("/sync/changes?entidades=articulo,familia")
+
+        assert response.status_code == 400
+        assert "familia" in response.json()["detail"]
+
+    def test_transaccion_abierta_retiene_el_token(self, monkeypatch):
+        """
+        Test para una fila escrita por una transacción que sigue abierta al consultar.
+        El token no debe adelantarla: al confirmarse se entrega en la siguiente llamada,
+        aunque el margen de seguridad sea nulo.
+        """
+        monkeypatch.setattr(sync_service, "MARGEN_SEGURIDAD", timedelta(0))
+        token = codificar_token(datetime.now(timezone.utc) - timedelta(minutes=5))
+        otra = SessionLocal()
+        try:
+            otra.execute(
+                text("INSERT INTO articulo (nombre, codigo, activo, id_familia) "
+                     "VALUES ('Articulo lento', 'ART-009', true, 1)")
+            )
+            token = client.get(f"/sync/changes?since={token}&entidades=articulo").json()["token"]
+            otra.commit()
+        finally:
+            otra.close()
+
+        datos = client.get(f"/sync/changes?since={token}&entidades=articulo").json()
+
+        assert "ART-009" in [a["codigo"] for a in datos["cambios"]["articulo"]["actualizados"]]
+
+    def test_baja_fuera_de_los_servicios(self):
+        """
+        Test para una baja hecha directamente con la sesión, sin BaseService.eliminar.
+        Debe dejar igualmente su registro de eliminación.
+        """
+        articulo = Articulo(nombre="Articulo efímero", codigo="ART-010", activo=True, id_familia=1)
+        self.db.add(articulo)
+        self.db.commit()
+        id_articulo = articulo.id
+
+        self.db.delete(articulo)
+        self.db.commit()
+
+        eliminados = self.db.execute(
+            text("SELECT id_registro FROM registro_eliminado WHERE tabla = 'articulo'")
+        ).scalars().all()
+        assert id_articulo in eliminados
@@ -0,0 +1,198 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.db import SessionLocal
+from app.main import app
+from app.models.trabajo import Trabajo
+from app.services.trabajo_service import Trabajador, TrabajoService, tipo_trabajo
+
+from app.tests import reset_db, solo_postgresql
+
+client = TestClient(app)
+
+
+@tipo_trabajo("prueba_pasos")
+def _prueba_pasos(db, contexto, pasos: int = 3, fallar: bool = False):
+    """Trabajo de prueba que avanza por pasos"""
+    for paso in range(pasos):
+        contexto.avanzar(paso * 100 // pasos, f"Paso {paso + 1}")
+    if fallar:
+        raise RuntimeError("Fallo de prueba")
+    return {"pasos": pasos}
+
+
+class TestTrabajos:
+    @classmethod
+    def setup_class(cls):
+        """
+        Se ejecuta una vez antes de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Vacía la cola de trabajos.
+        """
+        self.db = SessionLocal()
+        self.db.execute(text("DELETE FROM trabajo"))
+        self.db.commit()
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Cierra la sesión de base de datos.
+        """
+        self.db.close()
+
+    @classmethod
+    def teardown_class(cls):
+        """
+        Se ejecuta una vez después de todos los tests de la clase.
+        Limpia la base de datos.
+        """
+        cls.db = SessionLocal()
+        reset_db(cls.db)
+        cls.db.close()
+
+    def test_encolar_y_ejecutar(self):
+        """
+        Test del ciclo completo: encolar por la API, ejecutar en un trabajador
+        y consultar el resultado.
+        """
+        response = client.post("/trabajos/", json={"tipo": "prueba_pasos", "parametros": {"pasos": 4}})
+        assert response.status_code == 202
+        trabajo = response.json()
+        assert trabajo["estado"] == "pendiente" and trabajo["progreso"] == 0
+
+        assert Trabajador(nombre="test").procesar_siguiente() == "completado"
+        assert Trabajador(nombre="test").procesar_siguiente() is None
+
+        trabajo = client.get(f"/trabajos/{trabajo['id']}").json()
+        assert trabajo["estado"] == "completado" and trabajo["progreso"] == 100
+        assert trabajo["resultado"] == {"pasos": 4}
+        assert trabajo["mensaje"] == "Paso 4" and trabajo["intentos"] == 1 and trabajo["trabajador"] == "test"
+
+        assert any(tipo["tipo"] == "recalcular_disponibilidad" for tipo in client.get("/trabajos/tipos").json())
+
+    def test_validacion(self):
+        """
+        Test para tipos o parámetros no válidos.
+        """
+        assert client.post("/trabajos/", json={"tipo": "no_existe"}).status_code == 400
+        assert client.post("/trabajos/", json={"tipo": "prueba_pasos", "parametros": {"otro": 1}}).status_code == 400
+        assert client.get("/trabajos/?estado=raro").status_code == 400
+        assert client.get("/trabajos/999999").status_code == 404
+
+    def test_error(self):
+        """
+        Test para un trabajo que falla: queda en error con el mensaje.
+        """
+        trabajo = TrabajoService(self.db).encolar("prueba_pasos", {"fallar": True})
+        assert Trabajador().procesar_siguiente() == "error"
+        self.db.refresh(trabajo)
+        assert trabajo.estado == "error" and "Fallo de prueba" in trabajo.error
+
+    def test_cancelar(self):
+        """
+        Test de cancelación: uno pendiente se cancela al momento y uno en
+        curso se detiene en su siguiente paso.
+        """
+        pendiente = TrabajoService(self.db).encolar("prueba_pasos")
+        response = client.post(f"/trabajos/{pendiente.id}/cancelar")
+        assert response.json()["estado"] == "cancelado"
+        assert client.post(f"/trabajos/{pendiente.id}/cancelar").status_code == 400
+        assert client.post("/trabajos/999999/cancelar").status_code == 404
+
+        en_curso = TrabajoService(self.db).encolar("prueba_pasos")
+        trabajador = Trabajador()
+        reclamado = trabajador.reclamar()
+        assert reclamado[0] == en_curso.id
+        response = client.post(f"/trabajos/{en_curso.id}/cancelar")
+        assert response.json()["estado"] == "en_curso" and response.json()["cancelacion_solicitada"]
+        assert trabajador.ejecutar_trabajo(*reclamado) == "cancelado"
+
+    @solo_postgresql
+    def test_skip_locked(self):
+        """
+        Test de reparto de la cola: un trabajo bloqueado por otro trabajador
+        se salta y se reclama el siguiente.
+        """
+        servicio = TrabajoService(self.db)
+        primero = servicio.encolar("prueba_pasos")
+        segundo = servicio.encolar("prueba_pasos")
+
+        otra = SessionLocal()
+        try:
+            otra.query(Trabajo).filter(Trabajo.id == primero.id).with_for_update().one()
+            assert Trabajador().reclamar()[0] == segundo.id
+            otra.rollback()
+        finally:
+            otra.close()
+        assert Trabajador().reclamar()[0] == primero.id
+
+    @solo_postgresql
+    def test_recuperar_abandonados(self):
+        """
+        Test para trabajos en curso sin latido: vuelven a la cola y, agotados
+        los intentos, pasan a error.
+        """
+        trabajo = TrabajoService(self.db).encolar("prueba_pasos")
+        trabajador = Trabajador(abandono=60, max_intentos=2)
+        for intento in range(2):
+            assert trabajador.reclamar()[0] == trabajo.id
+            self.db.execute(text("UPDATE trabajo SET latido_at = now() - interval '1 hour'"))
+            self.db.commit()
+            assert trabajador.recuperar_abandonados() == 1
+
+        self.db.refresh(trabajo)
+        assert trabajo.estado == "error" and trabajo.intentos == 2
+        assert trabajador.reclamar() is None
+
+    def test_trabajo_de_mantenimiento(self):
+        """
+        Test de un tipo de trabajo incluido: recalcular la disponibilidad.
+        """
+        trabajo = TrabajoService(self.db).encolar("recalcular_disponibilidad")
+        assert Trabajador().procesar_siguiente() == "completado"
+        self.db.refresh(trabajo)
+        assert trabajo.resultado == {"filas": 0}
+
+    def test_progreso_de_los_trabajos_incluidos(self):
+        """
+        Test para los tipos pesados incluidos: informan de su progreso por pasos,
+        no solo al terminar.
+        """
+        servicio = TrabajoService(self.db)
+        trabajos = {
+            tipo: servicio.encolar(tipo)
+            for tipo in ("recalcular_disponibilidad", "reporte_valoracion", "validacion_integridad")
+        }
+        for _ in trabajos:
+            assert Trabajador().procesar_siguiente() == "completado"
+
+        for trabajo in trabajos.values():
+            self.db.refresh(trabajo)
+        assert trabajos["recalcular_disponibilidad"].mensaje == "Totales globales"
+        assert trabajos["reporte_valoracion"].mensaje == "Nombres y almacenes cargados"
+        assert trabajos["validacion_integridad"].mensaje.endswith("0 incidencias")
+
+    def test_rutas_en_segundo_plano(self):
+        """
+        Test para las rutas de mantenimiento con `en_segundo_plano`: encolan el
+        trabajo correspondiente y responden 202 sin ejecutarlo.
+        """
+        response = client.get("/inventario/validacion/integridad?chequeos=stock_huerfano&muestra=3&en_segundo_plano=true")
+        assert response.status_code == 202
+        assert response.json()["tipo"] == "validacion_integridad"
+        assert response.json()["parametros"] == {"chequeos": ["stock_huerfano"], "muestra": 3}
+
+        response = client.post("/inventario/mantenimiento/limpiar-huerfanos?simular=true&desde=stock_huerfano:5&en_segundo_plano=true")
+        assert response.status_code == 202
+        trabajo = response.json()
+        assert trabajo["tipo"] == "limpieza_huerfanos" and trabajo["estado"] == "pendiente"
+        assert trabajo["parametros"]["desde"] == {"stock_huerfano": 5}
+
+        assert self.db.query(Trabajo).count() == 2
@@ -0,0 +1,123 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.main import app
+from app.models.ubicacion import normalizar_ruta
+from app.services.producto_service import ProductoService
+from app.services.stock_service import StockService
+from app.services.ubicacion_service import UbicacionService
+
+from app.tests import TransaccionPrueba
+
+client = TestClient(app)
+
+class TestUbicaciones:
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Crea dos componentes con stock en varias ubicaciones.
+        Todo se deshace al terminar el test.
+        """
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
+        self.db.execute(text("INSERT INTO componente (nombre, codigo) VALUES ('Tornillo', 'COMP-001'), ('Tuerca', 'COMP-002')"))
+        self.db.commit()
+        stock_service = StockService(self.db)
+        stock_service.crear_stock_componente(1, 10, ubicacion_almacen="ALM1/P04/E01/H01")
+        stock_service.crear_stock_componente(1, 5, ubicacion_almacen="ALM1/P04/E02/H03")
+        stock_service.crear_stock_componente(2, 7, ubicacion_almacen="ALM1/P04/E02/H03")
+        stock_service.crear_stock_componente(2, 3, ubicacion_almacen="ALM1/P40/E01/H01")
+        stock_service.crear_stock_componente(1, 1, ubicacion_almacen="ALM2/P04")
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Deshace todo lo hecho en el test.
+        """
+        self.transaccion.deshacer()
+
+    def test_normalizar_ruta(self):
+        """
+        Test para la normalización de rutas.
+        """
+        assert normalizar_ruta(" alm1 / p04 ") == "ALM1/P04"
+        for ruta in ("", "ALM1//H1", "A/B/C/D/E"):
+            with pytest.raises(ValueError):
+                normalizar_ruta(ruta)
+
+    def test_jerarquia_creada(self):
+        """
+        Test para los niveles creados al dar de alta stock con una ruta.
+        Cada nivel debe existir una sola vez con su tipo, padre y posición.
+        """
+        hueco = UbicacionService(self.db).obtener_por_ruta("alm1/p04/e02/h03")
+        assert hueco.tipo == "hueco"
+        assert hueco.nivel == 4
+        assert hueco.posicion == 3
+        assert hueco.padre.ruta == "ALM1/P04/E02"
+        assert hueco.padre.padre.padre.tipo == "almacen"
+        assert len(UbicacionService(self.db).listar_ubicaciones(prefijo="ALM1", tipo="pasillo")) == 2
+
+    def test_stock_por_zona(self):
+        """
+        Test para el filtro de stock por ruta.
+        Debe incluir las ubicaciones contenidas y no confundir P04 con P40 ni con otro almacén.
+        """
+        stock_service = StockService(self.db)
+        pasillo = stock_service.listar_stock(ubicacion="ALM1/P04")
+        assert sorted(float(stock.cantidad_actual) for stock in pasillo) == [5, 7, 10]
+
+        hueco = stock_service.listar_stock(ubicacion="ALM1/P04/E02/H03")
+        assert sorted(stock.id_componente for stock in hueco) == [1, 2]
+
+        assert len(stock_service.listar_stock(ubicacion="ALM1")) == 4
+
+    def test_varias_ubicaciones_por_elemento(self):
+        """
+        Test para el stock de un mismo componente en varias ubicaciones.
+        Una ubicación repetida para el mismo componente debe rechazarse.
+        """
+        stocks = StockService(self.db).listar_stock(id_componente=1)
+        assert [stock.ubicacion_almacen for stock in stocks] == ["ALM1/P04/E01/H01", "ALM1/P04/E02/H03", "ALM2/P04"]
+
+        response = client.post("/stock/componente/1?cantidad_actual=1&ubicacion_almacen=alm1/p04/e01/h01")
+        assert response.status_code == 400
+
+    def test_disponibilidad_suma_ubicaciones(self):
+        """
+        Test para la disponibilidad de fabricación con stock repartido.
+        Debe sumar todas las ubicaciones del componente.
+        """
+        self.db.execute(text("INSERT INTO articulo (nombre, codigo) VALUES ('Mesa', 'MESA-1')"))
+        self.db.execute(text("INSERT INTO producto (tipo_producto, id_articulo) VALUES ('compuesto', 1)"))
+        self.db.execute(text("INSERT INTO producto_compuesto (id_producto) VALUES (1)"))
+        self.db.execute(text("INSERT INTO componente_producto (id_producto_compuesto, id_componente, cantidad_necesaria) VALUES (1, 1, 4)"))
+        self.db.commit()
+
+        resultado = ProductoService(self.db).verificar_disponibilidad_fabricacion(1, 4)
+        assert resultado["detalles_componentes"][0]["cantidad_disponible"] == 16
+        assert resultado["puede_fabricar"] is True
+
+    def test_api_ubicaciones(self):
+        """
+        Test para los endpoints de ubicaciones.
+        """
+        response = client.post("/ubicaciones/?ruta=ALM1/P05/E01")
+        assert response.status_code == 201
+        ubicacion = response.json()["ubicacion"]
+        assert ubicacion["tipo"] == "estanteria"
+
+        response = client.post("/ubicaciones/?ruta=alm1/p05/e01")
+        assert response.status_code == 400
+
+        response = client.get("/ubicaciones/?prefijo=ALM1/P04&tipo=hueco")
+        assert [u["ruta"] for u in response.json()] == ["ALM1/P04/E01/H01", "ALM1/P04/E02/H03"]
+
+        pasillo = UbicacionService(self.db).obtener_por_ruta("ALM1/P04")
+        response = client.get(f"/ubicaciones/{pasillo.id}/stock")
+        assert len(response.json()) == 3
+        response = client.get(f"/ubicaciones/{pasillo.id}/stock?incluir_contenidas=false")
+        assert response.json() == []
+
+        response = client.get("/stock/?ubicacion=ALM1//P04")
+        assert response.status_code == 400
@@ -0,0 +1,152 @@
+import random
+import numpy as np
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.main import app
+from app.services.stock_service import StockService
+from app.services.valoracion_service import (
+    ValoracionService, coste_medio_ponderado, repercutir_costes, valorar_fifo
+)
+
+from app.tests import TransaccionPrueba
+
+client = TestClient(app)
+
+class TestValoracion:
+    def setup_method(self, method):
+        """
+        Se ejecuta antes de cada test.
+        Crea una silla (10 a 5 €, 10 a 7 €, salen 15), tornillos (100 a 0,10 €
+        en ALM1 y 20 sin coste en ALM2), tuercas sin coste, una mesa de 4
+        tornillos y un pack de 2 sillas y 1 mesa con un 10 % de descuento.
+        Todo se deshace al terminar el test.
+        """
+        self.transaccion = TransaccionPrueba()
+        self.db = self.transaccion.db
+        self.db.execute(text("INSERT INTO articulo (nombre, codigo) VALUES ('Silla', 'SILLA-1'), ('Mesa', 'MESA-1'), ('Pack oficina', 'PACK-1')"))
+        self.db.execute(text("INSERT INTO producto (tipo_producto, id_articulo) VALUES ('simple', 1), ('compuesto', 2)"))
+        self.db.execute(text("INSERT INTO producto_simple (id_producto) VALUES (1)"))
+        self.db.execute(text("INSERT INTO producto_compuesto (id_producto) VALUES (2)"))
+        self.db.execute(text("INSERT INTO componente (nombre, codigo) VALUES ('Tornillo', 'COMP-001'), ('Tuerca', 'COMP-002')"))
+        self.db.execute(text("INSERT INTO componente_producto (id_producto_compuesto, id_componente, cantidad_necesaria) VALUES (1, 1, 4)"))
+        self.db.execute(text("INSERT INTO pack (nombre, id_articulo, descuento_porcentaje) VALUES ('Pack oficina', 3, 10)"))
+        self.db.execute(text("INSERT INTO pack_producto (id_pack, id_producto, cantidad_incluida) VALUES (1, 1, 2), (1, 2, 1)"))
+        self.db.commit()
+        stock_service = StockService(self.db)
+        silla = stock_service.crear_stock_producto(1, 10, ubicacion_almacen="ALM1/P01", coste_unitario=5)
+        stock_service.registrar_movimiento(silla.id, 10, "entrada", motivo="Compra", coste_unitario=7)
+        stock_service.registrar_movimiento(silla.id, 15, "salida", motivo="Pedido PED-1")
+        stock_service.crear_stock_componente(1, 100, ubicacion_almacen="ALM1/P02", coste_unitario=0.10)
+        stock_service.crear_stock_componente(1, 20, ubicacion_almacen="ALM2/P01")
+        stock_service.crear_stock_componente(2, 5, ubicacion_almacen="ALM2/P01")
+
+    def teardown_method(self, method):
+        """
+        Se ejecuta después de cada test.
+        Deshace todo lo hecho en el test.
+        """
+        self.transaccion.deshacer()
+
+    def test_valorar_fifo_equivale_a_consumir_capas(self):
+        """
+        Test del motor FIFO vectorizado frente a consumir capa a capa.
+        """
+        generador = random.Random(7)
+        grupos, cantidades, costes, existencias = [], [], [], []
+        for grupo in range(50):
+            capas = [(generador.randint(1, 20), generador.uniform(1, 10)) for _ in range(generador.randint(0, 6))]
+            for cantidad, coste in capas:
+                grupos.append(grupo)
+                cantidades.append(cantidad)
+                costes.append(coste)
+            existencias.append(generador.randint(0, sum(c for c, _ in capas) + 5))
+
+        valor, sin_capa = valorar_fifo(np.array(grupos), np.array(cantidades, dtype=float),
+                                       np.array(costes), np.array(existencias, dtype=float))
+        for grupo in range(50):
+            pendientes, esperado = existencias[grupo], 0.0
+            capas = [(c, k) for g, c, k in zip(grupos, cantidades, costes) if g == grupo]
+            for cantidad, coste in reversed(capas):
+                tomadas = min(cantidad, pendientes)
+                esperado += tomadas * coste
+                pendientes -= tomadas
+            assert abs(valor[grupo] - esperado) < 1e-6
+            assert sin_capa[grupo] == pendientes
+
+    def test_coste_medio_y_repercusion(self):
+        """
+        Test del coste medio ponderado y de la repercusión de costes a compuestos.
+        Un destino sin líneas o con un origen sin coste queda sin coste.
+        """
+        medio = coste_medio_ponderado(np.array([0, 0, 2]), np.array([10.0, 30.0, 1.0]), np.array([1.0, 2.0, 4.0]), 3)
+        assert medio[0] == 1.75 and np.isnan(medio[1]) and medio[2] == 4.0
+
+        costes = repercutir_costes(np.array([2.0, np.nan]), np.array([0, 0, 1]), np.array([0, 0, 1]),
+                                   np.array([1.0, 3.0, 1.0]), 3)
+        assert costes[0] == 8.0 and np.isnan(costes[1]) and np.isnan(costes[2])
+
+    def test_capas_de_coste(self):
+        """
+        Test para las capas abiertas por altas y entradas con coste.
+        Las salidas y las altas sin coste no abren capa.
+        """
+        capas = ValoracionService(self.db).listar_capas(id_producto_simple=1)
+        assert [(float(c.cantidad), float(c.coste_unitario), c.origen) for c in capas] == [(10, 5, "alta"), (10, 7, "entrada")]
+        assert len(ValoracionService(self.db).listar_capas(id_componente=1)) == 1
+
+        response = client.post("/stock/1/movimiento?cantidad=1&tipo_movimiento=salida&coste_unitario=3")
+        assert response.status_code == 400
+
+    def test_valorar_existencias(self):
+        """
+        Test para la valoración FIFO y por coste medio de cada elemento.
+        """
+        elementos = {
+            (e["tipo"], e["id"]): e for e in ValoracionService(self.db).valorar_existencias()["elementos"]
+        }
+        silla = elementos[("producto_simple", 1)]
+        assert silla["unidades"] == 5
+        assert silla["valor_fifo"] == 35 and silla["coste_unitario_fifo"] == 7
+        assert silla["valor_medio"] == 30 and silla["coste_unitario_medio"] == 6
+
+        tornillo = elementos[("componente", 1)]
+        assert tornillo["valor_fifo"] == 12 and tornillo["valor_medio"] == 12
+
+        tuerca = elementos[("componente", 2)]
+        assert tuerca["unidades_sin_coste"] == 5 and tuerca["coste_unitario_fifo"] is None
+
+    def test_costes_catalogo(self):
+        """
+        Test para el coste de compuestos y packs.
+        Mesa = 4 tornillos; pack = (2 sillas + 1 mesa) - 10 %.
+        """
+        costes = ValoracionService(self.db).costes_catalogo()
+        assert costes["productos"][2]["coste_fifo"] == 0.4
+        assert costes["packs"][1]["coste_fifo"] == 12.96
+        assert costes["packs"][1]["coste_medio"] == 11.16
+
+    def test_api_valoracion(self):
+        """
+        Test para el reporte de valoración y el análisis de costos.
+        """
+        response = client.get("/inventario/reporte/valoracion")
+        assert response.status_code == 200
+        reporte = response.json()
+        assert reporte["valor_total_fifo"] == 47
+        assert reporte["valor_total_medio"] == 42
+        assert reporte["unidades_sin_coste"] == 5
+        assert [(a["almacen"], a["valor_fifo"]) for a in reporte["por_almacen"]] == [("ALM1", 45), ("ALM2", 2)]
+
+        response = client.get("/inventario/analisis/costos?id_producto=2")
+        assert response.status_code == 200
+        analisis = response.json()
+        assert analisis["productos"] == [
+            {"id_producto": 2, "nombre": "Mesa", "tipo": "compuesto", "coste_fifo": 0.4, "coste_medio": 0.4}
+        ]
+        assert analisis["packs"] == []
+
+        response = client.get("/inventario/analisis/costos")
+        assert response.json()["packs"][0]["coste_fifo"] == 12.96
+
+        response = client.get("/inventario/analisis/costos?id_producto=99")
+        assert response.status_code == 400
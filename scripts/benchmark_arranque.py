@@ -0,0 +1,85 @@
+"""
+🚀 Benchmark del arranque de la aplicación
+
+Mide, en procesos nuevos (arranque en frío, sin módulos ya importados), lo
+que tarda `import app.main` con todos los routers montados al arrancar y con
+los de `--diferidas` montados bajo demanda, y los módulos que más tardan en
+importarse (`python -X importtime`).
+
+Con `--maximo-ms` termina con error si la mediana del arranque con las rutas
+diferidas lo supera, para usarlo como control en la integración continua.
+
+Uso:
+    python scripts/benchmark_arranque.py [--repeticiones 5] [--diferidas /graphql,/inventario] [--maximo-ms 1500]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+MEDIR_IMPORTACION = (
+    "import time; inicio = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - inicio) * 1000)"
+)
+
+
+def arrancar(diferidas, repeticiones):
+    """Milisegundos de `import app.main` en cada proceso nuevo"""
+    entorno = {**os.environ, "RUTAS_DIFERIDAS": diferidas}
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c", MEDIR_IMPORTACION], cwd=RAIZ, env=entorno,
+            capture_output=True, text=True, check=True
+        )
+        tiempos.append(float(salida.stdout.strip().splitlines()[-1]))
+    return tiempos
+
+
+def modulos_mas_lentos(diferidas, n):
+    """(microsegundos acumulados, módulo) de los `n` módulos que más tardan en importarse"""
+    entorno = {**os.environ, "RUTAS_DIFERIDAS": diferidas}
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], cwd=RAIZ, env=entorno,
+        capture_output=True, text=True, check=True
+    )
+    modulos = []
+    for linea in salida.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, modulo = linea.split("|")
+        modulos.append((int(acumulado), modulo.strip()))
+    return sorted(modulos, reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--diferidas", default="/graphql,/inventario,/stock,/historico,/picking,/trabajos")
+    parser.add_argument("--modulos", type=int, default=15)
+    parser.add_argument("--maximo-ms", type=float)
+    args = parser.parse_args()
+
+    print(f"{'rutas diferidas':<60} {'mediana ms':>11} {'mín ms':>9}")
+    mediana = None
+    for diferidas in ("", args.diferidas):
+        tiempos = arrancar(diferidas, args.repeticiones)
+        mediana = statistics.median(tiempos)
+        print(f"{diferidas or '(ninguna)':<60} {mediana:>11.0f} {min(tiempos):>9.0f}")
+
+    print(f"\nMódulos más lentos con las rutas diferidas ({args.modulos}):")
+    for acumulado, modulo in modulos_mas_lentos(args.diferidas, args.modulos):
+        print(f"{acumulado / 1000:>9.1f} ms  {modulo}")
+
+    if args.maximo_ms is not None and mediana > args.maximo_ms:
+        print(f"\n❌ El arranque ({mediana:.0f} ms) supera el máximo de {args.maximo_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+📜 Benchmark del stock en una fecha
+
+Carga movimientos sintéticos repartidos en los últimos meses y mide
+`HistoricoStockService.stock_en_fecha` para una fecha reciente sumando todo
+el histórico (sin instantáneas) y partiendo de una instantánea del inicio del
+mes anterior (la poda de particiones deja fuera el resto de meses).
+
+Usa la base de datos configurada. Las particiones de los meses que falten se
+crean (es el mantenimiento normal); los movimientos y la instantánea se
+cargan en una transacción que se deshace al terminar.
+
+Uso:
+    python scripts/benchmark_historico.py [--movimientos 2000000] [--meses 12] [--registros 5000]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.db import SessionLocal  # noqa: E402
+from app.services.historico_stock_service import HistoricoStockService, _sumar_meses, limites_mes  # noqa: E402
+
+
+def medir(servicio, fecha, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = servicio.stock_en_fecha(fecha)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return min(tiempos), len(resultado["filas"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movimientos", type=int, default=2_000_000)
+    parser.add_argument("--meses", type=int, default=12)
+    parser.add_argument("--registros", type=int, default=5000, help="registros de stock distintos")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    ahora = datetime.now(timezone.utc)
+    anio, mes = _sumar_meses(ahora.year, ahora.month, -args.meses)
+    desde, _ = limites_mes(anio, mes)
+
+    db = SessionLocal()
+    try:
+        servicio = HistoricoStockService(db)
+        servicio.asegurar_particiones(desde=desde.date())
+
+        inicio = time.perf_counter()
+        db.execute(text(
+            "INSERT INTO movimiento_stock (fecha, tipo, id_stock, id_componente, id_almacen, cantidad, cantidad_resultante) "
+            "SELECT :desde + (:segundos * n / :total) * interval '1 second', 'entrada', "
+            "n % :registros + 1, n % :registros + 1, NULL, 1, 0 "
+            "FROM generate_series(1, :total) AS n"
+        ), {
+            "desde": desde, "segundos": (ahora - desde).total_seconds() - 60,
+            "total": args.movimientos, "registros": args.registros
+        })
+        db.execute(text("ANALYZE movimiento_stock"))
+        print(f"📥 {args.movimientos:,} movimientos en {args.meses} meses cargados en {time.perf_counter() - inicio:.1f} s")
+
+        fecha = ahora - timedelta(minutes=1)
+        sin_instantanea, filas = medir(servicio, fecha, args.repeticiones)
+
+        anio, mes = _sumar_meses(ahora.year, ahora.month, -1)
+        base, _ = limites_mes(anio, mes)
+        id_instantanea = db.execute(text(
+            "INSERT INTO instantanea_stock (fecha, registros) VALUES (:fecha, :registros) RETURNING id"
+        ), {"fecha": base, "registros": args.registros}).scalar()
+        db.execute(text(
+            "INSERT INTO instantanea_stock_linea (id_instantanea, id_stock, id_componente, cantidad) "
+            "SELECT :id, id_stock, id_componente, sum(cantidad) FROM movimiento_stock "
+            "WHERE fecha < :fecha GROUP BY id_stock, id_componente"
+        ), {"id": id_instantanea, "fecha": base})
+        con_instantanea, _ = medir(servicio, fecha, args.repeticiones)
+
+        print(f"{'base':<28}{'ms':>10}")
+        print(f"{'todo el histórico':<28}{sin_instantanea:>10.1f}")
+        print(f"{'instantánea mes anterior':<28}{con_instantanea:>10.1f}")
+        print(f"({filas} filas de resultado)")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+🧺 Benchmark de rutas de picking
+
+Compara la longitud de ruta y el tiempo de ordenación (con la caché de
+coordenadas vacía) de las estrategias
+de picking frente a un orden aleatorio, sobre un almacén sintético (sin base
+de datos).
+
+Uso:
+    python scripts/benchmark_picking.py [--pasillos 30] [--estanterias 40] [--repeticiones 5]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.picking_service import coordenadas, longitud_ruta, ordenar_recogidas  # noqa: E402
+
+TAMANOS_OLEADA = (10, 100, 1000, 10000)
+
+
+def oleada_aleatoria(n, pasillos, estanterias, huecos, generador):
+    return [
+        {"ubicacion": f"ALM1/P{generador.randint(1, pasillos):02d}/E{generador.randint(1, estanterias):02d}/H{generador.randint(1, huecos)}"}
+        for _ in range(n)
+    ]
+
+
+def medir(recogidas, estrategia):
+    coordenadas.cache_clear()
+    inicio = time.perf_counter()
+    ordenadas = ordenar_recogidas(recogidas, estrategia)
+    ms = (time.perf_counter() - inicio) * 1000
+    return longitud_ruta(ordenadas), ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pasillos", type=int, default=30)
+    parser.add_argument("--estanterias", type=int, default=40)
+    parser.add_argument("--huecos", type=int, default=5)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    generador = random.Random(args.semilla)
+    print(f"Almacén: {args.pasillos} pasillos x {args.estanterias} estanterías x {args.huecos} huecos")
+    print(f"{'recogidas':>10} {'estrategia':>11} {'distancia':>10} {'vs aleatorio':>13} {'ms':>9}")
+    for n in TAMANOS_OLEADA:
+        totales = {estrategia: [0, 0.0] for estrategia in ("ninguna", "serpentina", "vecino")}
+        for _ in range(args.repeticiones):
+            recogidas = oleada_aleatoria(n, args.pasillos, args.estanterias, args.huecos, generador)
+            for estrategia, total in totales.items():
+                distancia, ms = medir(recogidas, estrategia)
+                total[0] += distancia
+                total[1] += ms
+        aleatoria = totales["ninguna"][0]
+        for estrategia, (distancia, ms) in totales.items():
+            nombre = "aleatoria" if estrategia == "ninguna" else estrategia
+            print(f"{n:>10} {nombre:>11} {distancia / args.repeticiones:>10.0f} "
+                  f"{distancia / aleatoria:>12.1%} {ms / args.repeticiones:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
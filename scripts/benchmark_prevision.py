@@ -0,0 +1,52 @@
+"""
+📈 Benchmark de la previsión de demanda
+
+Calcula demanda, stock de seguridad, mínimo y máximo de un catálogo
+sintético (sin base de datos) con el motor vectorizado, en un proceso y
+repartido entre varios.
+
+Uso:
+    python scripts/benchmark_prevision.py [--registros 200000] [--dias 90] [--salidas-por-registro 30] [--procesos 4]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.prevision_demanda_service import prever  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=200_000)
+    parser.add_argument("--dias", type=int, default=90)
+    parser.add_argument("--salidas-por-registro", type=int, default=30)
+    parser.add_argument("--procesos", type=int, default=4)
+    args = parser.parse_args()
+
+    generador = np.random.default_rng(7)
+    salidas = args.registros * args.salidas_por_registro
+    filas = generador.integers(0, args.registros, salidas)
+    dias = generador.integers(0, args.dias, salidas)
+    cantidades = generador.integers(1, 20, salidas).astype(float)
+    parametros = {"metodo": "exponencial", "alfa": 0.2, "ventana": 28, "plazo_reposicion": 7, "dias_revision": 14, "z": 1.645}
+
+    print(f"{args.registros:,} registros, {args.dias} días, {salidas:,} salidas")
+    referencia = None
+    for procesos in (1, args.procesos):
+        inicio = time.perf_counter()
+        resultado = prever(filas, dias, cantidades, args.registros, args.dias, procesos=procesos, **parametros)
+        duracion = time.perf_counter() - inicio
+        if referencia is None:
+            referencia = resultado
+        assert np.allclose(resultado, referencia)
+        print(f"{f'{procesos} proceso(s)':<16}{duracion * 1000:>10.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+💶 Benchmark del motor de valoración
+
+Compara la valoración FIFO vectorizada (`valorar_fifo`) con el consumo de
+capas elemento a elemento en Python, sobre un catálogo sintético (sin base
+de datos).
+
+Uso:
+    python scripts/benchmark_valoracion.py [--elementos 100000] [--capas-por-elemento 20]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.valoracion_service import coste_medio_ponderado, valorar_fifo  # noqa: E402
+
+
+def valorar_fifo_bucle(grupos, cantidades, costes, existencias):
+    capas_por_grupo = {}
+    for grupo, cantidad, coste in zip(grupos.tolist(), cantidades.tolist(), costes.tolist()):
+        capas_por_grupo.setdefault(grupo, []).append((cantidad, coste))
+    valor = [0.0] * len(existencias)
+    for grupo, pendientes in enumerate(existencias.tolist()):
+        for cantidad, coste in reversed(capas_por_grupo.get(grupo, [])):
+            if pendientes <= 0:
+                break
+            tomadas = min(cantidad, pendientes)
+            valor[grupo] += tomadas * coste
+            pendientes -= tomadas
+    return valor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--elementos", type=int, default=100_000)
+    parser.add_argument("--capas-por-elemento", type=int, default=20)
+    args = parser.parse_args()
+
+    generador = np.random.default_rng(7)
+    capas = args.elementos * args.capas_por_elemento
+    grupos = np.sort(generador.integers(0, args.elementos, capas))
+    cantidades = generador.integers(1, 50, capas).astype(float)
+    costes = generador.uniform(0.5, 100, capas)
+    existencias = np.floor(np.bincount(grupos, weights=cantidades, minlength=args.elementos) * generador.uniform(0, 1, args.elementos))
+
+    inicio = time.perf_counter()
+    valor, _ = valorar_fifo(grupos, cantidades, costes, existencias)
+    coste_medio_ponderado(grupos, cantidades, costes, args.elementos)
+    vectorizado = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    referencia = valorar_fifo_bucle(grupos, cantidades, costes, existencias)
+    bucle = time.perf_counter() - inicio
+
+    assert np.allclose(valor, referencia)
+    print(f"{args.elementos:,} elementos, {capas:,} capas")
+    print(f"{'numpy (FIFO + medio)':<24}{vectorizado * 1000:>10.0f} ms")
+    print(f"{'bucle Python (FIFO)':<24}{bucle * 1000:>10.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -79,6 +79,36 @@ WHERE EXISTS (SELECT 1 FROM proveedor);
 DELETE FROM familia 
 WHERE EXISTS (SELECT 1 FROM familia);
 
+-- 4.3 Tabla: registro_eliminado (bajas para /sync/changes, sin claves foráneas)
+DELETE FROM registro_eliminado 
+WHERE EXISTS (SELECT 1 FROM registro_eliminado);
+
+-- 4.4 Tabla: evento_stock_outbox (eventos de stock, sin claves foráneas)
+DELETE FROM evento_stock_outbox 
+WHERE EXISTS (SELECT 1 FROM evento_stock_outbox);
+
+-- 4.5 Tabla: disponibilidad_stock (resumen de stock por almacén, referencia a ubicacion)
+DELETE FROM disponibilidad_stock 
+WHERE EXISTS (SELECT 1 FROM disponibilidad_stock);
+
+-- 4.6 Tablas: movimiento_stock, instantáneas y capas de coste (histórico de stock, sin claves foráneas a otras tablas)
+DELETE FROM movimiento_stock 
+WHERE EXISTS (SELECT 1 FROM movimiento_stock);
+DELETE FROM instantanea_stock_linea 
+WHERE EXISTS (SELECT 1 FROM instantanea_stock_linea);
+DELETE FROM instantanea_stock 
+WHERE EXISTS (SELECT 1 FROM instantanea_stock);
+DELETE FROM capa_coste 
+WHERE EXISTS (SELECT 1 FROM capa_coste);
+
+-- 4.7 Tabla: trabajo (cola de trabajos en segundo plano, sin claves foráneas)
+DELETE FROM trabajo 
+WHERE EXISTS (SELECT 1 FROM trabajo);
+
+-- 4.8 Tabla: ubicacion (jerarquía del almacén, referenciada por stock)
+DELETE FROM ubicacion 
+WHERE EXISTS (SELECT 1 FROM ubicacion);
+
 -- ================================================
 -- PASO 5: Reiniciar secuencias de IDs (opcional)
 -- ================================================
@@ -96,6 +126,15 @@ ALTER SEQUENCE producto_compuesto_id_seq RESTART WITH 1;
 ALTER SEQUENCE pack_producto_id_seq RESTART WITH 1;
 ALTER SEQUENCE componente_producto_id_seq RESTART WITH 1;
 ALTER SEQUENCE stock_id_seq RESTART WITH 1;
+ALTER SEQUENCE registro_eliminado_id_seq RESTART WITH 1;
+ALTER SEQUENCE evento_stock_outbox_id_seq RESTART WITH 1;
+ALTER SEQUENCE ubicacion_id_seq RESTART WITH 1;
+ALTER SEQUENCE disponibilidad_stock_id_seq RESTART WITH 1;
+ALTER SEQUENCE movimiento_stock_id_seq RESTART WITH 1;
+ALTER SEQUENCE instantanea_stock_id_seq RESTART WITH 1;
+ALTER SEQUENCE instantanea_stock_linea_id_seq RESTART WITH 1;
+ALTER SEQUENCE capa_coste_id_seq RESTART WITH 1;
+ALTER SEQUENCE trabajo_id_seq RESTART WITH 1;
 
 -- ================================================
 -- VERIFICACIÓN FINAL
@@ -126,6 +165,22 @@ UNION ALL SELECT
     'componente_producto' as tabla, COUNT(*) as registros FROM componente_producto
 UNION ALL SELECT 
     'stock' as tabla, COUNT(*) as registros FROM stock
+UNION ALL SELECT 
+    'registro_eliminado' as tabla, COUNT(*) as registros FROM registro_eliminado
+UNION ALL SELECT 
+    'evento_stock_outbox' as tabla, COUNT(*) as registros FROM evento_stock_outbox
+UNION ALL SELECT 
+    'ubicacion' as tabla, COUNT(*) as registros FROM ubicacion
+UNION ALL SELECT 
+    'disponibilidad_stock' as tabla, COUNT(*) as registros FROM disponibilidad_stock
+UNION ALL SELECT 
+    'movimiento_stock' as tabla, COUNT(*) as registros FROM movimiento_stock
+UNION ALL SELECT 
+    'instantanea_stock' as tabla, COUNT(*) as registros FROM instantanea_stock
+UNION ALL SELECT 
+    'capa_coste' as tabla, COUNT(*) as registros FROM capa_coste
+UNION ALL SELECT 
+    'trabajo' as tabla, COUNT(*) as registros FROM trabajo
 ORDER BY tabla;
 
 -- Reactivar las restricciones de clave foránea
@@ -0,0 +1,61 @@
+"""
+📘 Generar el esquema OpenAPI precalculado
+
+Monta todos los routers de la aplicación (también los diferidos), genera su
+esquema OpenAPI y lo escribe en el artefacto que la app carga al arrancar
+(`app/openapi.json`, o `OPENAPI_ARTEFACTO`). Se ejecuta en el build y el
+resultado se versiona con el código.
+
+Con `--comprobar` no escribe nada: termina con error si el artefacto no
+coincide con las rutas reales, para usarlo como control en la integración
+continua.
+
+Uso:
+    python scripts/generar_openapi.py [--comprobar] [--salida app/openapi.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+# Routers en el orden de RUTAS: el orden de las rutas del esquema no depende del entorno
+os.environ["RUTAS_DIFERIDAS"] = ""
+
+from app.main import app, registro_routers  # noqa: E402
+from app.openapi import OPENAPI_ARTEFACTO, diferencias, generar_esquema, serializar  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--salida", default=OPENAPI_ARTEFACTO or str(RAIZ / "app" / "openapi.json"))
+    parser.add_argument("--comprobar", action="store_true")
+    args = parser.parse_args()
+
+    registro_routers.montar_pendientes()
+    esquema = generar_esquema(app)
+    salida = Path(args.salida)
+
+    if args.comprobar:
+        if not salida.exists():
+            print(f"❌ No existe {salida}: ejecuta python scripts/generar_openapi.py")
+            sys.exit(1)
+        cambios = diferencias(esquema, json.loads(salida.read_bytes()))
+        if cambios:
+            print(f"❌ {salida} no coincide con las rutas ({len(cambios)} cambios):")
+            for cambio in cambios:
+                print(f"    {cambio}")
+            print("Regenéralo con: python scripts/generar_openapi.py")
+            sys.exit(1)
+        print(f"✅ {salida} al día ({len(esquema['paths'])} rutas)")
+        return
+
+    salida.write_bytes(serializar(esquema))
+    print(f"✅ Esquema OpenAPI escrito en {salida} ({len(esquema['paths'])} rutas)")
+
+
+if __name__ == "__main__":
+    main()